@@ -0,0 +1,41 @@
+"""Render admission control: render_jobs.priority and render_jobs.queue_position.
+
+Revision ID: 0003_render_job_queue
+Revises: 0002_render_jobs_014
+Create Date: 2026-10-18
+
+Changes applied on top of 0002_render_jobs_014:
+
+  render_jobs:
+    - Add priority VARCHAR(20) NOT NULL DEFAULT 'final' — admission class of the
+      render ("final" exports are admitted before "draft" renders).
+    - Add queue_position INTEGER — 1-based position while the render waits for
+      admission (src/render/scheduler.py); NULL once admitted.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0003_render_job_queue"
+down_revision: str | Sequence[str] | None = "0002_render_jobs_014"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "render_jobs",
+        sa.Column("priority", sa.String(20), nullable=False, server_default="final"),
+    )
+    op.add_column("render_jobs", sa.Column("queue_position", sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("render_jobs", "queue_position")
+    op.drop_column("render_jobs", "priority")
@@ -0,0 +1,38 @@
+"""Render deduplication: render_jobs.fingerprint.
+
+Revision ID: 0004_render_job_fingerprint
+Revises: 0003_render_job_queue
+Create Date: 2026-10-18
+
+Changes applied on top of 0003_render_job_queue:
+
+  render_jobs:
+    - Add fingerprint VARCHAR(64) — SHA-256 of the normalized export timeline,
+      asset content identities, output format and encoder settings
+      (src/render/fingerprint.py).  NULL for jobs created before this revision.
+    - Add index ix_render_jobs_fingerprint.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0004_render_job_fingerprint"
+down_revision: str | Sequence[str] | None = "0003_render_job_queue"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.add_column("render_jobs", sa.Column("fingerprint", sa.String(64), nullable=True))
+    op.create_index("ix_render_jobs_fingerprint", "render_jobs", ["fingerprint"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_render_jobs_fingerprint", table_name="render_jobs")
+    op.drop_column("render_jobs", "fingerprint")
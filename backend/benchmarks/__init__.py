@@ -0,0 +1,12 @@
+"""Offline benchmark suite for render, analysis and batch-edit hot paths.
+
+Run from ``backend/``::
+
+    python -m benchmarks                    # compare against baselines.json
+    python -m benchmarks -k analysis        # only matching scenarios
+    python -m benchmarks --update-baseline  # record new baselines
+
+Exits non-zero when a scenario's median time or peak memory regresses by
+more than ``--threshold`` (default 25%).  Baselines are machine specific:
+record them on the machine that compares against them.
+"""
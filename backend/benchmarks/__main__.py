@@ -0,0 +1,74 @@
+"""Command-line entry point: ``python -m benchmarks`` (see the package docstring)."""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import sys
+from pathlib import Path
+
+# Benchmarks never touch cloud storage
+os.environ.setdefault("USE_LOCAL_STORAGE", "true")
+
+from benchmarks.harness import (  # noqa: E402
+    DEFAULT_BASELINE_PATH,
+    DEFAULT_THRESHOLD,
+    Result,
+    compare,
+    format_table,
+    load_baselines,
+    measure,
+    results_json,
+    save_baselines,
+)
+from benchmarks.scenarios import all_scenarios  # noqa: E402
+from benchmarks.synthetic import ffmpeg_available  # noqa: E402
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__)
+    parser.add_argument("-k", dest="pattern", help="only run scenarios whose name contains this")
+    parser.add_argument("--repeats", type=int, help="timed runs per scenario")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE_PATH)
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--json", type=Path, help="also write raw results to this file")
+    args = parser.parse_args(argv)
+
+    # The render path logs every filter graph (and missing fonts) on each run
+    logging.basicConfig(level=logging.ERROR)
+
+    has_ffmpeg = ffmpeg_available()
+    results: list[Result] = []
+    for scenario in all_scenarios():
+        if args.pattern and args.pattern not in scenario.name:
+            continue
+        if scenario.requires_ffmpeg and not has_ffmpeg:
+            print(f"skip {scenario.name}: FFmpeg not available", file=sys.stderr)
+            continue
+        results.append(measure(scenario, repeats=args.repeats))
+
+    baselines = load_baselines(args.baseline)
+    for line in format_table(results, baselines):
+        print(line)
+    if args.json:
+        args.json.write_text(results_json(results) + "\n")
+
+    if args.update_baseline:
+        save_baselines(results, args.baseline)
+        print(f"Baselines written to {args.baseline}")
+        return 0
+
+    regressions = compare(results, baselines, args.threshold)
+    for regression in regressions:
+        print(
+            f"REGRESSION {regression.name} {regression.metric}: "
+            f"{regression.baseline:g} -> {regression.current:g} ({regression.ratio:.2f}x)",
+            file=sys.stderr,
+        )
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,188 @@
+"""Timing / peak-memory measurement and baseline comparison.
+
+A :class:`Scenario` prepares its inputs in a context manager that yields the
+callable to measure (sync or async).  :func:`measure` runs it a few times
+for wall time (median reported) and once more under ``tracemalloc`` for peak
+Python heap usage, so tracing overhead never inflates the timings.
+
+Baselines are stored as JSON (``baselines.json`` next to this module).
+:func:`compare` flags a scenario when its median time or peak memory grows
+by more than the threshold over the baseline; tiny absolute differences are
+ignored so sub-millisecond scenarios do not flap.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import inspect
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from collections.abc import Callable, Iterator
+from dataclasses import asdict, dataclass
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+DEFAULT_BASELINE_PATH = Path(__file__).with_name("baselines.json")
+
+# Relative growth over the baseline that counts as a regression
+DEFAULT_THRESHOLD = 0.25
+# Absolute growth below which a change is noise, whatever the ratio
+MIN_TIME_DELTA_MS = 2.0
+MIN_MEMORY_DELTA_KIB = 256.0
+
+Prepare = Callable[[], contextlib.AbstractContextManager[Callable[[], Any]]]
+
+
+@dataclass(frozen=True)
+class Scenario:
+    name: str
+    prepare: Prepare
+    repeats: int = 5
+    requires_ffmpeg: bool = False
+
+
+@dataclass(frozen=True)
+class Result:
+    name: str
+    runs: int
+    median_ms: float
+    min_ms: float
+    max_ms: float
+    peak_kib: float
+
+
+@dataclass(frozen=True)
+class Regression:
+    name: str
+    metric: str
+    baseline: float
+    current: float
+
+    @property
+    def ratio(self) -> float:
+        return self.current / self.baseline if self.baseline else float("inf")
+
+
+def _runner(loop: asyncio.AbstractEventLoop, fn: Callable[[], Any]) -> Callable[[], None]:
+    def run() -> None:
+        result = fn()
+        if inspect.isawaitable(result):
+            loop.run_until_complete(result)
+
+    return run
+
+
+def measure(scenario: Scenario, repeats: int | None = None, warmup: int = 1) -> Result:
+    """Time ``scenario`` and record its peak traced memory."""
+    repeats = repeats or scenario.repeats
+    loop = asyncio.new_event_loop()
+    try:
+        with scenario.prepare() as fn:
+            run = _runner(loop, fn)
+            for _ in range(warmup):
+                run()
+            timings: list[float] = []
+            for _ in range(repeats):
+                started = time.perf_counter()
+                run()
+                timings.append((time.perf_counter() - started) * 1000)
+
+            tracemalloc.start()
+            try:
+                run()
+                _, peak = tracemalloc.get_traced_memory()
+            finally:
+                tracemalloc.stop()
+    finally:
+        loop.close()
+
+    return Result(
+        name=scenario.name,
+        runs=repeats,
+        median_ms=round(statistics.median(timings), 3),
+        min_ms=round(min(timings), 3),
+        max_ms=round(max(timings), 3),
+        peak_kib=round(peak / 1024, 1),
+    )
+
+
+def load_baselines(path: Path = DEFAULT_BASELINE_PATH) -> dict[str, dict[str, float]]:
+    if not path.exists():
+        return {}
+    data = json.loads(path.read_text())
+    scenarios: dict[str, dict[str, float]] = data.get("scenarios", {})
+    return scenarios
+
+
+def save_baselines(results: list[Result], path: Path = DEFAULT_BASELINE_PATH) -> None:
+    """Write ``results`` as the new baseline, keeping scenarios not re-run."""
+    scenarios = load_baselines(path)
+    for result in results:
+        scenarios[result.name] = {"median_ms": result.median_ms, "peak_kib": result.peak_kib}
+    data = {
+        "meta": {
+            "recorded_at": datetime.now(UTC).isoformat(timespec="seconds"),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+        },
+        "scenarios": dict(sorted(scenarios.items())),
+    }
+    path.write_text(json.dumps(data, indent=2, ensure_ascii=False) + "\n")
+
+
+def compare(
+    results: list[Result],
+    baselines: dict[str, dict[str, float]],
+    threshold: float = DEFAULT_THRESHOLD,
+) -> list[Regression]:
+    """Scenarios whose time or memory grew by more than ``threshold``."""
+    regressions: list[Regression] = []
+    for result in results:
+        baseline = baselines.get(result.name)
+        if baseline is None:
+            continue
+        checks = (
+            ("median_ms", result.median_ms, MIN_TIME_DELTA_MS),
+            ("peak_kib", result.peak_kib, MIN_MEMORY_DELTA_KIB),
+        )
+        for metric, current, min_delta in checks:
+            previous = baseline.get(metric)
+            if previous is None:
+                continue
+            if current - previous > max(previous * threshold, min_delta):
+                regressions.append(Regression(result.name, metric, previous, current))
+    return regressions
+
+
+def format_table(results: list[Result], baselines: dict[str, dict[str, float]]) -> Iterator[str]:
+    """Human-readable report lines, with the change against the baseline."""
+    width = max((len(r.name) for r in results), default=10)
+    yield (
+        f"{'scenario':<{width}}  {'median ms':>10}  {'vs base':>8}  "
+        f"{'peak KiB':>10}  {'vs base':>8}"
+    )
+    for result in results:
+        baseline = baselines.get(result.name, {})
+
+        def change(metric: str, current: float, baseline: dict[str, float] = baseline) -> str:
+            previous = baseline.get(metric)
+            if not previous:
+                return "new"
+            return f"{(current / previous - 1) * 100:+.0f}%"
+
+        yield (
+            f"{result.name:<{width}}  {result.median_ms:>10.2f}  "
+            f"{change('median_ms', result.median_ms):>8}  "
+            f"{result.peak_kib:>10.1f}  {change('peak_kib', result.peak_kib):>8}"
+        )
+
+
+def results_json(results: list[Result]) -> str:
+    return json.dumps([asdict(r) for r in results], indent=2)
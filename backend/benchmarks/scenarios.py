@@ -0,0 +1,254 @@
+"""Benchmark scenarios for the render, analysis and batch-edit hot paths.
+
+Every scenario runs at two sizes: ``small`` (a typical short video) and
+``large`` (a long, dense project).  All inputs are synthetic; only the
+``render.e2e`` scenario needs FFmpeg, and it uses lavfi-generated media.
+"""
+
+from __future__ import annotations
+
+import os
+import shutil
+import tempfile
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from typing import Any
+from uuid import uuid4
+
+from benchmarks.harness import Prepare, Scenario
+from benchmarks.synthetic import (
+    TimelineSpec,
+    asset_map,
+    build_timeline,
+    generate_media,
+    placeholder_media,
+)
+
+SIZES: dict[str, TimelineSpec] = {
+    "small": TimelineSpec(),
+    "large": TimelineSpec(
+        layers=6,
+        clips_per_layer=200,
+        keyframes_per_clip=8,
+        telops=100,
+        audio_tracks=4,
+        clips_per_audio_track=150,
+        volume_keyframes_per_clip=6,
+        video_assets=12,
+        audio_assets=8,
+    ),
+}
+
+# Small enough to render in a few seconds
+E2E_SPEC = TimelineSpec(
+    layers=2,
+    clips_per_layer=3,
+    keyframes_per_clip=2,
+    telops=2,
+    audio_tracks=2,
+    clips_per_audio_track=3,
+    clip_duration_ms=1000,
+    video_assets=2,
+    audio_assets=2,
+)
+
+
+@contextmanager
+def _workdir() -> Iterator[str]:
+    path = tempfile.mkdtemp(prefix="douga_bench_")
+    try:
+        yield path
+    finally:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+def _composite(spec: TimelineSpec) -> Prepare:
+    @contextmanager
+    def prepare() -> Iterator[Callable[[], Any]]:
+        from src.render.pipeline import RenderPipeline
+
+        timeline = build_timeline(spec)
+        with _workdir() as media_dir:
+            assets = placeholder_media(spec, media_dir)
+            pipeline = RenderPipeline(job_id="bench")
+            try:
+                output = os.path.join(pipeline.output_dir, "out.mp4")
+                yield lambda: pipeline.build_composite_command(
+                    timeline, assets, spec.duration_ms, output
+                )
+            finally:
+                shutil.rmtree(pipeline.work_dir, ignore_errors=True)
+
+    return prepare
+
+
+def _audio_mix(spec: TimelineSpec) -> Prepare:
+    @contextmanager
+    def prepare() -> Iterator[Callable[[], Any]]:
+        from src.render.audio_mixer import AudioMixer
+        from src.render.pipeline import RenderPipeline
+
+        timeline = build_timeline(spec)
+        with _workdir() as work:
+            assets = placeholder_media(spec, work)
+            pipeline, mixer = RenderPipeline(), AudioMixer(work)
+            output = os.path.join(work, "mixed.wav")
+
+            def run() -> Any:
+                tracks = pipeline._build_audio_tracks(timeline, assets, spec.duration_ms)
+                return mixer.build_mix_command(tracks, output, spec.duration_ms)
+
+            yield run
+
+    return prepare
+
+
+def _analysis(spec: TimelineSpec) -> Prepare:
+    @contextmanager
+    def prepare() -> Iterator[Callable[[], Any]]:
+        from src.services.timeline_analysis import TimelineAnalyzer
+
+        timeline, assets = build_timeline(spec), asset_map(spec)
+        # A fresh analyzer per run: it memoizes its index
+        yield lambda: TimelineAnalyzer(timeline, assets, project_id="bench").analyze_all()
+
+    return prepare
+
+
+def _validation(spec: TimelineSpec) -> Prepare:
+    @contextmanager
+    def prepare() -> Iterator[Callable[[], Any]]:
+        from src.services.composition_validator import CompositionValidator
+
+        timeline, assets = build_timeline(spec), asset_map(spec)
+        yield lambda: CompositionValidator(timeline, asset_ids=set(assets)).validate()
+
+    return prepare
+
+
+def _events(spec: TimelineSpec) -> Prepare:
+    @contextmanager
+    def prepare() -> Iterator[Callable[[], Any]]:
+        from src.services.event_detector import EventDetector
+
+        timeline = build_timeline(spec)
+        names = {aid: info["name"] for aid, info in asset_map(spec).items()}
+        yield lambda: EventDetector(timeline, names).detect_all()
+
+    return prepare
+
+
+class _NoAssetDb:
+    """Minimal async session: the batch touches no assets and flushes once."""
+
+    class _Result:
+        def scalars(self) -> list[Any]:
+            return []
+
+    async def execute(self, stmt: Any) -> _Result:
+        return self._Result()
+
+    async def flush(self) -> None:
+        return None
+
+
+def batch_operations(spec: TimelineSpec) -> list[Any]:
+    """One edit per visual clip: move, trim, transform, effects or delete."""
+    from src.schemas.ai import BatchClipOperation
+
+    operations: list[BatchClipOperation] = []
+    for layer in range(spec.layers):
+        for index in range(spec.clips_per_layer):
+            clip_id = f"clip-{layer}-{index}"
+            kind = index % 5
+            if kind == 0:
+                operations.append(
+                    BatchClipOperation(
+                        operation="move",
+                        clip_id=clip_id,
+                        data={"new_start_ms": index * spec.clip_duration_ms + 100},
+                    )
+                )
+            elif kind == 1:
+                operations.append(
+                    BatchClipOperation(
+                        operation="trim",
+                        clip_id=clip_id,
+                        data={"duration_ms": spec.clip_duration_ms - 500},
+                    )
+                )
+            elif kind == 2:
+                operations.append(
+                    BatchClipOperation(
+                        operation="update_transform", clip_id=clip_id, data={"x": 120, "y": -40}
+                    )
+                )
+            elif kind == 3:
+                operations.append(
+                    BatchClipOperation(
+                        operation="update_effects", clip_id=clip_id, data={"opacity": 0.7}
+                    )
+                )
+            else:
+                operations.append(BatchClipOperation(operation="delete", clip_id=clip_id))
+    return operations
+
+
+def _batch(spec: TimelineSpec) -> Prepare:
+    @contextmanager
+    def prepare() -> Iterator[Callable[[], Any]]:
+        from src.models.project import Project
+        from src.services.ai_service import AIService
+
+        timeline = build_timeline(spec)
+        operations = batch_operations(spec)
+        service = AIService(_NoAssetDb())  # type: ignore[arg-type]
+
+        async def run() -> Any:
+            # The batch works on a copy-on-write journal, so ``timeline`` is
+            # left untouched and can be shared by every run
+            project = Project(
+                id=uuid4(), name="bench", timeline_data=timeline, duration_ms=spec.duration_ms
+            )
+            result = (await service.execute_batch_operations(project, operations)).result
+            if not result.success:
+                raise RuntimeError(f"Batch failed: {result.errors[:3]}")
+            return result
+
+        yield run
+
+    return prepare
+
+
+@contextmanager
+def _render_e2e() -> Iterator[Callable[[], Any]]:
+    from src.render.pipeline import RenderPipeline
+
+    timeline = build_timeline(E2E_SPEC)
+    with _workdir() as work:
+        assets = generate_media(E2E_SPEC, os.path.join(work, "media"))
+        output = os.path.join(work, "out.mp4")
+
+        async def run() -> None:
+            pipeline = RenderPipeline(job_id="bench-e2e", width=640, height=360, fps=30)
+            try:
+                await pipeline.render(timeline, assets, output)
+            finally:
+                shutil.rmtree(pipeline.work_dir, ignore_errors=True)
+
+        yield run
+
+
+def all_scenarios() -> list[Scenario]:
+    scenarios: list[Scenario] = []
+    for size, spec in SIZES.items():
+        scenarios += [
+            Scenario(f"render.composite_command.{size}", _composite(spec)),
+            Scenario(f"render.audio_mix_command.{size}", _audio_mix(spec)),
+            Scenario(f"analysis.timeline.{size}", _analysis(spec)),
+            Scenario(f"analysis.composition_validation.{size}", _validation(spec)),
+            Scenario(f"analysis.event_detection.{size}", _events(spec)),
+            Scenario(f"api.batch_operations.{size}", _batch(spec)),
+        ]
+    scenarios.append(Scenario("render.e2e.small", _render_e2e, repeats=2, requires_ffmpeg=True))
+    return scenarios
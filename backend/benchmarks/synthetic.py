@@ -0,0 +1,253 @@
+"""Synthetic timelines and media for benchmarks.
+
+:func:`build_timeline` produces a timeline that validates against
+``src.schemas.timeline.TimelineData`` with a configurable number of layers,
+clips, keyframes, telops and audio clips.  Generation is deterministic for a
+given spec and seed, so runs are comparable.
+
+:func:`generate_media` renders short local test files with FFmpeg's
+``lavfi`` sources (``testsrc2`` / ``sine``) — no network, no fixtures.
+"""
+
+from __future__ import annotations
+
+import os
+import random
+import shutil
+import subprocess
+import uuid
+from dataclasses import dataclass
+from typing import Any
+
+# Fixed namespace so asset ids are stable across runs
+_ASSET_NAMESPACE = uuid.UUID("6d9f4f5e-3c1b-4c1e-9a57-2f4a1f0b7d10")
+
+_AUDIO_TRACK_TYPES = ("narration", "bgm", "se")
+
+
+@dataclass(frozen=True)
+class TimelineSpec:
+    """Size of a synthetic timeline."""
+
+    layers: int = 3
+    clips_per_layer: int = 20
+    keyframes_per_clip: int = 0
+    telops: int = 10
+    audio_tracks: int = 3
+    clips_per_audio_track: int = 10
+    volume_keyframes_per_clip: int = 0
+    clip_duration_ms: int = 3000
+    # Distinct media assets shared by the clips
+    video_assets: int = 4
+    audio_assets: int = 3
+
+    @property
+    def duration_ms(self) -> int:
+        return self.clips_per_layer * self.clip_duration_ms
+
+
+def asset_id(kind: str, index: int) -> str:
+    return str(uuid.uuid5(_ASSET_NAMESPACE, f"{kind}-{index}"))
+
+
+def asset_map(spec: TimelineSpec) -> dict[str, dict[str, Any]]:
+    """``{asset_id: {"name", "type"}}`` as passed to ``TimelineAnalyzer``."""
+    assets = {
+        asset_id("video", i): {"name": f"video_{i}.mp4", "type": "video"}
+        for i in range(spec.video_assets)
+    }
+    assets.update(
+        {
+            asset_id("audio", i): {"name": f"audio_{i}.wav", "type": "audio"}
+            for i in range(spec.audio_assets)
+        }
+    )
+    return assets
+
+
+def _keyframes(rng: random.Random, count: int, duration_ms: int) -> list[dict[str, Any]]:
+    step = duration_ms // max(count, 1)
+    return [
+        {
+            "time_ms": i * step,
+            "transform": {
+                "x": rng.uniform(-400, 400),
+                "y": rng.uniform(-200, 200),
+                "scale": rng.uniform(0.5, 1.5),
+                "rotation": rng.uniform(-15, 15),
+            },
+            "opacity": rng.uniform(0.5, 1.0),
+        }
+        for i in range(count)
+    ]
+
+
+def _video_clip(rng: random.Random, spec: TimelineSpec, layer: int, index: int) -> dict[str, Any]:
+    duration = spec.clip_duration_ms
+    clip: dict[str, Any] = {
+        "id": f"clip-{layer}-{index}",
+        "asset_id": asset_id("video", rng.randrange(spec.video_assets)),
+        "start_ms": index * duration,
+        "duration_ms": duration,
+        "in_point_ms": 0,
+        "out_point_ms": duration,
+        "transform": {"x": 0, "y": 0, "scale": rng.choice((1.0, 0.8, 0.5)), "rotation": 0},
+        "effects": {"opacity": 1.0},
+    }
+    if spec.keyframes_per_clip:
+        clip["keyframes"] = _keyframes(rng, spec.keyframes_per_clip, duration)
+    if index % 5 == 4:
+        clip["transition_in"] = {"type": "fade", "duration_ms": 300}
+    return clip
+
+
+def _telop(rng: random.Random, spec: TimelineSpec, index: int) -> dict[str, Any]:
+    slot = spec.duration_ms // max(spec.telops, 1)
+    return {
+        "id": f"telop-{index}",
+        "start_ms": index * slot,
+        "duration_ms": max(slot - 200, 500),
+        "text_content": f"テロップ {index}: {'あいうえお' * rng.randint(1, 4)}",
+        "text_style": {
+            "fontFamily": "Noto Sans JP",
+            "fontSize": 48,
+            "color": "#ffffff",
+            "strokeColor": "#000000",
+            "strokeWidth": 2,
+        },
+        "transform": {"x": 0, "y": 380, "scale": 1.0, "rotation": 0},
+        "effects": {"opacity": 1.0},
+    }
+
+
+def _audio_clip(rng: random.Random, spec: TimelineSpec, track: int, index: int) -> dict[str, Any]:
+    slot = spec.duration_ms // max(spec.clips_per_audio_track, 1)
+    duration = max(slot - rng.randrange(0, max(slot // 4, 1)), 200)
+    clip: dict[str, Any] = {
+        "id": f"audio-{track}-{index}",
+        "asset_id": asset_id("audio", rng.randrange(spec.audio_assets)),
+        "start_ms": index * slot,
+        "duration_ms": duration,
+        "in_point_ms": 0,
+        "out_point_ms": duration,
+        "volume": rng.choice((1.0, 0.8, 0.3)),
+        "fade_in_ms": 100,
+        "fade_out_ms": 100,
+    }
+    if spec.volume_keyframes_per_clip:
+        step = duration // spec.volume_keyframes_per_clip
+        clip["volume_keyframes"] = [
+            {"time_ms": i * step, "value": round(rng.uniform(0.1, 1.0), 3)}
+            for i in range(spec.volume_keyframes_per_clip)
+        ]
+    return clip
+
+
+def build_timeline(spec: TimelineSpec, seed: int = 0) -> dict[str, Any]:
+    """A deterministic timeline of the given size (``TimelineData``-shaped)."""
+    rng = random.Random(seed)
+    layers: list[dict[str, Any]] = []
+    if spec.telops:
+        layers.append(
+            {
+                "id": "layer-text",
+                "name": "Telops",
+                "type": "text",
+                "order": spec.layers,
+                "visible": True,
+                "locked": False,
+                "clips": [_telop(rng, spec, i) for i in range(spec.telops)],
+            }
+        )
+    for layer in range(spec.layers):
+        layers.append(
+            {
+                "id": f"layer-{layer}",
+                "name": f"Layer {layer}",
+                "type": "background" if layer == spec.layers - 1 else "content",
+                "order": spec.layers - 1 - layer,
+                "visible": True,
+                "locked": False,
+                "clips": [_video_clip(rng, spec, layer, i) for i in range(spec.clips_per_layer)],
+            }
+        )
+    audio_tracks = [
+        {
+            "id": f"track-{track}",
+            "name": f"Track {track}",
+            "type": _AUDIO_TRACK_TYPES[track % len(_AUDIO_TRACK_TYPES)],
+            "volume": 1.0,
+            "muted": False,
+            "clips": [_audio_clip(rng, spec, track, i) for i in range(spec.clips_per_audio_track)],
+        }
+        for track in range(spec.audio_tracks)
+    ]
+    return {
+        "version": "1.0",
+        "duration_ms": spec.duration_ms,
+        "layers": layers,
+        "audio_tracks": audio_tracks,
+    }
+
+
+def ffmpeg_available() -> bool:
+    from src.config import get_settings
+
+    return shutil.which(get_settings().ffmpeg_path) is not None
+
+
+def generate_media(spec: TimelineSpec, directory: str, duration_s: float = 2.0) -> dict[str, str]:
+    """Render the spec's assets with lavfi; returns ``{asset_id: path}``.
+
+    Files that already exist are reused.  Raises ``RuntimeError`` if FFmpeg
+    is missing or fails.
+    """
+    from src.config import get_settings
+
+    ffmpeg = get_settings().ffmpeg_path
+    if not ffmpeg_available():
+        raise RuntimeError(f"FFmpeg not found ({ffmpeg}); cannot generate test media")
+    os.makedirs(directory, exist_ok=True)
+
+    jobs: list[tuple[str, str, list[str]]] = []
+    for i in range(spec.video_assets):
+        path = os.path.join(directory, f"video_{i}.mp4")
+        source = [
+            *("-f", "lavfi", "-i", f"testsrc2=size=640x360:rate=30:duration={duration_s}"),
+            *("-f", "lavfi", "-i", f"sine=frequency={220 * (i + 1)}:duration={duration_s}"),
+            *("-c:v", "libx264", "-preset", "ultrafast", "-pix_fmt", "yuv420p"),
+            *("-c:a", "aac", "-shortest"),
+        ]
+        jobs.append((asset_id("video", i), path, source))
+    for i in range(spec.audio_assets):
+        path = os.path.join(directory, f"audio_{i}.wav")
+        source = ["-f", "lavfi", "-i", f"sine=frequency={330 * (i + 1)}:duration={duration_s}"]
+        jobs.append((asset_id("audio", i), path, source))
+
+    paths: dict[str, str] = {}
+    for aid, path, source in jobs:
+        if not os.path.exists(path):
+            completed = subprocess.run(
+                [ffmpeg, "-y", "-v", "error", *source, path], capture_output=True
+            )
+            if completed.returncode != 0:
+                raise RuntimeError(
+                    f"FFmpeg failed for {path}: {completed.stderr.decode(errors='replace')}"
+                )
+        paths[aid] = path
+    return paths
+
+
+def placeholder_media(spec: TimelineSpec, directory: str) -> dict[str, str]:
+    """``{asset_id: path}`` without creating files (for command-building only)."""
+    paths = {
+        asset_id("video", i): os.path.join(directory, f"video_{i}.mp4")
+        for i in range(spec.video_assets)
+    }
+    paths.update(
+        {
+            asset_id("audio", i): os.path.join(directory, f"audio_{i}.wav")
+            for i in range(spec.audio_assets)
+        }
+    )
+    return paths
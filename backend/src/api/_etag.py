@@ -72,6 +72,48 @@ def compute_etag(payload: Any, *, exclude_keys: list[str] | None = None) -> str:
     return f'W/"{digest}"'
 
 
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Check whether an ``If-None-Match`` header value matches ``etag``.
+
+    Supports:
+    - Exact match: If-None-Match: W/"abc"
+    - Wildcard: If-None-Match: *
+    - Multiple values: If-None-Match: W/"abc", W/"def"
+    """
+    if if_none_match.strip() == "*":
+        return True
+
+    # Parse comma-separated ETags
+    client_etags = [e.strip() for e in if_none_match.split(",")]
+    return etag in client_etags
+
+
+# Separator of the asset-catalog part of a read ETag (see ``with_asset_catalog``)
+_ASSETS_SEP = ";assets="
+
+
+def with_asset_catalog(etag: str, catalog: str) -> str:
+    """Extend ``etag`` with the asset catalog a read response also depends on.
+
+    Asset uploads and renames do not touch the project or sequence rows, so
+    reads that list assets or resolve asset names fold the catalog token into
+    their ETag.  Write preconditions compare only the timeline part
+    (:func:`timeline_etag`), so a concurrent upload does not fail an If-Match.
+    """
+    return f'{etag[:-1]}{_ASSETS_SEP}{catalog}"'
+
+
+def timeline_etag(etag: str) -> str:
+    """``etag`` without the asset-catalog part added by :func:`with_asset_catalog`."""
+    head, sep, _ = etag.partition(_ASSETS_SEP)
+    return f'{head}"' if sep else etag
+
+
+def not_modified_response(etag: str) -> Response:
+    """Return an empty 304 response carrying ``etag``."""
+    return Response(status_code=304, headers={"ETag": etag})
+
+
 def etag_response(
     request: Request, payload: Any, *, exclude_keys: list[str] | None = None
 ) -> Response:
@@ -98,7 +140,7 @@ def etag_response(
     if_none_match = request.headers.get("if-none-match") or request.headers.get("If-None-Match")
 
     if if_none_match and if_none_match == etag:
-        return Response(status_code=304, headers={"ETag": etag})
+        return not_modified_response(etag)
 
     serialized = _serialize(payload)
     return Response(
@@ -878,7 +878,7 @@ async def execute_batch_operations(
     service = AIService(db)
 
     flag_modified(project, "timeline_data")
-    result = await service.execute_batch_operations(project, request.operations)
+    execution = await service.execute_batch_operations(project, request.operations)
 
     # Publish event for SSE subscribers
     await event_manager.publish(
@@ -887,7 +887,7 @@ async def execute_batch_operations(
         data={"source": "ai_api", "operation": "batch_operations"},
     )
 
-    return result
+    return execution.result
 
 
 # =============================================================================
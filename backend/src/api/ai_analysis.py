@@ -22,6 +22,7 @@ from src.middleware.request_context import (
 )
 from src.models.asset import Asset
 from src.schemas.envelope import EnvelopeResponse, ErrorInfo, ResponseMeta
+from src.services.derived_view_cache import derived_views, view_key
 from src.services.timeline_analysis import TimelineAnalyzer
 
 logger = logging.getLogger(__name__)
@@ -176,7 +177,10 @@ async def analyze_composition(
         asset_map = await _build_asset_map(db, project_id)
 
         analyzer = TimelineAnalyzer(timeline_data, asset_map=asset_map, project_id=str(project_id))
-        result = analyzer.analyze_all()
+        result = await derived_views.get_or_compute(
+            view_key(edit_ctx.project, edit_ctx.sequence, "analysis.composition", asset_map),
+            analyzer.analyze_all,
+        )
 
         return _envelope_success(context, result)
 
@@ -258,8 +262,10 @@ async def get_suggestions(
         asset_map = await _build_asset_map(db, project_id)
 
         analyzer = TimelineAnalyzer(timeline_data, asset_map=asset_map, project_id=str(project_id))
-        suggestions = analyzer.generate_suggestions()
-        quality_score = analyzer.calculate_quality_score()
+        suggestions, quality_score = await derived_views.get_or_compute(
+            view_key(edit_ctx.project, edit_ctx.sequence, "analysis.suggestions", asset_map),
+            lambda: (analyzer.generate_suggestions(), analyzer.calculate_quality_score()),
+        )
 
         # Apply filters (post-processing)
         total_before_filter = len(suggestions)
@@ -339,7 +345,10 @@ async def detect_sections(
         asset_map = await _build_asset_map(db, project_id)
 
         analyzer = TimelineAnalyzer(timeline_data, asset_map=asset_map, project_id=str(project_id))
-        sections = analyzer.detect_sections()
+        sections = await derived_views.get_or_compute(
+            view_key(edit_ctx.project, edit_ctx.sequence, "analysis.sections", asset_map),
+            analyzer.detect_sections,
+        )
 
         return _envelope_success(
             context,
@@ -409,7 +418,10 @@ async def analyze_audio_balance(
         asset_map = await _build_asset_map(db, project_id)
 
         analyzer = TimelineAnalyzer(timeline_data, asset_map=asset_map, project_id=str(project_id))
-        result = analyzer.analyze_audio_balance()
+        result = await derived_views.get_or_compute(
+            view_key(edit_ctx.project, edit_ctx.sequence, "analysis.audio_balance", asset_map),
+            analyzer.analyze_audio_balance,
+        )
 
         return _envelope_success(context, result)
 
@@ -5,18 +5,22 @@ This module is imported by all sub-modules in api/ai_v1/.
 
 import logging
 from contextlib import contextmanager
+from datetime import datetime
 from typing import Any
 from uuid import UUID
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Request, Response
 from fastapi.encoders import jsonable_encoder
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel, Field, model_validator
+from sqlalchemy import exists, or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm.attributes import flag_modified
 
+from src.api._etag import etag_matches, not_modified_response, with_asset_catalog
 from src.api.access import get_accessible_project
 from src.api.deps import CurrentUser, DbSession, get_edit_context
+from src.config import get_settings
 from src.exceptions import DougaError
 from src.middleware.request_context import (
     RequestContext,
@@ -25,6 +29,7 @@ from src.middleware.request_context import (
 )
 from src.models.asset import Asset
 from src.models.project import Project
+from src.models.project_member import ProjectMember
 from src.models.sequence import Sequence
 from src.schemas.ai import (
     AddAudioClipRequest,
@@ -54,7 +59,10 @@ from src.schemas.clip_adapter import UnifiedClipInput, UnifiedMoveClipInput, Uni
 from src.schemas.envelope import EnvelopeResponse, ErrorInfo, ResponseMeta
 from src.schemas.options import OperationOptions
 from src.services.ai_service import _sanitize_timeline_ms
+from src.services.derived_view_cache import asset_catalog_token
 from src.services.storage_service import get_storage_service
+from src.utils.edit_token import decode_edit_token
+from src.utils.metrics import metrics
 
 
 def _serialize_for_json(obj: Any) -> Any:
@@ -729,11 +737,129 @@ def _use_sequence_timeline(project: "Project", sequence: "Sequence | None") -> "
         project.timeline_data = original
 
 
-def compute_project_etag(project: Project) -> str:
-    updated_at = project.updated_at
-    if updated_at is None:
-        return f'W/"{project.id}"'
-    return f'W/"{project.id}:{updated_at.isoformat()}"'
+def _format_project_etag(
+    project_id: UUID,
+    updated_at: datetime | None,
+    sequence_id: UUID | None = None,
+    sequence_version: int | None = None,
+    sequence_updated_at: datetime | None = None,
+) -> str:
+    tag = str(project_id)
+    if updated_at is not None:
+        tag += f":{updated_at.isoformat()}"
+    if sequence_id is not None:
+        seq_ts = sequence_updated_at.isoformat() if sequence_updated_at is not None else "-"
+        tag += f":{sequence_id}:{sequence_version}:{seq_ts}"
+    return f'W/"{tag}"'
+
+
+def compute_project_etag(project: Project, sequence: Sequence | None = None) -> str:
+    """ETag of the timeline shown by (project, sequence).
+
+    Sequence saves (``PUT /sequences/{id}``, snapshot restore) and V1 writes
+    only touch the sequence row, so its id, version and updated_at are part
+    of the tag alongside ``projects.updated_at``.
+    """
+    if sequence is None:
+        return _format_project_etag(project.id, project.updated_at)
+    return _format_project_etag(
+        project.id, project.updated_at, sequence.id, sequence.version, sequence.updated_at
+    )
+
+
+def compute_read_etag(project: Project, sequence: Sequence | None, assets: str) -> str:
+    """ETag of a read that also shows asset names: the timeline tag plus the catalog."""
+    return with_asset_catalog(compute_project_etag(project, sequence), assets)
+
+
+async def _precondition_sequence(
+    project_id: UUID, db: DbSession, x_edit_session: str | None
+) -> tuple[UUID, int, datetime | None] | None:
+    """(id, version, updated_at) of the sequence ``get_edit_context`` would resolve.
+
+    Mirrors its X-Edit-Session / default-sequence resolution without loading
+    ``timeline_data``.
+    """
+    columns = (Sequence.id, Sequence.version, Sequence.updated_at)
+    if x_edit_session:
+        claims = decode_edit_token(x_edit_session, get_settings().edit_token_secret)
+        if claims["pid"] == str(project_id):
+            result = await db.execute(
+                select(*columns).where(
+                    Sequence.id == claims["sid"], Sequence.project_id == project_id
+                )
+            )
+            row = result.one_or_none()
+            if row is not None:
+                return row[0], row[1], row[2]
+    result = await db.execute(
+        select(*columns).where(
+            Sequence.project_id == project_id,
+            Sequence.is_default == True,  # noqa: E712
+        )
+    )
+    row = result.one_or_none()
+    return (row[0], row[1], row[2]) if row is not None else None
+
+
+async def check_project_not_modified(
+    request: Request,
+    project_id: UUID,
+    current_user: CurrentUser,
+    db: DbSession,
+    x_edit_session: str | None = None,
+) -> Response | None:
+    """Answer a conditional GET with 304 before the handler loads the project.
+
+    Read endpoints whose ETag is ``compute_read_etag(project, sequence,
+    assets)`` can call this first (passing the same X-Edit-Session).  It reads
+    only ``projects.updated_at`` (plus the membership check from
+    ``get_accessible_project``), the target sequence's id, version and
+    updated_at, and the asset catalog token instead of the full rows with
+    their ``timeline_data`` JSONB, so a matching ``If-None-Match`` skips the
+    timeline load, asset-name resolution and serialization entirely.
+
+    Returns None when the request is unconditional, the ETag is stale, the
+    edit-session token is invalid, or the caller has no access — the handler
+    then runs normally and produces the 200 / 4xx response itself.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return None
+
+    result = await db.execute(
+        select(Project.updated_at).where(
+            Project.id == project_id,
+            or_(
+                Project.user_id == current_user.id,
+                exists().where(
+                    ProjectMember.project_id == Project.id,
+                    ProjectMember.user_id == current_user.id,
+                    ProjectMember.accepted_at.isnot(None),
+                ),
+            ),
+        )
+    )
+    row = result.one_or_none()
+    if row is None:
+        return None
+
+    try:
+        sequence = await _precondition_sequence(project_id, db, x_edit_session)
+    except ValueError:
+        return None  # invalid token: let the handler answer 400
+    if sequence is None:
+        etag = _format_project_etag(project_id, row[0])
+    else:
+        etag = _format_project_etag(project_id, row[0], *sequence)
+    etag = with_asset_catalog(etag, await asset_catalog_token(db, project_id))
+    if not etag_matches(if_none_match, etag):
+        metrics.incr("etag.precondition.miss")
+        return None
+
+    metrics.incr("etag.precondition.hit")
+    logger.debug("v1 precondition 304 project=%s", project_id)
+    return not_modified_response(etag)
 
 
 def _match_id(full_id: str | None, search_id: str) -> bool:
@@ -63,10 +63,10 @@ from src.schemas.options import OperationOptions
 from src.services.ai_service import AIService
 from src.services.chroma_key_service import ChromaKeyService
 from src.services.event_manager import event_manager
+from src.services.media_probe import ASSET_METADATA_KEY, media_probe, storage_content_key
 from src.services.operation_service import OperationService
 from src.services.storage_service import get_storage_service
 from src.services.validation_service import ValidationService
-from src.utils.media_info import get_media_info
 
 router = APIRouter()
 
@@ -108,7 +108,7 @@ async def add_clip(
         _orig_tl = project.timeline_data
         if _seq:
             project.timeline_data = _seq.timeline_data
-        current_etag = compute_project_etag(project)
+        current_etag = compute_project_etag(project, _seq)
 
         # Check If-Match for concurrency control
         if headers["if_match"] and headers["if_match"] != current_etag:
@@ -251,7 +251,9 @@ async def add_clip(
 
         await db.flush()
         await db.refresh(project)
-        response.headers["ETag"] = compute_project_etag(project)
+        if _seq:
+            await db.refresh(_seq)
+        response.headers["ETag"] = compute_project_etag(project, _seq)
 
         # Build response with operation info
         response_data: dict[str, Any] = {
@@ -359,7 +361,7 @@ async def move_clip(
         _orig_tl = project.timeline_data
         if _seq:
             project.timeline_data = _seq.timeline_data
-        current_etag = compute_project_etag(project)
+        current_etag = compute_project_etag(project, _seq)
 
         # Check If-Match for concurrency control
         if headers["if_match"] and headers["if_match"] != current_etag:
@@ -501,7 +503,9 @@ async def move_clip(
 
         await db.flush()
         await db.refresh(project)
-        response.headers["ETag"] = compute_project_etag(project)
+        if _seq:
+            await db.refresh(_seq)
+        response.headers["ETag"] = compute_project_etag(project, _seq)
 
         # Build response with operation info
         linked_clips_moved = getattr(result, "_linked_clips_moved", [])
@@ -596,7 +600,7 @@ async def transform_clip(
         _orig_tl = project.timeline_data
         if _seq:
             project.timeline_data = _seq.timeline_data
-        current_etag = compute_project_etag(project)
+        current_etag = compute_project_etag(project, _seq)
 
         # Check If-Match for concurrency control
         if headers["if_match"] and headers["if_match"] != current_etag:
@@ -733,7 +737,9 @@ async def transform_clip(
 
         await db.flush()
         await db.refresh(project)
-        response.headers["ETag"] = compute_project_etag(project)
+        if _seq:
+            await db.refresh(_seq)
+        response.headers["ETag"] = compute_project_etag(project, _seq)
 
         # Build response with operation info
         response_data: dict[str, Any] = {
@@ -825,7 +831,7 @@ async def update_clip_effects(
         _orig_tl = project.timeline_data
         if _seq:
             project.timeline_data = _seq.timeline_data
-        current_etag = compute_project_etag(project)
+        current_etag = compute_project_etag(project, _seq)
 
         # Check If-Match for concurrency control
         if headers["if_match"] and headers["if_match"] != current_etag:
@@ -983,7 +989,9 @@ async def update_clip_effects(
 
         await db.flush()
         await db.refresh(project)
-        response.headers["ETag"] = compute_project_etag(project)
+        if _seq:
+            await db.refresh(_seq)
+        response.headers["ETag"] = compute_project_etag(project, _seq)
 
         # Build response with operation info
         response_data: dict[str, Any] = {
@@ -1144,11 +1152,9 @@ async def preview_chroma_key(
                 ChromaKeyAutoFailedError(str(asset_id)),
             )
 
-        temp_dir = tempfile.mkdtemp(prefix="douga_chroma_preview_")
         try:
             frames = await chroma_service.render_preview_frames(
                 input_url=input_url,
-                output_dir=temp_dir,
                 times_ms=times,
                 clip_start_ms=start_ms,
                 in_point_ms=in_point_ms,
@@ -1158,6 +1164,7 @@ async def preview_chroma_key(
                 blend=request.blend,
                 skip_chroma_key=request.skip_chroma_key,
                 return_transparent_png=request.return_transparent_png,
+                source_key=storage_content_key(asset.storage_key),
             )
             logger.info("v1.preview_chroma_key ok project=%s clip=%s", project_id, clip_id)
             return envelope_success(
@@ -1185,8 +1192,6 @@ async def preview_chroma_key(
                 message=str(exc),
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             )
-        finally:
-            shutil.rmtree(temp_dir, ignore_errors=True)
     except HTTPException as exc:
         logger.warning(
             "v1.preview_chroma_key failed project=%s clip=%s: %s", project_id, clip_id, exc.detail
@@ -1375,7 +1380,8 @@ async def apply_chroma_key(
             )
 
             file_size = os.path.getsize(output_path)
-            media_info = get_media_info(output_path)
+            probe = await media_probe.aprobe(output_path)
+            media_info = probe.media_info()
 
             base_name = os.path.splitext(asset.name)[0]
             output_name = f"{base_name}_chroma.webm"
@@ -1410,8 +1416,10 @@ async def apply_chroma_key(
                         "blend": request.blend,
                     },
                     "source_clip_id": str(full_clip_id or clip_id),
+                    ASSET_METADATA_KEY: probe.to_metadata(storage_key),
                 },
             )
+            media_probe.seed(probe, content_key=storage_content_key(storage_key))
             db.add(new_asset)
             await db.flush()
             await db.refresh(new_asset)
@@ -1531,7 +1539,7 @@ async def update_clip_crop(
         _orig_tl = project.timeline_data
         if _seq:
             project.timeline_data = _seq.timeline_data
-        current_etag = compute_project_etag(project)
+        current_etag = compute_project_etag(project, _seq)
 
         # Check If-Match for concurrency control
         if headers["if_match"] and headers["if_match"] != current_etag:
@@ -1663,7 +1671,9 @@ async def update_clip_crop(
 
         await db.flush()
         await db.refresh(project)
-        response.headers["ETag"] = compute_project_etag(project)
+        if _seq:
+            await db.refresh(_seq)
+        response.headers["ETag"] = compute_project_etag(project, _seq)
 
         # Build response with operation info
         response_data: dict[str, Any] = {
@@ -1755,7 +1765,7 @@ async def update_clip_text_style(
         _orig_tl = project.timeline_data
         if _seq:
             project.timeline_data = _seq.timeline_data
-        current_etag = compute_project_etag(project)
+        current_etag = compute_project_etag(project, _seq)
 
         # Check If-Match for concurrency control
         if headers["if_match"] and headers["if_match"] != current_etag:
@@ -1895,7 +1905,9 @@ async def update_clip_text_style(
 
         await db.flush()
         await db.refresh(project)
-        response.headers["ETag"] = compute_project_etag(project)
+        if _seq:
+            await db.refresh(_seq)
+        response.headers["ETag"] = compute_project_etag(project, _seq)
 
         # Build response with operation info
         response_data: dict[str, Any] = {
@@ -1985,7 +1997,7 @@ async def delete_clip(
         _orig_tl = project.timeline_data
         if _seq:
             project.timeline_data = _seq.timeline_data
-        current_etag = compute_project_etag(project)
+        current_etag = compute_project_etag(project, _seq)
 
         # Check If-Match for concurrency control
         if headers["if_match"] and headers["if_match"] != current_etag:
@@ -2121,7 +2133,9 @@ async def delete_clip(
 
         await db.flush()
         await db.refresh(project)
-        response.headers["ETag"] = compute_project_etag(project)
+        if _seq:
+            await db.refresh(_seq)
+        response.headers["ETag"] = compute_project_etag(project, _seq)
 
         # Build response with operation info
         include_diff = request.options.include_diff if request else False
@@ -2204,7 +2218,7 @@ async def get_clip_details(
         )
         if _seq:
             project.timeline_data = _seq.timeline_data
-        response.headers["ETag"] = compute_project_etag(project)
+        response.headers["ETag"] = compute_project_etag(project, _seq)
 
         service = AIService(db)
         clip_details: L3ClipDetails | None = await service.get_clip_details(project, clip_id)
@@ -2278,7 +2292,7 @@ async def update_clip_timing(
         _orig_tl = project.timeline_data
         if _seq:
             project.timeline_data = _seq.timeline_data
-        current_etag = compute_project_etag(project)
+        current_etag = compute_project_etag(project, _seq)
 
         # Check If-Match for concurrency control
         if headers["if_match"] and headers["if_match"] != current_etag:
@@ -2433,7 +2447,9 @@ async def update_clip_timing(
 
         await db.flush()
         await db.refresh(project)
-        response.headers["ETag"] = compute_project_etag(project)
+        if _seq:
+            await db.refresh(_seq)
+        response.headers["ETag"] = compute_project_etag(project, _seq)
 
         # Build response with operation info
         linked_clips_updated = getattr(result, "_linked_clips_updated", [])
@@ -2535,7 +2551,7 @@ async def update_clip_text(
         _orig_tl = project.timeline_data
         if _seq:
             project.timeline_data = _seq.timeline_data
-        current_etag = compute_project_etag(project)
+        current_etag = compute_project_etag(project, _seq)
 
         # Check If-Match for concurrency control
         if headers["if_match"] and headers["if_match"] != current_etag:
@@ -2668,7 +2684,9 @@ async def update_clip_text(
 
         await db.flush()
         await db.refresh(project)
-        response.headers["ETag"] = compute_project_etag(project)
+        if _seq:
+            await db.refresh(_seq)
+        response.headers["ETag"] = compute_project_etag(project, _seq)
 
         # Build response with operation info
         response_data: dict[str, Any] = {
@@ -2766,7 +2784,7 @@ async def update_clip_shape(
         _orig_tl = project.timeline_data
         if _seq:
             project.timeline_data = _seq.timeline_data
-        current_etag = compute_project_etag(project)
+        current_etag = compute_project_etag(project, _seq)
 
         # Check If-Match for concurrency control
         if headers["if_match"] and headers["if_match"] != current_etag:
@@ -2917,7 +2935,9 @@ async def update_clip_shape(
 
         await db.flush()
         await db.refresh(project)
-        response.headers["ETag"] = compute_project_etag(project)
+        if _seq:
+            await db.refresh(_seq)
+        response.headers["ETag"] = compute_project_etag(project, _seq)
 
         # Build response with operation info
         response_data: dict[str, Any] = {
@@ -3015,7 +3035,7 @@ async def add_keyframe(
         _orig_tl = project.timeline_data
         if _seq:
             project.timeline_data = _seq.timeline_data
-        current_etag = compute_project_etag(project)
+        current_etag = compute_project_etag(project, _seq)
 
         # Check If-Match for concurrency control
         if header_result["if_match"] and header_result["if_match"] != current_etag:
@@ -3151,7 +3171,9 @@ async def add_keyframe(
 
         await db.flush()
         await db.refresh(project)
-        response.headers["ETag"] = compute_project_etag(project)
+        if _seq:
+            await db.refresh(_seq)
+        response.headers["ETag"] = compute_project_etag(project, _seq)
 
         # Build response with operation info
         response_data: dict[str, Any] = {
@@ -3247,7 +3269,7 @@ async def delete_keyframe(
         _orig_tl = project.timeline_data
         if _seq:
             project.timeline_data = _seq.timeline_data
-        current_etag = compute_project_etag(project)
+        current_etag = compute_project_etag(project, _seq)
 
         # Check If-Match for concurrency control
         if header_result["if_match"] and header_result["if_match"] != current_etag:
@@ -3375,7 +3397,9 @@ async def delete_keyframe(
 
         await db.flush()
         await db.refresh(project)
-        response.headers["ETag"] = compute_project_etag(project)
+        if _seq:
+            await db.refresh(_seq)
+        response.headers["ETag"] = compute_project_etag(project, _seq)
 
         # Build response with operation info
         include_diff = body.options.include_diff if body else False
@@ -3531,7 +3555,9 @@ async def split_clip(
 
         await db.flush()
         await db.refresh(project)
-        response.headers["ETag"] = compute_project_etag(project)
+        if _seq:
+            await db.refresh(_seq)
+        response.headers["ETag"] = compute_project_etag(project, _seq)
 
         response_data = _serialize_for_json(
             {
@@ -3666,7 +3692,9 @@ async def unlink_clip(
 
         await db.flush()
         await db.refresh(project)
-        response.headers["ETag"] = compute_project_etag(project)
+        if _seq:
+            await db.refresh(_seq)
+        response.headers["ETag"] = compute_project_etag(project, _seq)
 
         response_data: dict[str, Any] = {
             "clip_id": result["clip_id"],
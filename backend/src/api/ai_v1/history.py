@@ -31,7 +31,7 @@ from src.middleware.request_context import (
     validate_headers,
 )
 from src.schemas.ai import (
-    BatchOperationResult,
+    BatchExecution,
     GapAnalysisResult,
     L2TimelineAtTime,
     PacingAnalysisResult,
@@ -82,7 +82,7 @@ async def get_timeline_at_time(
         if _seq:
             project.timeline_data = _seq.timeline_data
             project.duration_ms = _seq.duration_ms
-        response.headers["ETag"] = compute_project_etag(project)
+        response.headers["ETag"] = compute_project_etag(project, _seq)
 
         # Validate time range
         if time_ms < 0:
@@ -158,7 +158,7 @@ async def execute_batch(
         _orig_tl = project.timeline_data
         if _seq:
             project.timeline_data = _seq.timeline_data
-        current_etag = compute_project_etag(project)
+        current_etag = compute_project_etag(project, _seq)
 
         # Check If-Match for concurrency control
         if header_result["if_match"] and header_result["if_match"] != current_etag:
@@ -200,7 +200,7 @@ async def execute_batch(
         service = AIService(db)
         operation_service = OperationService(db)
         try:
-            result: BatchOperationResult = await service.execute_batch_operations(
+            execution: BatchExecution = await service.execute_batch_operations(
                 project,
                 body.operations,
                 rollback_on_failure=body.options.rollback_on_failure,
@@ -221,6 +221,8 @@ async def execute_batch(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             )
 
+        result = execution.result
+
         # Only flag_modified after successful operation
         if result.successful_operations > 0:
             flag_modified(project, "timeline_data")
@@ -228,6 +230,10 @@ async def execute_batch(
         # Collect created_ids from individual operation results
         created_ids: list[str] = []
         affected_clips: list[str] = []
+        affected_layers = [c.entity_id for c in execution.changes if c.entity_type == "layer"]
+        affected_audio_clips = [
+            c.entity_id for c in execution.changes if c.entity_type == "audio_clip"
+        ]
         for op_result in result.results:
             if isinstance(op_result, dict):
                 if "clip_id" in op_result:
@@ -244,8 +250,9 @@ async def execute_batch(
             source="api_v1",
             success=result.success,
             affected_clips=affected_clips,
-            affected_layers=[],
-            diff=None,
+            affected_layers=affected_layers,
+            affected_audio_clips=affected_audio_clips,
+            diff=None,  # Will update after we have operation_id
             request_summary=RequestSummary(
                 endpoint="/batch",
                 method="POST",
@@ -268,6 +275,16 @@ async def execute_batch(
             user_id=current_user.id,
         )
 
+        # One combined diff for the whole batch
+        diff = operation_service.compute_diff(
+            operation_id=operation.id,
+            operation_type="batch",
+            changes=execution.changes,
+            duration_before_ms=execution.duration_before_ms,
+            duration_after_ms=execution.duration_after_ms,
+        )
+        await operation_service.update_operation_diff(operation, diff)
+
         await event_manager.publish(
             project_id=project_id,
             event_type="timeline_updated",
@@ -283,7 +300,9 @@ async def execute_batch(
 
         await db.flush()
         await db.refresh(project)
-        response.headers["ETag"] = compute_project_etag(project)
+        if _seq:
+            await db.refresh(_seq)
+        response.headers["ETag"] = compute_project_etag(project, _seq)
         logger.info(
             "v1.execute_batch ok project=%s success=%s fail=%s",
             project_id,
@@ -294,6 +313,8 @@ async def execute_batch(
         # Include operation_id in response
         response_data = result.model_dump()
         response_data["operation_id"] = str(operation.id)
+        if body.options.include_diff:
+            response_data["diff"] = diff.model_dump()
         return await idempotent_success(
             context,
             response_data,
@@ -364,7 +385,7 @@ async def execute_semantic(
         _orig_tl = project.timeline_data
         if _seq:
             project.timeline_data = _seq.timeline_data
-        current_etag = compute_project_etag(project)
+        current_etag = compute_project_etag(project, _seq)
 
         # Check If-Match for concurrency control
         if header_result["if_match"] and header_result["if_match"] != current_etag:
@@ -467,7 +488,9 @@ async def execute_semantic(
 
         await db.flush()
         await db.refresh(project)
-        response.headers["ETag"] = compute_project_etag(project)
+        if _seq:
+            await db.refresh(_seq)
+        response.headers["ETag"] = compute_project_etag(project, _seq)
         logger.info("v1.execute_semantic ok project=%s op=%s", project_id, sem_op.operation)
 
         # Build response with operation info
@@ -544,7 +567,7 @@ async def get_history(
         )
         if _seq:
             project.timeline_data = _seq.timeline_data
-        response.headers["ETag"] = compute_project_etag(project)
+        response.headers["ETag"] = compute_project_etag(project, _seq)
 
         operation_service = OperationService(db)
         query = HistoryQuery(
@@ -605,7 +628,7 @@ async def get_operation(
         )
         if _seq:
             project.timeline_data = _seq.timeline_data
-        response.headers["ETag"] = compute_project_etag(project)
+        response.headers["ETag"] = compute_project_etag(project, _seq)
 
         operation_service = OperationService(db)
         try:
@@ -677,7 +700,7 @@ async def rollback_operation(
         _orig_tl = project.timeline_data
         if _seq:
             project.timeline_data = _seq.timeline_data
-        current_etag = compute_project_etag(project)
+        current_etag = compute_project_etag(project, _seq)
 
         # Check If-Match for concurrency control
         if headers["if_match"] and headers["if_match"] != current_etag:
@@ -726,7 +749,9 @@ async def rollback_operation(
 
         await db.flush()
         await db.refresh(project)
-        response.headers["ETag"] = compute_project_etag(project)
+        if _seq:
+            await db.refresh(_seq)
+        response.headers["ETag"] = compute_project_etag(project, _seq)
         logger.info("v1.rollback_operation ok project=%s operation=%s", project_id, operation_id)
         return await idempotent_success(
             context,
@@ -784,7 +809,7 @@ async def analyze_gaps(
         if _seq:
             project.timeline_data = _seq.timeline_data
             project.duration_ms = _seq.duration_ms
-        response.headers["ETag"] = compute_project_etag(project)
+        response.headers["ETag"] = compute_project_etag(project, _seq)
 
         service = AIService(db)
         result: GapAnalysisResult = await service.analyze_gaps(project)
@@ -844,7 +869,7 @@ async def analyze_pacing(
         if _seq:
             project.timeline_data = _seq.timeline_data
             project.duration_ms = _seq.duration_ms
-        response.headers["ETag"] = compute_project_etag(project)
+        response.headers["ETag"] = compute_project_etag(project, _seq)
 
         service = AIService(db)
         result: PacingAnalysisResult = await service.analyze_pacing(
@@ -95,7 +95,7 @@ async def add_layer(
         _orig_tl = project.timeline_data
         if _seq:
             project.timeline_data = _seq.timeline_data
-        current_etag = compute_project_etag(project)
+        current_etag = compute_project_etag(project, _seq)
 
         # Check If-Match for concurrency control
         if header_result["if_match"] and header_result["if_match"] != current_etag:
@@ -216,7 +216,9 @@ async def add_layer(
 
         await db.flush()
         await db.refresh(project)
-        response.headers["ETag"] = compute_project_etag(project)
+        if _seq:
+            await db.refresh(_seq)
+        response.headers["ETag"] = compute_project_etag(project, _seq)
 
         # Build response with operation info
         response_data: dict[str, Any] = {
@@ -297,7 +299,7 @@ async def update_layer(
         _orig_tl = project.timeline_data
         if _seq:
             project.timeline_data = _seq.timeline_data
-        current_etag = compute_project_etag(project)
+        current_etag = compute_project_etag(project, _seq)
 
         # Check If-Match for concurrency control
         if header_result["if_match"] and header_result["if_match"] != current_etag:
@@ -379,7 +381,9 @@ async def update_layer(
 
         await db.flush()
         await db.refresh(project)
-        response.headers["ETag"] = compute_project_etag(project)
+        if _seq:
+            await db.refresh(_seq)
+        response.headers["ETag"] = compute_project_etag(project, _seq)
         logger.info("v1.update_layer ok project=%s layer=%s", project_id, layer_id)
         return await idempotent_success(
             context,
@@ -441,7 +445,7 @@ async def reorder_layers(
         _orig_tl = project.timeline_data
         if _seq:
             project.timeline_data = _seq.timeline_data
-        current_etag = compute_project_etag(project)
+        current_etag = compute_project_etag(project, _seq)
 
         # Check If-Match for concurrency control
         if header_result["if_match"] and header_result["if_match"] != current_etag:
@@ -505,7 +509,9 @@ async def reorder_layers(
 
         await db.flush()
         await db.refresh(project)
-        response.headers["ETag"] = compute_project_etag(project)
+        if _seq:
+            await db.refresh(_seq)
+        response.headers["ETag"] = compute_project_etag(project, _seq)
         logger.info("v1.reorder_layers ok project=%s", project_id)
         return await idempotent_success(
             context,
@@ -570,7 +576,7 @@ async def add_audio_clip(
         _orig_tl = project.timeline_data
         if _seq:
             project.timeline_data = _seq.timeline_data
-        current_etag = compute_project_etag(project)
+        current_etag = compute_project_etag(project, _seq)
 
         # Check If-Match for concurrency control
         if header_result["if_match"] and header_result["if_match"] != current_etag:
@@ -703,7 +709,9 @@ async def add_audio_clip(
 
         await db.flush()
         await db.refresh(project)
-        response.headers["ETag"] = compute_project_etag(project)
+        if _seq:
+            await db.refresh(_seq)
+        response.headers["ETag"] = compute_project_etag(project, _seq)
 
         # Build response with operation info
         response_data: dict[str, Any] = {
@@ -790,7 +798,7 @@ async def move_audio_clip(
         _orig_tl = project.timeline_data
         if _seq:
             project.timeline_data = _seq.timeline_data
-        current_etag = compute_project_etag(project)
+        current_etag = compute_project_etag(project, _seq)
 
         # Check If-Match for concurrency control
         if header_result["if_match"] and header_result["if_match"] != current_etag:
@@ -944,7 +952,9 @@ async def move_audio_clip(
 
         await db.flush()
         await db.refresh(project)
-        response.headers["ETag"] = compute_project_etag(project)
+        if _seq:
+            await db.refresh(_seq)
+        response.headers["ETag"] = compute_project_etag(project, _seq)
 
         # Build response with operation info
         response_data: dict[str, Any] = {
@@ -1026,7 +1036,7 @@ async def delete_audio_clip(
         _orig_tl = project.timeline_data
         if _seq:
             project.timeline_data = _seq.timeline_data
-        current_etag = compute_project_etag(project)
+        current_etag = compute_project_etag(project, _seq)
 
         # Check If-Match for concurrency control
         if header_result["if_match"] and header_result["if_match"] != current_etag:
@@ -1159,7 +1169,9 @@ async def delete_audio_clip(
 
         await db.flush()
         await db.refresh(project)
-        response.headers["ETag"] = compute_project_etag(project)
+        if _seq:
+            await db.refresh(_seq)
+        response.headers["ETag"] = compute_project_etag(project, _seq)
 
         # Build response with operation info (use full_clip_id for consistency)
         include_diff = body.options.include_diff if body else False
@@ -1244,7 +1256,7 @@ async def add_audio_track(
         _orig_tl = project.timeline_data
         if _seq:
             project.timeline_data = _seq.timeline_data
-        current_etag = compute_project_etag(project)
+        current_etag = compute_project_etag(project, _seq)
 
         # Check If-Match for concurrency control
         if header_result["if_match"] and header_result["if_match"] != current_etag:
@@ -1314,7 +1326,9 @@ async def add_audio_track(
 
         await db.flush()
         await db.refresh(project)
-        response.headers["ETag"] = compute_project_etag(project)
+        if _seq:
+            await db.refresh(_seq)
+        response.headers["ETag"] = compute_project_etag(project, _seq)
         logger.info("v1.add_audio_track ok project=%s track=%s", project_id, track_summary.id)
         return await idempotent_success(
             context,
@@ -1385,7 +1399,7 @@ async def add_marker(
         _orig_tl = project.timeline_data
         if _seq:
             project.timeline_data = _seq.timeline_data
-        current_etag = compute_project_etag(project)
+        current_etag = compute_project_etag(project, _seq)
 
         # Check If-Match for concurrency control
         if header_result["if_match"] and header_result["if_match"] != current_etag:
@@ -1491,7 +1505,9 @@ async def add_marker(
 
         await db.flush()
         await db.refresh(project)
-        response.headers["ETag"] = compute_project_etag(project)
+        if _seq:
+            await db.refresh(_seq)
+        response.headers["ETag"] = compute_project_etag(project, _seq)
 
         # Build response with operation info
         response_data: dict[str, Any] = {
@@ -1569,7 +1585,7 @@ async def update_marker(
         _orig_tl = project.timeline_data
         if _seq:
             project.timeline_data = _seq.timeline_data
-        current_etag = compute_project_etag(project)
+        current_etag = compute_project_etag(project, _seq)
 
         # Check If-Match for concurrency control
         if header_result["if_match"] and header_result["if_match"] != current_etag:
@@ -1708,7 +1724,9 @@ async def update_marker(
 
         await db.flush()
         await db.refresh(project)
-        response.headers["ETag"] = compute_project_etag(project)
+        if _seq:
+            await db.refresh(_seq)
+        response.headers["ETag"] = compute_project_etag(project, _seq)
 
         # Build response with operation info
         response_data: dict[str, Any] = {
@@ -1791,7 +1809,7 @@ async def delete_marker(
         _orig_tl = project.timeline_data
         if _seq:
             project.timeline_data = _seq.timeline_data
-        current_etag = compute_project_etag(project)
+        current_etag = compute_project_etag(project, _seq)
 
         # Check If-Match for concurrency control
         if header_result["if_match"] and header_result["if_match"] != current_etag:
@@ -1905,7 +1923,9 @@ async def delete_marker(
 
         await db.flush()
         await db.refresh(project)
-        response.headers["ETag"] = compute_project_etag(project)
+        if _seq:
+            await db.refresh(_seq)
+        response.headers["ETag"] = compute_project_etag(project, _seq)
 
         # Build response with operation info
         include_diff = body.options.include_diff if body else False
@@ -1978,7 +1998,7 @@ async def get_audio_clip_details(
         )
         if _seq:
             project.timeline_data = _seq.timeline_data
-        response.headers["ETag"] = compute_project_etag(project)
+        response.headers["ETag"] = compute_project_etag(project, _seq)
 
         service = AIService(db)
         clip_details: L3AudioClipDetails | None = await service.get_audio_clip_details(
@@ -2057,7 +2077,7 @@ async def update_audio_clip(
         _orig_tl = project.timeline_data
         if _seq:
             project.timeline_data = _seq.timeline_data
-        current_etag = compute_project_etag(project)
+        current_etag = compute_project_etag(project, _seq)
 
         # Check If-Match for concurrency control
         if headers["if_match"] and headers["if_match"] != current_etag:
@@ -2206,7 +2226,9 @@ async def update_audio_clip(
 
         await db.flush()
         await db.refresh(project)
-        response.headers["ETag"] = compute_project_etag(project)
+        if _seq:
+            await db.refresh(_seq)
+        response.headers["ETag"] = compute_project_etag(project, _seq)
 
         # Build response with operation info
         response_data: dict[str, Any] = {
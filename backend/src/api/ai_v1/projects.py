@@ -3,7 +3,7 @@
 from typing import Annotated
 from uuid import UUID
 
-from fastapi import APIRouter, Header, HTTPException, Request, Response, status
+from fastapi import APIRouter, Header, HTTPException, Query, Request, Response, status
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel, Field
 from sqlalchemy import or_, select
@@ -12,7 +12,8 @@ from src.api.ai_v1._helpers import (
     _http_error_code,
     _resolve_edit_session,
     _serialize_for_json,
-    compute_project_etag,
+    check_project_not_modified,
+    compute_read_etag,
     envelope_error,
     envelope_success,
     idempotent_success,
@@ -36,7 +37,15 @@ from src.schemas.ai import (
 from src.schemas.envelope import EnvelopeResponse
 from src.schemas.operation import RequestSummary, ResultSummary
 from src.services.ai_service import AIService
+from src.services.derived_view_cache import (
+    asset_catalog_token,
+    derived_views,
+    timeline_snapshots,
+    view_key,
+)
 from src.services.operation_service import OperationService
+from src.services.timeline_snapshot import IMAGE_WIDTH as SNAPSHOT_IMAGE_WIDTH
+from src.services.timeline_snapshot import SnapshotFormat
 
 router = APIRouter()
 
@@ -236,11 +245,18 @@ async def get_project_overview(
     current_user: CurrentUser,
     db: DbSession,
     response: Response,
+    http_request: Request,
     x_edit_session: Annotated[str | None, Header(alias="X-Edit-Session")] = None,
-) -> EnvelopeResponse | JSONResponse:
+) -> EnvelopeResponse | JSONResponse | Response:
     context = create_request_context()
     logger.info("v1.get_project_overview project=%s", project_id)
 
+    not_modified = await check_project_not_modified(
+        http_request, project_id, current_user, db, x_edit_session
+    )
+    if not_modified is not None:
+        return not_modified
+
     try:
         project, _seq = await _resolve_edit_session(
             project_id, current_user, db, x_edit_session, read_only=True
@@ -248,9 +264,13 @@ async def get_project_overview(
         if _seq:
             project.timeline_data = _seq.timeline_data
             project.duration_ms = _seq.duration_ms
-        response.headers["ETag"] = compute_project_etag(project)
+        assets = await asset_catalog_token(db, project.id)
+        response.headers["ETag"] = compute_read_etag(project, _seq, assets)
         service = AIService(db)
-        data: L1ProjectOverview = await service.get_project_overview(project)
+        data: L1ProjectOverview = await derived_views.get_or_compute(
+            view_key(project, _seq, "overview", assets=assets),
+            lambda: service.get_project_overview(project),
+        )
         return envelope_success(context, data)
     except HTTPException as exc:
         logger.warning("v1.get_project_overview failed project=%s: %s", project_id, exc.detail)
@@ -268,13 +288,20 @@ async def get_project_summary(
     current_user: CurrentUser,
     db: DbSession,
     response: Response,
+    http_request: Request,
     x_edit_session: Annotated[str | None, Header(alias="X-Edit-Session")] = None,
-) -> EnvelopeResponse | JSONResponse:
+) -> EnvelopeResponse | JSONResponse | Response:
     """Alias for /overview. Use /overview instead."""
     context = create_request_context()
     context.warnings.append("This endpoint is an alias for /overview. Use /overview instead.")
     logger.info("v1.get_project_summary (alias) project=%s", project_id)
 
+    not_modified = await check_project_not_modified(
+        http_request, project_id, current_user, db, x_edit_session
+    )
+    if not_modified is not None:
+        return not_modified
+
     try:
         project, _seq = await _resolve_edit_session(
             project_id, current_user, db, x_edit_session, read_only=True
@@ -282,9 +309,13 @@ async def get_project_summary(
         if _seq:
             project.timeline_data = _seq.timeline_data
             project.duration_ms = _seq.duration_ms
-        response.headers["ETag"] = compute_project_etag(project)
+        assets = await asset_catalog_token(db, project.id)
+        response.headers["ETag"] = compute_read_etag(project, _seq, assets)
         service = AIService(db)
-        data: L1ProjectOverview = await service.get_project_overview(project)
+        data: L1ProjectOverview = await derived_views.get_or_compute(
+            view_key(project, _seq, "overview", assets=assets),
+            lambda: service.get_project_overview(project),
+        )
         return envelope_success(context, data)
     except HTTPException as exc:
         logger.warning("v1.get_project_summary failed project=%s: %s", project_id, exc.detail)
@@ -302,11 +333,18 @@ async def get_timeline_structure(
     current_user: CurrentUser,
     db: DbSession,
     response: Response,
+    http_request: Request,
     x_edit_session: Annotated[str | None, Header(alias="X-Edit-Session")] = None,
-) -> EnvelopeResponse | JSONResponse:
+) -> EnvelopeResponse | JSONResponse | Response:
     context = create_request_context()
     logger.info("v1.get_timeline_structure project=%s", project_id)
 
+    not_modified = await check_project_not_modified(
+        http_request, project_id, current_user, db, x_edit_session
+    )
+    if not_modified is not None:
+        return not_modified
+
     try:
         project, _seq = await _resolve_edit_session(
             project_id, current_user, db, x_edit_session, read_only=True
@@ -314,9 +352,13 @@ async def get_timeline_structure(
         if _seq:
             project.timeline_data = _seq.timeline_data
             project.duration_ms = _seq.duration_ms
-        response.headers["ETag"] = compute_project_etag(project)
+        assets = await asset_catalog_token(db, project.id)
+        response.headers["ETag"] = compute_read_etag(project, _seq, assets)
         service = AIService(db)
-        data: L2TimelineStructure = await service.get_timeline_structure(project)
+        data: L2TimelineStructure = await derived_views.get_or_compute(
+            view_key(project, _seq, "structure", assets=assets),
+            lambda: service.get_timeline_structure(project),
+        )
         return envelope_success(context, data)
     except HTTPException as exc:
         logger.warning("v1.get_timeline_structure failed project=%s: %s", project_id, exc.detail)
@@ -334,19 +376,30 @@ async def get_timeline_overview(
     current_user: CurrentUser,
     db: DbSession,
     response: Response,
+    http_request: Request,
     x_edit_session: Annotated[str | None, Header(alias="X-Edit-Session")] = None,
     include_snapshot: bool = False,
-) -> EnvelopeResponse | JSONResponse:
+    snapshot_format: SnapshotFormat = "jpeg",
+    snapshot_width: Annotated[int, Query(ge=400, le=2400)] = SNAPSHOT_IMAGE_WIDTH,
+) -> EnvelopeResponse | JSONResponse | Response:
     """L2.5: Full timeline overview with clips, gaps, and overlaps in one request.
 
     The snapshot_base64 field is omitted by default to reduce response size.
-    Pass ?include_snapshot=true to include the visual timeline snapshot (~65K tokens).
+    Pass ?include_snapshot=true to include the visual timeline snapshot (~65K tokens),
+    optionally with ?snapshot_format=png|webp (smaller) and ?snapshot_width=.
+    The overview and each snapshot variant are cached per timeline version.
     """
     context = create_request_context()
     logger.info(
         "v1.get_timeline_overview project=%s include_snapshot=%s", project_id, include_snapshot
     )
 
+    not_modified = await check_project_not_modified(
+        http_request, project_id, current_user, db, x_edit_session
+    )
+    if not_modified is not None:
+        return not_modified
+
     try:
         project, _seq = await _resolve_edit_session(
             project_id, current_user, db, x_edit_session, read_only=True
@@ -354,11 +407,31 @@ async def get_timeline_overview(
         if _seq:
             project.timeline_data = _seq.timeline_data
             project.duration_ms = _seq.duration_ms
-        response.headers["ETag"] = compute_project_etag(project)
+        assets = await asset_catalog_token(db, project.id)
+        response.headers["ETag"] = compute_read_etag(project, _seq, assets)
         service = AIService(db)
-        data: L25TimelineOverview = await service.get_timeline_overview(
-            project, include_snapshot=include_snapshot
+        data: L25TimelineOverview = await derived_views.get_or_compute(
+            view_key(project, _seq, "timeline_overview", assets=assets),
+            lambda: service.get_timeline_overview(project),
         )
+        if include_snapshot:
+            snapshot: str | None = await timeline_snapshots.get_or_compute(
+                view_key(
+                    project,
+                    _seq,
+                    "timeline_snapshot",
+                    {"width": snapshot_width, "format": snapshot_format},
+                    assets=assets,
+                ),
+                lambda: service.get_timeline_snapshot(
+                    project, width=snapshot_width, image_format=snapshot_format
+                ),
+            )
+            if snapshot is not None:
+                # Cached values are shared: attach the snapshot to a copy
+                data = data.model_copy(
+                    update={"snapshot_base64": snapshot, "snapshot_format": snapshot_format}
+                )
         return envelope_success(context, data)
     except HTTPException as exc:
         logger.warning("v1.get_timeline_overview failed project=%s: %s", project_id, exc.detail)
@@ -376,8 +449,9 @@ async def get_asset_catalog(
     current_user: CurrentUser,
     db: DbSession,
     response: Response,
+    http_request: Request,
     x_edit_session: Annotated[str | None, Header(alias="X-Edit-Session")] = None,
-) -> EnvelopeResponse | JSONResponse:
+) -> EnvelopeResponse | JSONResponse | Response:
     context = create_request_context()
     logger.info("v1.get_asset_catalog project=%s", project_id)
 
@@ -388,13 +462,20 @@ async def get_asset_catalog(
         "se": {"bgm", "narration"},
     }
 
+    not_modified = await check_project_not_modified(
+        http_request, project_id, current_user, db, x_edit_session
+    )
+    if not_modified is not None:
+        return not_modified
+
     try:
         project, _seq = await _resolve_edit_session(
             project_id, current_user, db, x_edit_session, read_only=True
         )
         if _seq:
             project.timeline_data = _seq.timeline_data
-        response.headers["ETag"] = compute_project_etag(project)
+        assets = await asset_catalog_token(db, project.id)
+        response.headers["ETag"] = compute_read_etag(project, _seq, assets)
         service = AIService(db)
         data: L2AssetCatalog = await service.get_asset_catalog(project)
 
@@ -4,7 +4,6 @@ Routes under /api/ai-video/projects/{project_id}/...
 """
 
 import asyncio
-import copy
 import logging
 import os
 import shutil
@@ -51,10 +50,12 @@ from src.services.asset_classifier import classify_asset
 from src.services.audio_extractor import extract_audio_from_gcs
 from src.services.chroma_key_sampler import sample_chroma_key_color
 from src.services.click_detector import detect_clicks
+from src.services.keyed_intermediates import keyed_intermediates
 from src.services.plan_to_timeline import plan_to_timeline
 from src.services.quality_checker import QualityChecker
 from src.services.smart_sync_service import compute_smart_cut, compute_smart_sync
 from src.services.storage_service import get_storage_service
+from src.services.timeline_document import fork_timeline
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -509,13 +510,13 @@ async def _probe_media(
 
     Returns: (duration_ms, width, height, has_audio)
     """
-    from src.utils.media_info import get_media_info
+    from src.services.media_probe import media_probe
 
     with tempfile.NamedTemporaryFile(suffix=Path(filename).suffix, delete=True) as tmp:
         tmp.write(content)
         tmp.flush()
 
-        info = await asyncio.to_thread(get_media_info, tmp.name)
+        info = (await media_probe.aprobe(tmp.name)).media_info()
 
     return (
         info.get("duration_ms"),
@@ -530,14 +531,14 @@ async def _probe_image_dimensions(content: bytes, filename: str) -> tuple[int |
 
     Returns: (width, height) — either or both may be None if probing fails.
     """
-    from src.utils.media_info import get_media_info
+    from src.services.media_probe import media_probe
 
     suffix = Path(filename).suffix or ".png"
     with tempfile.NamedTemporaryFile(suffix=suffix, delete=True) as tmp:
         tmp.write(content)
         tmp.flush()
 
-        info = await asyncio.to_thread(get_media_info, tmp.name)
+        info = (await media_probe.aprobe(tmp.name)).media_info()
         width = info.get("width")
         height = info.get("height")
 
@@ -1648,7 +1649,9 @@ async def apply_plan(
     #    rather than blocking the apply.
     # ------------------------------------------------------------------
     snapshot_id: UUID | None = None
-    original_timeline = copy.deepcopy(project.timeline_data) if project.timeline_data else None
+    # The current document is replaced wholesale below (never mutated in
+    # place), so a structurally shared fork is a safe snapshot.
+    original_timeline = fork_timeline(project.timeline_data) if project.timeline_data else None
 
     if original_timeline:
         default_seq_result = await db.execute(
@@ -1729,6 +1732,16 @@ async def apply_plan(
 
     await db.flush()
 
+    # Key avatar clips ahead of the first export (best effort)
+    try:
+        await keyed_intermediates.schedule_for_timeline(timeline_data, db)
+    except Exception:
+        logger.warning(
+            "apply_plan: failed to schedule keyed intermediates for project %s",
+            project_id,
+            exc_info=True,
+        )
+
     # Count results
     layers_populated = sum(1 for layer in timeline_data["layers"] if layer["clips"])
     audio_clips_added = sum(len(track["clips"]) for track in timeline_data["audio_tracks"])
@@ -1852,10 +1865,12 @@ async def skill_trim_silence(
             real_dur = effective_dur
             if not asset.duration_ms:
                 try:
-                    from src.utils.media_info import get_media_info
+                    from src.services.media_probe import media_probe, storage_content_key
 
-                    info = await asyncio.to_thread(get_media_info, tmp_path)
-                    probed = info.get("duration_ms")
+                    probe = await media_probe.aprobe(
+                        tmp_path, content_key=storage_content_key(asset.storage_key)
+                    )
+                    probed = probe.duration_ms
                     if probed and probed > 0:
                         real_dur = probed
                         logger.info(
@@ -2398,8 +2413,6 @@ async def skill_sync_content(
     Idempotent: saves original clips in metadata and restores before
     re-processing.
     """
-    import copy
-
     gap_speed_multiplier = 2.5  # gaps play 2.5x faster than speech
 
     t0 = time.monotonic()
@@ -2408,7 +2421,7 @@ async def skill_sync_content(
     if not project.timeline_data:
         raise HTTPException(status_code=404, detail="No timeline data. Run apply_plan first.")
 
-    timeline_data = dict(project.timeline_data)
+    timeline_data = fork_timeline(project.timeline_data)
     metadata = timeline_data.setdefault("metadata", {})
 
     # --- Gather telop clips (group_id="ai-telop") from text layer ---
@@ -2445,11 +2458,13 @@ async def skill_sync_content(
         )
 
     # --- Idempotency: restore original clips if previously saved ---
+    # Clip dicts are only ever replaced below (never mutated in place), so the
+    # saved list can share them with the layer.
     if "original_content_clips" in metadata:
-        content_layer["clips"] = copy.deepcopy(metadata["original_content_clips"])
+        content_layer["clips"] = list(metadata["original_content_clips"])
 
     # Save original clips for future re-runs
-    metadata["original_content_clips"] = copy.deepcopy(content_layer["clips"])
+    metadata["original_content_clips"] = list(content_layer["clips"])
 
     # --- Determine full narration timeline range ---
     narration_track = _find_track(timeline_data, "narration")
@@ -3125,16 +3140,11 @@ async def check_quality(
 
                 n_samples = min(request.max_visual_samples, 20)
                 step = duration_ms // (n_samples + 1)
-                for i in range(1, n_samples + 1):
-                    t = step * i
-                    try:
-                        frame = await sampler.sample_frame(
-                            time_ms=t,
-                            resolution=request.resolution,
-                        )
-                        visual_samples.append(frame)
-                    except Exception as e:
-                        logger.warning(f"Visual sample at {t}ms failed: {e}")
+                frames = await sampler.sample_frames(
+                    [step * i for i in range(1, n_samples + 1)],
+                    resolution=request.resolution,
+                )
+                visual_samples.extend(frame for frame in frames if frame is not None)
         except Exception as e:
             logger.warning(f"Visual sampling failed: {e}")
             visual_sampling_skipped = True
@@ -13,7 +13,8 @@ from uuid import UUID
 import httpx
 from fastapi import APIRouter, BackgroundTasks, HTTPException, Query, Request, Response, status
 from pydantic import BaseModel
-from sqlalchemy import or_, select, update
+from sqlalchemy import cast, func, or_, select, update
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -40,9 +41,15 @@ from src.services.asset_timing_audit_service import (
 )
 from src.services.audio_extractor import extract_audio_from_gcs
 from src.services.chroma_key_sampler import sample_chroma_key_color
+from src.services.derived_view_cache import derived_views
+from src.services.media_probe import (
+    ASSET_METADATA_KEY,
+    ProbeResult,
+    media_probe,
+    storage_content_key,
+)
 from src.services.preview_service import PreviewService
 from src.services.storage_service import StorageService, get_storage_service
-from src.utils.media_info import get_media_info
 
 logger = logging.getLogger(__name__)
 
@@ -500,10 +507,8 @@ async def _probe_media_metadata_background(
     """
     try:
         storage = get_storage_service()
-        suffix = ".mp4" if asset_type == "video" else (".mp3" if asset_type == "audio" else ".bin")
-        with tempfile.NamedTemporaryFile(suffix=suffix, delete=True) as tmp:
-            await storage.download_file(storage_key, tmp.name)
-            info = await asyncio.to_thread(get_media_info, tmp.name)
+        probe = await _probe_storage(storage, storage_key, asset_type)
+        info = probe.media_info()
 
         duration_ms = info.get("duration_ms")
         width = info.get("width")
@@ -517,7 +522,13 @@ async def _probe_media_metadata_background(
 
         # Use explicit SQL UPDATE to avoid ORM dirty-tracking race conditions
         # with concurrent background tasks modifying the same asset row.
-        update_values: dict = {}
+        # The probe is merged into asset_metadata (JSONB ||) so later readers
+        # on any instance can seed the probe cache instead of re-probing.
+        update_values: dict = {
+            "asset_metadata": func.coalesce(Asset.asset_metadata, cast({}, JSONB)).op("||")(
+                cast({ASSET_METADATA_KEY: probe.to_metadata(storage_key)}, JSONB)
+            )
+        }
         if duration_ms:
             update_values["duration_ms"] = duration_ms
         if width:
@@ -552,10 +563,26 @@ async def _probe_storage_media_info(
     asset_type: str,
 ) -> dict:
     """Download a stored media file and return probed metadata."""
+    return (await _probe_storage(storage, storage_key, asset_type)).media_info()
+
+
+async def _probe_storage(
+    storage: StorageService,
+    storage_key: str,
+    asset_type: str,
+) -> ProbeResult:
+    """Probe a stored object, skipping the download when it was probed before.
+
+    Storage keys are never overwritten, so the key itself identifies the content.
+    """
+    content_key = storage_content_key(storage_key)
+    cached = media_probe.cached(content_key)
+    if cached is not None:
+        return cached
     suffix = ".mp4" if asset_type == "video" else (".mp3" if asset_type == "audio" else ".bin")
     with tempfile.NamedTemporaryFile(suffix=suffix, delete=True) as tmp:
         await storage.download_file(storage_key, tmp.name)
-        return await asyncio.to_thread(get_media_info, tmp.name)
+        return await media_probe.aprobe(tmp.name, content_key=content_key)
 
 
 def _select_audio_asset_metadata(
@@ -635,7 +662,7 @@ async def _probe_image_dimensions_background(asset_id: UUID, storage_key: str) -
 
             try:
                 # Primary: try ffprobe
-                info = await asyncio.to_thread(get_media_info, tmp_path)
+                info = (await media_probe.aprobe(tmp_path)).media_info()
                 width = info.get("width")
                 height = info.get("height")
 
@@ -1361,10 +1388,23 @@ async def register_asset(
         existing_asset.height = asset_data.height
         existing_asset.sample_rate = asset_data.sample_rate
         existing_asset.channels = asset_data.channels
+        # The persisted probe describes the old file; drop it so nothing seeds it.
+        if existing_asset.asset_metadata and ASSET_METADATA_KEY in existing_asset.asset_metadata:
+            existing_asset.asset_metadata = {
+                k: v for k, v in existing_asset.asset_metadata.items() if k != ASSET_METADATA_KEY
+            }
 
         await db.commit()
         await db.refresh(existing_asset)
 
+        if existing_asset.type in ("video", "audio"):
+            background_tasks.add_task(
+                _probe_media_metadata_background,
+                existing_asset.id,
+                existing_asset.storage_key,
+                existing_asset.type,
+            )
+
         # Schedule background thumbnail generation for replaced video assets
         if existing_asset.type == "video":
             background_tasks.add_task(
@@ -1701,6 +1741,7 @@ async def delete_asset(
     await storage.delete_file(asset.storage_key)
 
     await db.delete(asset)
+    derived_views.invalidate_project(project_id)
 
 
 @router.post(
@@ -3009,6 +3050,9 @@ async def rename_asset(
     asset.name = new_name
     await db.flush()
     await db.refresh(asset)
+    # Cached views key on asset_catalog_token, so they cannot serve the old
+    # name once this commits; this only evicts them early on this instance.
+    derived_views.invalidate_project(project_id)
 
     return _asset_to_response_with_signed_url(asset, storage)
 
@@ -9,6 +9,7 @@ from src.api.deps import API_KEY_PREFIX, CurrentUser, DbSession, hash_api_key
 from src.models.api_key import APIKey
 from src.schemas.auth import APIKeyCreate, APIKeyCreated, APIKeyResponse
 from src.schemas.user import UserResponse
+from src.services.principal_cache import api_key_cache_key, principal_cache
 
 router = APIRouter()
 
@@ -109,3 +110,4 @@ async def delete_api_key(
 
     api_key.is_active = False
     await db.flush()
+    principal_cache.revoke(api_key_cache_key(api_key.key_hash))
@@ -10,7 +10,7 @@ from fastapi import Depends, Header, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from firebase_admin import auth as firebase_auth
 from firebase_admin import credentials
-from sqlalchemy import select, update
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm.attributes import flag_modified
 
@@ -19,6 +19,13 @@ from src.models.api_key import APIKey
 from src.models.database import async_session_maker, get_db
 from src.models.sequence import Sequence
 from src.models.user import User
+from src.services.principal_cache import (
+    CachedPrincipal,
+    api_key_cache_key,
+    api_key_last_used,
+    principal_cache,
+    token_cache_key,
+)
 from src.utils.edit_token import decode_edit_token
 
 settings = get_settings()
@@ -59,13 +66,28 @@ def hash_api_key(key: str) -> str:
     return hashlib.sha256(key.encode()).hexdigest()
 
 
-async def get_user_by_api_key(db: AsyncSession, api_key: str) -> User | None:
+async def get_user_by_api_key(
+    db: AsyncSession, api_key: str, *, check_cache: bool = True
+) -> User | None:
     """Look up a user by their API key.
 
     Returns None if key is invalid, inactive, or expired.
-    Updates last_used_at on successful lookup.
+    Records last_used_at on successful lookup (written in periodic batches).
+    Verified keys are cached for ``auth_cache_ttl_seconds``, so a hit costs a
+    single primary-key load of the user.
     """
     key_hash = hash_api_key(api_key)
+    cache_key = api_key_cache_key(key_hash)
+
+    if check_cache:
+        cached = principal_cache.get(cache_key)
+        if cached is not None:
+            user = await db.get(User, cached.user_id)
+            if user is not None:
+                if cached.api_key_id is not None:
+                    api_key_last_used.mark(cached.api_key_id)
+                return user
+            principal_cache.invalidate(cache_key)
 
     result = await db.execute(
         select(APIKey).where(APIKey.key_hash == key_hash).where(APIKey.is_active == True)  # noqa: E712
@@ -80,20 +102,46 @@ async def get_user_by_api_key(db: AsyncSession, api_key: str) -> User | None:
         if api_key_record.expires_at < datetime.now(UTC):
             return None
 
-    # Update last_used_at
-    await db.execute(
-        update(APIKey).where(APIKey.id == api_key_record.id).values(last_used_at=datetime.now(UTC))
-    )
+    api_key_last_used.mark(api_key_record.id)
 
     # Get the user
     user_result = await db.execute(select(User).where(User.id == api_key_record.user_id))
-    return user_result.scalar_one_or_none()
+    user = user_result.scalar_one_or_none()
+    if user is not None:
+        principal_cache.put(
+            cache_key,
+            user.id,
+            not_after=api_key_record.expires_at,
+            api_key_id=api_key_record.id,
+        )
+    return user
+
+
+def _cached_principal(
+    credentials: HTTPAuthorizationCredentials | None,
+    x_api_key: str | None,
+) -> CachedPrincipal | None:
+    """Return the cached principal for the request's credential, if any."""
+    if x_api_key is not None:
+        if not x_api_key.startswith(API_KEY_PREFIX):
+            return None
+        cached = principal_cache.get(api_key_cache_key(hash_api_key(x_api_key)))
+        if cached is not None and cached.api_key_id is not None:
+            api_key_last_used.mark(cached.api_key_id)
+        return cached
+    if credentials is None:
+        return None
+    if settings.dev_mode and credentials.credentials == DEV_TOKEN:
+        return None
+    return principal_cache.get(token_cache_key(credentials.credentials))
 
 
 async def _authenticate_user(
     db: AsyncSession,
     credentials: HTTPAuthorizationCredentials | None,
     x_api_key: str | None,
+    *,
+    check_cache: bool = True,
 ) -> User:
     """Core authentication logic shared by all auth dependencies.
 
@@ -101,6 +149,10 @@ async def _authenticate_user(
     1. X-API-Key header (for MCP/programmatic access)
     2. Authorization: Bearer <token> (Firebase)
     3. dev-token bypass (dev_mode only)
+
+    Verified API keys and Firebase tokens are cached (see
+    ``src.services.principal_cache``); pass ``check_cache=False`` when the
+    caller has already consulted the cache.
     """
     # Check for API key authentication first
     if x_api_key is not None:
@@ -110,7 +162,7 @@ async def _authenticate_user(
                 detail="Invalid API key format",
             )
 
-        user = await get_user_by_api_key(db, x_api_key)
+        user = await get_user_by_api_key(db, x_api_key, check_cache=check_cache)
         if user is None:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -147,6 +199,15 @@ async def _authenticate_user(
         )
 
     token = credentials.credentials
+    cache_key = token_cache_key(token)
+
+    if check_cache:
+        cached = principal_cache.get(cache_key)
+        if cached is not None:
+            cached_user = await db.get(User, cached.user_id)
+            if cached_user is not None:
+                return cached_user
+            principal_cache.invalidate(cache_key)
 
     try:
         # Initialize Firebase if needed
@@ -190,6 +251,13 @@ async def _authenticate_user(
         db.add(user)
         await db.flush()
 
+    # Trust the verified token until the cache TTL or the token's own expiry
+    token_exp = decoded_token.get("exp")
+    principal_cache.put(
+        cache_key,
+        user.id,
+        not_after=datetime.fromtimestamp(token_exp, UTC) if token_exp else None,
+    )
     return user
 
 
@@ -221,10 +289,15 @@ async def get_authenticated_user(
 
     Unlike CurrentUser, this does NOT hold a DB connection after auth completes.
     Use this for long-running endpoints (thumbnail, waveform, audio extraction)
-    to avoid connection pool exhaustion.
+    to avoid connection pool exhaustion.  A cached credential needs no DB
+    session at all.
     """
+    cached = _cached_principal(credentials, x_api_key)
+    if cached is not None:
+        return AuthenticatedUser(id=cached.user_id)
+
     async with async_session_maker() as db:
-        user = await _authenticate_user(db, credentials, x_api_key)
+        user = await _authenticate_user(db, credentials, x_api_key, check_cache=False)
         await db.commit()
         return AuthenticatedUser(id=user.id)
     # Session closed here, connection returned to pool
@@ -23,6 +23,7 @@ from src.api.access import get_accessible_project
 from src.api.deps import CurrentUser, DbSession, get_edit_context
 from src.models.asset import Asset
 from src.models.project import Project
+from src.models.sequence import Sequence
 from src.schemas.preview import (
     EventPoint,
     EventPointsRequest,
@@ -37,6 +38,7 @@ from src.schemas.preview import (
     ValidationIssue,
 )
 from src.services.composition_validator import CompositionValidator
+from src.services.derived_view_cache import derived_views, view_key
 from src.services.event_detector import EventDetector
 from src.services.frame_sampler import FrameSampler
 from src.services.storage_service import get_storage_service
@@ -56,8 +58,12 @@ async def _resolve_timeline(
     db: DbSession,
     x_edit_session: str | None = None,
     sequence_id: UUID | None = None,
-) -> tuple["Project", dict]:
-    """Resolve project and timeline data, using sequence if edit token or sequence_id provided."""
+) -> tuple["Project", dict, "Sequence | None"]:
+    """Resolve project and timeline data, using sequence if edit token or sequence_id provided.
+
+    The resolved sequence (None for legacy project-only timelines) is returned
+    so callers can key derived-view caches on its version.
+    """
     ctx = await get_edit_context(project_id, current_user, db, x_edit_session, sequence_id)
     timeline = ctx.timeline_data
     if not timeline:
@@ -65,7 +71,7 @@ async def _resolve_timeline(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="No timeline data in project",
         )
-    return ctx.project, timeline
+    return ctx.project, timeline, ctx.sequence
 
 
 async def _build_asset_name_map(
@@ -161,7 +167,7 @@ async def get_event_points(
     - Alternatively, set the X-Edit-Session header (from a lock) for read-write access.
     - When neither is provided, the project's default sequence is used.
     """
-    project, timeline = await _resolve_timeline(
+    project, timeline, sequence = await _resolve_timeline(
         project_id, current_user, db, x_edit_session, sequence_id
     )
 
@@ -169,10 +175,14 @@ async def get_event_points(
     asset_name_map = await _build_asset_name_map(timeline, db)
 
     detector = EventDetector(timeline, asset_name_map=asset_name_map)
-    events = detector.detect_all(
-        include_visual=request.include_visual,
-        include_audio=request.include_audio,
-        min_gap_ms=request.min_gap_ms,
+    detect_params = {
+        "include_visual": request.include_visual,
+        "include_audio": request.include_audio,
+        "min_gap_ms": request.min_gap_ms,
+    }
+    events = await derived_views.get_or_compute(
+        view_key(project, sequence, "event_points", {**detect_params, "assets": asset_name_map}),
+        lambda: detector.detect_all(**detect_params),
     )
 
     return EventPointsResponse(
@@ -225,7 +235,7 @@ async def sample_frame(
     - Alternatively, set the X-Edit-Session header (from a lock) for read-write access.
     - When neither is provided, the project's default sequence is used.
     """
-    project, timeline = await _resolve_timeline(
+    project, timeline, _sequence = await _resolve_timeline(
         project_id, current_user, db, x_edit_session, sequence_id
     )
 
@@ -294,7 +304,7 @@ async def sample_event_points(
     - Alternatively, set the X-Edit-Session header (from a lock) for read-write access.
     - When neither is provided, the project's default sequence is used.
     """
-    project, timeline = await _resolve_timeline(
+    project, timeline, sequence = await _resolve_timeline(
         project_id, current_user, db, x_edit_session, sequence_id
     )
 
@@ -303,9 +313,19 @@ async def sample_event_points(
 
     # Step 1: Detect event points
     detector = EventDetector(timeline, asset_name_map=asset_name_map_for_events)
-    events = detector.detect_all(
-        include_audio=request.include_audio,
-        min_gap_ms=request.min_gap_ms,
+    detect_params = {
+        "include_visual": True,
+        "include_audio": request.include_audio,
+        "min_gap_ms": request.min_gap_ms,
+    }
+    events = await derived_views.get_or_compute(
+        view_key(
+            project,
+            sequence,
+            "event_points",
+            {**detect_params, "assets": asset_name_map_for_events},
+        ),
+        lambda: detector.detect_all(**detect_params),
     )
 
     # Step 2: Select events to sample (prioritize diverse types, limit count)
@@ -345,30 +365,30 @@ async def sample_event_points(
             project_fps=project.fps,
         )
 
-        # Step 3: Sample frames at each event point
+        # Step 3: Sample frames at each event point (batched: events showing
+        # the same clips render in one FFmpeg pass)
+        print(
+            f"[SAMPLE-EVENT-POINTS] Sampling {len(selected_events)} event points...",
+            flush=True,
+        )
+        results = await sampler.sample_frames(
+            [event.time_ms for event in selected_events],
+            resolution=request.resolution,
+        )
         samples: list[SampledEventPoint] = []
-        for i, event in enumerate(selected_events):
-            try:
-                print(
-                    f"[SAMPLE-EVENT-POINTS] Sampling {i + 1}/{len(selected_events)} "
-                    f"at {event.time_ms}ms ({event.event_type})...",
-                    flush=True,
-                )
-                result = await sampler.sample_frame(
+        for event, result in zip(selected_events, results, strict=True):
+            if result is None:
+                logger.warning(f"Failed to sample frame at {event.time_ms}ms")
+                continue
+            samples.append(
+                SampledEventPoint(
                     time_ms=event.time_ms,
-                    resolution=request.resolution,
-                )
-                samples.append(
-                    SampledEventPoint(
-                        time_ms=event.time_ms,
-                        event_type=event.event_type,
-                        description=event.description,
-                        frame_base64=result["frame_base64"],
-                        active_clips=result.get("active_clips", []),
-                    )
+                    event_type=event.event_type,
+                    description=event.description,
+                    frame_base64=result["frame_base64"],
+                    active_clips=result.get("active_clips", []),
                 )
-            except Exception as e:
-                logger.warning(f"Failed to sample frame at {event.time_ms}ms: {e}")
+            )
 
         total_elapsed = time_mod.monotonic() - t0
         print(
@@ -420,7 +440,7 @@ async def validate_composition(
     - Alternatively, set the X-Edit-Session header (from a lock) for read-write access.
     - When neither is provided, the project's default sequence is used.
     """
-    project, timeline = await _resolve_timeline(
+    project, timeline, sequence = await _resolve_timeline(
         project_id, current_user, db, x_edit_session, sequence_id
     )
 
@@ -442,7 +462,20 @@ async def validate_composition(
         asset_dimensions=asset_dimensions,
     )
 
-    issues = validator.validate(rules=request.rules)
+    issues = await derived_views.get_or_compute(
+        view_key(
+            project,
+            sequence,
+            "composition_validation",
+            {
+                "rules": request.rules,
+                "size": [project.width, project.height],
+                "assets": sorted(asset_ids),
+                "dimensions": asset_dimensions,
+            },
+        ),
+        lambda: validator.validate(rules=request.rules),
+    )
 
     error_count = sum(1 for i in issues if i.severity == "error")
     warning_count = sum(1 for i in issues if i.severity == "warning")
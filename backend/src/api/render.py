@@ -13,24 +13,49 @@ from datetime import UTC, datetime, timedelta
 from typing import Annotated
 from uuid import UUID
 
-from fastapi import APIRouter, Header, HTTPException, Query, status
+from fastapi import APIRouter, Header, HTTPException, Query, WebSocket, WebSocketDisconnect, status
+from fastapi.security import HTTPAuthorizationCredentials
 from sqlalchemy import select
 
 from src.api.access import get_accessible_project
-from src.api.deps import CurrentUser, DbSession, get_edit_context
+from src.api.deps import CurrentUser, DbSession, _authenticate_user, get_edit_context
+from src.api.websocket import (
+    create_complete_message,
+    create_error_message,
+    create_progress_message,
+    progress_notifier,
+    websocket_manager,
+)
+from src.config import get_settings
 from src.models.asset import Asset
 from src.models.database import async_session_maker
 from src.models.render_job import RenderJob
 from src.render.executor import get_render_executor
+from src.render.fingerprint import asset_content_identity, render_fingerprint, timeline_asset_ids
+from src.render.job_control import (
+    CoalescedProgressWriter,
+    ProgressFanout,
+    RenderCancellation,
+    render_cancellations,
+)
 from src.render.package_builder import RenderPackageBuilder
 from src.render.pipeline import RenderPipeline, analyze_timeline_for_memory
+from src.render.scheduler import RenderDemand, get_render_scheduler
 from src.render.timeline_normalization import normalize_export_timeline
 from src.schemas.render import RenderJobResponse, RenderPackageResponse, RenderRequest
-from src.services.storage_service import get_storage_service
+from src.services.keyed_intermediates import keyed_intermediates
+from src.services.media_probe import media_probe
+from src.services.storage_service import StreamingUpload, get_storage_service
+from src.utils.metrics import metrics
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+
+class _RenderCancelledError(Exception):
+    """Raised inside a streamed upload to discard it when the job was cancelled."""
+
+
 # Global dict to track active render processes for cancellation
 _active_renders: dict[str, asyncio.subprocess.Process] = {}
 
@@ -39,6 +64,15 @@ HEARTBEAT_INTERVAL_S: int = 20
 # Stale threshold: jobs with no heartbeat for this long are considered crashed.
 # Must be > HEARTBEAT_INTERVAL_S to avoid false positives.
 STALE_THRESHOLD_S: int = 120
+# How often a running render re-reads its job row to notice a cancellation
+# made in another process (in-process cancels are pushed immediately).
+CANCEL_POLL_INTERVAL_S: float = 5.0
+# Minimum spacing between non-terminal progress writes for one job.
+PROGRESS_WRITE_INTERVAL_S: float = 2.0
+# Minimum spacing between live (WebSocket) progress pushes for one job.
+PROGRESS_PUSH_INTERVAL_S: float = 0.25
+# Job states after which no further progress is pushed.
+_TERMINAL_STATUSES = ("completed", "failed", "cancelled")
 
 
 async def _update_job_progress(
@@ -95,7 +129,9 @@ async def _heartbeat_loop(job_id: UUID, stop_event: asyncio.Event) -> None:
 
     This prevents the stale-job detector from misclassifying a healthy but
     slow job (e.g. large FFmpeg composite) as crashed and spawning a duplicate
-    render.  The loop exits when *stop_event* is set.
+    render.  Since it reads the job row anyway, it also forwards a
+    cancellation made in another process to the running render.  The loop
+    exits when *stop_event* is set.
     """
     while not stop_event.is_set():
         try:
@@ -105,6 +141,8 @@ async def _heartbeat_loop(job_id: UUID, stop_event: asyncio.Event) -> None:
                 if job and job.status in ("queued", "processing"):
                     job.updated_at = datetime.now(UTC)
                     await db.commit()
+                elif job and job.status == "cancelled":
+                    render_cancellations.signal(job_id)
         except Exception as exc:
             logger.warning(f"[RENDER] Heartbeat failed for job {job_id}: {exc}")
         try:
@@ -126,6 +164,32 @@ async def _run_render_background(
 ) -> None:
     """Background task to run the actual render."""
     temp_dir = None
+    cancellation = render_cancellations.register(
+        job_id,
+        RenderCancellation(
+            poll=lambda: _check_cancelled(job_id),
+            poll_interval_s=CANCEL_POLL_INTERVAL_S,
+        ),
+    )
+    # The job row (polled by /render/status) is written every couple of
+    # seconds; connected WebSocket clients get the same stream much sooner.
+    progress = ProgressFanout(
+        CoalescedProgressWriter(
+            lambda percent, stage: _update_job_progress(job_id, percent, stage),
+            min_interval_s=PROGRESS_WRITE_INTERVAL_S,
+        ),
+        CoalescedProgressWriter(
+            lambda percent, stage: progress_notifier.notify_progress(
+                str(job_id),
+                percent,
+                "processing",
+                stage,
+                elapsed_ms=progress.clock.elapsed_ms,
+                stage_timings=progress.clock.timings(),
+            ),
+            min_interval_s=PROGRESS_PUSH_INTERVAL_S,
+        ),
+    )
     heartbeat_stop = asyncio.Event()
     heartbeat_task = asyncio.create_task(_heartbeat_loop(job_id, heartbeat_stop))
 
@@ -133,9 +197,10 @@ async def _run_render_background(
         # Check for cancellation
         if await _check_cancelled(job_id):
             logger.info(f"[RENDER] Job {job_id} was cancelled before starting")
+            cancellation.cancel()
             return
 
-        await _update_job_progress(job_id, 5, "Preparing render")
+        progress.submit(5, "Preparing render")
 
         # Debug: Log timeline structure
         audio_tracks = timeline_data.get("audio_tracks", [])
@@ -178,7 +243,11 @@ async def _run_render_background(
                     asset_ids.add(clip["asset_id"])
 
         if not has_content:
+            await progress.close()
             await _update_job_progress(job_id, 0, "Failed", "failed", "No content in timeline")
+            await progress_notifier.notify_error(
+                str(job_id), "No content in timeline", "NO_CONTENT"
+            )
             return
 
         # Load assets from database (if any)
@@ -191,14 +260,14 @@ async def _run_render_background(
                 assets_db = {str(a.id): a for a in result.scalars().all()}
 
         # Check for cancellation
-        if await _check_cancelled(job_id):
+        if await cancellation.check():
             logger.info(f"[RENDER] Job {job_id} cancelled after asset lookup")
             return
 
         if asset_ids:
-            await _update_job_progress(job_id, 10, "Downloading assets")
+            progress.submit(10, "Downloading assets")
         else:
-            await _update_job_progress(job_id, 10, "Preparing render")
+            progress.submit(10, "Preparing render")
 
         # Create temp directory
         temp_dir = tempfile.mkdtemp(prefix=f"douga_render_{job_id}_")
@@ -214,7 +283,7 @@ async def _run_render_background(
 
         for idx, (asset_id, asset) in enumerate(assets_db.items()):
             # Check for cancellation periodically
-            if await _check_cancelled(job_id):
+            if await cancellation.check():
                 logger.info(f"[RENDER] Job {job_id} cancelled during asset download")
                 return
 
@@ -222,19 +291,25 @@ async def _run_render_background(
             local_path = os.path.join(assets_dir, f"{asset_id}.{ext}")
             await storage.download_file(asset.storage_key, local_path)
             assets_local[asset_id] = local_path
+            media_probe.seed_from_metadata(
+                asset.asset_metadata, storage_key=asset.storage_key, path=local_path
+            )
 
             # Update progress (10-30% for downloads)
             download_progress = 10 + int((idx + 1) / total_assets * 20)
-            await _update_job_progress(
-                job_id, download_progress, f"Downloading assets ({idx + 1}/{total_assets})"
-            )
+            progress.submit(download_progress, f"Downloading assets ({idx + 1}/{total_assets})")
+
+        # Pre-keyed intermediates replace live chroma keying where available
+        assets_local.update(
+            await keyed_intermediates.fetch_for_render(timeline_data, assets_db, assets_dir)
+        )
 
         # Check for cancellation
-        if await _check_cancelled(job_id):
+        if await cancellation.check():
             logger.info(f"[RENDER] Job {job_id} cancelled after downloads")
             return
 
-        await _update_job_progress(job_id, 30, "Rendering video")
+        progress.submit(30, "Rendering video")
 
         # Create render pipeline with progress callback
         pipeline = RenderPipeline(
@@ -247,10 +322,7 @@ async def _run_render_background(
 
         # Set progress callback
         # Pipeline sends absolute progress values (0-100) directly
-        async def progress_callback(percent: int, stage: str) -> None:
-            await _update_job_progress(job_id, percent, stage)
-
-        pipeline.set_progress_callback(lambda p, s: asyncio.create_task(progress_callback(p, s)))
+        pipeline.set_progress_callback(progress.submit)
 
         # Output path - use project_id to avoid URL-encoding issues with long names
         if audio_only:
@@ -259,40 +331,64 @@ async def _run_render_background(
             output_filename = f"{project_id}_render.mp4"
         output_path = os.path.join(output_dir, output_filename)
 
+        output_storage_key = f"projects/{project_id}/renders/{job_id}/{output_filename}"
+        stream_upload = not audio_only and get_settings().render_stream_upload
+
         # Run render (pass job_id for cancel checking)
         if audio_only:
             await pipeline.render_audio_only(
                 timeline_data,
                 assets_local,
                 output_path,
-                cancel_check=lambda: _check_cancelled(job_id),
+                cancel_check=cancellation.check,
             )
+        elif stream_upload:
+            # Upload while muxing: the output streams into storage as it is
+            # encoded and is only finalized once the render succeeded.
+            try:
+                async with StreamingUpload(storage, output_storage_key, "video/mp4") as upload:
+                    await pipeline.render(
+                        timeline_data,
+                        assets_local,
+                        output_path,
+                        cancel_check=cancellation.check,
+                        output_sink=upload,
+                    )
+                    if cancellation.cancelled or await _check_cancelled(job_id):
+                        raise _RenderCancelledError
+                    progress.submit(90, "Finalizing upload")
+            except _RenderCancelledError:
+                logger.info(f"[RENDER] Job {job_id} cancelled after rendering")
+                cancellation.cancel()
+                return
+            output_size = upload.bytes_written
+            logger.info(f"[RENDER] Job {job_id} streamed {output_size} bytes to storage")
         else:
             await pipeline.render(
                 timeline_data,
                 assets_local,
                 output_path,
-                cancel_check=lambda: _check_cancelled(job_id),
+                cancel_check=cancellation.check,
             )
 
-        # Check for cancellation before upload
-        if await _check_cancelled(job_id):
-            logger.info(f"[RENDER] Job {job_id} cancelled after rendering")
-            return
+        if not stream_upload:
+            # Check for cancellation before upload (authoritative: reads the job row)
+            if cancellation.cancelled or await _check_cancelled(job_id):
+                logger.info(f"[RENDER] Job {job_id} cancelled after rendering")
+                cancellation.cancel()
+                return
 
-        await _update_job_progress(job_id, 90, "Uploading output")
+            progress.submit(90, "Uploading output")
 
-        # Upload to GCS
-        output_storage_key = f"projects/{project_id}/renders/{job_id}/{output_filename}"
-        await storage.upload_file(output_path, output_storage_key)
+            # Upload to GCS
+            await storage.upload_file(output_path, output_storage_key)
+            output_size = os.path.getsize(output_path)
 
         # Generate signed download URL
         download_url = await storage.get_signed_url(output_storage_key, expiration_minutes=1440)
 
-        # Get output file size
-        output_size = os.path.getsize(output_path)
-
         # Mark as completed
+        await progress.close()
         await _update_job_progress(
             job_id,
             100,
@@ -302,14 +398,29 @@ async def _run_render_background(
             output_url=download_url,
             output_size=output_size,
         )
+        await progress_notifier.notify_complete(
+            str(job_id),
+            download_url,
+            duration_ms=duration_ms,
+            file_size_bytes=output_size,
+            stage_timings=progress.clock.timings(),
+        )
 
         logger.info(f"[RENDER] Job {job_id} completed successfully")
 
     except Exception as e:
         logger.exception(f"[RENDER] Job {job_id} failed: {e}")
+        await progress.close()
         await _update_job_progress(job_id, 0, "Failed", "failed", str(e))
+        if not cancellation.cancelled:
+            await progress_notifier.notify_error(str(job_id), str(e))
 
     finally:
+        await progress.close()
+        render_cancellations.unregister(job_id)
+        if cancellation.cancelled:
+            await progress_notifier.notify_cancelled(str(job_id))
+
         # Stop heartbeat loop
         heartbeat_stop.set()
         heartbeat_task.cancel()
@@ -326,6 +437,78 @@ async def _run_render_background(
                 pass
 
 
+async def _render_fingerprint(
+    db: DbSession,
+    timeline_data: dict,
+    width: int,
+    height: int,
+    fps: int,
+    audio_only: bool,
+) -> str:
+    """Fingerprint of a normalized export timeline (see src/render/fingerprint.py)."""
+    asset_ids: list[UUID] = []
+    for asset_id in timeline_asset_ids(timeline_data):
+        try:
+            asset_ids.append(UUID(asset_id))
+        except ValueError:
+            continue
+    identities: dict[str, str] = {}
+    if asset_ids:
+        result = await db.execute(select(Asset).where(Asset.id.in_(asset_ids)))
+        identities = {str(a.id): asset_content_identity(a) for a in result.scalars().all()}
+    return render_fingerprint(
+        timeline_data, identities, width=width, height=height, fps=fps, audio_only=audio_only
+    )
+
+
+async def _reuse_completed_render(
+    db: DbSession, project_id: UUID, fingerprint: str
+) -> RenderJob | None:
+    """Record a completed job that reuses the output of an identical earlier render.
+
+    Returns None when there is no such render or its output is gone.
+    """
+    result = await db.execute(
+        select(RenderJob)
+        .where(
+            RenderJob.project_id == project_id,
+            RenderJob.fingerprint == fingerprint,
+            RenderJob.status == "completed",
+            RenderJob.output_key.is_not(None),
+        )
+        .order_by(RenderJob.completed_at.desc())
+        .limit(1)
+    )
+    previous = result.scalar_one_or_none()
+    if previous is None or previous.output_key is None:
+        return None
+    storage = get_storage_service()
+    if not await storage.file_exists(previous.output_key):
+        return None
+
+    # A new row keeps /render/status (latest job) and the history accurate
+    now = datetime.now(UTC)
+    job = RenderJob(
+        project_id=project_id,
+        status="completed",
+        progress=100,
+        current_stage="Complete (identical render reused)",
+        fingerprint=fingerprint,
+        output_key=previous.output_key,
+        output_url=await storage.get_signed_url(previous.output_key, expiration_minutes=1440),
+        output_size=previous.output_size,
+        started_at=now,
+        completed_at=now,
+    )
+    db.add(job)
+    await db.flush()
+    await db.refresh(job)
+    await db.commit()
+    metrics.incr("render.dedup.reused")
+    logger.info("[RENDER] Reused output of identical render %s as job %s", previous.id, job.id)
+    return job
+
+
 @router.post(
     "/projects/{project_id}/render",
     response_model=RenderJobResponse,
@@ -385,9 +568,12 @@ async def start_render(
             and (now - existing_job.updated_at).total_seconds() > STALE_THRESHOLD_S
         ):
             is_stale = True
-        # Fallback: check absolute timeouts
-        elif existing_job.status == "queued":
-            if existing_job.created_at and (now - existing_job.created_at).total_seconds() > 300:
+        # Fallback: check absolute timeouts.  A job waiting in the render
+        # queue (queue_position set) is kept fresh by its queue heartbeat;
+        # once admitted, started_at marks when it left the queue.
+        elif existing_job.status == "queued" and existing_job.queue_position is None:
+            queued_since = existing_job.started_at or existing_job.created_at
+            if queued_since and (now - queued_since).total_seconds() > 300:
                 is_stale = True
         elif existing_job.status == "processing":
             if existing_job.started_at and (now - existing_job.started_at).total_seconds() > 1800:
@@ -399,11 +585,8 @@ async def start_render(
                 "Job timed out (no heartbeat)" if not render_request.force else "Force replaced"
             )
             await db.flush()
-        else:
-            raise HTTPException(
-                status_code=status.HTTP_409_CONFLICT,
-                detail="A render job is already in progress for this project",
-            )
+            existing_job = None
+        # else: an identical render is attached to below; any other is a conflict
 
     # Get timeline data — use sequence if edit token or sequence_id provided
     ctx = await get_edit_context(project_id, current_user, db, x_edit_session, sequence_id)
@@ -443,7 +626,27 @@ async def start_render(
         f"[RENDER] Export range: {export_start_ms}ms - {export_end_ms}ms (duration: {render_duration_ms}ms)"
     )
 
+    # Deduplication: an identical render of this project that is running or
+    # whose output is still stored is returned instead of rendering again.
+    fingerprint = await _render_fingerprint(
+        db, timeline_data, project.width, project.height, project.fps, render_request.audio_only
+    )
+    if existing_job is not None:
+        if existing_job.fingerprint != fingerprint:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="A render job is already in progress for this project",
+            )
+        metrics.incr("render.dedup.attached")
+        logger.info("[RENDER] Identical render %s in flight; attaching", existing_job.id)
+        return RenderJobResponse.model_validate(existing_job)
+    if not render_request.force:
+        reused_job = await _reuse_completed_render(db, project_id, fingerprint)
+        if reused_job is not None:
+            return RenderJobResponse.model_validate(reused_job)
+
     # Pre-render memory estimation (OOM prevention) — skip for audio-only
+    mem_info = None
     if not render_request.audio_only:
         mem_info = analyze_timeline_for_memory(
             timeline_data, project.width, project.height, project.fps
@@ -495,14 +698,45 @@ async def start_render(
         status=initial_status,
         progress=0,
         current_stage=initial_stage,
+        priority=render_request.priority,
+        fingerprint=fingerprint,
         started_at=datetime.now(UTC) if _mode != "jobs" else None,
         timeline_snapshot=timeline_snapshot_for_db,
         render_params=render_params_for_db,
     )
     db.add(render_job)
     await db.flush()
-    await db.refresh(render_job)
-    await db.commit()
+
+    # Admission control (inline): the render starts now if its estimated
+    # memory/CPU fits next to the running ones, otherwise it waits in the
+    # render queue.  jobs mode admits from the render_jobs table instead
+    # (CloudRunJobsExecutor), so the row starts out waiting.
+    ticket = None
+    if _mode != "jobs":
+        ticket = get_render_scheduler().submit(
+            render_job.id,
+            RenderDemand.for_render(mem_info, audio_only=render_request.audio_only),
+            render_request.priority,
+        )
+    try:
+        if ticket is None:
+            render_job.current_stage = "Waiting for a render slot"
+        elif ticket.admitted:
+            render_job.started_at = datetime.now(UTC)
+        else:
+            render_job.status = "queued"
+            render_job.queue_position = ticket.position
+            render_job.current_stage = (
+                f"Waiting for a render slot (position {render_job.queue_position})"
+            )
+            render_job.started_at = None
+        await db.flush()
+        await db.refresh(render_job)
+        await db.commit()
+    except BaseException:
+        if ticket is not None:
+            ticket.release()
+        raise
 
     logger.info(
         "[RENDER] Created job %s for project %s (mode=%s audio_only=%s)",
@@ -517,8 +751,9 @@ async def start_render(
     if _mode == "jobs":
         # jobs mode: the render runs in a separate container that reads the
         # snapshot from the DB.  Do NOT construct the in-process coroutine.
-        # dispatch() returns an asyncio.Task that creates the execution and
-        # persists its name to render_job.celery_task_id (for cancellation).
+        # dispatch() returns an asyncio.Task that waits for a slot, creates
+        # the execution and persists its name to render_job.celery_task_id
+        # (for cancellation).
         executor.dispatch(render_job.id)
     else:
         # inline mode (backward-compatible): run the render in this process.
@@ -535,6 +770,7 @@ async def start_render(
                 render_duration_ms,
                 audio_only=render_request.audio_only,
             ),
+            ticket=ticket,
         )
 
     # Return immediately - frontend will poll for status
@@ -577,6 +813,71 @@ async def get_render_status(
     return RenderJobResponse.model_validate(render_job)
 
 
+def _job_snapshot_message(job: RenderJob) -> dict:
+    """WebSocket message describing a job's persisted state."""
+    job_id = str(job.id)
+    if job.status == "completed":
+        return create_complete_message(
+            job_id, job.output_url or "", file_size_bytes=job.output_size or 0
+        )
+    if job.status == "failed":
+        return create_error_message(job_id, job.error_message or "Render failed")
+    if job.status == "cancelled":
+        return {"type": "cancelled", "job_id": job_id, "status": "cancelled"}
+    return create_progress_message(job_id, job.status, job.progress, job.current_stage)
+
+
+@router.websocket("/projects/{project_id}/render/{job_id}/ws")
+async def render_progress_ws(
+    websocket: WebSocket,
+    project_id: UUID,
+    job_id: UUID,
+    token: Annotated[str | None, Query()] = None,
+    api_key: Annotated[str | None, Query()] = None,
+) -> None:
+    """Push progress, completion and errors of one render job.
+
+    Browsers cannot set headers on a WebSocket, so credentials come as query
+    parameters: ``?token=<Firebase ID token>`` or ``?api_key=douga_sk_...``.
+    The job's persisted state is sent on connect; after that messages arrive
+    as the render reports them.  ``/render/status`` remains the fallback.
+    """
+    async with async_session_maker() as db:
+        try:
+            credentials = (
+                HTTPAuthorizationCredentials(scheme="Bearer", credentials=token) if token else None
+            )
+            user = await _authenticate_user(db, credentials, api_key)
+            await get_accessible_project(project_id, user.id, db)
+        except HTTPException:
+            await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+            return
+        await db.commit()
+
+        job = await db.get(RenderJob, job_id)
+        if job is None or job.project_id != project_id:
+            await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+            return
+
+        # Register before reading the snapshot so no update falls in between
+        await websocket_manager.connect(websocket, str(job_id))
+        await db.refresh(job)
+        snapshot = _job_snapshot_message(job)
+
+    try:
+        await websocket.send_json(snapshot)
+        if snapshot["status"] in _TERMINAL_STATUSES:
+            await websocket.close()
+            return
+        while True:
+            # Client messages are ignored; receiving detects the disconnect
+            await websocket.receive_text()
+    except WebSocketDisconnect:
+        pass
+    finally:
+        websocket_manager.disconnect(websocket, str(job_id))
+
+
 @router.delete("/projects/{project_id}/render", status_code=status.HTTP_204_NO_CONTENT)
 async def cancel_render(
     project_id: UUID,
@@ -610,8 +911,9 @@ async def cancel_render(
     await db.commit()
 
     # Signal the executor to stop the running work.
-    # inline mode: cancel() is a no-op — the render loop polls _check_cancelled
-    #              and _kill_active_proc terminates the FFmpeg subprocess.
+    # inline mode: cancel() pushes the signal to the render running in this
+    #              process (renders elsewhere notice it via heartbeat/poll);
+    #              _kill_active_proc then terminates the FFmpeg subprocess.
     # jobs  mode: cancel() targets the Cloud Run Jobs execution stored in
     #             celery_task_id and forcibly stops the worker container.
     executor = get_render_executor()
@@ -815,12 +1117,15 @@ async def create_render_package(
         )
 
         try:
-            zip_path = await builder.build(timeline_data, assets_local, asset_names)
-
-            # Upload ZIP to GCS
-            zip_size = os.path.getsize(zip_path)
+            # Stream the ZIP straight into storage (no local archive)
             storage_key = f"projects/{project_id}/packages/render_package.zip"
-            await storage.upload_file(zip_path, storage_key, content_type="application/zip")
+            zip_size = await builder.build_and_upload(
+                timeline_data,
+                assets_local,
+                asset_names,
+                storage=storage,
+                storage_key=storage_key,
+            )
 
             # Generate signed download URL (24 hours)
             expiration_minutes = 1440
@@ -35,6 +35,7 @@ from src.schemas.sequence import (
     SnapshotCreate,
     SnapshotDetail,
 )
+from src.services.derived_view_cache import derived_views
 from src.services.storage_service import get_storage_service
 from src.utils.edit_token import create_edit_token
 
@@ -437,6 +438,7 @@ async def update_sequence(
 
     # Increment version
     seq.version += 1
+    derived_views.invalidate_project(project_id)
 
     # Recalculate duration_ms
     seq.duration_ms = _calculate_duration_ms(body.timeline_data)
@@ -862,6 +864,7 @@ async def restore_snapshot(
     flag_modified(seq, "timeline_data")
     seq.duration_ms = snap.duration_ms
     seq.version += 1
+    derived_views.invalidate_project(project_id)
     seq.locked_at = datetime.now(UTC)
 
     await db.flush()
@@ -4,12 +4,21 @@ This module provides:
 - WebSocketManager: Manages WebSocket connections per render job
 - RenderProgressNotifier: High-level API for sending progress updates
 - Message creation helpers: Standardized message formats
+
+When the notifier has a bus (``src.render.progress_bus``), messages are
+published there and every API instance broadcasts what it receives to its own
+clients, so a client sees a render running on any instance or worker.
 """
 
+import logging
 from typing import Any
 
 from fastapi import WebSocket
 
+from src.render.progress_bus import RenderProgressBus, render_progress_bus
+
+logger = logging.getLogger(__name__)
+
 
 class WebSocketManager:
     """Manages WebSocket connections for render progress updates.
@@ -60,10 +69,36 @@ class WebSocketManager:
 
 
 class RenderProgressNotifier:
-    """High-level API for sending render progress notifications."""
+    """High-level API for sending render progress notifications.
+
+    Without a bus, messages are broadcast directly to this instance's clients.
+    Notifications never raise: progress push is advisory, the job row stays
+    the source of truth.
+    """
 
-    def __init__(self, manager: WebSocketManager):
+    def __init__(self, manager: WebSocketManager, bus: RenderProgressBus | None = None):
         self._manager = manager
+        self._bus = bus
+
+    async def start(self) -> None:
+        """Start receiving messages published by other instances (no-op without a bus)."""
+        if self._bus is not None:
+            await self._bus.start(self._manager.broadcast)
+
+    async def stop(self) -> None:
+        if self._bus is not None:
+            await self._bus.stop()
+
+    async def _send(self, job_id: str, message: dict[str, Any]) -> None:
+        try:
+            if self._bus is not None:
+                await self._bus.publish(job_id, message)
+            else:
+                await self._manager.broadcast(job_id, message)
+        except Exception as exc:
+            logger.warning(
+                "[RENDER WS] Failed to send %s for job %s: %s", message["type"], job_id, exc
+            )
 
     async def notify_progress(
         self,
@@ -72,6 +107,7 @@ class RenderProgressNotifier:
         status: str,
         current_step: str | None = None,
         elapsed_ms: int = 0,
+        stage_timings: dict[str, int] | None = None,
     ) -> None:
         """Send a progress update to all connected clients."""
         message = create_progress_message(
@@ -80,8 +116,9 @@ class RenderProgressNotifier:
             percent=percent,
             current_step=current_step,
             elapsed_ms=elapsed_ms,
+            stage_timings=stage_timings,
         )
-        await self._manager.broadcast(job_id, message)
+        await self._send(job_id, message)
 
     async def notify_complete(
         self,
@@ -89,6 +126,7 @@ class RenderProgressNotifier:
         output_url: str,
         duration_ms: int = 0,
         file_size_bytes: int = 0,
+        stage_timings: dict[str, int] | None = None,
     ) -> None:
         """Send a completion notification to all connected clients."""
         message = create_complete_message(
@@ -96,8 +134,9 @@ class RenderProgressNotifier:
             output_url=output_url,
             duration_ms=duration_ms,
             file_size_bytes=file_size_bytes,
+            stage_timings=stage_timings,
         )
-        await self._manager.broadcast(job_id, message)
+        await self._send(job_id, message)
 
     async def notify_error(
         self,
@@ -111,7 +150,7 @@ class RenderProgressNotifier:
             error_message=error_message,
             error_code=error_code,
         )
-        await self._manager.broadcast(job_id, message)
+        await self._send(job_id, message)
 
     async def notify_cancelled(self, job_id: str) -> None:
         """Send a cancellation notification to all connected clients."""
@@ -120,7 +159,7 @@ class RenderProgressNotifier:
             "job_id": job_id,
             "status": "cancelled",
         }
-        await self._manager.broadcast(job_id, message)
+        await self._send(job_id, message)
 
 
 def create_progress_message(
@@ -129,9 +168,14 @@ def create_progress_message(
     percent: float,
     current_step: str | None = None,
     elapsed_ms: int = 0,
+    stage_timings: dict[str, int] | None = None,
 ) -> dict[str, Any]:
-    """Create a standardized progress message."""
-    return {
+    """Create a standardized progress message.
+
+    ``stage_timings`` maps each stage reached so far to its duration in ms
+    (the current stage's duration so far).
+    """
+    message = {
         "type": "progress",
         "job_id": job_id,
         "status": status,
@@ -139,6 +183,9 @@ def create_progress_message(
         "current_step": current_step,
         "elapsed_ms": elapsed_ms,
     }
+    if stage_timings is not None:
+        message["stage_timings"] = stage_timings
+    return message
 
 
 def create_complete_message(
@@ -146,9 +193,10 @@ def create_complete_message(
     output_url: str,
     duration_ms: int = 0,
     file_size_bytes: int = 0,
+    stage_timings: dict[str, int] | None = None,
 ) -> dict[str, Any]:
     """Create a standardized completion message."""
-    return {
+    message = {
         "type": "complete",
         "job_id": job_id,
         "status": "completed",
@@ -157,6 +205,9 @@ def create_complete_message(
         "duration_ms": duration_ms,
         "file_size_bytes": file_size_bytes,
     }
+    if stage_timings is not None:
+        message["stage_timings"] = stage_timings
+    return message
 
 
 def create_error_message(
@@ -176,4 +227,4 @@ def create_error_message(
 
 # Global WebSocket manager instance
 websocket_manager = WebSocketManager()
-progress_notifier = RenderProgressNotifier(websocket_manager)
+progress_notifier = RenderProgressNotifier(websocket_manager, bus=render_progress_bus)
@@ -74,6 +74,19 @@ class Settings(BaseSettings):
     gemini_chat_model: str = "gemini-3-pro-preview"
     openai_video_model: str = "gpt-4o"
 
+    # LLM provider HTTP pool (one keep-alive client per provider). Base URLs can
+    # point at a local mock provider; 429/5xx responses are retried up to
+    # llm_max_retries times, honoring Retry-After up to the max delay.
+    openai_base_url: str = "https://api.openai.com"
+    anthropic_base_url: str = "https://api.anthropic.com"
+    gemini_base_url: str = "https://generativelanguage.googleapis.com"
+    llm_max_connections_per_provider: int = 20
+    llm_max_retries: int = 2
+    llm_retry_max_delay_seconds: float = 30.0
+    # Approximate token budget for the chat timeline context (system prompt).
+    # Clips far from the region under discussion are summarised to stay within it.
+    chat_context_token_budget: int = 6000
+
     # CORS - stored as string, parsed via computed property.
     # Controlled via the CORS_ORIGINS env var (CORS_ORIGINS_RAW is also
     # accepted for backwards compatibility; CORS_ORIGINS wins if both are set).
@@ -181,6 +194,23 @@ class Settings(BaseSettings):
     # Override via RENDER_FFMPEG_PRESET env var if you need higher quality (e.g. "medium").
     render_ffmpeg_preset: str = "fast"
 
+    # Segment-parallel encoding: single-pass renders at least two segments long
+    # are composited as ~render_segment_duration_s segments cut at clip edges,
+    # by up to render_segment_workers FFmpeg processes at once (each using
+    # render_ffmpeg_threads), then joined with -c copy.  1 = one composite.
+    render_segment_workers: int = 1
+    render_segment_duration_s: int = 30
+
+    # Render admission control (src/render/scheduler.py): inline renders run
+    # while the estimated memory (within render_memory_safety_ratio of the
+    # container) and CPU of running renders fit; the rest are queued, final
+    # exports ahead of drafts.
+    render_cpu_budget: float = 0  # CPUs for renders; 0 = container CPU limit
+    render_max_concurrent_jobs: int = 0  # 0 = bounded by memory/CPU only
+    # jobs mode: concurrent Cloud Run Jobs executions across all instances,
+    # counted from the render_jobs table (src/render/executor.py)
+    render_jobs_max_concurrent: int = 10
+
     # Render execution mode (feature flag for ADR-001 Cloud Run Jobs migration).
     # "inline"  — default, current behaviour: asyncio.create_task in the same instance.
     # "jobs"    — Cloud Run Jobs executor: launches a separate container per render job.
@@ -192,12 +222,48 @@ class Settings(BaseSettings):
     cloud_run_region: str = "asia-northeast1"
     cloud_run_render_job_name: str = "douga-render-worker"
 
+    # Render progress push (WebSocket). "local" delivers to clients of the
+    # instance running the render only; "postgres" fans out to every instance
+    # via NOTIFY/LISTEN on render_progress_channel (needed behind a load
+    # balancer or with render_execution_mode="jobs").
+    render_progress_pubsub: Literal["local", "postgres"] = "local"
+    render_progress_channel: str = "render_progress"
+
+    # Pre-keyed chroma intermediates: chroma-keyed clips are keyed once per
+    # (asset, key settings) into a stored VP9-alpha file that renders overlay
+    # instead of keying every frame (src/services/keyed_intermediates.py).
+    render_prekeyed_chroma: bool = True
+
+    # Streamed render output: the final mux writes fragmented MP4 straight
+    # into a chunked storage upload, so uploading overlaps encoding instead
+    # of following it.  Off by default: the output is fragmented MP4.
+    render_stream_upload: bool = False
+
+    # Internal metrics: GET /health/metrics answers only requests carrying
+    # this value in X-Metrics-Token (monitoring / deploy tooling).  Empty
+    # disables the endpoint (404).
+    metrics_token: str = ""
+
     # Development/Testing - DEV_USER bypasses Firebase auth
     dev_mode: bool = False  # Set DEV_MODE=true in local .env to bypass auth
     dev_user_email: str = "dev@example.com"
     dev_user_name: str = "開発ユーザー"
     dev_user_id: str = "dev-user-123"
 
+    # Authentication cache - verified Firebase tokens / API keys are trusted for
+    # up to this many seconds before being re-verified (bounds how long a revoked
+    # credential keeps working on an instance). 0 disables the cache.
+    auth_cache_ttl_seconds: float = 60.0
+    auth_cache_max_entries: int = 10000
+    # API key last_used_at updates are batched and written at this interval
+    api_key_last_used_flush_seconds: float = 30.0
+
+    # Firestore project_updates publishing: events for the same project within
+    # this window are coalesced into one write; at most this many projects may
+    # have an event waiting before publishers are throttled.
+    event_publish_window_seconds: float = 0.1
+    event_publish_max_pending: int = 1000
+
     # Edit session token (HMAC signing key for X-Edit-Session tokens).
     # Must be overridden in production via EDIT_TOKEN_SECRET env var.
     edit_token_secret: str = _WEAK_DEFAULT_SECRET
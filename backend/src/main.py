@@ -1,7 +1,9 @@
+import hmac
 import logging
 import os
 from collections.abc import AsyncGenerator
 from contextlib import asynccontextmanager
+from typing import Any
 
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.encoders import jsonable_encoder
@@ -28,6 +30,7 @@ from src.api import (
     transcription,
 )
 from src.api.ai_v1._helpers import _http_error_code as _http_error_code_v1
+from src.api.websocket import progress_notifier
 from src.config import get_settings
 from src.constants.error_codes import get_error_spec
 from src.constants.expected_formats import get_expected_format
@@ -37,6 +40,11 @@ from src.middleware.rate_limit import RateLimitMiddleware
 from src.middleware.request_context import build_meta, create_request_context
 from src.models.database import engine, sync_engine
 from src.schemas.envelope import EnvelopeResponse, ErrorInfo
+from src.services.ai.http_pool import llm_http_pool
+from src.services.event_manager import event_manager
+from src.services.keyed_intermediates import keyed_intermediates
+from src.services.principal_cache import api_key_last_used
+from src.utils.metrics import metrics
 
 # Configure logging first so all subsequent modules use the right formatter.
 # In production this emits structured JSON; in other environments it uses the
@@ -94,8 +102,16 @@ init_sentry()
 async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     # Startup — schema migrations are now handled by ``alembic upgrade head``
     # in the deploy pipeline before the app starts.  No DDL is executed here.
+    api_key_last_used.start()
+    event_manager.start()
+    await progress_notifier.start()
     yield
     # Shutdown
+    await progress_notifier.stop()
+    await keyed_intermediates.stop()
+    await event_manager.stop()
+    await api_key_last_used.stop()
+    await llm_http_pool.aclose()
     await engine.dispose()
     sync_engine.dispose()
 
@@ -375,6 +391,21 @@ async def health_check() -> dict[str, str | bool]:
     }
 
 
+@app.get("/health/metrics", include_in_schema=False)
+async def metrics_snapshot(request: Request) -> dict[str, Any]:
+    """Per-instance hot-path counters (cache hit rates, 304 short-circuits).
+
+    Values reset on process restart and are not aggregated across Cloud Run
+    instances.  Internal only: requires ``X-Metrics-Token`` to match
+    ``settings.metrics_token`` and answers 404 otherwise (including when no
+    token is configured), so anonymous callers cannot probe instance load.
+    """
+    token = request.headers.get("x-metrics-token", "")
+    if not settings.metrics_token or not hmac.compare_digest(token, settings.metrics_token):
+        raise HTTPException(status_code=404, detail="Not Found")
+    return metrics.snapshot()
+
+
 @app.get("/api/version")
 async def get_version() -> dict[str, str]:
     """Return the backend version info.
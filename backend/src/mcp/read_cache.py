@@ -0,0 +1,118 @@
+"""Conditional-GET response cache and read coalescing for the MCP server.
+
+An agent's read loop (overview → structure → clip details → overview) asks
+the backend for the same payloads over and over.  The backend already tags
+``/api/ai/v1`` reads with ETags, so :class:`ReadCache` keeps the last body
+per (credential, URL) and lets the caller revalidate it with
+``If-None-Match``; a 304 reuses the cached bytes.
+
+- Identical reads that are in flight at the same time share one request.
+- Every entry is scoped to the project id found in its URL.  A write to a
+  project drops that project's entries and in-flight reads, and a read that
+  started before the write never stores its (possibly stale) result.
+- Writes outside any project (e.g. creating a project) clear everything.
+
+Entries are always revalidated, never served blind, so the cache only saves
+transfer and parsing — it cannot return data the backend would not.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import re
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from typing import NamedTuple
+
+# /api/ai/v1/projects/{id}/..., /api/projects/{id}/..., /api/ai/project/{id}/...
+_PROJECT_RE = re.compile(r"/projects?/([^/?#]+)")
+
+CacheKey = tuple[str, str]
+
+
+def project_scope(endpoint: str) -> str | None:
+    """Project id an endpoint belongs to, or None for project-less endpoints."""
+    match = _PROJECT_RE.search(endpoint)
+    return match.group(1) if match else None
+
+
+class CachedBody(NamedTuple):
+    etag: str
+    content: bytes
+    scope: str | None
+
+
+class ReadCache:
+    """LRU of ETag-tagged GET bodies with per-project invalidation."""
+
+    def __init__(self, max_entries: int = 256) -> None:
+        self.max_entries = max_entries
+        self._entries: OrderedDict[CacheKey, CachedBody] = OrderedDict()
+        self._inflight: dict[CacheKey, tuple[str | None, asyncio.Future[bytes]]] = {}
+        # Bumped on invalidation so reads started earlier cannot store stale bodies
+        self._epoch = 0
+        self._generations: dict[str | None, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def lookup(self, key: CacheKey) -> CachedBody | None:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def generation(self, scope: str | None) -> tuple[int, int]:
+        """Token to pass back to :meth:`store` for a read starting now."""
+        return self._epoch, self._generations.get(scope, 0)
+
+    def store(
+        self,
+        key: CacheKey,
+        scope: str | None,
+        generation: tuple[int, int],
+        etag: str,
+        content: bytes,
+    ) -> None:
+        if generation != self.generation(scope):
+            return
+        self._entries[key] = CachedBody(etag, content, scope)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, scope: str | None) -> None:
+        """Forget everything read from ``scope`` (everything when None)."""
+        if scope is None:
+            self._epoch += 1
+            self._entries.clear()
+            self._inflight.clear()
+            return
+        self._generations[scope] = self._generations.get(scope, 0) + 1
+        for key in [k for k, entry in self._entries.items() if entry.scope == scope]:
+            del self._entries[key]
+        for key in [k for k, (s, _) in self._inflight.items() if s == scope]:
+            del self._inflight[key]
+
+    async def coalesce(
+        self, key: CacheKey, scope: str | None, fetch: Callable[[], Awaitable[bytes]]
+    ) -> bytes:
+        """Run ``fetch`` once for concurrent callers asking for the same key."""
+        pending = self._inflight.get(key)
+        future: asyncio.Future[bytes]
+        if pending is None:
+            future = asyncio.ensure_future(fetch())
+            self._inflight[key] = (scope, future)
+            future.add_done_callback(lambda done: self._finish(key, done))
+        else:
+            future = pending[1]
+        # A cancelled caller must not cancel the read other callers wait on
+        return await asyncio.shield(future)
+
+    def _finish(self, key: CacheKey, done: asyncio.Future[bytes]) -> None:
+        pending = self._inflight.get(key)
+        if pending is not None and pending[1] is done:
+            del self._inflight[key]
+        if not done.cancelled():
+            # Mark the exception retrieved when every waiter has gone away
+            done.exception()
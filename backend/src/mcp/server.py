@@ -33,6 +33,7 @@ FastMCPベースのMCPサーバー。AIアシスタントに動画編集ツー
     pip install mcp[cli] httpx
 """
 
+import json
 import logging
 import os
 import uuid
@@ -40,6 +41,8 @@ from typing import Any
 
 import httpx
 
+from src.mcp.read_cache import ReadCache, project_scope
+
 try:
     from mcp.server.fastmcp import FastMCP
 except ImportError:
@@ -183,6 +186,66 @@ def _build_api_error_message(exc: httpx.HTTPStatusError, auth_mode: str) -> str:
         )
 
 
+# One keep-alive client per MCP process (created lazily inside the running loop)
+_http_client: httpx.AsyncClient | None = None
+
+# ETag-revalidated GET bodies, invalidated per project by write tools
+_read_cache = ReadCache()
+
+# POST endpoints that only read (preview sampling) and must not invalidate the cache
+_READ_ONLY_POST_MARKER = "/preview/"
+
+
+def _get_http_client() -> httpx.AsyncClient:
+    """プロセス共有の keep-alive クライアントを返す（初回呼び出し時に生成）。"""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=20, max_keepalive_connections=10, keepalive_expiry=60.0
+            ),
+        )
+    return _http_client
+
+
+def _invalidate_reads(endpoint: str) -> None:
+    """書き込み先プロジェクトのキャッシュ済み GET レスポンスを破棄する。"""
+    _read_cache.invalidate(project_scope(endpoint))
+
+
+async def _cached_get(url: str, endpoint: str, headers: dict[str, str], auth_mode: str) -> bytes:
+    """GET を ETag で再検証し、同一リクエストの同時実行は1本にまとめる。
+
+    キャッシュ済みの ETag があれば If-None-Match を付与し、304 なら
+    キャッシュ済みのボディを返す。
+
+    Returns:
+        レスポンスボディ（bytes）
+    """
+    scope = project_scope(endpoint)
+    key = ("\n".join(f"{k}:{v}" for k, v in sorted(headers.items())), url)
+    generation = _read_cache.generation(scope)
+
+    async def fetch() -> bytes:
+        cached = _read_cache.lookup(key)
+        request_headers = dict(headers)
+        if cached is not None:
+            request_headers["If-None-Match"] = cached.etag
+        response = await _get_http_client().get(url, headers=request_headers)
+        if response.status_code == 304 and cached is not None:
+            return cached.content
+        try:
+            response.raise_for_status()
+        except httpx.HTTPStatusError as exc:
+            raise RuntimeError(_build_api_error_message(exc, auth_mode)) from exc
+        etag = response.headers.get("etag")
+        if etag:
+            _read_cache.store(key, scope, generation, etag, response.content)
+        return response.content
+
+    return await _read_cache.coalesce(key, scope, fetch)
+
+
 def _build_auth_headers() -> tuple[dict[str, str], str]:
     """認証ヘッダーと認証モードを構築して返す。
 
@@ -217,26 +280,32 @@ async def _call_api(
     url = f"{API_BASE_URL}{endpoint}"
     headers, auth_mode = _build_auth_headers()
 
-    async with httpx.AsyncClient() as client:
-        if method == "GET":
-            response = await client.get(url, headers=headers)
-        elif method == "POST":
-            response = await client.post(url, headers=headers, json=data)
-        elif method == "PATCH":
-            response = await client.patch(url, headers=headers, json=data)
-        elif method == "PUT":
-            response = await client.put(url, headers=headers, json=data)
-        elif method == "DELETE":
-            response = await client.delete(url, headers=headers)
-        else:
-            raise ValueError(f"Unsupported method: {method}")
+    if method == "GET":
+        content = await _cached_get(url, endpoint, headers, auth_mode)
+        return json.loads(content) if content else {}  # type: ignore[no-any-return]
+
+    client = _get_http_client()
+    if method == "POST":
+        response = await client.post(url, headers=headers, json=data)
+    elif method == "PATCH":
+        response = await client.patch(url, headers=headers, json=data)
+    elif method == "PUT":
+        response = await client.put(url, headers=headers, json=data)
+    elif method == "DELETE":
+        response = await client.delete(url, headers=headers)
+    else:
+        raise ValueError(f"Unsupported method: {method}")
 
-        try:
-            response.raise_for_status()
-        except httpx.HTTPStatusError as exc:
-            raise RuntimeError(_build_api_error_message(exc, auth_mode)) from exc
+    if _READ_ONLY_POST_MARKER not in endpoint:
+        # Invalidate even on errors: a failed write may still have partially applied
+        _invalidate_reads(endpoint)
+
+    try:
+        response.raise_for_status()
+    except httpx.HTTPStatusError as exc:
+        raise RuntimeError(_build_api_error_message(exc, auth_mode)) from exc
 
-        return response.json() if response.content else {}
+    return response.json() if response.content else {}
 
 
 async def _call_api_v1_write(
@@ -271,34 +340,36 @@ async def _call_api_v1_write(
     headers, auth_mode = _build_auth_headers()
     headers["Idempotency-Key"] = idempotency_key
 
-    async with httpx.AsyncClient() as client:
-        if method == "POST":
-            response = await client.post(url, headers=headers, json=data)
-        elif method == "PATCH":
-            response = await client.patch(url, headers=headers, json=data)
-        elif method == "PUT":
-            response = await client.put(url, headers=headers, json=data)
-        elif method == "DELETE":
-            if data is None:
-                response = await client.delete(url, headers=headers)
-            else:
-                response = await client.request("DELETE", url, headers=headers, json=data)
+    client = _get_http_client()
+    if method == "POST":
+        response = await client.post(url, headers=headers, json=data)
+    elif method == "PATCH":
+        response = await client.patch(url, headers=headers, json=data)
+    elif method == "PUT":
+        response = await client.put(url, headers=headers, json=data)
+    elif method == "DELETE":
+        if data is None:
+            response = await client.delete(url, headers=headers)
         else:
-            raise ValueError(f"Unsupported method for V1 write: {method}")
+            response = await client.request("DELETE", url, headers=headers, json=data)
+    else:
+        raise ValueError(f"Unsupported method for V1 write: {method}")
 
-        try:
-            response.raise_for_status()
-        except httpx.HTTPStatusError as exc:
-            raise RuntimeError(_build_api_error_message(exc, auth_mode)) from exc
+    _invalidate_reads(endpoint)
+
+    try:
+        response.raise_for_status()
+    except httpx.HTTPStatusError as exc:
+        raise RuntimeError(_build_api_error_message(exc, auth_mode)) from exc
 
-        if not response.content:
-            return {}
+    if not response.content:
+        return {}
 
-        result = response.json()
-        # V1 Envelope レスポンス {"data": ..., "meta": ..., "ok": true} をアンラップ
-        if isinstance(result, dict) and "data" in result:
-            return result["data"]  # type: ignore[no-any-return]
-        return result  # type: ignore[return-value]
+    result = response.json()
+    # V1 Envelope レスポンス {"data": ..., "meta": ..., "ok": true} をアンラップ
+    if isinstance(result, dict) and "data" in result:
+        return result["data"]  # type: ignore[no-any-return]
+    return result  # type: ignore[return-value]
 
 
 async def _upload_files(
@@ -341,13 +412,15 @@ async def _upload_files(
             opened.append(f)
             files.append(("files", (p.name, f, mime)))
 
-        async with httpx.AsyncClient(timeout=timeout) as client:
-            resp = await client.post(f"{API_BASE_URL}{endpoint}", headers=headers, files=files)
-            try:
-                resp.raise_for_status()
-            except httpx.HTTPStatusError as exc:
-                raise RuntimeError(_build_api_error_message(exc, auth_mode)) from exc
-            return resp.json()
+        resp = await _get_http_client().post(
+            f"{API_BASE_URL}{endpoint}", headers=headers, files=files, timeout=timeout
+        )
+        _invalidate_reads(endpoint)
+        try:
+            resp.raise_for_status()
+        except httpx.HTTPStatusError as exc:
+            raise RuntimeError(_build_api_error_message(exc, auth_mode)) from exc
+        return resp.json()
     finally:
         for f in opened:
             f.close()
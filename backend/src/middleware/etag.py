@@ -6,12 +6,25 @@ When a client sends If-None-Match with a matching ETag value, returns
 
 Also adds Cache-Control headers to semi-static endpoints like
 /capabilities and /schemas.
+
+This is the fallback path: the full response has already been built by the
+time it runs.  Handlers that can derive their ETag from a narrow query
+short-circuit earlier via ``check_project_not_modified`` in
+``src.api.ai_v1._helpers``; matches caught here are counted as
+``etag.late_304`` so the remaining wasted work stays visible.
+
+Implemented as raw ASGI middleware: requests it has nothing to do for (no
+If-None-Match and not a cacheable path) pass straight through, and others
+only have their response-start message inspected.
 """
 
 import logging
 
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.api._etag import etag_matches
+from src.utils.metrics import metrics
 
 logger = logging.getLogger(__name__)
 
@@ -20,7 +33,7 @@ _CACHEABLE_PATHS = {"/api/ai/v1/capabilities", "/api/ai/v1/schemas"}
 _CACHE_CONTROL_STATIC = "public, max-age=300"
 
 
-class ETagMiddleware(BaseHTTPMiddleware):
+class ETagMiddleware:
     """Middleware that handles ETag-based conditional requests for V1 API.
 
     For GET requests to /api/ai/v1/* with an If-None-Match header:
@@ -30,51 +43,62 @@ class ETagMiddleware(BaseHTTPMiddleware):
     Also adds Cache-Control to semi-static endpoints (/capabilities, /schemas).
     """
 
-    async def dispatch(self, request: Request, call_next: RequestResponseEndpoint) -> Response:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         # Only handle V1 API GET requests
-        if not request.url.path.startswith("/api/ai/v1") or request.method != "GET":
-            return await call_next(request)
-
-        if_none_match = request.headers.get("if-none-match")
-
-        response = await call_next(request)
-
-        # Add Cache-Control for semi-static endpoints
-        if request.url.path in _CACHEABLE_PATHS:
-            response.headers.setdefault("Cache-Control", _CACHE_CONTROL_STATIC)
-
-        # Check ETag match for conditional requests
-        if if_none_match and response.status_code == 200:
-            response_etag = response.headers.get("etag")
-            if response_etag and self._etag_matches(if_none_match, response_etag):
-                logger.debug("ETag match for %s, returning 304", request.url.path)
-                return Response(
-                    status_code=304,
-                    headers={
-                        "ETag": response_etag,
-                        # Preserve rate limit headers if present
-                        **{
-                            k: v
-                            for k, v in response.headers.items()
-                            if k.lower().startswith("x-ratelimit")
-                        },
-                    },
-                )
-
-        return response
+        if (
+            scope["type"] != "http"
+            or scope["method"] != "GET"
+            or not scope["path"].startswith("/api/ai/v1")
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        path: str = scope["path"]
+        if_none_match = Headers(scope=scope).get("if-none-match")
+        cacheable = path in _CACHEABLE_PATHS
+        if not if_none_match and not cacheable:
+            await self.app(scope, receive, send)
+            return
+
+        not_modified = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal not_modified
+            if not_modified:
+                # Swallow the original body; the 304 has already been sent
+                return
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                # Add Cache-Control for semi-static endpoints
+                if cacheable:
+                    headers.setdefault("Cache-Control", _CACHE_CONTROL_STATIC)
+
+                # Check ETag match for conditional requests
+                response_etag = headers.get("etag")
+                if (
+                    if_none_match
+                    and message["status"] == 200
+                    and response_etag
+                    and self._etag_matches(if_none_match, response_etag)
+                ):
+                    logger.debug("ETag match for %s, returning 304", path)
+                    metrics.incr("etag.late_304")
+                    not_modified = True
+                    # Preserve rate limit headers if present
+                    raw = [(b"etag", response_etag.encode("latin-1"))] + [
+                        (k, v) for k, v in headers.raw if k.startswith(b"x-ratelimit")
+                    ]
+                    await send({"type": "http.response.start", "status": 304, "headers": raw})
+                    await send({"type": "http.response.body", "body": b"", "more_body": False})
+                    return
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
 
     @staticmethod
     def _etag_matches(if_none_match: str, etag: str) -> bool:
-        """Check if the If-None-Match header matches the response ETag.
-
-        Supports:
-        - Exact match: If-None-Match: W/"abc"
-        - Wildcard: If-None-Match: *
-        - Multiple values: If-None-Match: W/"abc", W/"def"
-        """
-        if if_none_match.strip() == "*":
-            return True
-
-        # Parse comma-separated ETags
-        client_etags = [e.strip() for e in if_none_match.split(",")]
-        return etag in client_etags
+        """Check if the If-None-Match header matches the response ETag."""
+        return etag_matches(if_none_match, etag)
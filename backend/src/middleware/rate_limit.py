@@ -1,26 +1,39 @@
 """Rate limiting middleware for V1 API endpoints.
 
-Implements a per-client sliding window counter with configurable limits.
-Since Cloud Run is stateless, this is an in-instance counter only;
-cross-instance global limiting would require Redis/DB (future work).
+Implements a per-client GCRA (generic cell rate algorithm) limiter — the
+token bucket expressed as a single "theoretical arrival time" per client —
+so each request costs O(1) time and each client O(1) memory regardless of
+the window size.  A client may burst up to ``requests_per_window`` requests
+and then continues at ``requests_per_window / window_seconds`` requests per
+second.
+
+State is in-instance by default.  Cloud Run is stateless, so a shared
+backend (e.g. Redis / Memorystore running the same GCRA step atomically) can
+be plugged in with :meth:`RateLimitMiddleware.set_backend` for
+cross-instance limiting; if it fails, the local state is used instead.
 
 Rate limit information is communicated via standard headers:
-    X-RateLimit-Limit:     Maximum requests per window
-    X-RateLimit-Remaining: Remaining requests in the current window
-    X-RateLimit-Reset:     UTC epoch seconds when the window resets
+    X-RateLimit-Limit:     Maximum burst size (requests per window)
+    X-RateLimit-Remaining: Requests that may still be sent right now
+    X-RateLimit-Reset:     UTC epoch seconds when the allowance is full again
 
 On limit exceeded: 429 Too Many Requests with envelope response and Retry-After header.
+
+Implemented as raw ASGI middleware (no ``BaseHTTPMiddleware``) so non-V1
+traffic passes straight through and V1 responses are not re-streamed.
 """
 
 import logging
+import math
+import threading
 import time
-from collections import defaultdict
-from dataclasses import dataclass, field
+from collections import OrderedDict
+from typing import Protocol
 
-from fastapi import Request, Response
 from fastapi.encoders import jsonable_encoder
 from fastapi.responses import JSONResponse
-from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from src.constants.error_codes import get_error_spec
 from src.middleware.request_context import build_meta, create_request_context
@@ -31,17 +44,52 @@ logger = logging.getLogger(__name__)
 # Default rate limit: 60 requests per minute per client
 RATE_LIMIT_REQUESTS = 60
 RATE_LIMIT_WINDOW_SECONDS = 60
+# Upper bound on tracked clients per instance (least recently seen evicted first)
+RATE_LIMIT_MAX_CLIENTS = 10_000
+
+
+class RateLimitBackend(Protocol):
+    """Shared limiter state.  ``acquire`` must apply the GCRA step atomically."""
+
+    async def acquire(
+        self, key: str, now: float, emission_interval: float, tolerance: float
+    ) -> tuple[bool, float]: ...
 
 
-@dataclass
-class _ClientWindow:
-    """Sliding window state for a single client."""
+class LocalRateLimitBackend:
+    """In-process GCRA state: one float per client in a bounded LRU."""
 
-    timestamps: list[float] = field(default_factory=list)
+    def __init__(self, max_clients: int = RATE_LIMIT_MAX_CLIENTS) -> None:
+        self._max_clients = max_clients
+        self._tat: OrderedDict[str, float] = OrderedDict()
+        self._lock = threading.Lock()
 
+    def __len__(self) -> int:
+        return len(self._tat)
 
-class RateLimitMiddleware(BaseHTTPMiddleware):
-    """Per-client sliding window rate limiter for /api/ai/v1 endpoints.
+    def step(
+        self, key: str, now: float, emission_interval: float, tolerance: float
+    ) -> tuple[bool, float]:
+        """Apply one request; returns (allowed, theoretical arrival time)."""
+        with self._lock:
+            tat = max(self._tat.get(key, now), now)
+            allowed = tat - now <= tolerance
+            if allowed:
+                tat += emission_interval
+                self._tat[key] = tat
+                self._tat.move_to_end(key)
+                if len(self._tat) > self._max_clients:
+                    self._tat.popitem(last=False)
+            return allowed, tat
+
+    async def acquire(
+        self, key: str, now: float, emission_interval: float, tolerance: float
+    ) -> tuple[bool, float]:
+        return self.step(key, now, emission_interval, tolerance)
+
+
+class RateLimitMiddleware:
+    """Per-client GCRA rate limiter for /api/ai/v1 endpoints.
 
     Client identity is resolved from:
       1. X-API-Key header (preferred for programmatic access)
@@ -51,105 +99,101 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
 
     def __init__(
         self,
-        app: "ASGIApp",  # noqa: F821
+        app: ASGIApp,
         requests_per_window: int = RATE_LIMIT_REQUESTS,
         window_seconds: int = RATE_LIMIT_WINDOW_SECONDS,
+        backend: RateLimitBackend | None = None,
+        max_clients: int = RATE_LIMIT_MAX_CLIENTS,
     ) -> None:
-        super().__init__(app)
+        self.app = app
         self.requests_per_window = requests_per_window
         self.window_seconds = window_seconds
-        # client_key -> _ClientWindow
-        self._windows: dict[str, _ClientWindow] = defaultdict(_ClientWindow)
+        # Seconds each request "costs"; a full burst may run this far ahead of now
+        self._emission_interval = window_seconds / requests_per_window
+        self._tolerance = self._emission_interval * (requests_per_window - 1)
+        self._local = LocalRateLimitBackend(max_clients)
+        self._backend = backend
+
+    def set_backend(self, backend: RateLimitBackend | None) -> None:
+        self._backend = backend
 
     # ------------------------------------------------------------------
     # Client identification
     # ------------------------------------------------------------------
 
     @staticmethod
-    def _identify_client(request: Request) -> str:
+    def _identify_client(headers: Headers, scope: Scope) -> str:
         """Extract a stable client identifier from request headers."""
         # 1. API key (hash the key to avoid storing secrets)
-        api_key = request.headers.get("x-api-key")
+        api_key = headers.get("x-api-key")
         if api_key:
             return f"apikey:{api_key[:16]}"
 
         # 2. Bearer token (use first 32 chars as fingerprint)
-        auth_header = request.headers.get("authorization", "")
+        auth_header = headers.get("authorization", "")
         if auth_header.lower().startswith("bearer "):
             token = auth_header[7:]
             return f"bearer:{token[:32]}"
 
         # 3. Fallback to IP
-        client_host = request.client.host if request.client else "unknown"
+        client = scope.get("client")
+        client_host = client[0] if client else "unknown"
         return f"ip:{client_host}"
 
     # ------------------------------------------------------------------
-    # Sliding window logic
+    # GCRA
     # ------------------------------------------------------------------
 
-    def _check_and_record(self, client_key: str, now: float) -> tuple[bool, int, int]:
+    async def _check_and_record(self, client_key: str, now: float) -> tuple[bool, int, int]:
         """Check rate limit and record the current request.
 
         Returns (allowed, remaining, reset_epoch).
         """
-        window = self._windows[client_key]
-        cutoff = now - self.window_seconds
-
-        # Prune timestamps outside the window
-        window.timestamps = [t for t in window.timestamps if t > cutoff]
-
-        remaining = self.requests_per_window - len(window.timestamps)
-        # Reset is the earliest time a slot opens up
-        if window.timestamps:
-            reset_epoch = int(window.timestamps[0] + self.window_seconds) + 1
+        args = (client_key, now, self._emission_interval, self._tolerance)
+        if self._backend is not None:
+            try:
+                allowed, tat = await self._backend.acquire(*args)
+            except Exception:
+                logger.warning("rate limit backend failed; using local state", exc_info=True)
+                allowed, tat = self._local.step(*args)
         else:
-            reset_epoch = int(now + self.window_seconds)
+            allowed, tat = self._local.step(*args)
 
-        if remaining <= 0:
-            return False, 0, reset_epoch
-
-        # Record this request
-        window.timestamps.append(now)
-        remaining -= 1  # account for the request we just recorded
-        return True, remaining, reset_epoch
+        if not allowed:
+            # Earliest time the next request fits within the burst tolerance
+            return False, 0, math.ceil(tat - self._tolerance)
 
-    # ------------------------------------------------------------------
-    # Periodic cleanup to avoid memory leaks from expired client entries
-    # ------------------------------------------------------------------
+        headroom = self._tolerance + self._emission_interval - (tat - now)
+        remaining = max(0, int(headroom / self._emission_interval + 1e-9))
+        return True, remaining, math.ceil(tat)
 
-    def _cleanup_stale_entries(self, now: float) -> None:
-        """Remove client entries with no timestamps in the current window."""
-        cutoff = now - self.window_seconds
-        stale_keys = [
-            k for k, w in self._windows.items() if not w.timestamps or w.timestamps[-1] <= cutoff
-        ]
-        for k in stale_keys:
-            del self._windows[k]
+    def _rate_limit_headers(self, remaining: int, reset_epoch: int) -> dict[str, str]:
+        return {
+            "X-RateLimit-Limit": str(self.requests_per_window),
+            "X-RateLimit-Remaining": str(remaining),
+            "X-RateLimit-Reset": str(reset_epoch),
+        }
 
     # ------------------------------------------------------------------
-    # Middleware dispatch
+    # ASGI entry point
     # ------------------------------------------------------------------
 
-    async def dispatch(self, request: Request, call_next: RequestResponseEndpoint) -> Response:
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         # Only rate-limit V1 API paths
-        if not request.url.path.startswith("/api/ai/v1"):
-            return await call_next(request)
+        if scope["type"] != "http" or not scope["path"].startswith("/api/ai/v1"):
+            await self.app(scope, receive, send)
+            return
 
         now = time.time()
-        client_key = self._identify_client(request)
-
-        # Periodic cleanup (every ~100 requests)
-        if int(now) % 100 == 0:
-            self._cleanup_stale_entries(now)
-
-        allowed, remaining, reset_epoch = self._check_and_record(client_key, now)
+        client_key = self._identify_client(Headers(scope=scope), scope)
+        allowed, remaining, reset_epoch = await self._check_and_record(client_key, now)
 
         if not allowed:
             retry_after = max(1, reset_epoch - int(now))
             logger.warning(
                 "Rate limit exceeded for client=%s path=%s",
                 client_key,
-                request.url.path,
+                scope["path"],
             )
             context = create_request_context()
             spec = get_error_spec("RATE_LIMITED")
@@ -167,19 +211,22 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
             resp = JSONResponse(
                 status_code=429,
                 content=jsonable_encoder(envelope.model_dump(exclude_none=True)),
+                headers={
+                    **self._rate_limit_headers(0, reset_epoch),
+                    "Retry-After": str(retry_after),
+                },
             )
-            resp.headers["X-RateLimit-Limit"] = str(self.requests_per_window)
-            resp.headers["X-RateLimit-Remaining"] = "0"
-            resp.headers["X-RateLimit-Reset"] = str(reset_epoch)
-            resp.headers["Retry-After"] = str(retry_after)
-            return resp
+            await resp(scope, receive, send)
+            return
 
-        # Proceed with the request
-        response = await call_next(request)
+        rate_headers = self._rate_limit_headers(remaining, reset_epoch)
 
-        # Attach rate limit headers to all V1 responses
-        response.headers["X-RateLimit-Limit"] = str(self.requests_per_window)
-        response.headers["X-RateLimit-Remaining"] = str(remaining)
-        response.headers["X-RateLimit-Reset"] = str(reset_epoch)
+        async def send_with_headers(message: Message) -> None:
+            # Attach rate limit headers to all V1 responses
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                for name, value in rate_headers.items():
+                    headers[name] = value
+            await send(message)
 
-        return response
+        await self.app(scope, receive, send_with_headers)
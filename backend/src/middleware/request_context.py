@@ -8,6 +8,7 @@ from fastapi import HTTPException, Request, status
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.api._etag import timeline_etag
 from src.schemas.envelope import ResponseMeta
 from src.services.idempotency_store import CachedResponse, idempotency_store
 
@@ -71,6 +72,9 @@ def validate_headers(
     if_match = request.headers.get("If-Match")
     if not if_match:
         context.warnings.append("If-Match header recommended for optimistic locking")
+    else:
+        # Tags from asset-aware reads carry the catalog; writes compare the timeline
+        if_match = timeline_etag(if_match)
 
     return {"idempotency_key": idempotency_key, "if_match": if_match}
 
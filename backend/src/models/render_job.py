@@ -27,11 +27,20 @@ class RenderJob(Base, UUIDMixin, TimestampMixin):
     progress: Mapped[int] = mapped_column(Integer, default=0)
     current_stage: Mapped[str | None] = mapped_column(String(100), nullable=True)
 
+    # Admission control (src/render/scheduler.py): "final" or "draft", and the
+    # 1-based position while waiting for admission (NULL once admitted).
+    priority: Mapped[str] = mapped_column(String(20), default="final", server_default="final")
+    queue_position: Mapped[int | None] = mapped_column(Integer, nullable=True)
+
     # Output
     output_key: Mapped[str | None] = mapped_column(Text, nullable=True)
     output_url: Mapped[str | None] = mapped_column(Text, nullable=True)
     output_size: Mapped[int | None] = mapped_column(Integer, nullable=True)
 
+    # Render fingerprint (src/render/fingerprint.py): identical renders of a
+    # project share it, so a request can reuse a finished or running one.
+    fingerprint: Mapped[str | None] = mapped_column(String(64), nullable=True, index=True)
+
     # Timing
     started_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
     completed_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
@@ -16,6 +16,7 @@ from dataclasses import dataclass
 from pathlib import Path
 
 from src.config import get_settings
+from src.services.media_probe import ProbeError, media_probe
 
 settings = get_settings()
 
@@ -469,16 +470,7 @@ class AudioMixer:
 
     def get_audio_duration(self, file_path: str) -> int:
         """Get audio duration in milliseconds."""
-        cmd = [
-            settings.ffprobe_path,
-            "-v",
-            "quiet",
-            "-show_entries",
-            "format=duration",
-            "-of",
-            "default=noprint_wrappers=1:nokey=1",
-            file_path,
-        ]
-        result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-        duration_s = float(result.stdout.strip())
-        return int(duration_s * 1000)
+        duration_ms = media_probe.probe(file_path).duration_ms
+        if duration_ms is None:
+            raise ProbeError(f"Duration not found in: {file_path}")
+        return duration_ms
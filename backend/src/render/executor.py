@@ -17,22 +17,184 @@ jobs
     job payload from the database.  Requires real GCP infrastructure
     (Cloud Run Job resource) to be present; raises ``RenderExecutorError``
     when the infrastructure is not reachable.
+
+Both executors queue renders before starting them, and the job row shows
+its ``queue_position`` while it waits:
+
+- inline renders hold an admission ticket from :mod:`src.render.scheduler`
+  (this instance's memory/CPU budget);
+- jobs-mode executions are admitted cluster-wide from the ``render_jobs``
+  table (:func:`jobs_queue_position`), so ``render_jobs_max_concurrent``
+  bounds the executions of all API instances together.
 """
 
 from __future__ import annotations
 
 import asyncio
 import logging
+from collections.abc import Iterable
+from datetime import UTC, datetime
 from typing import Any
 from uuid import UUID
 
+from src.render.job_control import render_cancellations
+from src.render.scheduler import PRIORITY_RANK, AdmissionTicket, get_render_scheduler
+
 logger = logging.getLogger(__name__)
 
+# jobs mode: how often a waiting job's dispatcher retries admission (which
+# also refreshes its row), after how long without a row update a waiting job
+# is presumed orphaned (its API instance died) and skipped, and after how
+# long without one (no worker heartbeat) an admitted execution is presumed
+# dead and its slot freed.
+JOBS_QUEUE_POLL_INTERVAL_S: float = 5.0
+JOBS_QUEUE_STALE_AFTER_S: float = 60.0
+JOBS_STALE_AFTER_S: float = 600.0
+
+# pg_advisory_xact_lock key serializing jobs-mode admission across instances
+JOBS_ADMISSION_LOCK_KEY = 0x646F7567  # "doug"
+
 
 class RenderExecutorError(RuntimeError):
     """Raised when the executor cannot dispatch a render job."""
 
 
+async def _persist_queue_state(job_id: UUID, position: int | None, *, admitted_status: str) -> bool:
+    """Write a job's queue position (``None`` = admitted) to its row.
+
+    Returns False when the job is no longer active (cancelled, failed or
+    deleted elsewhere), in which case it should leave the queue.
+    """
+    # Imported lazily to avoid a circular import at module load time.
+    from sqlalchemy import select
+
+    from src.models.database import async_session_maker
+    from src.models.render_job import RenderJob
+
+    async with async_session_maker() as db:
+        result = await db.execute(select(RenderJob).where(RenderJob.id == job_id))
+        job = result.scalar_one_or_none()
+        if job is None or job.status not in ("queued", "processing"):
+            return False
+        job.queue_position = position
+        if position is None:
+            job.status = admitted_status
+            job.started_at = datetime.now(UTC)
+            job.current_stage = "Starting render"
+        else:
+            job.status = "queued"
+            job.current_stage = f"Waiting for a render slot (position {position})"
+        job.updated_at = datetime.now(UTC)
+        await db.commit()
+    return True
+
+
+async def _wait_for_admission(ticket: AdmissionTicket, admitted_status: str) -> bool:
+    """Wait for *ticket*, keeping the job row's queue position current.
+
+    Returns False if the render left the queue instead (cancelled).
+    """
+    if ticket.admitted:
+        return True
+
+    async def on_position(position: int) -> None:
+        if not await _persist_queue_state(ticket.job_id, position, admitted_status=admitted_status):
+            ticket.release()
+
+    if not await ticket.wait(on_position):
+        logger.info("[RENDER] Job %s left the render queue", ticket.job_id)
+        return False
+    logger.info("[RENDER] Job %s admitted", ticket.job_id)
+    return await _persist_queue_state(ticket.job_id, None, admitted_status=admitted_status)
+
+
+def jobs_queue_position(
+    job_id: UUID, active: Iterable[Any], max_jobs: int, now: datetime
+) -> int | None:
+    """Queue position of a waiting jobs-mode render; ``None`` if it may start.
+
+    ``active`` are the ``queued``/``processing`` job rows (``id``,
+    ``priority``, ``started_at``, ``created_at``, ``updated_at``).  Admitted
+    rows have ``started_at`` set and hold a slot until they are stale; the
+    waiting ones are served by priority class, then by arrival.
+    """
+    running = 0
+    waiting: list[Any] = []
+    for row in active:
+        age = (now - row.updated_at).total_seconds() if row.updated_at else 0.0
+        if row.started_at is not None:
+            if row.id != job_id and age <= JOBS_STALE_AFTER_S:
+                running += 1
+        elif row.id == job_id or age <= JOBS_QUEUE_STALE_AFTER_S:
+            waiting.append(row)
+    waiting.sort(key=lambda r: (PRIORITY_RANK.get(r.priority, len(PRIORITY_RANK)), r.created_at))
+    index = next(i for i, row in enumerate(waiting) if row.id == job_id)
+    free = max(0, max_jobs - running)
+    return None if index < free else index - free + 1
+
+
+async def _claim_jobs_slot(job_id: UUID, max_jobs: int) -> int | None:
+    """One admission attempt for a jobs-mode render.
+
+    Returns 0 once the job is admitted (``started_at`` set, which takes its
+    slot), its 1-based queue position while it waits, or None when the job
+    is no longer active.
+    """
+    from sqlalchemy import select, text
+
+    from src.models.database import async_session_maker
+    from src.models.render_job import RenderJob
+
+    async with async_session_maker() as db:
+        # Held until commit: instances decide one at a time on a fresh count
+        await db.execute(
+            text("SELECT pg_advisory_xact_lock(:key)"), {"key": JOBS_ADMISSION_LOCK_KEY}
+        )
+        result = await db.execute(
+            select(
+                RenderJob.id,
+                RenderJob.priority,
+                RenderJob.started_at,
+                RenderJob.created_at,
+                RenderJob.updated_at,
+            ).where(RenderJob.status.in_(("queued", "processing")))
+        )
+        active = result.all()
+        if not any(row.id == job_id for row in active):
+            return None
+        now = datetime.now(UTC)
+        position = jobs_queue_position(job_id, active, max_jobs, now)
+        job = await db.get(RenderJob, job_id)
+        assert job is not None
+        job.queue_position = position
+        job.updated_at = now
+        if position is None:
+            job.started_at = now
+            job.current_stage = "Starting render"
+        else:
+            job.current_stage = f"Waiting for a render slot (position {position})"
+        await db.commit()
+    return 0 if position is None else position
+
+
+async def _mark_dispatch_failed(job_id: UUID, error: str) -> None:
+    """Fail a jobs-mode render whose execution could not be launched."""
+    from sqlalchemy import select
+
+    from src.models.database import async_session_maker
+    from src.models.render_job import RenderJob
+
+    async with async_session_maker() as db:
+        result = await db.execute(select(RenderJob).where(RenderJob.id == job_id))
+        job = result.scalar_one_or_none()
+        if job is None or job.status not in ("queued", "processing"):
+            return
+        job.status = "failed"
+        job.error_message = error
+        job.completed_at = datetime.now(UTC)
+        await db.commit()
+
+
 # ---------------------------------------------------------------------------
 # Inline executor (default — backward-compatible)
 # ---------------------------------------------------------------------------
@@ -49,6 +211,8 @@ class InlineExecutor:
         self,
         job_id: UUID,
         background_coro: Any = None,
+        *,
+        ticket: AdmissionTicket | None = None,
     ) -> None:
         """Schedule *background_coro* as a fire-and-forget asyncio task.
 
@@ -61,6 +225,9 @@ class InlineExecutor:
             in ``asyncio.create_task`` so the caller returns immediately.
             Must be provided in inline mode (the default ``None`` exists only
             to keep a uniform signature with :class:`CloudRunJobsExecutor`).
+        ticket:
+            The job's admission ticket from the render scheduler.  The
+            render starts once it is admitted and releases it when done.
         """
         if background_coro is None:
             raise RenderExecutorError(
@@ -68,15 +235,31 @@ class InlineExecutor:
                 "(inline mode runs the render in-process)."
             )
         logger.info("[RENDER][inline] Scheduling job %s as asyncio.create_task", job_id)
-        asyncio.create_task(background_coro)
+        if ticket is None:
+            asyncio.create_task(background_coro)
+        else:
+            asyncio.create_task(self._run_admitted(ticket, background_coro))
+
+    async def _run_admitted(self, ticket: AdmissionTicket, background_coro: Any) -> None:
+        started = False
+        try:
+            if not await _wait_for_admission(ticket, admitted_status="processing"):
+                return
+            started = True
+            await background_coro
+        finally:
+            if not started:
+                background_coro.close()
+            ticket.release()
 
     def cancel(self, job_id: UUID, execution_id: str | None) -> None:
-        """Cancel a running inline job (cooperative via DB flag only).
+        """Cancel a running inline job (cooperative).
 
-        In inline mode the render loop polls ``_check_cancelled(job_id)``
-        and will stop at the next checkpoint.  There is no way to forcibly
-        terminate the underlying asyncio task from outside — callers must
-        mark the DB status as ``'cancelled'`` before calling this method.
+        If the render runs in this process its cancellation flag is set
+        directly and the pipeline stops at its next check.  Renders running
+        in another API instance pick up the DB status through their
+        heartbeat / rate-limited poll, so callers must still mark the DB
+        status as ``'cancelled'`` before calling this method.
 
         Parameters
         ----------
@@ -85,10 +268,14 @@ class InlineExecutor:
         execution_id:
             Ignored in inline mode (no external execution reference).
         """
+        if get_render_scheduler().withdraw(job_id):
+            logger.info("[RENDER][inline] Removed queued job %s from the render queue", job_id)
+            return
+        delivered = render_cancellations.signal(job_id)
         logger.info(
-            "[RENDER][inline] Cancellation signal acknowledged for job %s "
-            "(cooperative: DB flag must be set to 'cancelled' before this call)",
+            "[RENDER][inline] Cancellation signal for job %s %s",
             job_id,
+            "delivered in-process" if delivered else "left to the DB flag (not running here)",
         )
 
 
@@ -267,7 +454,7 @@ class CloudRunJobsExecutor:
         *,
         env_overrides: dict[str, str] | None = None,
     ) -> asyncio.Task[str]:
-        """Schedule a Cloud Run Jobs execution as an asyncio background task.
+        """Queue a Cloud Run Jobs execution as an asyncio background task.
 
         Parameters
         ----------
@@ -284,8 +471,10 @@ class CloudRunJobsExecutor:
         Returns
         -------
         asyncio.Task[str]
-            A background task that resolves to the Execution name string and
-            persists it to ``RenderJob.celery_task_id`` as a side effect.
+            A background task that waits for a cluster-wide slot (see
+            :meth:`_dispatch_queued`), then resolves to the Execution name
+            string and persists it to ``RenderJob.celery_task_id`` as a side
+            effect (empty if the job left the queue before it was admitted).
         """
         # If a real coroutine was passed (uniform-interface caller), close it
         # so it does not trigger a "coroutine was never awaited" warning.
@@ -293,7 +482,37 @@ class CloudRunJobsExecutor:
             background_coro.close()
 
         logger.info("[RENDER][jobs] Scheduling Cloud Run Jobs execution for job %s", job_id)
-        return asyncio.create_task(self.dispatch_and_persist(job_id, env_overrides=env_overrides))
+        return asyncio.create_task(self._dispatch_queued(job_id, env_overrides))
+
+    async def _dispatch_queued(self, job_id: UUID, env_overrides: dict[str, str] | None) -> str:
+        """Wait for a slot among ``render_jobs_max_concurrent`` executions, then launch.
+
+        The slot is the job row itself (see :func:`jobs_queue_position`): it
+        is freed when the worker marks the row terminal, or when the row
+        stops heartbeating, on whichever instance next counts the slots.
+        """
+        from src.config import get_settings
+
+        max_jobs = max(1, get_settings().render_jobs_max_concurrent)
+        reported: int | None = None
+        while True:
+            position = await _claim_jobs_slot(job_id, max_jobs)
+            if position is None:
+                logger.info("[RENDER][jobs] Job %s left the render queue", job_id)
+                return ""
+            if position == 0:
+                break
+            if position != reported:
+                reported = position
+                logger.info("[RENDER][jobs] Job %s queued at position %d", job_id, position)
+            await asyncio.sleep(JOBS_QUEUE_POLL_INTERVAL_S)
+        logger.info("[RENDER][jobs] Job %s admitted", job_id)
+        try:
+            return await self.dispatch_and_persist(job_id, env_overrides=env_overrides)
+        except RenderExecutorError as exc:
+            # Free the slot now instead of after JOBS_STALE_AFTER_S
+            await _mark_dispatch_failed(job_id, str(exc))
+            raise
 
     async def cancel_execution(self, job_id: UUID, execution_id: str) -> None:
         """Cancel a running Cloud Run Jobs execution.
@@ -337,6 +556,8 @@ class CloudRunJobsExecutor:
         status to ``'cancelled'`` before calling this.
         """
         if not execution_id:
+            # A job still waiting for a slot leaves the queue on its
+            # dispatcher's next admission attempt (it reads the DB status)
             logger.warning("[RENDER][jobs] Cannot cancel job %s: no execution_id stored", job_id)
             return
         asyncio.create_task(self.cancel_execution(job_id, execution_id))
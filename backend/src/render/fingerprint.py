@@ -0,0 +1,88 @@
+"""Render fingerprints: identify renders that would produce the same output.
+
+A fingerprint is the SHA-256 of a canonical JSON document made of:
+
+- the normalized export timeline (the output of
+  :func:`src.render.timeline_normalization.normalize_export_timeline`,
+  which already carries the export range);
+- the content identity of every asset the timeline references — the
+  asset's content hash, or its immutable storage key
+  (:func:`src.services.media_probe.storage_content_key`) when no hash is
+  known;
+- the output dimensions, fps and audio-only flag;
+- the encoder settings that shape the output.
+
+``start_render`` uses it to return an existing render instead of starting an
+identical one.  Bump :data:`RENDER_FINGERPRINT_VERSION` when the pipeline
+changes its output for the same inputs, so older renders stop matching.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from collections.abc import Mapping
+from typing import Any
+
+from src.config import get_settings
+from src.services.media_probe import storage_content_key
+
+RENDER_FINGERPRINT_VERSION = 1
+
+
+def timeline_asset_ids(timeline_data: dict[str, Any]) -> set[str]:
+    """Asset IDs referenced by a timeline's video and audio clips."""
+    asset_ids: set[str] = set()
+    for group in ("layers", "audio_tracks"):
+        for track in timeline_data.get(group) or []:
+            for clip in track.get("clips") or []:
+                if clip.get("asset_id"):
+                    asset_ids.add(str(clip["asset_id"]))
+    return asset_ids
+
+
+def asset_content_identity(asset: Any) -> str:
+    """Content identity of an ``Asset`` row."""
+    if asset.hash:
+        return f"hash:{asset.hash}"
+    return storage_content_key(asset.storage_key)
+
+
+def render_fingerprint(
+    timeline_data: dict[str, Any],
+    asset_identities: Mapping[str, str],
+    *,
+    width: int,
+    height: int,
+    fps: int,
+    audio_only: bool,
+) -> str:
+    """Fingerprint of a render (see module docstring).
+
+    Args:
+        timeline_data: Normalized export timeline.
+        asset_identities: ``{asset_id: asset_content_identity(asset)}``;
+            assets missing from it are fingerprinted as missing.
+        width: Output width.
+        height: Output height.
+        fps: Output frame rate.
+        audio_only: Audio-only export.
+    """
+    settings = get_settings()
+    document = {
+        "version": RENDER_FINGERPRINT_VERSION,
+        "timeline": timeline_data,
+        "assets": {
+            asset_id: asset_identities.get(asset_id)
+            for asset_id in sorted(timeline_asset_ids(timeline_data))
+        },
+        "output": {"width": width, "height": height, "fps": fps, "audio_only": audio_only},
+        "encoder": {
+            "preset": settings.render_ffmpeg_preset,
+            "audio_bitrate": settings.render_audio_bitrate,
+            "audio_sample_rate": settings.render_audio_sample_rate,
+            "fragmented": settings.render_stream_upload and not audio_only,
+        },
+    }
+    canonical = json.dumps(document, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
@@ -0,0 +1,230 @@
+"""Cancellation and progress plumbing for running render jobs.
+
+Cancellation
+------------
+The pipeline checks for cancellation on every line FFmpeg writes to
+``-progress pipe:1``.  That check used to open a DB session and SELECT the
+``RenderJob`` row each time, so a long composite issued thousands of queries
+against a small connection pool.
+
+:class:`RenderCancellation` makes the check an in-memory flag instead:
+
+- inline mode: ``DELETE /render`` runs in the same process as the render,
+  so :meth:`InlineExecutor.cancel` pushes the signal through
+  :data:`render_cancellations` and the next check sees it immediately.
+- other processes (a jobs-mode worker, or another API instance behind the
+  load balancer): the heartbeat loop already reads the job row every
+  ``HEARTBEAT_INTERVAL_S`` and signals on ``status == "cancelled"``; an
+  optional ``poll`` callable is additionally consulted at most once every
+  ``poll_interval_s``.
+
+Progress
+--------
+:class:`CoalescedProgressWriter` turns a stream of progress updates into at
+most one DB write per interval (always writing the latest value), so
+per-asset and per-percent updates no longer each cost a transaction.
+:class:`ProgressFanout` feeds the same stream to several writers (the DB
+row and the live WebSocket push, each at its own rate) and records stage
+timings in a :class:`StageClock`.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import re
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+# "Downloading assets (3/12)", "Compositing video (40%)", "Rendering chunk 2/5"
+# and "Chunk 2/5: Mixing audio" are progress within one stage, not new stages
+_STAGE_COUNTER_RE = re.compile(r"^Chunk \d+/\d+:\s*|\s*\(?\d+(?:\s*/\s*\d+|%)\)?$")
+
+
+class RenderCancellation:
+    """Cancellation flag for one render job.
+
+    :meth:`cancel` may be called from any coroutine on the render's event
+    loop; :meth:`check` is cheap enough to call on every progress line.
+    """
+
+    def __init__(
+        self,
+        poll: Callable[[], Awaitable[bool]] | None = None,
+        poll_interval_s: float = 2.0,
+    ) -> None:
+        self._event = asyncio.Event()
+        self._poll = poll
+        self._poll_interval_s = poll_interval_s
+        self._last_poll = time.monotonic()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def cancel(self) -> None:
+        self._event.set()
+
+    async def wait(self) -> None:
+        await self._event.wait()
+
+    async def check(self) -> bool:
+        """Return True once cancelled, polling the source of truth sparingly."""
+        if self._event.is_set():
+            return True
+        if self._poll is not None:
+            now = time.monotonic()
+            if now - self._last_poll >= self._poll_interval_s:
+                self._last_poll = now
+                try:
+                    if await self._poll():
+                        self._event.set()
+                except Exception as exc:
+                    logger.warning("[RENDER] Cancellation poll failed: %s", exc)
+        return self._event.is_set()
+
+
+class RenderCancellationRegistry:
+    """In-process registry of cancellation flags for running jobs."""
+
+    def __init__(self) -> None:
+        self._flags: dict[str, RenderCancellation] = {}
+
+    def register(self, job_id: Any, cancellation: RenderCancellation) -> RenderCancellation:
+        self._flags[str(job_id)] = cancellation
+        return cancellation
+
+    def unregister(self, job_id: Any) -> None:
+        self._flags.pop(str(job_id), None)
+
+    def get(self, job_id: Any) -> RenderCancellation | None:
+        return self._flags.get(str(job_id))
+
+    def signal(self, job_id: Any) -> bool:
+        """Cancel ``job_id`` if it runs in this process; returns whether it did."""
+        cancellation = self._flags.get(str(job_id))
+        if cancellation is None:
+            return False
+        cancellation.cancel()
+        return True
+
+
+# Process-wide registry
+render_cancellations = RenderCancellationRegistry()
+
+
+class CoalescedProgressWriter:
+    """Write progress updates at most once per ``min_interval_s``.
+
+    :meth:`submit` is synchronous so it can be used directly as the
+    pipeline's progress callback.  The first update is written right away;
+    updates arriving within the interval are folded into one trailing write
+    of the latest value.  Call :meth:`close` before writing a terminal
+    status so a trailing write cannot overwrite it.
+    """
+
+    def __init__(
+        self,
+        write: Callable[[int, str], Awaitable[None]],
+        min_interval_s: float = 2.0,
+    ) -> None:
+        self._write = write
+        self._min_interval_s = min_interval_s
+        self._pending: tuple[int, str] | None = None
+        self._last_write = float("-inf")
+        self._task: asyncio.Task[None] | None = None
+        self._closed = asyncio.Event()
+
+    def submit(self, progress: int, stage: str) -> None:
+        if self._closed.is_set():
+            return
+        self._pending = (progress, stage)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._drain())
+
+    async def close(self) -> None:
+        """Drop any pending update and wait for an in-flight write to finish."""
+        self._pending = None
+        self._closed.set()
+        if self._task is not None:
+            await self._task
+
+    async def _drain(self) -> None:
+        while self._pending is not None:
+            delay = self._last_write + self._min_interval_s - time.monotonic()
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self._closed.wait(), timeout=delay)
+                except TimeoutError:
+                    pass
+            pending, self._pending = self._pending, None
+            if pending is None or self._closed.is_set():
+                return
+            self._last_write = time.monotonic()
+            try:
+                await self._write(*pending)
+            except Exception as exc:
+                logger.warning("[RENDER] Progress write failed: %s", exc)
+
+
+def stage_name(stage: str) -> str:
+    """``stage`` without its chunk prefix and trailing ``(n/m)`` / ``(n%)`` counter."""
+    return _STAGE_COUNTER_RE.sub("", stage) or stage
+
+
+class StageClock:
+    """Wall-clock time spent in each render stage."""
+
+    def __init__(self) -> None:
+        self._started = time.monotonic()
+        self._durations: dict[str, float] = {}
+        self._current: str | None = None
+        self._current_since = self._started
+
+    @property
+    def elapsed_ms(self) -> int:
+        return int((time.monotonic() - self._started) * 1000)
+
+    def mark(self, stage: str) -> None:
+        """Note that the render is now in ``stage``."""
+        name = stage_name(stage)
+        if name == self._current:
+            return
+        now = time.monotonic()
+        self._close(now)
+        self._current, self._current_since = name, now
+
+    def _close(self, now: float) -> None:
+        if self._current is not None:
+            self._durations[self._current] = (
+                self._durations.get(self._current, 0.0) + now - self._current_since
+            )
+
+    def timings(self) -> dict[str, int]:
+        """Milliseconds per stage, in order reached (the current one so far)."""
+        durations = dict(self._durations)
+        if self._current is not None:
+            durations[self._current] = (
+                durations.get(self._current, 0.0) + time.monotonic() - self._current_since
+            )
+        return {name: int(seconds * 1000) for name, seconds in durations.items()}
+
+
+class ProgressFanout:
+    """One progress callback feeding several :class:`CoalescedProgressWriter`."""
+
+    def __init__(self, *writers: CoalescedProgressWriter, clock: StageClock | None = None) -> None:
+        self._writers = writers
+        self.clock = clock or StageClock()
+
+    def submit(self, progress: int, stage: str) -> None:
+        self.clock.mark(stage)
+        for writer in self._writers:
+            writer.submit(progress, stage)
+
+    async def close(self) -> None:
+        for writer in self._writers:
+            await writer.close()
@@ -0,0 +1,180 @@
+"""Compile keyframe tracks into FFmpeg expressions.
+
+A track is a list of ``(time_s, value)`` points, linearly interpolated
+between points and held constant before the first and after the last one.
+The track is split at the keyframe times into pieces (a constant or a linear
+segment), and one of two equivalent expression shapes selects the piece:
+
+- ``chain``: ``if(lt(t,t0),v0,if(lt(t,t1),seg0,...))``.  The first pieces
+  are cheap, but a frame late in the clip walks every comparison.
+- ``balanced``: the same pieces behind a binary search on the keyframe
+  times, so every frame costs about ``log2(K)`` comparisons.
+
+FFmpeg evaluates ``if()`` lazily, so an expression costs the comparisons on
+the path to the piece it selects — per frame for ``overlay``/``scale``/
+``rotate``, and per *pixel* inside ``geq``.  :func:`estimate_cost` weighs
+each piece by the share of the clip it covers, and
+:func:`compile_keyframe_expr` picks the cheaper shape (``chain`` on a tie, so
+short tracks keep their familiar form).
+"""
+
+from __future__ import annotations
+
+import math
+from typing import Literal
+
+KeyframeStrategy = Literal["chain", "balanced"]
+
+Point = tuple[float, float]
+
+
+def _split_pieces(points: list[Point], time_expr: str) -> tuple[list[float], list[str]]:
+    """Breakpoints and pieces of a track with at least two points.
+
+    Piece ``k`` applies while ``breakpoints[k-1] <= t < breakpoints[k]``:
+    the first value before the first keyframe, one segment per keyframe
+    pair, and the last value from the last keyframe on.
+    """
+    first_t, first_v = points[0]
+    breakpoints = [first_t]
+    pieces = [f"{first_v:.6f}"]
+    for (start_t, start_v), (end_t, end_v) in zip(points, points[1:], strict=False):
+        if math.isclose(end_t, start_t):
+            pieces.append(f"{end_v:.6f}")
+        else:
+            pieces.append(
+                f"({start_v:.6f}+(({end_v:.6f})-({start_v:.6f}))"
+                f"*(({time_expr})-({start_t:.6f}))/({end_t - start_t:.6f}))"
+            )
+        breakpoints.append(end_t)
+    pieces.append(f"{points[-1][1]:.6f}")
+    return breakpoints, pieces
+
+
+def _chain_expr(breakpoints: list[float], pieces: list[str], time_expr: str) -> str:
+    expr = pieces[-1]
+    for idx in range(len(breakpoints) - 1, -1, -1):
+        expr = f"if(lt(({time_expr}),{breakpoints[idx]:.6f}),{pieces[idx]},{expr})"
+    return expr
+
+
+def _balanced_expr(
+    breakpoints: list[float], pieces: list[str], time_expr: str, lo: int, hi: int
+) -> str:
+    if lo == hi:
+        return pieces[lo]
+    mid = (lo + hi + 1) // 2
+    below = _balanced_expr(breakpoints, pieces, time_expr, lo, mid - 1)
+    above = _balanced_expr(breakpoints, pieces, time_expr, mid, hi)
+    return f"if(lt(({time_expr}),{breakpoints[mid - 1]:.6f}),{below},{above})"
+
+
+def _balanced_depths(lo: int, hi: int, depth: int, depths: list[int]) -> None:
+    if lo == hi:
+        depths[lo] = depth
+        return
+    mid = (lo + hi + 1) // 2
+    _balanced_depths(lo, mid - 1, depth + 1, depths)
+    _balanced_depths(mid, hi, depth + 1, depths)
+
+
+def _piece_weights(breakpoints: list[float], window: tuple[float, float] | None) -> list[float]:
+    """Share of ``window`` (default: the keyframed span) covered by each piece."""
+    start, end = window if window is not None else (breakpoints[0], breakpoints[-1])
+    if end <= start:
+        return [1.0] * (len(breakpoints) + 1)
+    edges = [-math.inf, *breakpoints, math.inf]
+    return [
+        max(0.0, min(end, edges[k + 1]) - max(start, edges[k])) / (end - start)
+        for k in range(len(breakpoints) + 1)
+    ]
+
+
+def _sorted_points(points: list[Point]) -> list[Point]:
+    return sorted(points, key=lambda item: item[0])
+
+
+def estimate_cost(
+    points: list[Point],
+    strategy: KeyframeStrategy,
+    window: tuple[float, float] | None = None,
+) -> float:
+    """Expected comparisons per evaluation of the track's expression.
+
+    Each piece costs the comparisons on its path, weighted by the share of
+    ``window`` (the times the expression is evaluated at, e.g. the clip's
+    elapsed-time range) it covers.  Constant tracks cost nothing.
+    """
+    sorted_points = _sorted_points(points)
+    if len(sorted_points) < 2 or _is_constant_track(sorted_points):
+        return 0.0
+    breakpoints, _ = _split_pieces(sorted_points, "t")
+    count = len(breakpoints)
+    if strategy == "chain":
+        costs = [min(k + 1, count) for k in range(count + 1)]
+    else:
+        costs = [0] * (count + 1)
+        _balanced_depths(0, count, 0, costs)
+    weights = _piece_weights(breakpoints, window)
+    total = sum(weights)
+    return sum(w * c for w, c in zip(weights, costs, strict=True)) / total
+
+
+def choose_strategy(
+    points: list[Point], window: tuple[float, float] | None = None
+) -> KeyframeStrategy:
+    """The cheaper expression shape for ``points`` (``chain`` on a tie)."""
+    if estimate_cost(points, "balanced", window) < estimate_cost(points, "chain", window):
+        return "balanced"
+    return "chain"
+
+
+def _is_constant_track(sorted_points: list[Point]) -> bool:
+    first_v = sorted_points[0][1]
+    return all(value == first_v for _, value in sorted_points)
+
+
+def compile_keyframe_expr(
+    points: list[Point],
+    time_expr: str,
+    default_value: float,
+    *,
+    strategy: KeyframeStrategy | None = None,
+    window: tuple[float, float] | None = None,
+) -> str:
+    """FFmpeg expression that linearly interpolates ``points`` at ``time_expr``.
+
+    Args:
+        points: ``(time_s, value)`` keyframes, in any order.
+        time_expr: Expression for the time the points are relative to.
+        default_value: Value when there are no points.
+        strategy: Expression shape; chosen by :func:`choose_strategy` when
+            omitted.
+        window: Range of ``time_expr`` values the expression is evaluated
+            over, used to weigh the cost estimate.
+    """
+    if not points:
+        return f"{default_value:.6f}"
+
+    sorted_points = _sorted_points(points)
+    if len(sorted_points) == 1 or _is_constant_track(sorted_points):
+        # Interpolating between equal values is exact, so a constant track
+        # renders identically as a plain number (and lets callers skip
+        # per-frame evaluation)
+        return f"{sorted_points[0][1]:.6f}"
+
+    breakpoints, pieces = _split_pieces(sorted_points, time_expr)
+    if strategy is None:
+        strategy = choose_strategy(sorted_points, window)
+    if strategy == "balanced":
+        return _balanced_expr(breakpoints, pieces, time_expr, 0, len(pieces) - 1)
+    return _chain_expr(breakpoints, pieces, time_expr)
+
+
+def is_constant_expr(expr: str) -> bool:
+    """Whether ``expr`` is a plain number (no per-frame evaluation needed)."""
+    try:
+        float(expr)
+    except ValueError:
+        return False
+    return True
@@ -8,13 +8,13 @@ L4: エフェクト（キラキラ等）- Effects
 L5: テロップ・テキスト - Text overlays
 """
 
-import json
 import subprocess
 from dataclasses import dataclass, field
 from enum import IntEnum
 from pathlib import Path
 
 from src.config import get_settings
+from src.services.media_probe import media_probe
 
 
 class LayerType(IntEnum):
@@ -339,25 +339,7 @@ class LayerCompositor:
         for layer in layers:
             for clip in layer.clips:
                 try:
-                    result = subprocess.run(
-                        [
-                            self.settings.ffprobe_path,
-                            "-v",
-                            "error",
-                            "-select_streams",
-                            "a",
-                            "-show_entries",
-                            "stream=codec_type",
-                            "-of",
-                            "json",
-                            clip.asset_path,
-                        ],
-                        capture_output=True,
-                        text=True,
-                        check=True,
-                    )
-                    data = json.loads(result.stdout)
-                    if data.get("streams"):
+                    if media_probe.probe(clip.asset_path).has_audio:
                         return True
                 except Exception:
                     continue
@@ -365,42 +347,4 @@ class LayerCompositor:
 
     def _get_video_info(self, video_path: str) -> dict:
         """Get video information using ffprobe."""
-        result = subprocess.run(
-            [
-                self.settings.ffprobe_path,
-                "-v",
-                "error",
-                "-select_streams",
-                "v:0",
-                "-show_entries",
-                "stream=width,height,duration",
-                "-show_entries",
-                "format=duration",
-                "-of",
-                "json",
-                video_path,
-            ],
-            capture_output=True,
-            text=True,
-            check=True,
-        )
-        data = json.loads(result.stdout)
-
-        width = height = 0
-        duration = 0.0
-
-        if data.get("streams"):
-            stream = data["streams"][0]
-            width = stream.get("width", 0)
-            height = stream.get("height", 0)
-            if "duration" in stream:
-                duration = float(stream["duration"])
-
-        if data.get("format") and "duration" in data["format"]:
-            duration = float(data["format"]["duration"])
-
-        return {
-            "width": width,
-            "height": height,
-            "duration_ms": int(duration * 1000),
-        }
+        return media_probe.probe(video_path).video_info()
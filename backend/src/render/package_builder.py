@@ -15,6 +15,13 @@ Package structure:
     ├── manifest.json
     ├── timeline.json
     └── README.txt
+
+Assets and generated PNGs are hard-linked into the package directory (or
+referenced in place when a link is not possible), never copied.  The ZIP is
+written as a stream (:meth:`RenderPackageBuilder.write_zip`): already
+compressed media is STORED, and :meth:`RenderPackageBuilder.build_and_upload`
+feeds the stream straight into a chunked storage upload, so no archive copy
+ever lands on disk.
 """
 
 import asyncio
@@ -28,16 +35,64 @@ import tempfile
 import zipfile
 from datetime import UTC, datetime
 from pathlib import Path
-from typing import Any
+from typing import TYPE_CHECKING, Any, BinaryIO
 
 from src.config import get_settings
 from src.render.audio_mixer import AudioMixer
 from src.render.pipeline import RenderPipeline, analyze_timeline_for_memory
 from src.render.timeline_normalization import normalize_embedded_export_timeline
 
+if TYPE_CHECKING:
+    from src.services.storage_service import StorageService
+
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+# Already-compressed formats: deflating them burns CPU for ~0% gain
+STORED_EXTENSIONS = frozenset(
+    {
+        ".mp4",
+        ".mov",
+        ".m4v",
+        ".webm",
+        ".mkv",
+        ".avi",
+        ".mp3",
+        ".m4a",
+        ".aac",
+        ".ogg",
+        ".opus",
+        ".flac",
+        ".png",
+        ".jpg",
+        ".jpeg",
+        ".webp",
+        ".gif",
+        ".avif",
+        ".heic",
+        ".zip",
+    }
+)
+
+
+class _CountingSink:
+    """Write-only wrapper that counts bytes (and hides seeking from zipfile)."""
+
+    def __init__(self, stream: BinaryIO) -> None:
+        self._stream = stream
+        self.bytes_written = 0
+
+    def write(self, data: bytes) -> int:
+        self._stream.write(data)
+        self.bytes_written += len(data)
+        return len(data)
+
+    def flush(self) -> None:
+        self._stream.flush()
+
+    def close(self) -> None:
+        """The caller owns (and closes) the underlying stream."""
+
 
 class RenderPackageBuilder:
     """Builds a self-contained render package ZIP for client-side FFmpeg execution."""
@@ -73,6 +128,8 @@ class RenderPackageBuilder:
         # Track asset path mappings: original_path -> package_relative_path
         self._asset_path_map: dict[str, str] = {}
         self._generated_path_map: dict[str, str] = {}
+        # Package-relative path -> source file, for files that could not be linked
+        self._external_files: dict[str, str] = {}
         self._script_entries: list[tuple[str, str]] = []
         self.expected_ffmpeg_version = self._detect_ffmpeg_version()
 
@@ -107,12 +164,46 @@ class RenderPackageBuilder:
         Returns:
             Path to the generated ZIP file
         """
+        await self.prepare(timeline_data, assets_local, asset_names)
+        zip_path = os.path.join(self.work_dir, f"{self.package_name}.zip")
+        await asyncio.to_thread(self._create_zip, zip_path)
+        return zip_path
+
+    async def build_and_upload(
+        self,
+        timeline_data: dict[str, Any],
+        assets_local: dict[str, str],
+        asset_names: dict[str, str] | None,
+        *,
+        storage: "StorageService",
+        storage_key: str,
+    ) -> int:
+        """Build the render package and stream its ZIP into storage.
+
+        Returns:
+            Size of the uploaded ZIP in bytes
+        """
+        await self.prepare(timeline_data, assets_local, asset_names)
+
+        def upload() -> int:
+            with storage.open_write_stream(storage_key, "application/zip") as stream:
+                return self.write_zip(stream)
+
+        return await asyncio.to_thread(upload)
+
+    async def prepare(
+        self,
+        timeline_data: dict[str, Any],
+        assets_local: dict[str, str],
+        asset_names: dict[str, str] | None = None,
+    ) -> None:
+        """Lay out the package directory (assets, generated PNGs, scripts, metadata)."""
         asset_names = asset_names or {}
         self._script_entries = []
         normalized_timeline, render_duration_ms = normalize_embedded_export_timeline(timeline_data)
 
-        # Step 1: Copy assets into package with human-readable names
-        self._copy_assets(assets_local, asset_names)
+        # Step 1: Link assets into package with human-readable names
+        self._link_assets(assets_local, asset_names)
 
         # Step 2: Create pipeline to get FFmpeg commands + generate PNGs
         pipeline = RenderPipeline(
@@ -166,18 +257,13 @@ class RenderPackageBuilder:
         self._write_timeline(normalized_timeline)
         self._write_readme()
 
-        # Step 10: Create ZIP
-        zip_path = os.path.join(self.work_dir, f"{self.package_name}.zip")
-        self._create_zip(zip_path)
-
-        # Cleanup pipeline temp dir
+        # Cleanup pipeline temp dir (generated PNGs are linked, or copied when
+        # a link is not possible, so the package no longer needs it)
         try:
             shutil.rmtree(pipeline.work_dir, ignore_errors=True)
         except Exception:
             pass
 
-        return zip_path
-
     def cleanup(self) -> None:
         """Remove temporary work directory."""
         try:
@@ -185,12 +271,27 @@ class RenderPackageBuilder:
         except Exception:
             pass
 
-    def _copy_assets(
+    def _link_file(self, source: str, dest: str, *, reference: bool) -> None:
+        """Hard-link ``source`` to ``dest`` inside the package.
+
+        When linking fails (e.g. across filesystems) the file is referenced
+        in place if ``reference`` is set (it must outlive the package), and
+        copied otherwise.
+        """
+        try:
+            os.link(source, dest)
+        except OSError:
+            if reference:
+                self._external_files[os.path.relpath(dest, self.package_dir)] = source
+            else:
+                shutil.copy2(source, dest)
+
+    def _link_assets(
         self,
         assets_local: dict[str, str],
         asset_names: dict[str, str],
     ) -> None:
-        """Copy assets into package with human-readable filenames."""
+        """Link assets into package with human-readable filenames."""
         used_names: dict[str, int] = {}
 
         for asset_id, local_path in assets_local.items():
@@ -216,7 +317,7 @@ class RenderPackageBuilder:
                 used_names[full_name] = 1
 
             dest = os.path.join(self.assets_dir, full_name)
-            shutil.copy2(local_path, dest)
+            self._link_file(local_path, dest, reference=True)
             self._asset_path_map[local_path] = f"./assets/{full_name}"
 
     def _shell_join(self, cmd: list[str]) -> str:
@@ -236,13 +337,14 @@ class RenderPackageBuilder:
         *,
         prefix: str = "",
     ) -> None:
-        """Copy generated PNGs into the package and register rewrite mappings."""
+        """Link generated PNGs into the package and register rewrite mappings."""
         for label, gen_path in generated_files.items():
             if not os.path.exists(gen_path):
                 continue
             dest_name = f"{prefix}{label}" if prefix else label
             dest = os.path.join(self.generated_dir, dest_name)
-            shutil.copy2(gen_path, dest)
+            # The pipeline work dir is removed after the build: never reference
+            self._link_file(gen_path, dest, reference=False)
             self._generated_path_map[gen_path] = f"./generated/{dest_name}"
 
     def _build_standard_scripts(
@@ -771,11 +873,39 @@ NOTES:
         with open(path, "w") as f:
             f.write(content)
 
+    def _package_files(self) -> list[tuple[str, str]]:
+        """``(source_path, arcname)`` of every package file, in archive order."""
+        files: dict[str, str] = {}
+        for root, dirs, names in os.walk(self.package_dir):
+            dirs.sort()
+            for name in sorted(names):
+                file_path = os.path.join(root, name)
+                files[os.path.relpath(file_path, self.package_dir)] = file_path
+        files.update(self._external_files)
+        return [
+            (source, os.path.join(self.package_name, rel_path))
+            for rel_path, source in sorted(files.items())
+        ]
+
+    def write_zip(self, stream: BinaryIO) -> int:
+        """Write the package as a ZIP to ``stream``; returns the bytes written.
+
+        The stream is only appended to (no seeking), so it can be a network
+        upload.  Media entries are STORED, everything else DEFLATED; files
+        are read in small blocks, so memory stays flat whatever the package
+        size.
+        """
+        sink = _CountingSink(stream)
+        with zipfile.ZipFile(sink, "w", zipfile.ZIP_DEFLATED) as zf:
+            for source, arcname in self._package_files():
+                ext = os.path.splitext(source)[1].lower()
+                compress_type = (
+                    zipfile.ZIP_STORED if ext in STORED_EXTENSIONS else zipfile.ZIP_DEFLATED
+                )
+                zf.write(source, arcname, compress_type=compress_type)
+        return sink.bytes_written
+
     def _create_zip(self, zip_path: str) -> None:
         """Create ZIP archive of the package directory."""
-        with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as zf:
-            for root, _dirs, files in os.walk(self.package_dir):
-                for file in files:
-                    file_path = os.path.join(root, file)
-                    arcname = os.path.relpath(file_path, self.work_dir)
-                    zf.write(file_path, arcname)
+        with open(zip_path, "wb") as f:
+            self.write_zip(f)
@@ -16,7 +16,7 @@ Memory-safe rendering:
 """
 
 import asyncio
-import copy
+import json
 import logging
 import math
 import os
@@ -31,7 +31,7 @@ from dataclasses import dataclass, field
 from datetime import UTC, datetime
 from enum import Enum
 from pathlib import Path
-from typing import Any
+from typing import Any, Protocol
 from uuid import uuid4
 
 from PIL import Image, ImageDraw, ImageFont
@@ -39,7 +39,11 @@ from PIL import Image, ImageDraw, ImageFont
 from src.config import get_settings
 from src.exceptions import RenderError
 from src.render.audio_mixer import AudioClipData, AudioMixer, AudioTrackData, VolumeKeyframeData
-from src.services.chroma_key_service import compute_secondary_key_color
+from src.render.keyframe_expr import compile_keyframe_expr, is_constant_expr
+from src.services.chroma_key_service import RENDER_ALPHA_REFINE, RenderKeyParams
+from src.services.keyed_intermediates import clip_key_params, keyed_asset_ref
+from src.services.timeline_document import fork_timeline
+from src.utils.metrics import metrics
 
 logger = logging.getLogger(__name__)
 
@@ -76,6 +80,13 @@ FFMPEG_COMPOSITE_TIMEOUT_S: int = 1500
 FFMPEG_FINAL_ENCODE_TIMEOUT_S: int = 600
 # Blank/black video generation (lavfi color source) — normally seconds.
 FFMPEG_BLANK_VIDEO_TIMEOUT_S: int = 120
+
+# Streamed output (see RenderPipeline.render(output_sink=...)): fragmented MP4
+# needs no seek back to the header, so it can be written to a pipe.  The
+# (empty) moov still comes first, so players start without a full download.
+FRAGMENTED_MP4_MOVFLAGS = "+frag_keyframe+empty_moov+default_base_moof"
+# Bytes read from FFmpeg's stdout per sink write
+STREAM_READ_SIZE = 1024 * 1024
 # Threshold in seconds for considering /tmp/douga_render_* dirs orphaned
 ORPHAN_DIR_AGE_S: int = 3600
 
@@ -113,6 +124,24 @@ def get_container_memory_limit() -> int:
     return 2 * 1024**3
 
 
+def get_container_cpu_limit() -> float:
+    """Detect the container CPU limit (in CPUs) from cgroup (Cloud Run / Docker).
+
+    Returns:
+        CPU limit.  Falls back to ``os.cpu_count()`` if there is no quota.
+    """
+    # cgroup v2: "<quota> <period>" or "max <period>"
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()[:2]
+            if quota != "max" and int(period) > 0:
+                return int(quota) / int(period)
+    except (FileNotFoundError, ValueError, PermissionError):
+        pass
+
+    return float(os.cpu_count() or 1)
+
+
 def estimate_render_memory(
     duration_s: float,
     width: int,
@@ -289,6 +318,22 @@ def analyze_timeline_for_memory(
     }
 
 
+def segment_workers_for(mem_info: dict[str, Any]) -> int:
+    """Parallel segment encoders for a render (1 = a single composite process).
+
+    Each worker holds a composite's worth of memory, so the count is bounded
+    by how many estimates fit the safety limit.  Memory-chunked renders and
+    renders shorter than two segments use one.
+    """
+    workers = settings.render_segment_workers
+    if workers <= 1 or mem_info["needs_chunking"]:
+        return 1
+    if mem_info["duration_s"] < 2 * settings.render_segment_duration_s:
+        return 1
+    fitting = int(mem_info["safety_limit_bytes"] // max(1, mem_info["estimated_bytes"]))
+    return max(1, min(workers, fitting))
+
+
 # ============================================================================
 # Enums
 # ============================================================================
@@ -465,6 +510,12 @@ class UndoManager:
         self._redo_stack.clear()
 
 
+class RenderOutputSink(Protocol):
+    """Destination of a streamed render output (e.g. a chunked storage upload)."""
+
+    async def write(self, data: bytes) -> None: ...
+
+
 class RenderPipeline:
     """
     Main render pipeline for compositing Udemy course videos.
@@ -565,30 +616,15 @@ class RenderPipeline:
         points: list[tuple[float, float]],
         time_expr: str,
         default_value: float,
+        window: tuple[float, float] | None = None,
     ) -> str:
-        """Build an FFmpeg expression that linearly interpolates between points."""
-        if not points:
-            return f"{default_value:.6f}"
+        """Build an FFmpeg expression that linearly interpolates between points.
 
-        sorted_points = sorted(points, key=lambda item: item[0])
-        if len(sorted_points) == 1:
-            return f"{sorted_points[0][1]:.6f}"
-
-        expr = f"{sorted_points[-1][1]:.6f}"
-        for idx in range(len(sorted_points) - 2, -1, -1):
-            start_t, start_v = sorted_points[idx]
-            end_t, end_v = sorted_points[idx + 1]
-            if math.isclose(end_t, start_t):
-                segment_expr = f"{end_v:.6f}"
-            else:
-                segment_expr = (
-                    f"({start_v:.6f}+(({end_v:.6f})-({start_v:.6f}))"
-                    f"*(({time_expr})-({start_t:.6f}))/({end_t - start_t:.6f}))"
-                )
-            expr = f"if(lt(({time_expr}),{end_t:.6f}),{segment_expr},{expr})"
-
-        first_t, first_v = sorted_points[0]
-        return f"if(lt(({time_expr}),{first_t:.6f}),{first_v:.6f},{expr})"
+        Dense tracks compile to a binary search over the keyframe times
+        rather than a linear ``if()`` chain, whichever the cost estimate in
+        :mod:`src.render.keyframe_expr` says is cheaper over ``window``.
+        """
+        return compile_keyframe_expr(points, time_expr, default_value, window=window)
 
     def _build_keyframed_property_expr(
         self,
@@ -616,7 +652,13 @@ class RenderPipeline:
                 value = self._coerce_float(raw, default_value)
             points.append((time_ms / 1000.0, value))
 
-        return self._build_piecewise_linear_expr(points, time_expr, default_value)
+        # The expression is evaluated over the clip's visible span
+        visible_s = (
+            self._coerce_float(clip.get("duration_ms"), 0.0)
+            + self._coerce_float(clip.get("freeze_frame_ms"), 0.0)
+        ) / 1000.0
+        window = (0.0, visible_s) if visible_s > 0 else None
+        return self._build_piecewise_linear_expr(points, time_expr, default_value, window)
 
     def _build_transition_offset_expr(
         self,
@@ -870,6 +912,7 @@ class RenderPipeline:
         assets: dict[str, str],  # asset_id -> local file path
         output_path: str,
         cancel_check: Callable[[], Any] | None = None,
+        output_sink: RenderOutputSink | None = None,
     ) -> str:
         """
         Execute the full render pipeline.
@@ -882,9 +925,14 @@ class RenderPipeline:
             assets: Map of asset IDs to local file paths
             output_path: Output video file path
             cancel_check: Optional async callable that returns True if cancelled
+            output_sink: Stream the output to this sink as fragmented MP4
+                instead of writing ``output_path``.  Single-pass renders pipe
+                the composite encode through the final mux into the sink, so
+                the consumer (e.g. an upload) runs while encoding; chunked
+                renders stream the chunk concatenation.
 
         Returns:
-            Path to rendered video
+            Path to rendered video (not written when ``output_sink`` is set)
 
         Raises:
             asyncio.CancelledError: If render was cancelled
@@ -923,10 +971,19 @@ class RenderPipeline:
                 f"[RENDER] Using chunked rendering: {mem_info['recommended_chunks']} chunks "
                 f"of ~{mem_info['chunk_duration_s']}s each"
             )
-            return await self._render_chunked(timeline_data, assets, output_path, mem_info)
+            return await self._render_chunked(
+                timeline_data, assets, output_path, mem_info, output_sink
+            )
 
         # Standard single-pass render
-        return await self._render_single(timeline_data, assets, output_path, duration_ms)
+        return await self._render_single(
+            timeline_data,
+            assets,
+            output_path,
+            duration_ms,
+            output_sink,
+            segment_workers=segment_workers_for(mem_info),
+        )
 
     @staticmethod
     def _cleanup_orphan_dirs(current_job_id: str | None = None) -> None:
@@ -965,8 +1022,15 @@ class RenderPipeline:
         assets: dict[str, str],
         output_path: str,
         duration_ms: int,
+        output_sink: RenderOutputSink | None = None,
+        *,
+        segment_workers: int = 1,
     ) -> str:
-        """Execute the standard single-pass render pipeline."""
+        """Execute the standard single-pass render pipeline.
+
+        With ``segment_workers`` > 1 the video is composited in segments by
+        that many parallel FFmpeg processes (see _composite_segments).
+        """
         try:
             # Check for cancellation
             if await self._is_cancelled():
@@ -979,16 +1043,32 @@ class RenderPipeline:
             if await self._is_cancelled():
                 raise asyncio.CancelledError("Render cancelled")
 
-            # Step 2: Composite video layers
-            self._update_progress(30, "Compositing video")
-            video_path = await self._composite_video(timeline_data, assets, duration_ms)
+            segments = self._plan_segments(timeline_data, segment_workers)
+            if output_sink is not None and len(segments) <= 1:
+                # Steps 2+3 run concurrently, streaming into the sink
+                self._update_progress(30, "Compositing video")
+                await self._composite_and_stream(
+                    timeline_data, assets, audio_path, duration_ms, output_sink
+                )
+            else:
+                # Step 2: Composite video layers
+                self._update_progress(30, "Compositing video")
+                if len(segments) > 1:
+                    video_path = await self._composite_segments(
+                        timeline_data, assets, duration_ms, segments, segment_workers
+                    )
+                else:
+                    video_path = await self._composite_video(timeline_data, assets, duration_ms)
 
-            if await self._is_cancelled():
-                raise asyncio.CancelledError("Render cancelled")
+                if await self._is_cancelled():
+                    raise asyncio.CancelledError("Render cancelled")
 
-            # Step 3: Combine audio and video
-            self._update_progress(80, "Encoding final video")
-            await self._encode_final(video_path, audio_path, output_path, duration_ms)
+                # Step 3: Combine audio and video
+                self._update_progress(80, "Encoding final video")
+                if output_sink is not None:
+                    await self._stream_final(video_path, audio_path, duration_ms, output_sink)
+                else:
+                    await self._encode_final(video_path, audio_path, output_path, duration_ms)
 
         finally:
             # Always clean up the per-job work_dir, even on failure/cancel.
@@ -1006,6 +1086,7 @@ class RenderPipeline:
         assets: dict[str, str],
         output_path: str,
         mem_info: dict[str, Any],
+        output_sink: RenderOutputSink | None = None,
     ) -> str:
         """
         Render a long video in chunks to stay within memory limits.
@@ -1021,7 +1102,9 @@ class RenderPipeline:
         sub-pipelines clean up their own work_dirs inside _render_single.
         """
         try:
-            return await self._render_chunked_impl(timeline_data, assets, output_path, mem_info)
+            return await self._render_chunked_impl(
+                timeline_data, assets, output_path, mem_info, output_sink
+            )
         finally:
             # Always clean up the top-level work_dir, even on failure/cancel.
             if self.work_dir and os.path.isdir(self.work_dir):
@@ -1033,6 +1116,7 @@ class RenderPipeline:
         assets: dict[str, str],
         output_path: str,
         mem_info: dict[str, Any],
+        output_sink: RenderOutputSink | None = None,
     ) -> str:
         """Body of the chunked render (see _render_chunked for the contract)."""
         duration_ms = timeline_data.get("duration_ms", 0)
@@ -1135,7 +1219,10 @@ class RenderPipeline:
         self._update_progress(92, "Concatenating chunks")
         logger.info("[CHUNKED RENDER] Concatenating %d chunks", len(chunk_files))
 
-        await self._concatenate_chunks(chunk_files, output_path)
+        if output_sink is not None:
+            await self._stream_concatenated_chunks(chunk_files, output_sink)
+        else:
+            await self._concatenate_chunks(chunk_files, output_path)
 
         # Cleanup chunk files
         self._update_progress(97, "Cleaning up chunks")
@@ -1214,6 +1301,188 @@ class RenderPipeline:
 
         return boundaries
 
+    def _plan_segments(
+        self, timeline_data: dict[str, Any], segment_workers: int
+    ) -> list[tuple[int, int]]:
+        """Segment boundaries for segment-parallel encoding ([] when not used).
+
+        Cuts are placed at clip edges (_calculate_chunk_boundaries) and then
+        snapped to the nearest whole-millisecond frame time relative to the
+        export start, so each segment samples exactly the frames a
+        single-pass composite would and every segment but the last holds a
+        whole number of frames.
+        """
+        if segment_workers <= 1:
+            return []
+        duration_ms = timeline_data.get("duration_ms", 0)
+        export_start_ms = timeline_data.get("export_start_ms", 0)
+        export_end_ms = timeline_data.get("export_end_ms", duration_ms + export_start_ms)
+        boundaries = self._calculate_chunk_boundaries(
+            timeline_data, export_start_ms, export_end_ms, settings.render_segment_duration_s
+        )
+
+        # Frame times n * 1000 / fps are whole milliseconds every `step` ms
+        step = 1000 // math.gcd(1000, self.fps)
+        cuts: list[int] = []
+        for _, end_ms in boundaries[:-1]:
+            cut = export_start_ms + round((end_ms - export_start_ms) / step) * step
+            if (cuts[-1] if cuts else export_start_ms) < cut < export_end_ms:
+                cuts.append(cut)
+        edges = [export_start_ms, *cuts, export_end_ms]
+        return list(zip(edges[:-1], edges[1:], strict=True))
+
+    async def _composite_segments(
+        self,
+        timeline_data: dict[str, Any],
+        assets: dict[str, str],
+        duration_ms: int,
+        segments: list[tuple[int, int]],
+        workers: int,
+    ) -> str:
+        """Composite the video as segments on parallel FFmpeg processes.
+
+        Every segment is its own encode, so each cut starts on an IDR frame
+        and the segments join losslessly with the concat demuxer (-c copy).
+        The joined video is verified (_verify_segmented_video) against
+        ``duration_ms``; if it does not match, the video is composited again
+        in a single pass.
+        """
+        segments_dir = os.path.join(self.output_dir, "segments")
+        os.makedirs(segments_dir, exist_ok=True)
+        num_segments = len(segments)
+        semaphore = asyncio.Semaphore(workers)
+        segment_progress = [0] * num_segments
+        pipelines: list[RenderPipeline] = []
+        t0 = time.monotonic()
+
+        logger.info(
+            "[SEGMENTS] Compositing %d segments on %d workers: %s",
+            num_segments,
+            workers,
+            segments,
+        )
+
+        async def composite_segment(idx: int, start_ms: int, end_ms: int) -> str:
+            async with semaphore:
+                if await self._is_cancelled():
+                    raise asyncio.CancelledError("Render cancelled")
+                segment_pipeline = RenderPipeline(
+                    job_id=f"{self.job_id}_seg{idx}",
+                    project_id=self.project_id,
+                    width=self.width,
+                    height=self.height,
+                    fps=self.fps,
+                )
+                segment_pipeline._cancel_check = self._cancel_check
+                pipelines.append(segment_pipeline)
+
+                def on_progress(percent: int, _stage: str) -> None:
+                    # Composite reports 30-80; map to 0-100 per segment
+                    segment_progress[idx] = max(0, min(100, (percent - 30) * 2))
+                    overall = sum(segment_progress) / num_segments
+                    self._update_progress(
+                        30 + int(overall * 0.5),
+                        f"Compositing video ({int(overall)}%, {num_segments} segments)",
+                    )
+
+                segment_pipeline.set_progress_callback(on_progress)
+                try:
+                    segment_timeline = self._create_chunk_timeline(timeline_data, start_ms, end_ms)
+                    path = await segment_pipeline._composite_video(
+                        segment_timeline, assets, end_ms - start_ms
+                    )
+                    segment_path = os.path.join(segments_dir, f"segment_{idx:03d}.mp4")
+                    os.replace(path, segment_path)
+                    on_progress(80, "")
+                    return segment_path
+                finally:
+                    segment_pipeline._cleanup()
+
+        tasks = [
+            asyncio.create_task(composite_segment(idx, start_ms, end_ms))
+            for idx, (start_ms, end_ms) in enumerate(segments)
+        ]
+        try:
+            done, _pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+            for task in done:
+                task.result()
+            segment_files = [task.result() for task in tasks]
+        finally:
+            for segment_pipeline in pipelines:
+                await segment_pipeline._kill_active_proc()
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        video_path = os.path.join(self.output_dir, "composite.mp4")
+        await self._concatenate_chunks(segment_files, video_path)
+        shutil.rmtree(segments_dir, ignore_errors=True)
+        logger.info(
+            "[SEGMENTS] %d segments composited in %.1fs",
+            num_segments,
+            time.monotonic() - t0,
+        )
+
+        if await self._verify_segmented_video(video_path, duration_ms):
+            metrics.incr("render.segments.verified")
+            return video_path
+
+        metrics.incr("render.segments.verify_failed")
+        logger.warning("[SEGMENTS] Joined video does not match the timeline; compositing again")
+        return await self._composite_video(timeline_data, assets, duration_ms)
+
+    async def _verify_segmented_video(self, video_path: str, duration_ms: int) -> bool:
+        """Check a joined video's frame count and duration against ``duration_ms``.
+
+        A single-pass composite holds ``duration_ms * fps / 1000`` frames,
+        rounded either way for a partial last frame, and lasts
+        ``duration_ms`` to within one frame.
+        """
+        cmd = [
+            settings.ffprobe_path,
+            "-v",
+            "error",
+            "-select_streams",
+            "v:0",
+            "-count_packets",
+            "-show_entries",
+            "stream=nb_read_packets:format=duration",
+            "-of",
+            "json",
+            video_path,
+        ]
+        proc = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        stdout, stderr = await proc.communicate()
+        if proc.returncode != 0:
+            logger.warning(
+                "[SEGMENTS] ffprobe failed: %s", stderr.decode("utf-8", errors="replace")[-500:]
+            )
+            return False
+        try:
+            info = json.loads(stdout)
+            frames = int(info["streams"][0]["nb_read_packets"])
+            probed_ms = float(info["format"]["duration"]) * 1000
+        except (ValueError, KeyError, IndexError, TypeError):
+            logger.warning("[SEGMENTS] Unexpected ffprobe output: %r", stdout[:500])
+            return False
+
+        expected_frames = duration_ms * self.fps / 1000
+        frame_ms = 1000 / self.fps
+        ok = abs(frames - expected_frames) < 1 and abs(probed_ms - duration_ms) <= frame_ms
+        logger.info(
+            "[SEGMENTS] Verification: %d frames (expected %.2f), %.0fms (expected %d) -> %s",
+            frames,
+            expected_frames,
+            probed_ms,
+            duration_ms,
+            "ok" if ok else "MISMATCH",
+        )
+        return ok
+
     def _create_chunk_timeline(
         self,
         original_timeline: dict[str, Any],
@@ -1227,8 +1496,8 @@ class RenderPipeline:
         """
         chunk_duration_ms = chunk_end_ms - chunk_start_ms
 
-        # Deep copy to avoid modifying the original
-        chunk_timeline = copy.deepcopy(original_timeline)
+        # Structurally shared fork: only top-level fields differ per chunk
+        chunk_timeline = fork_timeline(original_timeline)
 
         # Set chunk-specific timing
         chunk_timeline["duration_ms"] = chunk_duration_ms
@@ -1291,6 +1560,39 @@ class RenderPipeline:
 
         logger.info(f"[CHUNKED] Concatenation successful: {output_path}")
 
+    async def _stream_concatenated_chunks(
+        self, chunk_files: list[str], output_sink: RenderOutputSink
+    ) -> None:
+        """Concatenate chunk files as fragmented MP4 into ``output_sink``."""
+        concat_list_path = os.path.join(self.output_dir, "concat_list.txt")
+        with open(concat_list_path, "w") as f:
+            for chunk_file in chunk_files:
+                escaped = chunk_file.replace("'", "'\\''")
+                f.write(f"file '{escaped}'\n")
+
+        cmd = [
+            self.ffmpeg_path,
+            "-y",
+            "-f",
+            "concat",
+            "-safe",
+            "0",
+            "-i",
+            concat_list_path,
+            "-c",
+            "copy",
+            "-movflags",
+            FRAGMENTED_MP4_MOVFLAGS,
+            "-f",
+            "mp4",
+            "pipe:1",
+        ]
+        logger.info(f"[CHUNKED] Streaming concatenation command: {' '.join(cmd)}")
+        written = await self._stream_ffmpeg_output(
+            cmd, output_sink, "Chunk concatenation", FFMPEG_FINAL_ENCODE_TIMEOUT_S
+        )
+        logger.info(f"[CHUNKED] Streamed concatenation: {written} bytes")
+
     async def _is_cancelled(self) -> bool:
         """Check if render has been cancelled."""
         if self._cancel_check is None:
@@ -1583,6 +1885,14 @@ class RenderPipeline:
                     continue
 
                 asset_path = assets[asset_id]
+                # Chroma-keyed clips overlay a pre-keyed intermediate when the
+                # caller fetched one (see src.services.keyed_intermediates)
+                key_params = clip_key_params(clip)
+                prekeyed_path = (
+                    assets.get(keyed_asset_ref(asset_id, key_params)) if key_params else None
+                )
+                if prekeyed_path:
+                    asset_path = prekeyed_path
                 # Static images need -loop 1 to generate continuous frames
                 ext = asset_path.rsplit(".", 1)[-1].lower() if "." in asset_path else ""
                 is_image = ext in ("png", "jpg", "jpeg", "bmp", "webp", "tiff", "gif")
@@ -1598,10 +1908,14 @@ class RenderPipeline:
                     export_start_ms,
                     export_end_ms,
                     is_still_image=is_image,
+                    prekeyed=bool(prekeyed_path),
                 )
 
                 if is_image:
                     inputs.extend(["-loop", "1", "-framerate", str(fps), "-i", asset_path])
+                elif prekeyed_path:
+                    # FFmpeg's native VP9 decoder drops the alpha plane
+                    inputs.extend([*input_prefix, "-c:v", "libvpx-vp9", "-i", asset_path])
                 else:
                     inputs.extend([*input_prefix, "-i", asset_path])
 
@@ -1676,6 +1990,11 @@ class RenderPipeline:
             return await self._create_blank_video(output_path, duration_ms)
 
         cmd, _generated_files = result
+        await self._run_composite(cmd, duration_ms)
+        return output_path
+
+    async def _run_composite(self, cmd: list[str], duration_ms: int) -> None:
+        """Run a composite command, reporting progress; raises RenderError on failure."""
         duration_s = duration_ms / 1000
 
         logger.info("[RENDER DEBUG] FFmpeg composite command (duration_s=%s)", duration_s)
@@ -1756,7 +2075,64 @@ class RenderPipeline:
                 stderr_summary=stderr_summary,
             )
 
-        return output_path
+    async def _composite_and_stream(
+        self,
+        timeline_data: dict[str, Any],
+        assets: dict[str, str],
+        audio_path: str,
+        duration_ms: int,
+        output_sink: RenderOutputSink,
+    ) -> None:
+        """Composite, mux and stream the output to ``output_sink`` concurrently.
+
+        The composite encode writes fragmented MP4 into a FIFO that the final
+        mux reads while it is produced; the mux writes fragmented MP4 to its
+        stdout, which is forwarded to the sink.  Backpressure flows from the
+        sink to the encoder through the pipes, so nothing is buffered beyond
+        pipe and read sizes.
+        """
+        fifo_path = os.path.join(self.output_dir, "composite.fifo")
+        result = self.build_composite_command(timeline_data, assets, duration_ms, fifo_path)
+        if result is None:
+            video_path = await self._create_blank_video(
+                os.path.join(self.output_dir, "composite.mp4"), duration_ms
+            )
+            self._update_progress(80, "Encoding final video")
+            await self._stream_final(video_path, audio_path, duration_ms, output_sink)
+            return
+
+        cmd, _generated_files = result
+        composite_cmd = [
+            *cmd[:-1],
+            "-movflags",
+            FRAGMENTED_MP4_MOVFLAGS,
+            "-f",
+            "mp4",
+            cmd[-1],
+        ]
+        os.mkfifo(fifo_path)
+
+        composite_task = asyncio.create_task(self._run_composite(composite_cmd, duration_ms))
+        mux_task = asyncio.create_task(
+            self._stream_final(fifo_path, audio_path, duration_ms, output_sink)
+        )
+        try:
+            done, _pending = await asyncio.wait(
+                {composite_task, mux_task}, return_when=asyncio.FIRST_EXCEPTION
+            )
+            for task in done:
+                task.result()
+            await composite_task
+            self._update_progress(80, "Encoding final video")
+            await mux_task
+        finally:
+            if not composite_task.done():
+                # The encoder may be blocked on the FIFO with no reader left
+                await self._kill_active_proc()
+            for task in (composite_task, mux_task):
+                if not task.done():
+                    task.cancel()
+            await asyncio.gather(composite_task, mux_task, return_exceptions=True)
 
     def _build_clip_filter(
         self,
@@ -1768,6 +2144,7 @@ class RenderPipeline:
         export_start_ms: int = 0,
         export_end_ms: int | None = None,
         is_still_image: bool = False,
+        prekeyed: bool = False,
     ) -> tuple[str, list[str]]:
         """Build FFmpeg filter for a single clip.
 
@@ -1775,6 +2152,8 @@ class RenderPipeline:
             export_start_ms: Start of export range in ms (clips are offset relative to this)
             export_end_ms: End of export range in ms (clips extending beyond are trimmed)
             is_still_image: True for image/shape/text inputs (needs format normalization)
+            prekeyed: The input is the clip's keyed intermediate (see
+                :mod:`src.services.keyed_intermediates`); chroma key is skipped
 
         Returns:
             Tuple of (filter_string, input_prefix_args).  input_prefix_args
@@ -2032,6 +2411,11 @@ class RenderPipeline:
             self._coerce_float(effects.get("opacity"), 1.0),
         )
         has_keyframes = bool(clip.get("keyframes"))
+        # Keyframes that never change the scale compile to constants: size the
+        # scaler once instead of re-evaluating it on every frame
+        scale_eval = (
+            "init" if is_constant_expr(scale_x_expr) and is_constant_expr(scale_y_expr) else "frame"
+        )
         # Parity: scale is uniform when scaleX == scaleY (or only legacy `scale` present)
         is_uniform_scale = math.isclose(scale_x, scale_y)
 
@@ -2044,86 +2428,41 @@ class RenderPipeline:
             if has_keyframes or not math.isclose(scale_x, 1.0) or not math.isclose(scale_y, 1.0):
                 clip_filters.append(
                     f"scale=w='max(2,trunc(iw*({scale_x_expr})))':"
-                    f"h='max(2,trunc(ih*({scale_y_expr})))':eval=frame"
+                    f"h='max(2,trunc(ih*({scale_y_expr})))':eval={scale_eval}"
                 )
         elif image_with_explicit_size:
             if has_keyframes or not math.isclose(scale_x, 1.0) or not math.isclose(scale_y, 1.0):
                 # scale != 1.0 or animated: multiply explicit size by scale expression
                 clip_filters.append(
                     f"scale=w='max(2,trunc({int(width)}*({scale_x_expr})))':"
-                    f"h='max(2,trunc({int(height)}*({scale_y_expr})))':eval=frame"
+                    f"h='max(2,trunc({int(height)}*({scale_y_expr})))':eval={scale_eval}"
                 )
             else:
                 # scale == 1.0 and no keyframes: use fixed size (fast path)
                 clip_filters.append(
                     f"scale=w='max(2,trunc({int(width)}))':h='max(2,trunc({int(height)}))':eval=init"
                 )
+        elif prekeyed:
+            # The intermediate was keyed at this clip's size (prekey_scale_filter)
+            pass
         elif width and height:
             clip_filters.append(
                 f"scale=w='max(2,trunc({int(width)}*({scale_x_expr})))':"
-                f"h='max(2,trunc({int(height)}*({scale_y_expr})))':eval=frame"
+                f"h='max(2,trunc({int(height)}*({scale_y_expr})))':eval={scale_eval}"
             )
         elif has_keyframes or not math.isclose(scale_x, 1.0) or not math.isclose(scale_y, 1.0):
             clip_filters.append(
                 f"scale=w='max(2,trunc(iw*({scale_x_expr})))':"
-                f"h='max(2,trunc(ih*({scale_y_expr})))':eval=frame"
+                f"h='max(2,trunc(ih*({scale_y_expr})))':eval={scale_eval}"
             )
         _ = is_uniform_scale  # used for parity logging if needed
 
-        # Chroma key (available for all layers with video content)
+        # Chroma key (available for all layers with video content).  A
+        # pre-keyed input already carries the keyed alpha: skip keying.
         chroma_key = effects.get("chroma_key") or {}
-        chroma_key_enabled = chroma_key.get("enabled", False)
+        chroma_key_enabled = bool(chroma_key.get("enabled", False)) and not prekeyed
         if chroma_key_enabled:
-            _raw_color = str(chroma_key.get("color", "#00FF00")).lstrip("#")
-            # --- Defensive validation (second-layer guard after Pydantic) ---
-            if not _HEX6_COLOR_RE.match(_raw_color):
-                logger.warning("[CHROMA_KEY] Invalid color %r, falling back to 00FF00", _raw_color)
-                _raw_color = "00FF00"
-            color = f"0x{_raw_color.upper()}"
-            # Defaults match effects_spec.yaml (SSOT)
-            try:
-                similarity = float(chroma_key.get("similarity", 0.4))
-            except (ValueError, TypeError):
-                logger.warning(
-                    "[CHROMA_KEY] Invalid similarity %r, falling back to 0.4",
-                    chroma_key.get("similarity"),
-                )
-                similarity = 0.4
-            try:
-                blend = float(chroma_key.get("blend", 0.1))
-            except (ValueError, TypeError):
-                logger.warning(
-                    "[CHROMA_KEY] Invalid blend %r, falling back to 0.1",
-                    chroma_key.get("blend"),
-                )
-                blend = 0.1
-            # Clamp to valid range [0.0, 1.0]
-            similarity = max(0.0, min(1.0, similarity))
-            blend = max(0.0, min(1.0, blend))
-            # #269: Use chromakey (YUV) instead of colorkey (RGB) to match the
-            # preview pipeline (chroma_key_service.py:271).  Users tune
-            # similarity/blend values while watching the preview, so the
-            # production render must use the same filter family.
-            clip_filters.append(f"chromakey={color}:{similarity}:{blend}")
-            # Secondary chromakey pass: target brighter reflections (e.g. on hair edges)
-            # Use the already-validated _raw_color (no # prefix, 6-digit hex)
-            secondary_color = compute_secondary_key_color(f"#{_raw_color}")
-            secondary_sim = max(0.15, similarity * 0.6)
-            secondary_blend = max(0.05, blend * 0.8)
-            clip_filters.append(
-                f"chromakey={secondary_color}:{secondary_sim:.2f}:{secondary_blend:.2f}"
-            )
-            # Despill to remove color fringing
-            try:
-                r, g, b = (
-                    int(_raw_color[0:2], 16),
-                    int(_raw_color[2:4], 16),
-                    int(_raw_color[4:6], 16),
-                )
-                despill_type = "blue" if (b > g and b > r) else "green"
-            except (ValueError, IndexError):
-                despill_type = "green"
-            clip_filters.append(f"despill=type={despill_type}")
+            clip_filters.extend(RenderKeyParams.from_effects(chroma_key).filters())
 
         # Post-chroma filters (crop, rotation, opacity) go into a separate
         # list when chroma key is enabled so we can insert alpha erosion
@@ -2181,7 +2520,7 @@ class RenderPipeline:
             post_str = ("," + ",".join(post_chroma_filters)) if post_chroma_filters else ""
             filter_str = (
                 f"[{input_idx}:v]{pre_str},split[{ck_m}][{ck_a}];\n"
-                f"[{ck_a}]alphaextract,median=radius=1,erosion,gblur=sigma=2.0[{ck_e}];\n"
+                f"[{ck_a}]{RENDER_ALPHA_REFINE}[{ck_e}];\n"
                 f"[{ck_m}][{ck_e}]alphamerge{post_str}[clip{input_idx}];\n"
             )
             clip_ref = f"clip{input_idx}"
@@ -2914,6 +3253,64 @@ class RenderPipeline:
 
         return output_path
 
+    async def _stream_final(
+        self,
+        video_path: str,
+        audio_path: str,
+        duration_ms: int,
+        output_sink: RenderOutputSink,
+    ) -> None:
+        """Final mux (see build_final_command) as fragmented MP4 into ``output_sink``."""
+        cmd = self.build_final_command(video_path, audio_path, "pipe:1", duration_ms)
+        movflags_idx = cmd.index("-movflags")
+        cmd[movflags_idx + 1 : movflags_idx + 2] = [FRAGMENTED_MP4_MOVFLAGS, "-f", "mp4"]
+        written = await self._stream_ffmpeg_output(
+            cmd, output_sink, "Final encoding", FFMPEG_FINAL_ENCODE_TIMEOUT_S
+        )
+        logger.info("[ENCODE FINAL] Streamed %d bytes", written)
+
+    async def _stream_ffmpeg_output(
+        self,
+        cmd: list[str],
+        output_sink: RenderOutputSink,
+        label: str,
+        timeout_s: int,
+    ) -> int:
+        """Run FFmpeg writing to stdout and forward the output to ``output_sink``.
+
+        Returns the number of bytes forwarded.  ``timeout_s`` bounds the
+        time without any output.
+        """
+        proc = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        assert proc.stdout is not None and proc.stderr is not None
+        stderr_task = asyncio.create_task(proc.stderr.read())
+        written = 0
+        try:
+            while True:
+                async with asyncio.timeout(timeout_s):
+                    data = await proc.stdout.read(STREAM_READ_SIZE)
+                if not data:
+                    break
+                await output_sink.write(data)
+                written += len(data)
+            await proc.wait()
+        except BaseException:
+            if proc.returncode is None:
+                proc.kill()
+                await proc.wait()
+            stderr_task.cancel()
+            raise
+
+        stderr = await stderr_task
+        if proc.returncode != 0:
+            stderr_text = stderr.decode("utf-8", errors="replace")
+            raise RuntimeError(f"{label} failed: {stderr_text[-2000:]}")
+        return written
+
     def _cleanup(self) -> None:
         """Clean up temporary files."""
         try:
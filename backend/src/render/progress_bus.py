@@ -0,0 +1,186 @@
+"""Cross-instance fan-out of render progress messages.
+
+A render runs on one instance (or in a Cloud Run Jobs worker) while the
+browser's WebSocket may be connected to any API instance behind the load
+balancer.  :class:`~src.api.websocket.RenderProgressNotifier` therefore
+publishes every message to a bus, and each API instance delivers what it
+receives to its own WebSocket clients.
+
+- :class:`LocalProgressBus` delivers in-process.  It is the default (one
+  instance, local development) and the stand-in used by tests.
+- :class:`PostgresProgressBus` uses ``NOTIFY``/``LISTEN`` on the application
+  database, so no extra infrastructure is needed.  Publishing works without
+  :meth:`~PostgresProgressBus.start` (render workers only publish); the
+  listener reconnects after losing its connection.
+
+Delivery is best effort: a message published while nobody listens is lost,
+and clients fall back to polling ``/render/status``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from collections.abc import Awaitable, Callable
+from typing import Any, Protocol
+
+import asyncpg
+
+from src.config import get_settings
+from src.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# (job_id, message) -> None; the API instance's WebSocketManager.broadcast
+Deliver = Callable[[str, dict[str, Any]], Awaitable[None]]
+
+# Postgres rejects NOTIFY payloads of 8000 bytes or more
+_MAX_PAYLOAD_BYTES = 7900
+
+# Delay before the listener retries after losing its connection
+_RECONNECT_DELAY_S = 2.0
+
+
+class RenderProgressBus(Protocol):
+    """Publish/subscribe interface shared by the bus implementations."""
+
+    async def publish(self, job_id: str, message: dict[str, Any]) -> None: ...
+
+    async def start(self, deliver: Deliver) -> None:
+        """Start delivering published messages to ``deliver``."""
+        ...
+
+    async def stop(self) -> None: ...
+
+
+class LocalProgressBus:
+    """In-process bus: messages reach only this instance's clients."""
+
+    def __init__(self) -> None:
+        self._deliver: Deliver | None = None
+
+    async def publish(self, job_id: str, message: dict[str, Any]) -> None:
+        metrics.incr("render.progress.published")
+        if self._deliver is not None:
+            await self._deliver(job_id, message)
+
+    async def start(self, deliver: Deliver) -> None:
+        self._deliver = deliver
+
+    async def stop(self) -> None:
+        self._deliver = None
+
+
+def _asyncpg_dsn(database_url: str) -> str:
+    """Plain libpq DSN for an SQLAlchemy ``postgresql+asyncpg://`` URL."""
+    return database_url.replace("postgresql+asyncpg://", "postgresql://", 1)
+
+
+class PostgresProgressBus:
+    """Bus over Postgres ``NOTIFY``/``LISTEN`` on one channel.
+
+    Uses its own asyncpg connections rather than the SQLAlchemy pool: the
+    listener holds a connection for the lifetime of the app, and the pool
+    is deliberately small.
+    """
+
+    def __init__(self, dsn: str, channel: str) -> None:
+        self.dsn = dsn
+        self.channel = channel
+        self._deliver: Deliver | None = None
+        self._publisher: asyncpg.Connection | None = None
+        self._publish_lock = asyncio.Lock()
+        self._listener_task: asyncio.Task[None] | None = None
+        self._deliveries: set[asyncio.Task[None]] = set()
+
+    async def publish(self, job_id: str, message: dict[str, Any]) -> None:
+        payload = json.dumps({"job_id": job_id, "message": message}, default=str)
+        if len(payload.encode()) > _MAX_PAYLOAD_BYTES:
+            logger.warning("[PROGRESS BUS] Dropping oversized message for job %s", job_id)
+            metrics.incr("render.progress.dropped")
+            return
+        async with self._publish_lock:
+            try:
+                if self._publisher is None or self._publisher.is_closed():
+                    self._publisher = await asyncpg.connect(self.dsn)
+                await self._publisher.execute("SELECT pg_notify($1, $2)", self.channel, payload)
+            except (OSError, asyncpg.PostgresError, asyncpg.InterfaceError) as exc:
+                # Progress is advisory: never fail the render over it
+                metrics.incr("render.progress.dropped")
+                logger.warning("[PROGRESS BUS] Publish for job %s failed: %s", job_id, exc)
+                await self._close_publisher()
+                return
+        metrics.incr("render.progress.published")
+
+    async def start(self, deliver: Deliver) -> None:
+        self._deliver = deliver
+        if self._listener_task is None or self._listener_task.done():
+            self._listener_task = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        self._deliver = None
+        if self._listener_task is not None:
+            self._listener_task.cancel()
+            try:
+                await self._listener_task
+            except asyncio.CancelledError:
+                pass
+            self._listener_task = None
+        async with self._publish_lock:
+            await self._close_publisher()
+
+    async def _close_publisher(self) -> None:
+        if self._publisher is not None:
+            try:
+                await self._publisher.close()
+            except Exception:
+                pass
+            self._publisher = None
+
+    async def _listen(self) -> None:
+        while True:
+            lost = asyncio.Event()
+            try:
+                conn = await asyncpg.connect(self.dsn)
+            except (OSError, asyncpg.PostgresError) as exc:
+                logger.warning("[PROGRESS BUS] Listener connect failed: %s", exc)
+                await asyncio.sleep(_RECONNECT_DELAY_S)
+                continue
+            try:
+                conn.add_termination_listener(lambda _conn: lost.set())
+                await conn.add_listener(self.channel, self._on_notify)
+                logger.info("[PROGRESS BUS] Listening on %s", self.channel)
+                await lost.wait()
+                logger.warning("[PROGRESS BUS] Listener connection lost; reconnecting")
+            finally:
+                if not conn.is_closed():
+                    await conn.close()
+            await asyncio.sleep(_RECONNECT_DELAY_S)
+
+    def _on_notify(self, _conn: Any, _pid: int, _channel: str, payload: str) -> None:
+        try:
+            data = json.loads(payload)
+            job_id, message = str(data["job_id"]), data["message"]
+        except (ValueError, KeyError, TypeError):
+            logger.warning("[PROGRESS BUS] Ignoring malformed notification")
+            return
+        if self._deliver is not None:
+            metrics.incr("render.progress.received")
+            task = asyncio.ensure_future(self._deliver(job_id, message))
+            self._deliveries.add(task)
+            task.add_done_callback(self._deliveries.discard)
+
+
+def create_progress_bus() -> RenderProgressBus:
+    """The bus selected by ``render_progress_pubsub``."""
+    settings = get_settings()
+    if settings.render_progress_pubsub == "postgres":
+        return PostgresProgressBus(
+            _asyncpg_dsn(settings.database_url), settings.render_progress_channel
+        )
+    return LocalProgressBus()
+
+
+# Process-wide instance
+render_progress_bus = create_progress_bus()
@@ -0,0 +1,253 @@
+"""Render admission control (per API instance).
+
+Every render declares a :class:`RenderDemand` — its estimated peak memory
+(from :func:`src.render.pipeline.analyze_timeline_for_memory`) and the CPUs
+its FFmpeg processes use.  :class:`RenderScheduler` admits renders while the
+demand of the running ones fits the instance budget and queues the rest.
+The budget is the container's memory (at the render safety ratio) and CPU
+limit, so concurrent inline exports no longer compete with each other's
+memory estimate or starve API requests.  (jobs mode runs every render in its
+own container and admits executions cluster-wide from the ``render_jobs``
+table instead; see :mod:`src.render.executor`.)
+
+The queue is ordered by priority class (``final`` exports before ``draft``
+renders), then by arrival, and is served strictly in that order so a large
+render cannot be starved by smaller ones behind it.  A render larger than the
+whole budget is admitted once nothing else runs.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+import logging
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from typing import Any, Literal
+from uuid import UUID
+
+from src.config import get_settings
+from src.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+RenderPriority = Literal["final", "draft"]
+
+# Lower rank is served first
+PRIORITY_RANK: dict[str, int] = {"final": 0, "draft": 1}
+
+# Audio-only renders mix and encode audio only
+AUDIO_ONLY_MEMORY_BYTES = 256 * 1024 * 1024
+AUDIO_ONLY_CPU = 1.0
+
+# How often a queued render re-reports its position (keeps the job row's
+# updated_at fresh, like the heartbeat of a running render)
+QUEUE_REFRESH_INTERVAL_S = 20.0
+
+
+@dataclass(frozen=True)
+class RenderDemand:
+    """Resources a render holds while it runs."""
+
+    memory_bytes: int
+    cpu: float
+
+    @classmethod
+    def for_render(cls, mem_info: dict[str, Any] | None, *, audio_only: bool) -> RenderDemand:
+        """Demand of a render from its ``analyze_timeline_for_memory`` result."""
+        if audio_only or mem_info is None:
+            return cls(AUDIO_ONLY_MEMORY_BYTES, AUDIO_ONLY_CPU)
+        from src.render.pipeline import segment_workers_for
+
+        # A chunked render keeps every chunk under the safety limit, and
+        # parallel segment encoders are capped to fit it too
+        workers = segment_workers_for(mem_info)
+        memory = min(
+            int(mem_info["estimated_bytes"]) * workers, int(mem_info["safety_limit_bytes"])
+        )
+        return cls(memory, float(get_settings().render_ffmpeg_threads) * workers)
+
+
+class AdmissionTicket:
+    """A render's place in a :class:`RenderScheduler` (see :meth:`RenderScheduler.submit`)."""
+
+    def __init__(
+        self,
+        scheduler: RenderScheduler,
+        job_id: UUID,
+        demand: RenderDemand,
+        priority: RenderPriority,
+        seq: int,
+    ) -> None:
+        self.job_id = job_id
+        self.demand = demand
+        self.priority = priority
+        self._scheduler = scheduler
+        self._order = (PRIORITY_RANK.get(priority, len(PRIORITY_RANK)), seq)
+        self._wakeup = asyncio.Event()
+        self.admitted = False
+        self.withdrawn = False
+        self.released = False
+
+    @property
+    def position(self) -> int | None:
+        """1-based position in the queue; ``None`` once admitted or withdrawn."""
+        return self._scheduler._position(self)
+
+    async def wait(
+        self,
+        on_position: Callable[[int], Awaitable[None]] | None = None,
+        refresh_s: float = QUEUE_REFRESH_INTERVAL_S,
+    ) -> bool:
+        """Wait until admitted; returns False if the ticket was withdrawn.
+
+        ``on_position`` is called with the queue position whenever it
+        changes, and at least every ``refresh_s`` seconds while queued.
+        """
+        reported: int | None = None
+        while True:
+            if self.admitted:
+                return True
+            if self.withdrawn:
+                return False
+            position = self.position
+            self._wakeup.clear()
+            if on_position is not None and position is not None:
+                if position != reported:
+                    reported = position
+                    await on_position(position)
+                    continue
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=refresh_s)
+            except TimeoutError:
+                reported = None
+
+    def release(self) -> None:
+        """Free the ticket's resources (or leave the queue); idempotent."""
+        self._scheduler._release(self)
+
+
+class RenderScheduler:
+    """Admits renders against a resource budget (see module docstring).
+
+    A ``None`` budget dimension is unlimited.
+    """
+
+    def __init__(
+        self,
+        *,
+        memory_budget_bytes: int | None = None,
+        cpu_budget: float | None = None,
+        max_jobs: int | None = None,
+    ) -> None:
+        self.memory_budget_bytes = memory_budget_bytes
+        self.cpu_budget = cpu_budget
+        self.max_jobs = max_jobs
+        self._seq = itertools.count()
+        self._waiting: list[AdmissionTicket] = []
+        self._running: dict[UUID, AdmissionTicket] = {}
+
+    @classmethod
+    def from_settings(cls) -> RenderScheduler:
+        """This instance's budget for inline renders."""
+        from src.render.pipeline import get_container_cpu_limit, get_container_memory_limit
+
+        settings = get_settings()
+        memory = int(get_container_memory_limit() * settings.render_memory_safety_ratio)
+        cpu = settings.render_cpu_budget or get_container_cpu_limit()
+        return cls(
+            memory_budget_bytes=memory,
+            cpu_budget=cpu,
+            max_jobs=settings.render_max_concurrent_jobs or None,
+        )
+
+    @property
+    def running(self) -> int:
+        return len(self._running)
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiting)
+
+    def submit(
+        self, job_id: UUID, demand: RenderDemand, priority: RenderPriority = "final"
+    ) -> AdmissionTicket:
+        """Queue a render; it may be admitted immediately (``ticket.admitted``)."""
+        ticket = AdmissionTicket(self, job_id, demand, priority, next(self._seq))
+        self._waiting.append(ticket)
+        self._waiting.sort(key=lambda t: t._order)
+        self._pump()
+        if not ticket.admitted:
+            metrics.incr("render.scheduler.queued")
+            logger.info(
+                "[SCHEDULER] Job %s queued at position %s (%s, %d MiB, %.1f CPU; %d running)",
+                job_id,
+                ticket.position,
+                priority,
+                demand.memory_bytes // 1024**2,
+                demand.cpu,
+                self.running,
+            )
+        return ticket
+
+    def withdraw(self, job_id: UUID) -> bool:
+        """Remove a queued render (e.g. cancelled); returns False if it is not queued."""
+        for ticket in self._waiting:
+            if ticket.job_id == job_id:
+                ticket.withdrawn = True
+                self._release(ticket)
+                return True
+        return False
+
+    def _position(self, ticket: AdmissionTicket) -> int | None:
+        try:
+            return self._waiting.index(ticket) + 1
+        except ValueError:
+            return None
+
+    def _fits(self, demand: RenderDemand) -> bool:
+        if not self._running:
+            return True
+        if self.max_jobs is not None and len(self._running) >= self.max_jobs:
+            return False
+        if self.memory_budget_bytes is not None:
+            used = sum(t.demand.memory_bytes for t in self._running.values())
+            if used + demand.memory_bytes > self.memory_budget_bytes:
+                return False
+        if self.cpu_budget is not None:
+            used_cpu = sum(t.demand.cpu for t in self._running.values())
+            if used_cpu + demand.cpu > self.cpu_budget:
+                return False
+        return True
+
+    def _pump(self) -> None:
+        while self._waiting and self._fits(self._waiting[0].demand):
+            ticket = self._waiting.pop(0)
+            ticket.admitted = True
+            self._running[ticket.job_id] = ticket
+            metrics.incr("render.scheduler.admitted")
+        for ticket in (*self._waiting, *self._running.values()):
+            ticket._wakeup.set()
+
+    def _release(self, ticket: AdmissionTicket) -> None:
+        if ticket.released:
+            return
+        ticket.released = True
+        if ticket in self._waiting:
+            self._waiting.remove(ticket)
+            ticket.withdrawn = True
+        elif self._running.get(ticket.job_id) is ticket:
+            del self._running[ticket.job_id]
+        ticket._wakeup.set()
+        self._pump()
+
+
+_scheduler: RenderScheduler | None = None
+
+
+def get_render_scheduler() -> RenderScheduler:
+    """Process-wide scheduler, budgeted from settings on first use."""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = RenderScheduler.from_settings()
+    return _scheduler
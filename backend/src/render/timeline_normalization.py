@@ -2,9 +2,10 @@
 
 from __future__ import annotations
 
-import copy
 from typing import Any
 
+from src.services.timeline_document import fork_timeline
+
 
 def normalize_export_timeline(
     timeline_data: dict[str, Any],
@@ -23,7 +24,7 @@ def normalize_export_timeline(
     if export_start_ms >= export_end_ms:
         raise ValueError("Invalid export range: start must be less than end")
 
-    normalized_timeline = copy.deepcopy(timeline_data)
+    normalized_timeline = fork_timeline(timeline_data)
     render_duration_ms = export_end_ms - export_start_ms
     normalized_timeline["duration_ms"] = render_duration_ms
     normalized_timeline["export_start_ms"] = export_start_ms
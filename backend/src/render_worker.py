@@ -52,9 +52,11 @@ async def _run_worker(job_id: UUID) -> int:
     from sqlalchemy import select
 
     from src.api.render import _run_render_background, _update_job_progress
+    from src.api.websocket import progress_notifier
     from src.logging_config import configure_logging
     from src.models.database import async_session_maker, init_db
     from src.models.render_job import RenderJob
+    from src.services.keyed_intermediates import keyed_intermediates
 
     configure_logging()
     logger.info("[WORKER] Starting render worker for job %s", job_id)
@@ -121,17 +123,24 @@ async def _run_worker(job_id: UUID) -> int:
         render_duration_ms,
     )
 
-    await _run_render_background(
-        job_id=job_id,
-        project_id=project_id,
-        project_name=project_name,
-        project_width=project_width,
-        project_height=project_height,
-        project_fps=project_fps,
-        timeline_data=timeline_data,
-        duration_ms=render_duration_ms,
-        audio_only=audio_only,
-    )
+    try:
+        await _run_render_background(
+            job_id=job_id,
+            project_id=project_id,
+            project_name=project_name,
+            project_width=project_width,
+            project_height=project_height,
+            project_fps=project_fps,
+            timeline_data=timeline_data,
+            duration_ms=render_duration_ms,
+            audio_only=audio_only,
+        )
+    finally:
+        # Intermediates the render had to key live are generated in the
+        # background; asyncio.run() would cancel them on return
+        await keyed_intermediates.drain()
+        # Close the progress bus's publishing connection (if it opened one)
+        await progress_notifier.stop()
 
     logger.info("[WORKER] Render for job %s completed", job_id)
     return 0
@@ -5,11 +5,18 @@ Designed with information hierarchy: L1 (Summary) -> L2 (Structure) -> L3 (Detai
 """
 
 import re
+from dataclasses import dataclass, field
 from datetime import datetime
 from typing import Annotated, Any, Literal
 from uuid import UUID
 
-from pydantic import BaseModel, ConfigDict, Field, field_validator, model_validator
+from pydantic import (
+    BaseModel,
+    ConfigDict,
+    Field,
+    field_validator,
+    model_validator,
+)
 from pydantic.functional_validators import BeforeValidator
 
 from src.schemas._validators import normalize_font_weight
@@ -19,6 +26,7 @@ from src.schemas.effects_generated import (  # noqa: F401
     GeneratedEffectsDetails,
     GeneratedUpdateClipEffectsRequest,
 )
+from src.schemas.operation import ChangeDetail
 
 # =============================================================================
 # L1: Summary Level (~300 tokens) - Project Overview
@@ -361,7 +369,11 @@ class L25TimelineOverview(BaseModel):
     warnings: list[str] = Field(default_factory=list)
     snapshot_base64: str | None = Field(
         default=None,
-        description="Base64-encoded JPEG image of the timeline visual snapshot",
+        description="Base64-encoded image of the timeline visual snapshot",
+    )
+    snapshot_format: str | None = Field(
+        default=None,
+        description="Encoding of snapshot_base64: jpeg, png or webp",
     )
 
 
@@ -1103,6 +1115,20 @@ class BatchOperationResult(BaseModel):
     )
 
 
+@dataclass
+class BatchExecution:
+    """Outcome of a batch run: the API response plus what history records.
+
+    ``changes`` is the combined diff of the applied batch (empty when nothing
+    was kept); it is recorded on the operation and never serialized.
+    """
+
+    result: BatchOperationResult
+    changes: list[ChangeDetail] = field(default_factory=list)
+    duration_before_ms: int = 0
+    duration_after_ms: int = 0
+
+
 # =============================================================================
 # Analysis Tools
 # =============================================================================
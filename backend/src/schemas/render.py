@@ -1,4 +1,5 @@
 from datetime import datetime
+from typing import Literal
 from uuid import UUID
 
 from pydantic import BaseModel
@@ -11,6 +12,7 @@ class RenderRequest(BaseModel):
     start_ms: int | None = None  # Optional start time in milliseconds (for partial export)
     end_ms: int | None = None  # Optional end time in milliseconds (for partial export)
     audio_only: bool = False  # Skip video compositing; export audio only (m4a/AAC)
+    priority: Literal["final", "draft"] = "final"  # Admission order when renders queue
 
 
 class RenderJobResponse(BaseModel):
@@ -19,6 +21,8 @@ class RenderJobResponse(BaseModel):
     status: str
     progress: int
     current_stage: str | None
+    priority: str = "final"
+    queue_position: int | None = None
     output_url: str | None
     output_size: int | None
     started_at: datetime | None
@@ -0,0 +1,350 @@
+"""Bulk execution support for ``execute_batch_operations``.
+
+A batch used to run every operation through the full single-op path:
+Pydantic validation per op, a DB round trip per referenced asset, a linear
+clip scan per lookup, a whole-timeline sanitize/duration pass per op, and a
+``copy.deepcopy`` of the entire timeline up front when
+``rollback_on_failure`` was requested.
+
+This module provides the pieces the batch path now uses instead:
+
+- :func:`prepare_operations` parses and validates every operation once,
+  before anything is applied.
+- :func:`prefetch_assets` loads all referenced assets (and their extracted
+  audio assets) in two queries.
+- :class:`TimelineJournal` is a copy-on-write working copy of the timeline
+  (see :mod:`src.services.timeline_document`): a clip dict is deep-copied
+  only when an operation first touches it.  The base timeline is never
+  mutated, so rollback is simply "keep the base", and the combined diff
+  falls out of comparing the two.
+- :class:`BatchSession` bundles the above while a batch runs; the editor's
+  finders, ``_get_asset`` and ``_update_project_duration`` consult it.
+"""
+
+from __future__ import annotations
+
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Literal
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.models.asset import Asset
+from src.schemas.ai import (
+    AddAudioClipRequest,
+    AddClipRequest,
+    BatchClipOperation,
+    MoveAudioClipRequest,
+    MoveClipRequest,
+    SplitClipRequest,
+    UpdateClipEffectsRequest,
+    UpdateClipTextRequest,
+    UpdateClipTextStyleRequest,
+    UpdateClipTransformRequest,
+)
+from src.schemas.clip_adapter import UnifiedClipInput, UnifiedTransformInput
+from src.schemas.operation import ChangeDetail
+from src.services.timeline_document import ROW_KEYS, ClipKind, TimelineDocument
+
+# =============================================================================
+# Copy-on-write journal
+# =============================================================================
+
+
+class TimelineJournal(TimelineDocument):
+    """Copy-on-write working copy of a timeline for one batch.
+
+    The cost of a batch is proportional to the clips it touches rather than
+    to the timeline size; :meth:`changes` derives the combined diff.
+    """
+
+    def changes(self) -> list[ChangeDetail]:
+        """Combined diff of everything the batch changed, relative to ``base``."""
+        changes: list[ChangeDetail] = []
+        clip_entities: tuple[tuple[ClipKind, str], ...] = (
+            ("video", "clip"),
+            ("audio", "audio_clip"),
+        )
+        for kind, entity in clip_entities:
+            before = _clips_by_id(self.base, kind)
+            after = _clips_by_id(self.working, kind)
+            for clip_id, (clip, row_id) in after.items():
+                prev = before.get(clip_id)
+                if prev is None:
+                    changes.append(_change(entity, clip_id, "created", None, (clip, row_id)))
+                elif prev[1] != row_id or (prev[0] is not clip and prev[0] != clip):
+                    changes.append(_change(entity, clip_id, "modified", prev, (clip, row_id)))
+            for clip_id, prev in before.items():
+                if clip_id not in after:
+                    changes.append(_change(entity, clip_id, "deleted", prev, None))
+
+        row_entities: tuple[tuple[ClipKind, str], ...] = (
+            ("video", "layer"),
+            ("audio", "audio_track"),
+        )
+        for kind, entity in row_entities:
+            before_rows = _rows_by_id(self.base, kind)
+            for row_id, row in _rows_by_id(self.working, kind).items():
+                prev_row = before_rows.get(row_id)
+                if prev_row is None:
+                    changes.append(
+                        ChangeDetail(
+                            entity_type=entity,  # type: ignore[arg-type]
+                            entity_id=row_id,
+                            change_type="created",
+                            after=row,
+                        )
+                    )
+                elif prev_row != row:
+                    changes.append(
+                        ChangeDetail(
+                            entity_type=entity,  # type: ignore[arg-type]
+                            entity_id=row_id,
+                            change_type="modified",
+                            before=prev_row,
+                            after=row,
+                        )
+                    )
+        return changes
+
+
+def _clips_by_id(timeline: dict[str, Any], kind: ClipKind) -> dict[str, tuple[dict[str, Any], str]]:
+    result: dict[str, tuple[dict[str, Any], str]] = {}
+    for row in timeline.get(ROW_KEYS[kind]) or []:
+        for clip in row.get("clips") or []:
+            result.setdefault(clip.get("id", ""), (clip, row.get("id", "")))
+    return result
+
+
+def _rows_by_id(timeline: dict[str, Any], kind: ClipKind) -> dict[str, dict[str, Any]]:
+    """Row properties without their clip lists (clips are diffed separately)."""
+    return {
+        row.get("id", ""): {k: v for k, v in row.items() if k != "clips"}
+        for row in timeline.get(ROW_KEYS[kind]) or []
+    }
+
+
+def _change(
+    entity: str,
+    clip_id: str,
+    change_type: Literal["created", "modified", "deleted"],
+    before: tuple[dict[str, Any], str] | None,
+    after: tuple[dict[str, Any], str] | None,
+) -> ChangeDetail:
+    container_key = "layer_id" if entity == "clip" else "track_id"
+
+    def snapshot(entry: tuple[dict[str, Any], str] | None) -> dict[str, Any] | None:
+        if entry is None:
+            return None
+        clip, row_id = entry
+        return {**clip, container_key: row_id}
+
+    return ChangeDetail(
+        entity_type=entity,  # type: ignore[arg-type]
+        entity_id=clip_id,
+        change_type=change_type,
+        before=snapshot(before),
+        after=snapshot(after),
+    )
+
+
+# =============================================================================
+# Single-pass request preparation
+# =============================================================================
+
+
+@dataclass
+class PreparedOperation:
+    """A batch operation with its request parsed (or its validation error)."""
+
+    op: BatchClipOperation
+    request: Any = None
+    error: Exception | None = None
+
+
+def _require_clip_id(op: BatchClipOperation, message: str) -> None:
+    if not op.clip_id:
+        raise ValueError(message)
+
+
+def _reject_audio(op: BatchClipOperation, name: str) -> None:
+    if op.clip_type == "audio":
+        raise ValueError(f"{name} does not support audio clips")
+
+
+def _prepare_request(op: BatchClipOperation) -> Any:
+    """Validate ``op`` and build its request model.
+
+    Checks run in the same order, with the same messages, as the original
+    per-op dispatch so batch error reporting is unchanged.
+    """
+    if op.operation == "add":
+        if op.clip_type == "video":
+            unified = UnifiedClipInput.model_validate(op.data)
+            return AddClipRequest(**unified.to_flat_dict())
+        return AddAudioClipRequest(**op.data)
+
+    if op.operation == "move":
+        _require_clip_id(op, "clip_id required for move operation")
+        move_data = dict(op.data)
+        if "new_start_ms" not in move_data:
+            raise ValueError(
+                "new_start_ms is required for move operation. "
+                "Place it inside the 'data' field: "
+                '{"operation": "move", "clip_id": "...", "data": {"new_start_ms": 5000}}'
+            )
+        if op.clip_type == "video":
+            return MoveClipRequest(**move_data)
+        return MoveAudioClipRequest(**move_data)
+
+    if op.operation == "update_transform":
+        _require_clip_id(op, "clip_id required for update_transform")
+        _reject_audio(op, "update_transform")
+        unified_transform = UnifiedTransformInput.model_validate(op.data)
+        return UpdateClipTransformRequest(**unified_transform.to_flat_dict())
+
+    if op.operation == "update_effects":
+        _require_clip_id(op, "clip_id required for update_effects")
+        _reject_audio(op, "update_effects")
+        return UpdateClipEffectsRequest(**op.data)
+
+    if op.operation == "trim":
+        _require_clip_id(op, "clip_id required for trim operation")
+        duration_ms = op.data.get("duration_ms")
+        if duration_ms is None:
+            raise ValueError("duration_ms required for trim operation")
+        return duration_ms
+
+    if op.operation == "delete":
+        _require_clip_id(op, "clip_id required for delete operation")
+        return None
+
+    if op.operation == "update_text_style":
+        _require_clip_id(op, "clip_id required for update_text_style")
+        _reject_audio(op, "update_text_style")
+        # Support both nested {"text_style": {...}} and flat {"font_size": 48}
+        return UpdateClipTextStyleRequest(**op.data.get("text_style", op.data))
+
+    if op.operation == "update_text":
+        _require_clip_id(op, "clip_id required for update_text")
+        _reject_audio(op, "update_text")
+        return UpdateClipTextRequest(**op.data)
+
+    if op.operation == "split":
+        _require_clip_id(op, "clip_id required for split")
+        _reject_audio(op, "split")
+        return SplitClipRequest(**op.data)
+
+    if op.operation == "update_layer":
+        layer_id = op.layer_id or op.data.get("layer_id")
+        if not layer_id:
+            raise ValueError("layer_id required for update_layer operation")
+        return layer_id
+
+    return None
+
+
+def prepare_operations(operations: list[BatchClipOperation]) -> list[PreparedOperation]:
+    """Validate every operation once, up front."""
+    prepared: list[PreparedOperation] = []
+    for op in operations:
+        try:
+            prepared.append(PreparedOperation(op=op, request=_prepare_request(op)))
+        except Exception as exc:
+            prepared.append(PreparedOperation(op=op, error=exc))
+    return prepared
+
+
+# =============================================================================
+# Asset prefetch
+# =============================================================================
+
+
+@dataclass
+class BatchSession:
+    """State shared by the editor's helpers while a batch executes."""
+
+    journal: TimelineJournal
+    assets: dict[str, Asset | None] = field(default_factory=dict)
+    linked_audio: dict[str, Asset | None] = field(default_factory=dict)
+    duration_dirty: bool = False
+
+
+def referenced_asset_ids(
+    prepared: list[PreparedOperation], journal: TimelineJournal
+) -> tuple[set[str], set[str]]:
+    """Return (asset ids, video asset ids needing a linked-audio lookup)."""
+    asset_ids: set[str] = set()
+    linked_ids: set[str] = set()
+    for item in prepared:
+        if item.error is not None:
+            continue
+        req = item.request
+        if isinstance(req, AddClipRequest | AddAudioClipRequest) and req.asset_id:
+            asset_ids.add(str(req.asset_id))
+            if isinstance(req, AddClipRequest) and not req.text_content:
+                linked_ids.add(str(req.asset_id))
+        elif item.op.clip_id:
+            kind: ClipKind = "audio" if item.op.clip_type == "audio" else "video"
+            clip = journal.peek_clip(kind, item.op.clip_id)
+            if clip is not None and clip.get("asset_id"):
+                asset_ids.add(str(clip["asset_id"]))
+    return asset_ids, linked_ids
+
+
+def _as_uuids(ids: set[str]) -> dict[uuid.UUID, str]:
+    parsed: dict[uuid.UUID, str] = {}
+    for raw in ids:
+        try:
+            parsed[uuid.UUID(raw)] = raw
+        except (ValueError, TypeError):
+            continue
+    return parsed
+
+
+async def prefetch_assets(
+    db: AsyncSession,
+    asset_ids: set[str],
+    linked_video_ids: set[str],
+    *,
+    include_linked: bool = True,
+) -> tuple[dict[str, Asset | None], dict[str, Asset | None]]:
+    """Load referenced assets and linked audio assets in one query each.
+
+    Every requested id gets an entry (``None`` when missing or not a UUID)
+    so later lookups never fall through to the database.
+    """
+    assets: dict[str, Asset | None] = dict.fromkeys(asset_ids)
+    by_uuid = _as_uuids(asset_ids)
+    if by_uuid:
+        result = await db.execute(select(Asset).where(Asset.id.in_(list(by_uuid))))
+        for asset in result.scalars():
+            assets[by_uuid[asset.id]] = asset
+
+    linked: dict[str, Asset | None] = {}
+    if include_linked and linked_video_ids:
+        linked = dict.fromkeys(linked_video_ids)
+        linked_uuids = _as_uuids(linked_video_ids)
+        if linked_uuids:
+            result = await db.execute(
+                select(Asset).where(
+                    Asset.source_asset_id.in_(list(linked_uuids)),
+                    Asset.type == "audio",
+                )
+            )
+            for asset in result.scalars():
+                if asset.source_asset_id is None:
+                    continue
+                source = linked_uuids.get(asset.source_asset_id)
+                if source is not None and linked.get(source) is None:
+                    linked[source] = asset
+    return assets, linked
+
+
+def active_batch_session(service: Any, timeline: Any) -> BatchSession | None:
+    """Return the running batch session if ``timeline`` is its working copy."""
+    session: BatchSession | None = getattr(service, "_batch_session", None)
+    if session is not None and session.journal.is_working(timeline):
+        return session
+    return None
@@ -56,11 +56,17 @@ class ChatMixin:
         # Use project-level API key if available, otherwise use environment settings
         project_api_key = decrypt_field(getattr(project, "ai_api_key", None))
 
-        # Build timeline context with assets for filename → UUID mapping
+        # Build budgeted timeline context with assets for filename → UUID mapping
         timeline = context_source.timeline_data or {}
         assets = await self._get_project_assets(project.id)
-        context = self._build_chat_context(context_source, timeline, assets)
-        system_prompt = self._build_chat_system_prompt(context)
+        system_prompt = self._build_chat_prompt(
+            context_source,
+            timeline,
+            assets,
+            message=message,
+            history=history,
+            sequence_id=getattr(timeline_target, "id", None),
+        )
 
         # Route to the appropriate provider (project API key takes priority)
         if active_provider == "openai":
@@ -221,6 +227,21 @@ class ChatMixin:
         """Build the system prompt. Delegates to LLMGateway."""
         return self._llm.build_chat_system_prompt(context)
 
+    def _build_chat_prompt(
+        self: Any,
+        project: Project,
+        timeline: dict,
+        assets: list[Asset] | None = None,
+        *,
+        message: str = "",
+        history: list[ChatMessage] | None = None,
+        sequence_id: Any | None = None,
+    ) -> str:
+        """Build the token-budgeted system prompt. Delegates to LLMGateway."""
+        return self._llm.build_chat_prompt(
+            project, timeline, assets, message=message, history=history, sequence_id=sequence_id
+        )
+
     async def _execute_chat_operations_on_project(
         self, project: Project, operations: list[dict]
     ) -> list[ChatAction]:
@@ -279,11 +300,17 @@ class ChatMixin:
         # Use project-level API key if available
         project_api_key = decrypt_field(getattr(project, "ai_api_key", None))
 
-        # Build timeline context with assets for filename → UUID mapping
+        # Build budgeted timeline context with assets for filename → UUID mapping
         timeline = context_source.timeline_data or {}
         assets = await self._get_project_assets(project.id)
-        context = self._build_chat_context(context_source, timeline, assets)
-        system_prompt = self._build_chat_system_prompt(context)
+        system_prompt = self._build_chat_prompt(
+            context_source,
+            timeline,
+            assets,
+            message=message,
+            history=history,
+            sequence_id=getattr(timeline_target, "id", None),
+        )
 
         # Route to the appropriate provider
         if active_provider == "openai":
@@ -0,0 +1,527 @@
+"""Token-budgeted, incremental chat context.
+
+``LLMGateway.build_chat_context`` serializes every clip and asset of the
+project on every turn, so prompt size (and latency / cost) grows with the
+timeline.  :class:`ChatContextBuilder` instead produces a :class:`ChatPrompt`
+in three parts, ordered from most to least stable:
+
+1. **Stable prefix** — rules, project header, asset catalog and the layer /
+   track skeleton.  Identical across turns until assets or layers change.
+2. **Clip snapshot** — clip lines as of the last rebase, windowed around the
+   region under discussion (times and clip ids mentioned in the message)
+   so the whole context fits ``budget_tokens``.  Distant clips are folded
+   into per-layer "omitted" summaries.
+3. **Changes since snapshot** — the clips added, changed or removed since
+   the snapshot was taken.
+
+Parts 1 and 2 are byte-identical between turns until the next rebase, so
+providers with prefix caching reuse them: Anthropic via explicit
+``cache_control`` breakpoints (:meth:`ChatPrompt.anthropic_system`), OpenAI
+and Gemini implicitly because the prefix comes first.  Snapshots live in a
+per-instance LRU; a miss just means the next prompt carries a fresh snapshot
+and no diff.  The snapshot is rebased when the diff outgrows
+``rebase_ratio`` of it or the budget would be exceeded.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import math
+import re
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Iterable, Sequence
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+
+from src.services.ai.utils import _escape_user_string
+from src.utils.metrics import metrics
+
+if TYPE_CHECKING:
+    from src.models.asset import Asset
+    from src.schemas.ai import ChatMessage
+
+ClipSummarizer = Callable[[dict[str, Any]], str]
+
+# Share of the budget the asset catalog may use before it is truncated
+_ASSET_BUDGET_SHARE = 0.3
+
+_CLOCK_RE = re.compile(r"(?<![\d:])(\d{1,3}):([0-5]\d)(?:\.(\d{1,3}))?(?![\d:])")
+_DURATION_RE = re.compile(
+    r"(\d+(?:\.\d+)?)\s*(ms|ミリ秒|秒|sec(?:onds?)?|s)(?![A-Za-z])", re.IGNORECASE
+)
+_SHORT_ID_RE = re.compile(r"\b[0-9a-f]{8}\b")
+# Leading list marker of a serialized clip line ("  - id=...")
+_LIST_MARKER_RE = re.compile(r"^\s*(?:[-*]\s+)?")
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate: ~4 ASCII chars per token, one token per other char."""
+    ascii_chars = len(text.encode("ascii", "ignore"))
+    return math.ceil(ascii_chars / 4) + (len(text) - ascii_chars)
+
+
+class ChatPrompt(str):
+    """A system prompt that remembers which leading blocks are cacheable.
+
+    It *is* the full prompt string, so providers without cache markup (and
+    existing callers) use it unchanged.
+    """
+
+    blocks: tuple[tuple[str, bool], ...]
+
+    def __new__(cls, blocks: Sequence[tuple[str, bool]]) -> ChatPrompt:
+        prompt = super().__new__(cls, "".join(text for text, _ in blocks))
+        prompt.blocks = tuple((text, cache) for text, cache in blocks if text)
+        return prompt
+
+    def anthropic_system(self) -> list[dict[str, Any]]:
+        """System blocks with ``cache_control`` on each cacheable block."""
+        return [
+            {"type": "text", "text": text, "cache_control": {"type": "ephemeral"}}
+            if cache
+            else {"type": "text", "text": text}
+            for text, cache in self.blocks
+        ]
+
+
+def anthropic_system(prompt: str) -> str | list[dict[str, Any]]:
+    """Value for Anthropic's ``system`` field: cache blocks when available."""
+    return prompt.anthropic_system() if isinstance(prompt, ChatPrompt) else prompt
+
+
+# ----------------------------------------------------------------------
+# Clip lines and focus
+# ----------------------------------------------------------------------
+
+
+@dataclass(frozen=True)
+class ClipLine:
+    """One serialized clip, keyed by its container and clip id.
+
+    ``text`` is the line as listed in the snapshot; ``body`` is the same line
+    without its list marker, which diffs re-prefix with their own marker.
+    """
+
+    key: str
+    group: str
+    start_ms: int
+    end_ms: int
+    text: str
+    body: str
+    tokens: int
+
+
+@dataclass(frozen=True)
+class _Group:
+    key: str
+    header: str
+    clip_count: int
+
+
+def _short_id(value: Any) -> str:
+    return str(value or "?")[:8]
+
+
+def collect_clip_lines(
+    timeline: dict[str, Any], summarize_clip: ClipSummarizer
+) -> tuple[list[_Group], list[ClipLine]]:
+    """Serialize every clip of ``timeline`` in display order."""
+    groups: list[_Group] = []
+    lines: list[ClipLine] = []
+
+    def _add(
+        group_key: str, header: str, clips: list[dict[str, Any]], render: ClipSummarizer
+    ) -> None:
+        groups.append(_Group(group_key, header, len(clips)))
+        for clip in clips:
+            start = int(clip.get("start_ms", 0) or 0)
+            text = render(clip)
+            lines.append(
+                ClipLine(
+                    key=f"{group_key}/{clip.get('id', '?')}",
+                    group=group_key,
+                    start_ms=start,
+                    end_ms=start + int(clip.get("duration_ms", 0) or 0),
+                    text=text,
+                    body=_LIST_MARKER_RE.sub("", text, count=1),
+                    tokens=estimate_tokens(text) + 1,
+                )
+            )
+
+    for layer in timeline.get("layers", []):
+        layer_id = _short_id(layer.get("id", ""))
+        header = f"Layer {_escape_user_string(layer.get('name', ''))} (id={layer_id})"
+        _add(f"L{layer_id}", header, layer.get("clips", []), summarize_clip)
+
+    def _audio_line(clip: dict[str, Any]) -> str:
+        return (
+            f"  - id={_short_id(clip.get('id'))} start={clip.get('start_ms', 0)}ms "
+            f"dur={clip.get('duration_ms', 0)}ms"
+        )
+
+    for track in timeline.get("audio_tracks", []):
+        track_id = _short_id(track.get("id", ""))
+        header = f"Audio {_escape_user_string(track.get('type', ''))} (id={track_id})"
+        _add(f"A{track_id}", header, track.get("clips", []), _audio_line)
+
+    return groups, lines
+
+
+def focus_points(texts: Iterable[str], lines: Sequence[ClipLine]) -> list[int]:
+    """Timeline positions (ms) referenced by ``texts``: times and clip ids."""
+    starts_by_id: dict[str, int] = {}
+    for line in lines:
+        starts_by_id.setdefault(line.key.rsplit("/", 1)[-1][:8], line.start_ms)
+
+    points: list[int] = []
+    for text in texts:
+        for minutes, seconds, frac in _CLOCK_RE.findall(text):
+            ms = (int(minutes) * 60 + int(seconds)) * 1000
+            points.append(ms + (int(frac.ljust(3, "0")) if frac else 0))
+        for value, unit in _DURATION_RE.findall(text):
+            scale = 1 if unit.lower() in ("ms", "ミリ秒") else 1000
+            points.append(int(float(value) * scale))
+        for short_id in _SHORT_ID_RE.findall(text.lower()):
+            if short_id in starts_by_id:
+                points.append(starts_by_id[short_id])
+    return points
+
+
+def _distance(line: ClipLine, points: Sequence[int]) -> int:
+    """Distance from the clip's [start, end] interval to the nearest point."""
+    return min(max(line.start_ms - p, p - line.end_ms, 0) for p in points)
+
+
+def select_window(lines: Sequence[ClipLine], points: Sequence[int], budget: int) -> set[str]:
+    """Keys of the clips nearest ``points`` (earliest first without any) that fit."""
+    if points:
+        ranked = sorted(lines, key=lambda line: (_distance(line, points), line.start_ms))
+    else:
+        ranked = sorted(lines, key=lambda line: line.start_ms)
+    chosen: set[str] = set()
+    used = 0
+    for line in ranked:
+        if used + line.tokens > budget:
+            break
+        chosen.add(line.key)
+        used += line.tokens
+    return chosen
+
+
+def render_clip_section(
+    groups: Sequence[_Group], lines: Sequence[ClipLine], visible: set[str]
+) -> str:
+    """Per-layer clip lines, with runs of hidden clips folded into one note."""
+    by_group: dict[str, list[ClipLine]] = {}
+    for line in lines:
+        by_group.setdefault(line.group, []).append(line)
+
+    out: list[str] = []
+    for group in groups:
+        out.append(f"{group.header} clips={group.clip_count}:")
+        hidden: list[ClipLine] = []
+        for line in by_group.get(group.key, []):
+            if line.key in visible:
+                if hidden:
+                    out.append(_omitted(hidden))
+                    hidden = []
+                out.append(line.text)
+            else:
+                hidden.append(line)
+        if hidden:
+            out.append(_omitted(hidden))
+    return "\n".join(out) if out else "  (empty)"
+
+
+def _omitted(hidden: Sequence[ClipLine]) -> str:
+    return f"  … {_omitted_summary(hidden)}"
+
+
+def _omitted_summary(hidden: Sequence[ClipLine]) -> str:
+    start = min(line.start_ms for line in hidden)
+    end = max(line.end_ms for line in hidden)
+    return f"{len(hidden)} clips omitted ({start}ms–{end}ms)"
+
+
+# ----------------------------------------------------------------------
+# Clip views and diffs
+# ----------------------------------------------------------------------
+
+
+@dataclass(frozen=True)
+class DiffEntry:
+    """One change between two :class:`ClipView` objects.
+
+    ``op`` is ``removed``, ``changed`` or ``added`` for a clip (``key`` is the
+    clip key, ``body`` its new line body) and ``omitted`` for a group whose
+    hidden clips changed (``key`` is the group key, ``body`` the new summary,
+    empty when nothing is hidden any more).
+    """
+
+    op: str
+    key: str
+    body: str = ""
+
+
+@dataclass(frozen=True)
+class ClipView:
+    """What the model is told about clips: visible line bodies and hidden totals."""
+
+    visible: dict[str, str]  # clip key -> body
+    omitted: dict[str, str]  # group key -> summary of its hidden clips
+
+    def apply(self, entries: Iterable[DiffEntry]) -> ClipView:
+        """The view a reader holds after reading ``entries`` on top of this one."""
+        visible = dict(self.visible)
+        omitted = dict(self.omitted)
+        for entry in entries:
+            if entry.op == "removed":
+                visible.pop(entry.key, None)
+            elif entry.op in ("changed", "added"):
+                visible[entry.key] = entry.body
+            elif entry.body:
+                omitted[entry.key] = entry.body
+            else:
+                omitted.pop(entry.key, None)
+        return ClipView(visible, omitted)
+
+
+def clip_view(lines: Sequence[ClipLine], visible: set[str]) -> ClipView:
+    """The view a full rendering of ``lines`` showing ``visible`` conveys."""
+    hidden: dict[str, list[ClipLine]] = {}
+    for line in lines:
+        if line.key not in visible:
+            hidden.setdefault(line.group, []).append(line)
+    return ClipView(
+        visible={line.key: line.body for line in lines if line.key in visible},
+        omitted={group: _omitted_summary(group_lines) for group, group_lines in hidden.items()},
+    )
+
+
+def diff_views(old: ClipView, new: ClipView) -> list[DiffEntry]:
+    """Entries that turn ``old`` into ``new`` (``old.apply(entries) == new``)."""
+    entries: list[DiffEntry] = []
+    for key, body in old.visible.items():
+        if key not in new.visible:
+            entries.append(DiffEntry("removed", key))
+        elif new.visible[key] != body:
+            entries.append(DiffEntry("changed", key, new.visible[key]))
+    entries.extend(
+        DiffEntry("added", key, body) for key, body in new.visible.items() if key not in old.visible
+    )
+    for group in [*new.omitted, *(g for g in old.omitted if g not in new.omitted)]:
+        summary = new.omitted.get(group, "")
+        if old.omitted.get(group, "") != summary:
+            entries.append(DiffEntry("omitted", group, summary))
+    return entries
+
+
+def _render_entry(entry: DiffEntry, headers: dict[str, str]) -> str:
+    if entry.op == "removed":
+        return f"  - id={entry.key.rsplit('/', 1)[-1][:8]} (removed)"
+    if entry.op == "changed":
+        return f"  ~ {entry.body}"
+    if entry.op == "added":
+        return f"  + {entry.body}"
+    return f"  ~ {headers.get(entry.key, entry.key)}: {entry.body or 'no clips omitted'}"
+
+
+# ----------------------------------------------------------------------
+# Snapshots
+# ----------------------------------------------------------------------
+
+
+@dataclass(frozen=True)
+class ContextSnapshot:
+    """Clip lines the model was last given in full, plus their rendering."""
+
+    stable_digest: str
+    view: ClipView
+    known: frozenset[str]  # every clip key on the timeline at snapshot time
+    rendered: str
+    tokens: int
+
+
+class ContextSnapshotStore:
+    """Bounded LRU of the last clip snapshot per chat context (project/sequence)."""
+
+    def __init__(self, max_entries: int = 256) -> None:
+        self._max_entries = max_entries
+        self._entries: OrderedDict[str, ContextSnapshot] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> ContextSnapshot | None:
+        with self._lock:
+            snapshot = self._entries.get(key)
+            if snapshot is not None:
+                self._entries.move_to_end(key)
+            return snapshot
+
+    def put(self, key: str, snapshot: ContextSnapshot) -> None:
+        with self._lock:
+            self._entries[key] = snapshot
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+# ----------------------------------------------------------------------
+# Builder
+# ----------------------------------------------------------------------
+
+
+class ChatContextBuilder:
+    """Builds budgeted :class:`ChatPrompt` objects, diffing against snapshots."""
+
+    def __init__(
+        self,
+        summarize_clip: ClipSummarizer,
+        *,
+        budget_tokens: int = 6000,
+        rebase_ratio: float = 0.25,
+        snapshots: ContextSnapshotStore | None = None,
+    ) -> None:
+        self._summarize_clip = summarize_clip
+        self.budget_tokens = budget_tokens
+        self.rebase_ratio = rebase_ratio
+        self._snapshots = snapshots if snapshots is not None else chat_context_snapshots
+
+    def build(
+        self,
+        context_key: str,
+        project: Any,
+        timeline: dict[str, Any],
+        assets: Sequence[Asset] | None,
+        *,
+        preamble: str,
+        message: str = "",
+        history: Sequence[ChatMessage] = (),
+    ) -> ChatPrompt:
+        groups, lines = collect_clip_lines(timeline, self._summarize_clip)
+        stable = self._stable_section(project, timeline, groups, assets or [], lines)
+        stable_block = f"{preamble}\n\n{stable}"
+        remaining = self.budget_tokens - estimate_tokens(stable_block)
+
+        stable_digest = hashlib.sha256(stable_block.encode()).hexdigest()
+        snapshot = self._snapshots.get(context_key)
+        diff = None
+        if snapshot is not None and snapshot.stable_digest == stable_digest:
+            diff = self._diff(snapshot, groups, lines, message, history, remaining)
+
+        if snapshot is None or diff is None:
+            metrics.incr("chat.context.snapshot.miss")
+            recent = [message] + [m.content for m in list(history)[-4:] if m.role == "user"]
+            # Leave the diff the headroom it may grow to before a rebase
+            window_budget = int(remaining / (1 + self.rebase_ratio))
+            visible = select_window(lines, focus_points(recent, lines), window_budget)
+            rendered = render_clip_section(groups, lines, visible)
+            snapshot = ContextSnapshot(
+                stable_digest=stable_digest,
+                view=clip_view(lines, visible),
+                known=frozenset(line.key for line in lines),
+                rendered=rendered,
+                tokens=estimate_tokens(rendered),
+            )
+            self._snapshots.put(context_key, snapshot)
+            diff = ""
+        else:
+            metrics.incr("chat.context.snapshot.hit")
+
+        dynamic = f"\n\n## Current State\nDuration: {getattr(project, 'duration_ms', 0)}ms"
+        if diff:
+            dynamic += f"\n\n## Changes since snapshot (override the snapshot)\n{diff}"
+        prompt = ChatPrompt(
+            [
+                (stable_block, True),
+                (f"\n\n## Clip Snapshot\n{snapshot.rendered}", True),
+                (dynamic, False),
+            ]
+        )
+        metrics.observe("chat.context.tokens", estimate_tokens(prompt))
+        return prompt
+
+    def _stable_section(
+        self,
+        project: Any,
+        timeline: dict[str, Any],
+        groups: Sequence[_Group],
+        assets: Sequence[Asset],
+        lines: Sequence[ClipLine],
+    ) -> str:
+        parts = [
+            "## 現在のプロジェクト状態",
+            f"Project: {_escape_user_string(project.name)}",
+            f"Resolution: {project.width}x{project.height}",
+        ]
+        if assets:
+            parts.append("\n## Available Assets (use asset_id for operations)")
+            parts.append(self._asset_catalog(timeline, assets))
+        parts.append("\n## Timeline Structure")
+        skeleton = [group.header for group in groups]
+        parts.append("\n".join(f"  - {header}" for header in skeleton) or "  (empty)")
+        return "\n".join(parts)
+
+    def _asset_catalog(self, timeline: dict[str, Any], assets: Sequence[Asset]) -> str:
+        """Asset lines, assets used on the timeline first, truncated to a budget share."""
+        used = {
+            str(clip.get("asset_id"))
+            for container in ("layers", "audio_tracks")
+            for group in timeline.get(container, [])
+            for clip in group.get("clips", [])
+            if clip.get("asset_id")
+        }
+        ordered = sorted(assets, key=lambda asset: str(asset.id) not in used)
+        limit = int(self.budget_tokens * _ASSET_BUDGET_SHARE)
+        out: list[str] = []
+        spent = 0
+        for index, asset in enumerate(ordered):
+            line = (
+                f"  - name={_escape_user_string(asset.name)} type={asset.type} asset_id={asset.id}"
+            )
+            spent += estimate_tokens(line) + 1
+            if spent > limit and out:
+                out.append(f"  … {len(ordered) - index} more assets not listed")
+                break
+            out.append(line)
+        return "\n".join(out)
+
+    def _diff(
+        self,
+        snapshot: ContextSnapshot,
+        groups: Sequence[_Group],
+        lines: Sequence[ClipLine],
+        message: str,
+        history: Sequence[ChatMessage],
+        remaining: int,
+    ) -> str | None:
+        """Diff lines against ``snapshot``, or None when it should be rebased.
+
+        The diff is what turns the snapshot's view into the view a full
+        rebuild showing the same clips would give, omitted summaries included.
+        """
+        current = {line.key for line in lines}
+        # Clips the conversation now points at that the snapshot did not show
+        recent = [message] + [m.content for m in list(history)[-2:] if m.role == "user"]
+        points = focus_points(recent, lines)
+        diff_budget = remaining - snapshot.tokens
+        visible = {key for key in current if key not in snapshot.known}
+        if points:
+            visible |= select_window(lines, points, max(0, diff_budget // 2))
+        visible |= current.intersection(snapshot.view.visible)
+
+        headers = {group.key: group.header for group in groups}
+        entries = diff_views(snapshot.view, clip_view(lines, visible))
+        diff = "\n".join(_render_entry(entry, headers) for entry in entries)
+        tokens = estimate_tokens(diff)
+        if tokens > max(64, snapshot.tokens * self.rebase_ratio) or tokens > diff_budget:
+            return None
+        return diff
+
+
+# Process-wide instance
+chat_context_snapshots = ContextSnapshotStore()
@@ -0,0 +1,259 @@
+"""Process-wide pooled HTTP clients for LLM providers.
+
+``LLMGateway`` used to open a fresh ``httpx.AsyncClient`` per call, so every
+chat turn (and every round of a streamed tool loop) paid DNS + TCP + TLS
+setup to the provider.  :class:`LLMHttpPool` keeps one long-lived client per
+provider instead:
+
+- keep-alive connections with a per-provider connection limit;
+- HTTP/2 when the optional ``h2`` package is installed (HTTP/1.1 otherwise);
+- retry with exponential backoff for 429 / 5xx and connection failures,
+  honoring ``Retry-After`` (delays longer than ``retry_max_delay_s`` are not
+  waited for — the error response is returned to the caller as before);
+- timing metrics per provider: ``llm.<provider>.ttfb_ms`` (request sent →
+  response headers) and ``llm.<provider>.tokens_per_s`` (output tokens over
+  generation time).
+
+Base URLs come from settings so the pool can be pointed at a local mock
+provider; tests can also inject an ``httpx`` transport directly.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import importlib.util
+import logging
+import random
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import asynccontextmanager
+from datetime import UTC, datetime
+from email.utils import parsedate_to_datetime
+from typing import Any, Literal
+
+import httpx
+
+from src.config import get_settings
+from src.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+Provider = Literal["openai", "gemini", "anthropic"]
+
+RETRYABLE_STATUS = frozenset({429, 500, 502, 503, 504})
+
+
+def http2_available() -> bool:
+    """HTTP/2 needs the optional ``h2`` package (``httpx[http2]``)."""
+    return importlib.util.find_spec("h2") is not None
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Parse a ``Retry-After`` header (delta-seconds or HTTP-date) into seconds."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=UTC)
+    return max(0.0, (when - datetime.now(UTC)).total_seconds())
+
+
+def output_tokens(provider: Provider, payload: dict[str, Any]) -> int | None:
+    """Output token count reported in a non-streaming provider response."""
+    if provider == "openai":
+        value = (payload.get("usage") or {}).get("completion_tokens")
+    elif provider == "anthropic":
+        value = (payload.get("usage") or {}).get("output_tokens")
+    else:
+        value = (payload.get("usageMetadata") or {}).get("candidatesTokenCount")
+    return value if isinstance(value, int) else None
+
+
+class StreamMeter:
+    """Counts streamed output tokens; the pool turns them into tokens/sec."""
+
+    def __init__(self, provider: Provider, first_byte_at: float) -> None:
+        self.provider = provider
+        self.first_byte_at = first_byte_at
+        self.tokens = 0
+
+    def add(self, tokens: int = 1) -> None:
+        self.tokens += tokens
+
+    def finish(self, now: float) -> None:
+        elapsed = now - self.first_byte_at
+        if self.tokens and elapsed > 0:
+            metrics.observe(f"llm.{self.provider}.tokens_per_s", self.tokens / elapsed)
+
+
+class LLMHttpPool:
+    """One keep-alive ``httpx.AsyncClient`` per provider, with retry and timing."""
+
+    def __init__(
+        self,
+        base_urls: dict[Provider, str],
+        *,
+        max_connections: int = 20,
+        max_retries: int = 2,
+        retry_base_delay_s: float = 0.5,
+        retry_max_delay_s: float = 30.0,
+        timeout_s: float = 180.0,
+        transport: httpx.AsyncBaseTransport | None = None,
+        sleep: Callable[[float], Awaitable[Any]] = asyncio.sleep,
+    ) -> None:
+        self._base_urls = dict(base_urls)
+        self.max_connections = max_connections
+        self.max_retries = max_retries
+        self.retry_base_delay_s = retry_base_delay_s
+        self.retry_max_delay_s = retry_max_delay_s
+        self.timeout_s = timeout_s
+        self._transport = transport
+        self._sleep = sleep
+        self._clients: dict[Provider, httpx.AsyncClient] = {}
+
+    @classmethod
+    def from_settings(cls) -> LLMHttpPool:
+        settings = get_settings()
+        return cls(
+            {
+                "openai": settings.openai_base_url,
+                "gemini": settings.gemini_base_url,
+                "anthropic": settings.anthropic_base_url,
+            },
+            max_connections=settings.llm_max_connections_per_provider,
+            max_retries=settings.llm_max_retries,
+            retry_max_delay_s=settings.llm_retry_max_delay_seconds,
+        )
+
+    def client(self, provider: Provider) -> httpx.AsyncClient:
+        """Return the shared client for ``provider``, creating it on first use."""
+        client = self._clients.get(provider)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(
+                base_url=self._base_urls[provider],
+                timeout=self.timeout_s,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                    keepalive_expiry=60.0,
+                ),
+                http2=self._transport is None and http2_available(),
+                transport=self._transport,
+            )
+            self._clients[provider] = client
+        return client
+
+    async def aclose(self) -> None:
+        clients, self._clients = list(self._clients.values()), {}
+        for client in clients:
+            await client.aclose()
+
+    # ------------------------------------------------------------------
+    # Requests
+    # ------------------------------------------------------------------
+
+    async def post(
+        self,
+        provider: Provider,
+        path: str,
+        *,
+        headers: dict[str, str],
+        json: dict[str, Any],
+        params: dict[str, str] | None = None,
+    ) -> httpx.Response:
+        """POST and read the full body; retries transient failures."""
+        response, sent_at = await self._send(
+            provider, path, headers=headers, json=json, params=params
+        )
+        try:
+            await response.aread()
+        finally:
+            await response.aclose()
+        if response.status_code == 200:
+            # Non-streaming providers generate before replying: time the whole attempt
+            self._observe_throughput(provider, response, time.monotonic() - sent_at)
+        return response
+
+    @asynccontextmanager
+    async def stream(
+        self,
+        provider: Provider,
+        path: str,
+        *,
+        headers: dict[str, str],
+        json: dict[str, Any],
+        params: dict[str, str] | None = None,
+    ) -> AsyncIterator[tuple[httpx.Response, StreamMeter]]:
+        """Open a streaming POST.  Only the request is retried, never a started stream."""
+        response, _ = await self._send(provider, path, headers=headers, json=json, params=params)
+        meter = StreamMeter(provider, time.monotonic())
+        try:
+            yield response, meter
+        finally:
+            await response.aclose()
+            meter.finish(time.monotonic())
+
+    async def _send(
+        self,
+        provider: Provider,
+        path: str,
+        *,
+        headers: dict[str, str],
+        json: dict[str, Any],
+        params: dict[str, str] | None,
+    ) -> tuple[httpx.Response, float]:
+        """Send with retries; returns the final response and when it was sent."""
+        client = self.client(provider)
+        attempt = 0
+        while True:
+            request = client.build_request("POST", path, headers=headers, json=json, params=params)
+            started = time.monotonic()
+            try:
+                response = await client.send(request, stream=True)
+            except (httpx.ConnectError, httpx.ConnectTimeout):
+                # Nothing reached the provider, so the request is safe to resend
+                delay = self._backoff(attempt)
+                if attempt >= self.max_retries:
+                    raise
+                logger.warning("[LLM] %s connect failed; retrying in %.1fs", provider, delay)
+            else:
+                metrics.observe(f"llm.{provider}.ttfb_ms", (time.monotonic() - started) * 1000)
+                if response.status_code not in RETRYABLE_STATUS or attempt >= self.max_retries:
+                    return response, started
+                retry_after = parse_retry_after(response.headers.get("retry-after"))
+                delay = retry_after if retry_after is not None else self._backoff(attempt)
+                if delay > self.retry_max_delay_s:
+                    return response, started
+                await response.aclose()
+                logger.warning(
+                    "[LLM] %s HTTP %d; retrying in %.1fs", provider, response.status_code, delay
+                )
+            metrics.incr(f"llm.{provider}.retries")
+            attempt += 1
+            await self._sleep(delay)
+
+    def _backoff(self, attempt: int) -> float:
+        """Exponential backoff with full jitter, capped at ``retry_max_delay_s``."""
+        ceiling = min(self.retry_max_delay_s, self.retry_base_delay_s * 2**attempt)
+        return random.uniform(0, ceiling)
+
+    @staticmethod
+    def _observe_throughput(provider: Provider, response: httpx.Response, elapsed: float) -> None:
+        try:
+            tokens = output_tokens(provider, response.json())
+        except ValueError:
+            return
+        if tokens and elapsed > 0:
+            metrics.observe(f"llm.{provider}.tokens_per_s", tokens / elapsed)
+
+
+# Process-wide instance
+llm_http_pool = LLMHttpPool.from_settings()
@@ -2,7 +2,8 @@
 
 Handles:
 - Non-streaming chat calls to OpenAI / Gemini / Anthropic
-- Streaming SSE calls to OpenAI / Gemini / Anthropic
+- Streaming SSE calls to OpenAI / Gemini / Anthropic (both over the shared
+  keep-alive clients in ``http_pool``)
 - Project context serialization (clips → compact prompt text)
 - System-prompt construction
 - _build_chat_response helper
@@ -25,6 +26,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from src.config import get_settings
 from src.models.asset import Asset
 from src.schemas.ai import ChatAction, ChatMessage, ChatResponse
+from src.services.ai.chat_context import ChatContextBuilder, ChatPrompt, anthropic_system
+from src.services.ai.http_pool import llm_http_pool
 from src.services.ai.utils import _escape_user_string
 from src.services.chat_tools import (
     AnthropicToolAdapter,
@@ -37,6 +40,47 @@ if TYPE_CHECKING:
 
 logger = logging.getLogger(__name__)
 
+_CHAT_PROMPT_INTRO = """あなたは動画編集アプリ「douga」のAIアシスタントです。
+ユーザーのタイムライン編集指示を理解し、提供されたツールを使って操作を実行します。"""
+
+_CHAT_PROMPT_RULES = """## ルール
+- 日本語で応答してください
+- 編集操作が必要な場合は必ずツールを呼び出してください（テキストにJSONを出力しないでください）
+- 情報の質問のみの場合はツール呼び出し不要です
+- ユーザーの指示が曖昧な場合は確認してください
+
+## 重要: asset_id について
+- asset_id は必ず UUID 形式で指定してください（例: "6d591866-a838-46ff-a356-442b2bf2afeb"）
+- ファイル名（例: "video.mp4"）は使用できません
+- 「Available Assets」セクションからファイル名に対応する asset_id を確認してください
+
+## 重要: テキストオブジェクトの読み方
+- `type=text` の行がテキストオブジェクトです
+- `text_state=present` のときだけ `text="..."` を本文として扱ってください
+- `text_state=empty` は空文字、`text_state=unavailable` は取得不能です。推測で補完しないでください
+
+## 重要: execute_operations の使い方
+- 既存テキストの本文変更は `update_text` を使ってください（`delete` + `add` ではなく）
+- 既存テロップの色・背景色・背景透明度の変更は `update_text_style` を使ってください
+- 背景透明度の指定は 0.0-1.0 です（0%=0.0、50%=0.5、100%=1.0）
+- コンテキストに `bg_state=none` や `bg_state=unset` が出ているテキストは背景が見えません
+- 1つのテキストを2つに分ける場合は `split` を使い、`left_text_content` / `right_text_content` も指定できます
+- `clip_id` にはコンテキストに表示された `id=` の値をそのまま使ってください（短縮・変形しないこと）
+- move操作: `new_start_ms` は必須です
+- add操作の `data`: layer_id, start_ms, duration_ms が必須（アセットクリップには asset_id も必須）
+
+## レイヤー・配置の操作
+- レイヤー追加: `add_layer`、削除: `delete_layer`、並べ替え: `reorder_layers`
+- レイヤー名の変更だけなら `rename_layer`、表示/ロック等もまとめて変えるなら `update_layer`
+- クリップを前後に隙間なく寄せる: `snap_to_previous` / `snap_to_next`
+- レイヤー内のギャップを詰める: `close_gap`"""
+
+# Extra rules for the windowed / incremental context of build_chat_prompt
+_CHAT_PROMPT_WINDOW_RULES = """
+## コンテキストの読み方
+- 「Clip Snapshot」は前回時点のクリップ一覧です。「Changes since snapshot」がある場合はそちらが優先です
+- `… N clips omitted` の範囲のクリップは省略されています。必要ならユーザーに時刻範囲を確認してください"""
+
 
 class LLMGateway:
     """Thin wrapper around OpenAI / Gemini / Anthropic APIs.
@@ -78,21 +122,21 @@ class LLMGateway:
         messages.append({"role": "user", "content": message})
 
         try:
-            async with httpx.AsyncClient(timeout=180.0) as client:
-                response = await client.post(
-                    "https://api.openai.com/v1/chat/completions",
-                    headers={
-                        "Authorization": f"Bearer {api_key}",
-                        "Content-Type": "application/json",
-                    },
-                    json={
-                        "model": settings.openai_chat_model,
-                        "max_tokens": 16384,
-                        "messages": messages,
-                        "tools": OpenAIToolAdapter.build_tools(),
-                        "tool_choice": "auto",
-                    },
-                )
+            response = await llm_http_pool.post(
+                "openai",
+                "/v1/chat/completions",
+                headers={
+                    "Authorization": f"Bearer {api_key}",
+                    "Content-Type": "application/json",
+                },
+                json={
+                    "model": settings.openai_chat_model,
+                    "max_tokens": 16384,
+                    "messages": messages,
+                    "tools": OpenAIToolAdapter.build_tools(),
+                    "tool_choice": "auto",
+                },
+            )
 
             if response.status_code != 200:
                 error_detail = response.text
@@ -177,20 +221,21 @@ class LLMGateway:
 
         model_name = settings.gemini_chat_model
         try:
-            async with httpx.AsyncClient(timeout=180.0) as client:
-                response = await client.post(
-                    f"https://generativelanguage.googleapis.com/v1beta/models/{model_name}:generateContent?key={api_key}",
-                    headers={"Content-Type": "application/json"},
-                    json={
-                        "contents": contents,
-                        "tools": GeminiToolAdapter.build_tools(),
-                        "toolConfig": {"functionCallingConfig": {"mode": "AUTO"}},
-                        "generationConfig": {
-                            "maxOutputTokens": 8192,
-                            "temperature": 0.7,
-                        },
+            response = await llm_http_pool.post(
+                "gemini",
+                f"/v1beta/models/{model_name}:generateContent",
+                params={"key": api_key},
+                headers={"Content-Type": "application/json"},
+                json={
+                    "contents": contents,
+                    "tools": GeminiToolAdapter.build_tools(),
+                    "toolConfig": {"functionCallingConfig": {"mode": "AUTO"}},
+                    "generationConfig": {
+                        "maxOutputTokens": 8192,
+                        "temperature": 0.7,
                     },
-                )
+                },
+            )
 
             if response.status_code != 200:
                 error_detail = response.text
@@ -265,23 +310,23 @@ class LLMGateway:
         messages.append({"role": "user", "content": message})
 
         try:
-            async with httpx.AsyncClient(timeout=180.0) as client:
-                response = await client.post(
-                    "https://api.anthropic.com/v1/messages",
-                    headers={
-                        "x-api-key": api_key,
-                        "anthropic-version": "2023-06-01",
-                        "Content-Type": "application/json",
-                    },
-                    json={
-                        "model": settings.anthropic_chat_model,
-                        "max_tokens": 16384,
-                        "system": system_prompt,
-                        "messages": messages,
-                        "tools": AnthropicToolAdapter.build_tools(),
-                        "tool_choice": {"type": "auto"},
-                    },
-                )
+            response = await llm_http_pool.post(
+                "anthropic",
+                "/v1/messages",
+                headers={
+                    "x-api-key": api_key,
+                    "anthropic-version": "2023-06-01",
+                    "Content-Type": "application/json",
+                },
+                json={
+                    "model": settings.anthropic_chat_model,
+                    "max_tokens": 16384,
+                    "system": anthropic_system(system_prompt),
+                    "messages": messages,
+                    "tools": AnthropicToolAdapter.build_tools(),
+                    "tool_choice": {"type": "auto"},
+                },
+            )
 
             if response.status_code != 200:
                 error_detail = response.text
@@ -349,63 +394,63 @@ class LLMGateway:
             # Accumulate streamed tool_call deltas: index -> {id, name, arguments_parts}
             tool_call_acc: dict[int, dict[str, Any]] = {}
 
-            async with httpx.AsyncClient(timeout=180.0) as client:
-                async with client.stream(
-                    "POST",
-                    "https://api.openai.com/v1/chat/completions",
-                    headers={
-                        "Authorization": f"Bearer {api_key}",
-                        "Content-Type": "application/json",
-                    },
-                    json={
-                        "model": settings.openai_chat_model,
-                        "max_tokens": 16384,
-                        "messages": messages,
-                        "stream": True,
-                        "tools": OpenAIToolAdapter.build_tools(),
-                        "tool_choice": "auto",
-                    },
-                ) as response:
-                    if response.status_code != 200:
-                        error_text = (await response.aread()).decode("utf-8", errors="replace")
-                        logger.error(f"OpenAI API error: {response.status_code} - {error_text}")
-                        yield f"event: error\ndata: {json.dumps({'message': f'OpenAI APIエラー (HTTP {response.status_code})'})}\n\n"
-                        yield "event: done\ndata: {}\n\n"
-                        return
-
-                    async for line in response.aiter_lines():
-                        if line.startswith("data: "):
-                            data = line[6:]
-                            if data == "[DONE]":
-                                break
-                            try:
-                                chunk = json.loads(data)
-                                choice = (chunk.get("choices") or [{}])[0]
-                                delta = choice.get("delta", {})
-                                # Stream text content
-                                content = delta.get("content", "")
-                                if content:
-                                    full_text += content
-                                    yield f"event: chunk\ndata: {json.dumps({'text': content})}\n\n"
-                                # Accumulate tool_calls deltas
-                                for tc in delta.get("tool_calls") or []:
-                                    idx = tc.get("index", 0)
-                                    if idx not in tool_call_acc:
-                                        tool_call_acc[idx] = {
-                                            "id": "",
-                                            "name": "",
-                                            "arguments_parts": [],
-                                        }
-                                    acc = tool_call_acc[idx]
-                                    fn = tc.get("function", {})
-                                    if tc.get("id"):
-                                        acc["id"] = tc["id"]
-                                    if fn.get("name"):
-                                        acc["name"] += fn["name"]
-                                    if fn.get("arguments"):
-                                        acc["arguments_parts"].append(fn["arguments"])
-                            except json.JSONDecodeError:
-                                continue
+            async with llm_http_pool.stream(
+                "openai",
+                "/v1/chat/completions",
+                headers={
+                    "Authorization": f"Bearer {api_key}",
+                    "Content-Type": "application/json",
+                },
+                json={
+                    "model": settings.openai_chat_model,
+                    "max_tokens": 16384,
+                    "messages": messages,
+                    "stream": True,
+                    "tools": OpenAIToolAdapter.build_tools(),
+                    "tool_choice": "auto",
+                },
+            ) as (response, meter):
+                if response.status_code != 200:
+                    error_text = (await response.aread()).decode("utf-8", errors="replace")
+                    logger.error(f"OpenAI API error: {response.status_code} - {error_text}")
+                    yield f"event: error\ndata: {json.dumps({'message': f'OpenAI APIエラー (HTTP {response.status_code})'})}\n\n"
+                    yield "event: done\ndata: {}\n\n"
+                    return
+
+                async for line in response.aiter_lines():
+                    if line.startswith("data: "):
+                        data = line[6:]
+                        if data == "[DONE]":
+                            break
+                        try:
+                            chunk = json.loads(data)
+                            choice = (chunk.get("choices") or [{}])[0]
+                            delta = choice.get("delta", {})
+                            # Stream text content
+                            content = delta.get("content", "")
+                            if content:
+                                full_text += content
+                                meter.add()
+                                yield f"event: chunk\ndata: {json.dumps({'text': content})}\n\n"
+                            # Accumulate tool_calls deltas
+                            for tc in delta.get("tool_calls") or []:
+                                idx = tc.get("index", 0)
+                                if idx not in tool_call_acc:
+                                    tool_call_acc[idx] = {
+                                        "id": "",
+                                        "name": "",
+                                        "arguments_parts": [],
+                                    }
+                                acc = tool_call_acc[idx]
+                                fn = tc.get("function", {})
+                                if tc.get("id"):
+                                    acc["id"] = tc["id"]
+                                if fn.get("name"):
+                                    acc["name"] += fn["name"]
+                                if fn.get("arguments"):
+                                    acc["arguments_parts"].append(fn["arguments"])
+                        except json.JSONDecodeError:
+                            continue
 
             # Reassemble and execute tool calls
             if tool_call_acc:
@@ -488,52 +533,53 @@ class LLMGateway:
             # Accumulate function calls across stream chunks
             accumulated_fc: list[dict[str, Any]] = []
 
-            async with httpx.AsyncClient(timeout=180.0) as client:
-                async with client.stream(
-                    "POST",
-                    f"https://generativelanguage.googleapis.com/v1beta/models/{model_name}:streamGenerateContent?key={api_key}&alt=sse",
-                    headers={"Content-Type": "application/json"},
-                    json={
-                        "contents": contents,
-                        "tools": GeminiToolAdapter.build_tools(),
-                        "toolConfig": {"functionCallingConfig": {"mode": "AUTO"}},
-                        "generationConfig": {
-                            "maxOutputTokens": 8192,
-                            "temperature": 0.7,
-                        },
+            async with llm_http_pool.stream(
+                "gemini",
+                f"/v1beta/models/{model_name}:streamGenerateContent",
+                params={"key": api_key, "alt": "sse"},
+                headers={"Content-Type": "application/json"},
+                json={
+                    "contents": contents,
+                    "tools": GeminiToolAdapter.build_tools(),
+                    "toolConfig": {"functionCallingConfig": {"mode": "AUTO"}},
+                    "generationConfig": {
+                        "maxOutputTokens": 8192,
+                        "temperature": 0.7,
                     },
-                ) as response:
-                    if response.status_code != 200:
-                        error_text = (await response.aread()).decode("utf-8", errors="replace")
-                        logger.error(f"Gemini API error: {response.status_code} - {error_text}")
-                        yield f"event: error\ndata: {json.dumps({'message': f'Gemini APIエラー (HTTP {response.status_code})'})}\n\n"
-                        yield "event: done\ndata: {}\n\n"
-                        return
-
-                    async for line in response.aiter_lines():
-                        if line.startswith("data: "):
-                            data = line[6:]
-                            try:
-                                chunk = json.loads(data)
-                                candidates = chunk.get("candidates", [])
-                                if candidates:
-                                    parts = candidates[0].get("content", {}).get("parts", [])
-                                    for part in parts:
-                                        if "text" in part:
-                                            text = part["text"]
-                                            if text:
-                                                full_text += text
-                                                yield f"event: chunk\ndata: {json.dumps({'text': text})}\n\n"
-                                        if "functionCall" in part:
-                                            fc = part["functionCall"]
-                                            accumulated_fc.append(
-                                                {
-                                                    "name": fc.get("name", ""),
-                                                    "arguments": fc.get("args", {}),
-                                                }
-                                            )
-                            except json.JSONDecodeError:
-                                continue
+                },
+            ) as (response, meter):
+                if response.status_code != 200:
+                    error_text = (await response.aread()).decode("utf-8", errors="replace")
+                    logger.error(f"Gemini API error: {response.status_code} - {error_text}")
+                    yield f"event: error\ndata: {json.dumps({'message': f'Gemini APIエラー (HTTP {response.status_code})'})}\n\n"
+                    yield "event: done\ndata: {}\n\n"
+                    return
+
+                async for line in response.aiter_lines():
+                    if line.startswith("data: "):
+                        data = line[6:]
+                        try:
+                            chunk = json.loads(data)
+                            candidates = chunk.get("candidates", [])
+                            if candidates:
+                                parts = candidates[0].get("content", {}).get("parts", [])
+                                for part in parts:
+                                    if "text" in part:
+                                        text = part["text"]
+                                        if text:
+                                            full_text += text
+                                            meter.add()
+                                            yield f"event: chunk\ndata: {json.dumps({'text': text})}\n\n"
+                                    if "functionCall" in part:
+                                        fc = part["functionCall"]
+                                        accumulated_fc.append(
+                                            {
+                                                "name": fc.get("name", ""),
+                                                "arguments": fc.get("args", {}),
+                                            }
+                                        )
+                        except json.JSONDecodeError:
+                            continue
 
             # Execute accumulated function calls
             if accumulated_fc:
@@ -586,67 +632,67 @@ class LLMGateway:
             current_block_index: int = -1
             current_block_type: str = ""
 
-            async with httpx.AsyncClient(timeout=180.0) as client:
-                async with client.stream(
-                    "POST",
-                    "https://api.anthropic.com/v1/messages",
-                    headers={
-                        "x-api-key": api_key,
-                        "anthropic-version": "2023-06-01",
-                        "Content-Type": "application/json",
-                    },
-                    json={
-                        "model": settings.anthropic_chat_model,
-                        "max_tokens": 16384,
-                        "system": system_prompt,
-                        "messages": messages,
-                        "stream": True,
-                        "tools": AnthropicToolAdapter.build_tools(),
-                        "tool_choice": {"type": "auto"},
-                    },
-                ) as response:
-                    if response.status_code != 200:
-                        error_text = (await response.aread()).decode("utf-8", errors="replace")
-                        logger.error(f"Anthropic API error: {response.status_code} - {error_text}")
-                        yield f"event: error\ndata: {json.dumps({'message': f'Anthropic APIエラー (HTTP {response.status_code})'})}\n\n"
-                        yield "event: done\ndata: {}\n\n"
-                        return
-
-                    async for line in response.aiter_lines():
-                        if line.startswith("data: "):
-                            data = line[6:]
-                            try:
-                                chunk = json.loads(data)
-                                event_type = chunk.get("type", "")
-
-                                if event_type == "content_block_start":
-                                    block = chunk.get("content_block", {})
-                                    current_block_index = chunk.get("index", -1)
-                                    current_block_type = block.get("type", "")
-                                    if current_block_type == "tool_use":
-                                        tool_block_acc[current_block_index] = {
-                                            "id": block.get("id", ""),
-                                            "name": block.get("name", ""),
-                                            "input_parts": [],
-                                        }
-
-                                elif event_type == "content_block_delta":
-                                    delta = chunk.get("delta", {})
-                                    delta_type = delta.get("type", "")
-                                    if delta_type == "text_delta":
-                                        text = delta.get("text", "")
-                                        if text:
-                                            full_text += text
-                                            yield f"event: chunk\ndata: {json.dumps({'text': text})}\n\n"
-                                    elif delta_type == "input_json_delta":
-                                        partial = delta.get("partial_json", "")
-                                        if current_block_index in tool_block_acc:
-                                            tool_block_acc[current_block_index][
-                                                "input_parts"
-                                            ].append(partial)
-
-                            except json.JSONDecodeError:
-                                continue
+            async with llm_http_pool.stream(
+                "anthropic",
+                "/v1/messages",
+                headers={
+                    "x-api-key": api_key,
+                    "anthropic-version": "2023-06-01",
+                    "Content-Type": "application/json",
+                },
+                json={
+                    "model": settings.anthropic_chat_model,
+                    "max_tokens": 16384,
+                    "system": anthropic_system(system_prompt),
+                    "messages": messages,
+                    "stream": True,
+                    "tools": AnthropicToolAdapter.build_tools(),
+                    "tool_choice": {"type": "auto"},
+                },
+            ) as (response, meter):
+                if response.status_code != 200:
+                    error_text = (await response.aread()).decode("utf-8", errors="replace")
+                    logger.error(f"Anthropic API error: {response.status_code} - {error_text}")
+                    yield f"event: error\ndata: {json.dumps({'message': f'Anthropic APIエラー (HTTP {response.status_code})'})}\n\n"
+                    yield "event: done\ndata: {}\n\n"
+                    return
+
+                async for line in response.aiter_lines():
+                    if line.startswith("data: "):
+                        data = line[6:]
+                        try:
+                            chunk = json.loads(data)
+                            event_type = chunk.get("type", "")
+
+                            if event_type == "content_block_start":
+                                block = chunk.get("content_block", {})
+                                current_block_index = chunk.get("index", -1)
+                                current_block_type = block.get("type", "")
+                                if current_block_type == "tool_use":
+                                    tool_block_acc[current_block_index] = {
+                                        "id": block.get("id", ""),
+                                        "name": block.get("name", ""),
+                                        "input_parts": [],
+                                    }
+
+                            elif event_type == "content_block_delta":
+                                delta = chunk.get("delta", {})
+                                delta_type = delta.get("type", "")
+                                if delta_type == "text_delta":
+                                    text = delta.get("text", "")
+                                    if text:
+                                        full_text += text
+                                        meter.add()
+                                        yield f"event: chunk\ndata: {json.dumps({'text': text})}\n\n"
+                                elif delta_type == "input_json_delta":
+                                    partial = delta.get("partial_json", "")
+                                    if current_block_index in tool_block_acc:
+                                        tool_block_acc[current_block_index]["input_parts"].append(
+                                            partial
+                                        )
+
+                        except json.JSONDecodeError:
+                            continue
 
             # Reassemble and execute tool calls
             if tool_block_acc:
@@ -841,43 +887,41 @@ class LLMGateway:
 
     def build_chat_system_prompt(self, context: str) -> str:
         """Build the system prompt for the tool-use chat architecture."""
-        return f"""あなたは動画編集アプリ「douga」のAIアシスタントです。
-ユーザーのタイムライン編集指示を理解し、提供されたツールを使って操作を実行します。
-
-## 現在のプロジェクト状態
-{context}
-
-## ルール
-- 日本語で応答してください
-- 編集操作が必要な場合は必ずツールを呼び出してください（テキストにJSONを出力しないでください）
-- 情報の質問のみの場合はツール呼び出し不要です
-- ユーザーの指示が曖昧な場合は確認してください
-
-## 重要: asset_id について
-- asset_id は必ず UUID 形式で指定してください（例: "6d591866-a838-46ff-a356-442b2bf2afeb"）
-- ファイル名（例: "video.mp4"）は使用できません
-- 上記「Available Assets」セクションからファイル名に対応する asset_id を確認してください
-
-## 重要: テキストオブジェクトの読み方
-- `type=text` の行がテキストオブジェクトです
-- `text_state=present` のときだけ `text="..."` を本文として扱ってください
-- `text_state=empty` は空文字、`text_state=unavailable` は取得不能です。推測で補完しないでください
-
-## 重要: execute_operations の使い方
-- 既存テキストの本文変更は `update_text` を使ってください（`delete` + `add` ではなく）
-- 既存テロップの色・背景色・背景透明度の変更は `update_text_style` を使ってください
-- 背景透明度の指定は 0.0-1.0 です（0%=0.0、50%=0.5、100%=1.0）
-- コンテキストに `bg_state=none` や `bg_state=unset` が出ているテキストは背景が見えません
-- 1つのテキストを2つに分ける場合は `split` を使い、`left_text_content` / `right_text_content` も指定できます
-- `clip_id` にはコンテキストに表示された `id=` の値をそのまま使ってください（短縮・変形しないこと）
-- move操作: `new_start_ms` は必須です
-- add操作の `data`: layer_id, start_ms, duration_ms が必須（アセットクリップには asset_id も必須）
+        return (
+            f"{_CHAT_PROMPT_INTRO}\n\n## 現在のプロジェクト状態\n{context}\n\n{_CHAT_PROMPT_RULES}"
+        )
 
-## レイヤー・配置の操作
-- レイヤー追加: `add_layer`、削除: `delete_layer`、並べ替え: `reorder_layers`
-- レイヤー名の変更だけなら `rename_layer`、表示/ロック等もまとめて変えるなら `update_layer`
-- クリップを前後に隙間なく寄せる: `snap_to_previous` / `snap_to_next`
-- レイヤー内のギャップを詰める: `close_gap`"""
+    def build_chat_prompt(
+        self,
+        project: Project,
+        timeline: dict[str, Any],
+        assets: list[Asset] | None = None,
+        *,
+        message: str = "",
+        history: list[ChatMessage] | None = None,
+        sequence_id: Any | None = None,
+    ) -> ChatPrompt:
+        """Build a token-budgeted system prompt with a cacheable stable prefix.
+
+        Unlike :meth:`build_chat_system_prompt` the rules come first and the
+        timeline is windowed and diffed against the previous turn's snapshot
+        (see ``chat_context``).  Snapshots are kept per project and sequence,
+        so alternating between sequences never diffs one against the other.
+        """
+        builder = ChatContextBuilder(
+            self.build_context_clip_summary,
+            budget_tokens=get_settings().chat_context_token_budget,
+        )
+        context_key = f"{getattr(project, 'id', '')}:{sequence_id or '-'}"
+        return builder.build(
+            context_key,
+            project,
+            timeline,
+            assets,
+            preamble=f"{_CHAT_PROMPT_INTRO}\n\n{_CHAT_PROMPT_RULES}\n{_CHAT_PROMPT_WINDOW_RULES}",
+            message=message,
+            history=history or [],
+        )
 
     # ------------------------------------------------------------------
     # Response builder
@@ -4,7 +4,7 @@ from __future__ import annotations
 
 import logging
 import uuid
-from typing import Any, cast
+from typing import TYPE_CHECKING, Any, cast
 
 from sqlalchemy import select
 
@@ -38,6 +38,10 @@ from src.schemas.ai import (
     TransitionDetails,
     VolumeKeyframeResponse,
 )
+from src.services.ai.batch_engine import active_batch_session
+
+if TYPE_CHECKING:
+    from src.services.timeline_snapshot import SnapshotFormat
 
 logger = logging.getLogger(__name__)
 
@@ -318,36 +322,7 @@ class ProjectQueryMixin:
         timeline = project.timeline_data or {}
         layers_data = timeline.get("layers", [])
         audio_tracks_data = timeline.get("audio_tracks", [])
-
-        # Bulk resolve asset_id -> asset_name
-        all_asset_ids: set[str] = set()
-        for layer in layers_data:
-            for clip in layer.get("clips", []):
-                aid = clip.get("asset_id")
-                if aid:
-                    all_asset_ids.add(aid)
-        for track in audio_tracks_data:
-            for clip in track.get("clips", []):
-                aid = clip.get("asset_id")
-                if aid:
-                    all_asset_ids.add(aid)
-
-        asset_name_map: dict[str, str] = {}
-        if all_asset_ids:
-            from uuid import UUID as _UUID
-
-            valid_ids: list[_UUID] = []
-            for aid in all_asset_ids:
-                try:
-                    valid_ids.append(_UUID(aid))
-                except (ValueError, AttributeError):
-                    pass  # Skip malformed asset_ids in timeline data
-            if valid_ids:
-                result = await self.db.execute(
-                    select(Asset.id, Asset.name).where(Asset.id.in_(valid_ids))
-                )
-                for row in result:
-                    asset_name_map[str(row[0])] = row[1]
+        asset_name_map = await self._resolve_asset_names(layers_data, audio_tracks_data)
 
         warnings: list[str] = []
 
@@ -487,21 +462,9 @@ class ProjectQueryMixin:
         # Generate visual snapshot (only when explicitly requested)
         snapshot_base64: str | None = None
         if include_snapshot:
-            try:
-                from src.services.timeline_snapshot import generate_timeline_snapshot
-
-                snapshot_base64 = generate_timeline_snapshot(
-                    layers=layers_data,
-                    audio_tracks=audio_tracks_data,
-                    duration_ms=project.duration_ms or 0,
-                    asset_name_map=asset_name_map,
-                )
-            except Exception:
-                logger.warning(
-                    "Failed to generate timeline snapshot for project=%s",
-                    project.id,
-                    exc_info=True,
-                )
+            snapshot_base64 = self._render_timeline_snapshot(
+                project, layers_data, audio_tracks_data, asset_name_map
+            )
 
         return L25TimelineOverview(
             project_id=project.id,
@@ -510,8 +473,103 @@ class ProjectQueryMixin:
             audio_tracks=overview_audio,
             warnings=warnings,
             snapshot_base64=snapshot_base64,
+            snapshot_format="jpeg" if snapshot_base64 else None,
         )
 
+    async def get_timeline_snapshot(
+        self: Any,
+        project: Project,
+        *,
+        width: int | None = None,
+        image_format: SnapshotFormat = "jpeg",
+    ) -> str | None:
+        """Render the timeline snapshot image on its own (base64, or None on failure).
+
+        Args:
+            project: The project whose timeline is drawn.
+            width: Image width in pixels (default: the standard snapshot width).
+            image_format: ``"jpeg"``, ``"png"`` or ``"webp"``.
+        """
+        timeline = project.timeline_data or {}
+        layers_data = timeline.get("layers", [])
+        audio_tracks_data = timeline.get("audio_tracks", [])
+        asset_name_map = await self._resolve_asset_names(layers_data, audio_tracks_data)
+        snapshot: str | None = self._render_timeline_snapshot(
+            project,
+            layers_data,
+            audio_tracks_data,
+            asset_name_map,
+            width=width,
+            image_format=image_format,
+        )
+        return snapshot
+
+    def _render_timeline_snapshot(
+        self: Any,
+        project: Project,
+        layers_data: list[dict[str, Any]],
+        audio_tracks_data: list[dict[str, Any]],
+        asset_name_map: dict[str, str],
+        *,
+        width: int | None = None,
+        image_format: SnapshotFormat = "jpeg",
+    ) -> str | None:
+        """Draw the snapshot image; failures are logged and yield None."""
+        from src.services.timeline_snapshot import IMAGE_WIDTH, generate_timeline_snapshot
+
+        try:
+            return generate_timeline_snapshot(
+                layers=layers_data,
+                audio_tracks=audio_tracks_data,
+                duration_ms=project.duration_ms or 0,
+                asset_name_map=asset_name_map,
+                width=width or IMAGE_WIDTH,
+                image_format=image_format,
+            )
+        except Exception:
+            logger.warning(
+                "Failed to generate timeline snapshot for project=%s",
+                project.id,
+                exc_info=True,
+            )
+            return None
+
+    async def _resolve_asset_names(
+        self: Any,
+        layers_data: list[dict[str, Any]],
+        audio_tracks_data: list[dict[str, Any]],
+    ) -> dict[str, str]:
+        """Bulk resolve asset_id -> asset_name for the clips of a timeline."""
+        all_asset_ids: set[str] = set()
+        for layer in layers_data:
+            for clip in layer.get("clips", []):
+                aid = clip.get("asset_id")
+                if aid:
+                    all_asset_ids.add(aid)
+        for track in audio_tracks_data:
+            for clip in track.get("clips", []):
+                aid = clip.get("asset_id")
+                if aid:
+                    all_asset_ids.add(aid)
+
+        asset_name_map: dict[str, str] = {}
+        if all_asset_ids:
+            from uuid import UUID as _UUID
+
+            valid_ids: list[_UUID] = []
+            for aid in all_asset_ids:
+                try:
+                    valid_ids.append(_UUID(aid))
+                except (ValueError, AttributeError):
+                    pass  # Skip malformed asset_ids in timeline data
+            if valid_ids:
+                result = await self.db.execute(
+                    select(Asset.id, Asset.name).where(Asset.id.in_(valid_ids))
+                )
+                for row in result:
+                    asset_name_map[str(row[0])] = row[1]
+        return asset_name_map
+
     # =========================================================================
     # L3: Details Level
     # =========================================================================
@@ -766,6 +824,9 @@ class ProjectQueryMixin:
 
     async def _find_linked_audio_asset(self: Any, video_asset_id: str) -> Asset | None:
         """Find the auto-extracted audio asset linked to a video asset."""
+        session = getattr(self, "_batch_session", None)
+        if session is not None and video_asset_id in session.linked_audio:
+            return cast(Asset | None, session.linked_audio[video_asset_id])
         result = await self.db.execute(
             select(Asset)
             .where(
@@ -822,4 +883,11 @@ class ProjectQueryMixin:
                         continue
                     results.append((clip, track, "audio"))
 
+        session = active_batch_session(self, timeline)
+        if session is not None:
+            # Callers mutate linked clips in place; hand out private copies.
+            results = [
+                (session.journal.own_clip(container, clip), container, kind)
+                for clip, container, kind in results
+            ]
         return results
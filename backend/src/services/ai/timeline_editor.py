@@ -2,7 +2,6 @@
 
 from __future__ import annotations
 
-import copy
 import logging
 import uuid
 from typing import Any
@@ -31,6 +30,7 @@ from src.schemas.ai import (
     AddMarkerRequest,
     AudioTrackSummary,
     BatchClipOperation,
+    BatchExecution,
     BatchOperationResult,
     GapAnalysisResult,
     L3AudioClipDetails,
@@ -43,7 +43,6 @@ from src.schemas.ai import (
     PreviewDiffRequest,
     SemanticOperation,
     SemanticOperationResult,
-    SplitClipRequest,
     TimelineGap,
     TimeRange,
     UpdateAudioClipRequest,
@@ -56,7 +55,16 @@ from src.schemas.ai import (
     UpdateClipTransformRequest,
     UpdateMarkerRequest,
 )
-from src.schemas.clip_adapter import UnifiedClipInput, UnifiedTransformInput
+from src.schemas.operation import ChangeDetail
+from src.services.ai.batch_engine import (
+    BatchSession,
+    PreparedOperation,
+    TimelineJournal,
+    active_batch_session,
+    prefetch_assets,
+    prepare_operations,
+    referenced_asset_ids,
+)
 from src.services.ai.utils import (
     _sanitize_timeline_ms,
     normalize_text_style_for_storage,
@@ -539,6 +547,9 @@ class TimelineEditorMixin:
 
         Returns: (clip_data, source_layer, full_clip_id)
         """
+        session = active_batch_session(self, timeline)
+        if session is not None:
+            return session.journal.find_clip("video", clip_id)
         for layer in timeline.get("layers", []):
             for clip in layer.get("clips", []):
                 full_id = clip.get("id", "")
@@ -554,6 +565,9 @@ class TimelineEditorMixin:
 
         Returns: (clip_data, source_track, full_clip_id)
         """
+        session = active_batch_session(self, timeline)
+        if session is not None:
+            return session.journal.find_clip("audio", clip_id)
         for track in timeline.get("audio_tracks", []):
             for clip in track.get("clips", []):
                 full_id = clip.get("id", "")
@@ -2542,17 +2556,23 @@ class TimelineEditorMixin:
         rollback_on_failure: bool = False,
         continue_on_error: bool = True,
         include_audio: bool = True,
-    ) -> BatchOperationResult:
+    ) -> BatchExecution:
         """Execute multiple clip operations in a batch.
 
-        All individual operations skip flag_modified/flush; a single
-        flag_modified + flush is performed at the end for efficiency.
+        Operations are validated once up front, referenced assets are
+        prefetched in bulk, and mutations are applied to a copy-on-write
+        working copy of the timeline (see ``batch_engine``).  The working copy
+        replaces ``project.timeline_data`` only if the batch is kept, followed
+        by a single duration pass, flag_modified and flush.
 
         Args:
-            rollback_on_failure: If True, save a deep copy of timeline_data before
-                executing. On first failure, restore from the copy and return.
+            rollback_on_failure: If True, on first failure discard the working
+                copy (the original timeline is left untouched) and return.
             continue_on_error: If False (and rollback_on_failure is also False),
                 stop execution on first failure. Completed operations remain applied.
+
+        Returns the response together with the combined diff of the batch and
+        the project duration before/after it.
         """
 
         results: list[dict[str, Any]] = []
@@ -2561,182 +2581,61 @@ class TimelineEditorMixin:
         rolled_back = False
         stopped_at_index: int | None = None
 
-        # Save snapshot for potential rollback
-        timeline_snapshot = None
-        if rollback_on_failure:
-            timeline_snapshot = copy.deepcopy(project.timeline_data)
-
-        for idx, op in enumerate(operations):
-            try:
-                if op.operation == "add":
-                    if op.clip_type == "video":
-                        # Use UnifiedClipInput for unified format support
-                        unified = UnifiedClipInput.model_validate(op.data)
-                        req = AddClipRequest(**unified.to_flat_dict())
-                        result = await self.add_clip(
-                            project, req, include_audio=include_audio, _skip_flush=True
-                        )
-                    else:
-                        req = AddAudioClipRequest(**op.data)
-                        result = await self.add_audio_clip(project, req, _skip_flush=True)
-                    results.append({"operation": "add", "clip_id": result.id if result else None})
-                    successful += 1
-
-                elif op.operation == "move":
-                    if not op.clip_id:
-                        raise ValueError("clip_id required for move operation")
-                    move_data = dict(op.data)
-                    if "new_start_ms" not in move_data:
-                        raise ValueError(
-                            "new_start_ms is required for move operation. "
-                            "Place it inside the 'data' field: "
-                            '{"operation": "move", "clip_id": "...", "data": {"new_start_ms": 5000}}'
-                        )
-                    if op.clip_type == "video":
-                        req = MoveClipRequest(**move_data)
-                        await self.move_clip(project, op.clip_id, req, _skip_flush=True)
-                    else:
-                        req = MoveAudioClipRequest(**move_data)
-                        await self.move_audio_clip(project, op.clip_id, req, _skip_flush=True)
-                    results.append({"operation": "move", "clip_id": op.clip_id})
-                    successful += 1
-
-                elif op.operation == "update_transform":
-                    if not op.clip_id:
-                        raise ValueError("clip_id required for update_transform")
-                    # update_transform only supports video clips
-                    if op.clip_type == "audio":
-                        raise ValueError("update_transform does not support audio clips")
-                    # Use UnifiedTransformInput for unified format support
-                    unified = UnifiedTransformInput.model_validate(op.data)
-                    req = UpdateClipTransformRequest(**unified.to_flat_dict())
-                    await self.update_clip_transform(project, op.clip_id, req, _skip_flush=True)
-                    results.append({"operation": "update_transform", "clip_id": op.clip_id})
-                    successful += 1
-
-                elif op.operation == "update_effects":
-                    if not op.clip_id:
-                        raise ValueError("clip_id required for update_effects")
-                    # update_effects only supports video clips
-                    if op.clip_type == "audio":
-                        raise ValueError("update_effects does not support audio clips")
-                    req = UpdateClipEffectsRequest(**op.data)
-                    await self.update_clip_effects(project, op.clip_id, req, _skip_flush=True)
-                    results.append({"operation": "update_effects", "clip_id": op.clip_id})
-                    successful += 1
-
-                elif op.operation == "trim":
-                    if not op.clip_id:
-                        raise ValueError("clip_id required for trim operation")
-                    duration_ms = op.data.get("duration_ms")
-                    if duration_ms is None:
-                        raise ValueError("duration_ms required for trim operation")
-                    await self.trim_clip(
-                        project, op.clip_id, duration_ms, op.clip_type, _skip_flush=True
-                    )
-                    results.append({"operation": "trim", "clip_id": op.clip_id})
-                    successful += 1
-
-                elif op.operation == "delete":
-                    if not op.clip_id:
-                        raise ValueError("clip_id required for delete operation")
-                    if op.clip_type == "video":
-                        await self.delete_clip(project, op.clip_id, _skip_flush=True)
-                    else:
-                        await self.delete_audio_clip(project, op.clip_id, _skip_flush=True)
-                    results.append({"operation": "delete", "clip_id": op.clip_id})
-                    successful += 1
-
-                elif op.operation == "update_text_style":
-                    if not op.clip_id:
-                        raise ValueError("clip_id required for update_text_style")
-                    if op.clip_type == "audio":
-                        raise ValueError("update_text_style does not support audio clips")
-                    # Support both nested {"text_style": {...}} and flat {"font_size": 48}
-                    style_data = op.data.get("text_style", op.data)
-                    req = UpdateClipTextStyleRequest(**style_data)
-                    await self.update_clip_text_style(project, op.clip_id, req, _skip_flush=True)
-                    results.append({"operation": "update_text_style", "clip_id": op.clip_id})
-                    successful += 1
+        prepared = prepare_operations(operations)
+        journal = TimelineJournal(project.timeline_data or {})
+        asset_ids, linked_ids = referenced_asset_ids(prepared, journal)
+        assets, linked_audio = await prefetch_assets(
+            self.db, asset_ids, linked_ids, include_linked=include_audio
+        )
+        session = BatchSession(journal=journal, assets=assets, linked_audio=linked_audio)
+        duration_before = project.duration_ms or 0
 
-                elif op.operation == "update_text":
-                    if not op.clip_id:
-                        raise ValueError("clip_id required for update_text")
-                    if op.clip_type == "audio":
-                        raise ValueError("update_text does not support audio clips")
-                    req = UpdateClipTextRequest(**op.data)
-                    await self.update_clip_text(project, op.clip_id, req, _skip_flush=True)
-                    results.append({"operation": "update_text", "clip_id": op.clip_id})
+        project.timeline_data = journal.working
+        self._batch_session = session
+        try:
+            for idx, item in enumerate(prepared):
+                op = item.op
+                try:
+                    if item.error is not None:
+                        raise item.error
+                    results.append(await self._apply_batch_operation(project, item, include_audio))
                     successful += 1
-
-                elif op.operation == "split":
-                    if not op.clip_id:
-                        raise ValueError("clip_id required for split")
-                    if op.clip_type == "audio":
-                        raise ValueError("split does not support audio clips")
-                    req = SplitClipRequest(**op.data)
-                    split_result = await self.split_clip(
-                        project,
-                        op.clip_id,
-                        req.split_at_ms,
-                        left_text_content=req.left_text_content,
-                        right_text_content=req.right_text_content,
-                        _skip_flush=True,
+                except Exception as e:
+                    error_info = self._classify_batch_error(e, op)
+                    errors.append(
+                        f"Operation {op.operation} failed [{error_info['error_code']}]: "
+                        f"{error_info['message']} (suggestion: {error_info['suggestion']})"
                     )
-                    right_clip = split_result.get("right_clip")
                     results.append(
                         {
-                            "operation": "split",
-                            "clip_id": op.clip_id,
-                            "right_clip_id": getattr(right_clip, "id", None),
+                            "operation": op.operation,
+                            "error": error_info["message"],
+                            "error_code": error_info["error_code"],
+                            "suggestion": error_info["suggestion"],
                         }
                     )
-                    successful += 1
-
-                elif op.operation == "update_layer":
-                    layer_id = op.layer_id or op.data.get("layer_id")
-                    if not layer_id:
-                        raise ValueError("layer_id required for update_layer operation")
-                    result = await self.update_layer(
-                        project,
-                        layer_id,
-                        name=op.data.get("name"),
-                        visible=op.data.get("visible"),
-                        locked=op.data.get("locked"),
-                        _skip_flush=True,
-                    )
-                    if result is None:
-                        raise ValueError(f"Layer not found: {layer_id}")
-                    results.append({"operation": "update_layer", "layer_id": layer_id})
-                    successful += 1
 
-            except Exception as e:
-                error_info = self._classify_batch_error(e, op)
-                errors.append(
-                    f"Operation {op.operation} failed [{error_info['error_code']}]: "
-                    f"{error_info['message']} (suggestion: {error_info['suggestion']})"
-                )
-                results.append(
-                    {
-                        "operation": op.operation,
-                        "error": error_info["message"],
-                        "error_code": error_info["error_code"],
-                        "suggestion": error_info["suggestion"],
-                    }
-                )
+                    if rollback_on_failure:
+                        # The base timeline was never mutated: just drop the working copy
+                        rolled_back = True
+                        stopped_at_index = idx
+                        # Reset counts: nothing was actually applied
+                        successful = 0
+                        break
+                    elif not continue_on_error:
+                        # Stop execution but keep completed operations
+                        stopped_at_index = idx
+                        break
+        finally:
+            self._batch_session = None
 
-                if rollback_on_failure and timeline_snapshot is not None:
-                    # Restore timeline to pre-batch state
-                    project.timeline_data = timeline_snapshot
-                    rolled_back = True
-                    stopped_at_index = idx
-                    # Reset counts: nothing was actually applied
-                    successful = 0
-                    break
-                elif not continue_on_error:
-                    # Stop execution but keep completed operations
-                    stopped_at_index = idx
-                    break
+        changes: list[ChangeDetail] = []
+        if rolled_back or successful == 0:
+            project.timeline_data = journal.base
+        else:
+            if session.duration_dirty:
+                self._update_project_duration(project)
+            changes = journal.changes()
 
         # Single flag_modified + flush for the entire batch
         # Only flush if there were successful operations (avoid flushing broken state)
@@ -2750,7 +2649,7 @@ class TimelineEditorMixin:
                 errors.append(f"Database flush failed: {flush_err}")
                 successful = 0
 
-        return BatchOperationResult(
+        result = BatchOperationResult(
             success=len(errors) == 0,
             total_operations=len(operations),
             successful_operations=successful,
@@ -2760,6 +2659,93 @@ class TimelineEditorMixin:
             rolled_back=rolled_back,
             stopped_at_index=stopped_at_index,
         )
+        return BatchExecution(
+            result=result,
+            changes=changes,
+            duration_before_ms=duration_before,
+            duration_after_ms=project.duration_ms or 0,
+        )
+
+    async def _apply_batch_operation(
+        self: Any, project: Project, item: PreparedOperation, include_audio: bool
+    ) -> dict[str, Any]:
+        """Apply one prepared batch operation and return its result entry."""
+        op, req = item.op, item.request
+
+        if op.operation == "add":
+            if op.clip_type == "video":
+                result = await self.add_clip(
+                    project, req, include_audio=include_audio, _skip_flush=True
+                )
+            else:
+                result = await self.add_audio_clip(project, req, _skip_flush=True)
+            return {"operation": "add", "clip_id": result.id if result else None}
+
+        if op.operation == "move":
+            if op.clip_type == "video":
+                await self.move_clip(project, op.clip_id, req, _skip_flush=True)
+            else:
+                await self.move_audio_clip(project, op.clip_id, req, _skip_flush=True)
+            return {"operation": "move", "clip_id": op.clip_id}
+
+        if op.operation == "update_transform":
+            await self.update_clip_transform(project, op.clip_id, req, _skip_flush=True)
+            return {"operation": "update_transform", "clip_id": op.clip_id}
+
+        if op.operation == "update_effects":
+            await self.update_clip_effects(project, op.clip_id, req, _skip_flush=True)
+            return {"operation": "update_effects", "clip_id": op.clip_id}
+
+        if op.operation == "trim":
+            await self.trim_clip(project, op.clip_id, req, op.clip_type, _skip_flush=True)
+            return {"operation": "trim", "clip_id": op.clip_id}
+
+        if op.operation == "delete":
+            if op.clip_type == "video":
+                await self.delete_clip(project, op.clip_id, _skip_flush=True)
+            else:
+                await self.delete_audio_clip(project, op.clip_id, _skip_flush=True)
+            return {"operation": "delete", "clip_id": op.clip_id}
+
+        if op.operation == "update_text_style":
+            await self.update_clip_text_style(project, op.clip_id, req, _skip_flush=True)
+            return {"operation": "update_text_style", "clip_id": op.clip_id}
+
+        if op.operation == "update_text":
+            await self.update_clip_text(project, op.clip_id, req, _skip_flush=True)
+            return {"operation": "update_text", "clip_id": op.clip_id}
+
+        if op.operation == "split":
+            split_result = await self.split_clip(
+                project,
+                op.clip_id,
+                req.split_at_ms,
+                left_text_content=req.left_text_content,
+                right_text_content=req.right_text_content,
+                _skip_flush=True,
+            )
+            right_clip = split_result.get("right_clip")
+            return {
+                "operation": "split",
+                "clip_id": op.clip_id,
+                "right_clip_id": getattr(right_clip, "id", None),
+            }
+
+        if op.operation == "update_layer":
+            layer_id = req
+            layer = await self.update_layer(
+                project,
+                layer_id,
+                name=op.data.get("name"),
+                visible=op.data.get("visible"),
+                locked=op.data.get("locked"),
+                _skip_flush=True,
+            )
+            if layer is None:
+                raise ValueError(f"Layer not found: {layer_id}")
+            return {"operation": "update_layer", "layer_id": layer_id}
+
+        raise ValueError(f"Unsupported batch operation: {op.operation}")
 
     # =========================================================================
     # Analysis Tools
@@ -3200,13 +3186,19 @@ class TimelineEditorMixin:
         return False
 
     async def _get_asset(self: Any, asset_id: str) -> Asset | None:
-        """Get asset by ID."""
+        """Get asset by ID (served from the batch prefetch while a batch runs)."""
+        session = getattr(self, "_batch_session", None)
+        if session is not None and asset_id in session.assets:
+            return session.assets[asset_id]
         try:
             asset_uuid = uuid.UUID(asset_id)
             result = await self.db.execute(select(Asset).where(Asset.id == asset_uuid))
-            return result.scalar_one_or_none()
+            asset = result.scalar_one_or_none()
         except (ValueError, TypeError):
-            return None
+            asset = None
+        if session is not None:
+            session.assets[asset_id] = asset
+        return asset
 
     async def _validate_clip_timing(
         self,
@@ -3254,8 +3246,15 @@ class TimelineEditorMixin:
                 )
 
     def _update_project_duration(self: Any, project: Project) -> None:
-        """Update project duration based on timeline content."""
+        """Update project duration based on timeline content.
+
+        While a batch runs this is deferred to a single pass at the end.
+        """
         timeline = project.timeline_data or {}
+        session = active_batch_session(self, timeline)
+        if session is not None:
+            session.duration_dirty = True
+            return
 
         # Sanitize all ms fields to integers before persisting
         _sanitize_timeline_ms(timeline)
@@ -12,7 +12,6 @@ session of its own; mutations go through the passed ai_service.
 
 from __future__ import annotations
 
-import copy
 import logging
 from typing import TYPE_CHECKING, Any
 
@@ -23,6 +22,7 @@ from src.schemas.ai import (
     ChatAction,
     SemanticOperation,
 )
+from src.services.timeline_document import deep_clone
 
 if TYPE_CHECKING:
     from src.models.project import Project
@@ -244,7 +244,8 @@ async def execute_chat_operations_on_project(
                         )
                     )
                 if batch_ops:
-                    batch_result = await ai_service.execute_batch_operations(project, batch_ops)
+                    execution = await ai_service.execute_batch_operations(project, batch_ops)
+                    batch_result = execution.result
                     logger.info(
                         f"[AI Batch] Result: success={batch_result.success}, {batch_result.successful_operations}/{batch_result.total_operations}"
                     )
@@ -374,7 +375,9 @@ async def execute_chat_operations(
 
     original_timeline = project.timeline_data
     original_duration_ms = project.duration_ms
-    target_timeline_before = copy.deepcopy(timeline_target.timeline_data or {})
+    # Chat operations mutate clips in place, so the before-image must be a
+    # fully independent copy rather than a structurally shared fork.
+    target_timeline_before = deep_clone(timeline_target.timeline_data or {})
     target_duration_before = getattr(timeline_target, "duration_ms", project.duration_ms)
 
     try:
@@ -1,12 +1,12 @@
 """Audio extraction service for converting video to audio."""
 
 import asyncio
-import json
 import os
 import subprocess
 import tempfile
 
 from src.config import get_settings
+from src.services.media_probe import ProbeError, media_probe
 from src.services.storage_service import StorageService
 
 
@@ -37,24 +37,12 @@ def extract_audio_from_video(
         raise FileNotFoundError(f"Input file not found: {input_path}")
 
     # Check if video has audio track
-    probe_cmd = [
-        settings.ffprobe_path,
-        "-v",
-        "quiet",
-        "-print_format",
-        "json",
-        "-show_streams",
-        "-select_streams",
-        "a",
-        input_path,
-    ]
-    probe_result = subprocess.run(probe_cmd, capture_output=True, text=True)
     try:
-        probe_data = json.loads(probe_result.stdout)
-        if not probe_data.get("streams"):
-            raise RuntimeError(f"No audio track in video: {input_path}")
-    except json.JSONDecodeError:
+        probe = media_probe.probe(input_path)
+    except ProbeError:
         raise RuntimeError(f"Failed to probe video: {input_path}")
+    if not probe.has_audio:
+        raise RuntimeError(f"No audio track in video: {input_path}")
 
     # FFmpeg command to extract audio
     cmd = [
@@ -97,30 +85,12 @@ async def extract_audio_from_video_async(
         raise FileNotFoundError(f"Input file not found: {input_path}")
 
     # Check if video has audio track
-    probe_cmd = [
-        settings.ffprobe_path,
-        "-v",
-        "quiet",
-        "-print_format",
-        "json",
-        "-show_streams",
-        "-select_streams",
-        "a",
-        input_path,
-    ]
-    probe_process = await asyncio.create_subprocess_exec(
-        *probe_cmd,
-        stdout=asyncio.subprocess.PIPE,
-        stderr=asyncio.subprocess.PIPE,
-    )
-    probe_stdout, _ = await probe_process.communicate()
-
     try:
-        probe_data = json.loads(probe_stdout.decode())
-        if not probe_data.get("streams"):
-            raise RuntimeError(f"No audio track in video: {input_path}")
-    except json.JSONDecodeError:
+        probe = await media_probe.aprobe(input_path)
+    except ProbeError:
         raise RuntimeError(f"Failed to probe video: {input_path}")
+    if not probe.has_audio:
+        raise RuntimeError(f"No audio track in video: {input_path}")
 
     # FFmpeg command to extract audio
     cmd = [
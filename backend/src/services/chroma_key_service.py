@@ -3,15 +3,32 @@
 import asyncio
 import base64
 import logging
-import os
-import subprocess
+import re
+from dataclasses import dataclass
 from typing import Any
 
 from src.config import get_settings
 from src.services.chroma_key_sampler import sample_chroma_key_color
+from src.services.preview_frame_cache import PreviewFrameKey, preview_frame_cache
 
 logger = logging.getLogger(__name__)
 
+_HEX6_COLOR_RE = re.compile(r"^[0-9A-Fa-f]{6}$")
+
+# Alpha refinement applied to keyed render footage: smooth jagged edges with
+# median, erode by 1px to remove fringing, then blur for smooth transitions
+RENDER_ALPHA_REFINE = "alphaextract,median=radius=1,erosion,gblur=sigma=2.0"
+
+# Preview positions within this span share one decoder input; farther apart,
+# a fresh input seek is cheaper than decoding everything in between
+PREVIEW_INPUT_SPAN_MS = 5_000
+PREVIEW_TIMEOUT_S = 60
+
+
+def _yuv420p_frame_size(width: int, height: int) -> int:
+    """Bytes of one raw ``yuv420p`` frame (chroma planes round odd sizes up)."""
+    return width * height + 2 * ((width + 1) // 2) * ((height + 1) // 2)
+
 
 def compute_secondary_key_color(hex_color: str) -> str:
     """Compute a brighter variant of the key color for secondary colorkey pass.
@@ -38,6 +55,74 @@ def compute_secondary_key_color(hex_color: str) -> str:
         return f"0x{r:02X}{g2:02X}{b:02X}"
 
 
+@dataclass(frozen=True)
+class RenderKeyParams:
+    """Validated chroma key settings of a clip, as keyed by the renderer."""
+
+    color: str  # 6-digit upper-case hex, no prefix
+    similarity: float
+    blend: float
+    # Scale filter the renderer applies before keying ("" = source size).  The
+    # alpha refinement works in output pixels, so intermediates key at this size.
+    scale: str = ""
+
+    @classmethod
+    def from_effects(cls, chroma_key: dict[str, Any]) -> "RenderKeyParams":
+        """Validate ``effects.chroma_key`` (second-layer guard after Pydantic)."""
+        raw_color = str(chroma_key.get("color", "#00FF00")).lstrip("#")
+        if not _HEX6_COLOR_RE.match(raw_color):
+            logger.warning("[CHROMA_KEY] Invalid color %r, falling back to 00FF00", raw_color)
+            raw_color = "00FF00"
+        # Defaults match effects_spec.yaml (SSOT)
+        try:
+            similarity = float(chroma_key.get("similarity", 0.4))
+        except (ValueError, TypeError):
+            logger.warning(
+                "[CHROMA_KEY] Invalid similarity %r, falling back to 0.4",
+                chroma_key.get("similarity"),
+            )
+            similarity = 0.4
+        try:
+            blend = float(chroma_key.get("blend", 0.1))
+        except (ValueError, TypeError):
+            logger.warning(
+                "[CHROMA_KEY] Invalid blend %r, falling back to 0.1",
+                chroma_key.get("blend"),
+            )
+            blend = 0.1
+        # Clamp to valid range [0.0, 1.0]
+        return cls(
+            color=raw_color.upper(),
+            similarity=max(0.0, min(1.0, similarity)),
+            blend=max(0.0, min(1.0, blend)),
+        )
+
+    @property
+    def token(self) -> str:
+        """Stable string identifying these settings (for cache keys)."""
+        token = f"{self.color}:{self.similarity:.4f}:{self.blend:.4f}"
+        return f"{token}|{self.scale}" if self.scale else token
+
+    def filters(self) -> list[str]:
+        """Key filters: primary + secondary ``chromakey`` pass, then ``despill``.
+
+        #269: chromakey (YUV) rather than colorkey (RGB) to match the preview
+        pipeline.  Users tune similarity/blend values while watching the
+        preview, so the production render must use the same filter family.
+        """
+        # Secondary pass targets brighter reflections (e.g. on hair edges)
+        secondary_color = compute_secondary_key_color(f"#{self.color}")
+        secondary_sim = max(0.15, self.similarity * 0.6)
+        secondary_blend = max(0.05, self.blend * 0.8)
+        r, g, b = (int(self.color[i : i + 2], 16) for i in (0, 2, 4))
+        despill_type = "blue" if (b > g and b > r) else "green"
+        return [
+            f"chromakey=0x{self.color}:{self.similarity}:{self.blend}",
+            f"chromakey={secondary_color}:{secondary_sim:.2f}:{secondary_blend:.2f}",
+            f"despill=type={despill_type}",
+        ]
+
+
 class ChromaKeyService:
     """Resolve key color and apply chroma key processing."""
 
@@ -184,11 +269,84 @@ class ChromaKeyService:
             logger.error("FFmpeg stderr (last 2000): %s", error[-2000:])
             raise RuntimeError(f"FFmpeg chroma key processing failed: {error[-500:]}")
 
+    async def render_keyed_intermediate(
+        self,
+        input_path: str,
+        output_path: str,
+        params: RenderKeyParams,
+        *,
+        timeout_s: float = 1800,
+    ) -> None:
+        """Key a whole video into a VP9-alpha file for the renderer to overlay.
+
+        Applies exactly the renderer's chain — ``params.scale``, then
+        :meth:`RenderKeyParams.filters` plus :data:`RENDER_ALPHA_REFINE` — so
+        the erosion and blur see the same pixels as live keying, video only.
+        Timestamps are passed through so clip in/out points still line up.
+        Decode the result with ``-c:v libvpx-vp9`` to get the alpha plane back.
+        """
+        key_chain = ",".join(params.filters())
+        scale = f"{params.scale}," if params.scale else ""
+        filter_complex = (
+            f"[0:v]format=yuva420p,{scale}{key_chain},split[km][ka];"
+            f"[ka]{RENDER_ALPHA_REFINE}[ke];"
+            f"[km][ke]alphamerge,format=yuva420p[keyed]"
+        )
+        cmd = [
+            self.settings.ffmpeg_path,
+            "-y",
+            "-i",
+            str(input_path),
+            "-filter_complex",
+            filter_complex,
+            "-map",
+            "[keyed]",
+            "-an",
+            "-fps_mode",
+            "passthrough",
+            "-pix_fmt",
+            "yuva420p",
+            "-c:v",
+            "libvpx-vp9",
+            "-auto-alt-ref",
+            "0",
+            "-crf",
+            "18",
+            "-b:v",
+            "0",
+            "-deadline",
+            "good",
+            "-cpu-used",
+            "4",
+            "-row-mt",
+            "1",
+            # Matches the CPU the render scheduler accounts for
+            "-threads",
+            str(self.settings.render_ffmpeg_threads),
+            # Short GOPs keep the renderer's per-clip seeks cheap
+            "-g",
+            "60",
+            str(output_path),
+        ]
+        process = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        try:
+            _, stderr = await asyncio.wait_for(process.communicate(), timeout=timeout_s)
+        except TimeoutError:
+            process.kill()
+            await process.wait()
+            raise RuntimeError(f"Keyed intermediate timed out after {timeout_s:.0f} seconds")
+        if process.returncode != 0:
+            error = stderr.decode("utf-8", errors="ignore")
+            raise RuntimeError(f"FFmpeg keyed intermediate failed: {error[-500:]}")
+
     async def render_preview_frames(
         self,
         *,
         input_url: str,
-        output_dir: str,
         times_ms: list[int],
         clip_start_ms: int,
         in_point_ms: int,
@@ -199,9 +357,16 @@ class ChromaKeyService:
         background_color: str = "0x000000",
         skip_chroma_key: bool = False,
         return_transparent_png: bool = False,
+        source_key: str | None = None,
     ) -> list[dict[str, Any]]:
         """Render chroma key preview frames directly from a signed URL.
 
+        All frames are decoded by one FFmpeg process (see
+        :meth:`_decode_preview_frames`) and keyed together by a second one
+        reading them from a pipe.  When ``source_key`` identifies the source
+        content, decoded frames are cached in :data:`preview_frame_cache`, so
+        re-keying with new similarity/blend only re-runs the key filters.
+
         If skip_chroma_key is True, returns raw frames without chroma key processing.
         If return_transparent_png is True, returns PNG with transparency instead of
         compositing onto black background (for frontend compositing with other layers).
@@ -216,141 +381,298 @@ class ChromaKeyService:
         )
 
         width, height = self._parse_resolution(resolution)
-        color = key_color.replace("#", "0x")
-        # FFmpeg colorkey requires similarity in range [0.00001 - 1], 0 is not accepted
-        similarity = max(0.00001, similarity)
-        frames: list[dict[str, Any]] = []
-
-        # Always use solid black background (no checkerboard)
-        for time_ms in times_ms:
-            relative_ms = max(0, time_ms - clip_start_ms)
-            seek_ms = max(0, in_point_ms + relative_ms)
-            seek_s = seek_ms / 1000.0
-            output_path = os.path.join(output_dir, f"frame_{time_ms}.jpg")
-
-            # Debug log: calculated seek position
-            logger.info(
-                "render_preview_frames: time_ms=%s, relative_ms=%s, seek_ms=%s, seek_s=%.3f",
-                time_ms,
-                relative_ms,
-                seek_ms,
-                seek_s,
-            )
-
-            if skip_chroma_key:
-                # Raw frame extraction without chroma key processing
-                cmd = [
-                    self.settings.ffmpeg_path,
-                    "-y",
-                    "-rw_timeout",
-                    "20000000",
-                    "-ss",
-                    f"{seek_s:.3f}",
-                    "-i",
-                    input_url,
-                    "-vf",
-                    f"scale={width}:{height}",
-                    "-frames:v",
-                    "1",
-                    "-q:v",
-                    "5",
-                    output_path,
-                ]
-            else:
-                # Chroma key processing
-                # 1. FFmpeg: apply chromakey + despill and output PNG with transparency
-                # 2. Pillow: composite onto black background and save as JPEG
-                output_png = output_path.replace(".jpg", ".png")
-                despill_type = self._get_despill_type(key_color)
-                # Apply chromakey + despill for edge refinement (removes color spill/fringing)
-                secondary_color = self._compute_secondary_key_color(key_color)
-                secondary_sim = max(0.15, similarity * 0.6)
-                secondary_blend = max(0.05, blend * 0.8)
-                vf_filter = (
-                    f"scale={width}:{height},"
-                    f"chromakey={color}:{similarity}:{blend},"
-                    f"chromakey={secondary_color}:{secondary_sim:.2f}:{secondary_blend:.2f},"
-                    f"despill=type={despill_type},"
-                    f"format=yuva420p"
+        seeks_ms = {
+            time_ms: max(0, in_point_ms + max(0, time_ms - clip_start_ms)) for time_ms in times_ms
+        }
+        logger.info("render_preview_frames: seek_ms=%s", list(seeks_ms.values()))
+
+        # Decode each distinct source position once, from the cache if possible
+        decoded: dict[int, bytes] = {}
+        for seek_ms in seeks_ms.values():
+            if source_key is not None and seek_ms not in decoded:
+                cached = preview_frame_cache.get(
+                    PreviewFrameKey(source_key, seek_ms, width, height)
                 )
-                cmd = [
-                    self.settings.ffmpeg_path,
-                    "-y",
-                    "-rw_timeout",
-                    "20000000",
-                    "-ss",
-                    f"{seek_s:.3f}",
-                    "-i",
-                    input_url,
-                    "-vf",
-                    vf_filter,
-                    "-frames:v",
-                    "1",
-                    output_png,
-                ]
-
-            result = await asyncio.to_thread(subprocess.run, cmd, capture_output=True, text=True)
-            if result.returncode != 0:
-                stderr_full = result.stderr or "(no stderr)"
-                stdout_full = result.stdout or "(no stdout)"
-                # Log command without URL (privacy/length)
-                cmd_safe = [arg if not arg.startswith("http") else "<URL>" for arg in cmd]
-                logger.error(
-                    "FFmpeg chroma key preview FAILED at time_ms=%s returncode=%s",
-                    time_ms,
-                    result.returncode,
-                )
-                logger.error("FFmpeg command: %s", " ".join(cmd_safe))
-                logger.error("FFmpeg stderr (full):\n%s", stderr_full)
-                logger.error("FFmpeg stdout (full):\n%s", stdout_full)
-                raise RuntimeError(
-                    f"FFmpeg chroma key preview failed at {time_ms}ms. "
-                    f"returncode={result.returncode}. stderr={stderr_full[:2000]}"
+                if cached is not None:
+                    decoded[seek_ms] = cached
+        missing = sorted(set(seeks_ms.values()) - decoded.keys())
+        if missing:
+            fresh = await self._decode_preview_frames(input_url, missing, width, height)
+            decoded.update(fresh)
+            if source_key is not None:
+                for seek_ms, frame in fresh.items():
+                    preview_frame_cache.put(
+                        PreviewFrameKey(source_key, seek_ms, width, height), frame
+                    )
+
+        positions = sorted(decoded)
+        keyed: dict[int, bytes] = {}
+        if not skip_chroma_key:
+            # FFmpeg chromakey requires similarity in range [0.00001 - 1], 0 is not accepted
+            chain = self._preview_key_chain(key_color, max(0.00001, similarity), blend)
+            keyed_frames = await self._key_preview_frames(
+                [decoded[seek_ms] for seek_ms in positions], width, height, chain
+            )
+            keyed = dict(zip(positions, keyed_frames, strict=True))
+
+        def encode_all() -> list[dict[str, Any]]:
+            encoded: dict[int, tuple[bytes, str]] = {}
+            frames: list[dict[str, Any]] = []
+            for time_ms, seek_ms in seeks_ms.items():
+                if seek_ms not in encoded:
+                    encoded[seek_ms] = self._encode_preview_frame(
+                        keyed.get(seek_ms, decoded[seek_ms]),
+                        width,
+                        height,
+                        keyed=not skip_chroma_key,
+                        transparent=return_transparent_png,
+                    )
+                frame_data, image_format = encoded[seek_ms]
+                frames.append(
+                    {
+                        "time_ms": time_ms,
+                        "resolution": f"{width}x{height}",
+                        "frame_base64": base64.b64encode(frame_data).decode("utf-8"),
+                        "size_bytes": len(frame_data),
+                        "skip_chroma_key": skip_chroma_key,
+                        "image_format": image_format,
+                    }
                 )
+            return frames
+
+        # times_ms may repeat; dict keys keep one entry per distinct time
+        frames = await asyncio.to_thread(encode_all)
+        by_time = {frame["time_ms"]: frame for frame in frames}
+        return [by_time[time_ms] for time_ms in times_ms]
 
-            # For chroma key: either return transparent PNG or composite onto black background
-            if not skip_chroma_key:
-                import io
-
-                from PIL import Image
-
-                # Read PNG with transparency
-                fg_img = Image.open(output_png).convert("RGBA")
-
-                if return_transparent_png:
-                    # Return PNG with transparency for frontend compositing
-                    png_buffer = io.BytesIO()
-                    fg_img.save(png_buffer, format="PNG", optimize=True)
-                    frame_data = png_buffer.getvalue()
-                    image_format = "png"
-                else:
-                    # Create black background
-                    bg_img = Image.new("RGBA", fg_img.size, (0, 0, 0, 255))
-                    # Composite foreground onto background
-                    composited = Image.alpha_composite(bg_img, fg_img)
-                    # Convert to RGB (no alpha) and save as JPEG
-                    rgb_img = composited.convert("RGB")
-                    jpeg_buffer = io.BytesIO()
-                    rgb_img.save(jpeg_buffer, format="JPEG", quality=85)
-                    frame_data = jpeg_buffer.getvalue()
-                    image_format = "jpeg"
+    def _preview_key_chain(self, key_color: str, similarity: float, blend: float) -> str:
+        """Preview key filters: chromakey + despill for edge refinement."""
+        color = key_color.replace("#", "0x")
+        despill_type = self._get_despill_type(key_color)
+        secondary_color = self._compute_secondary_key_color(key_color)
+        secondary_sim = max(0.15, similarity * 0.6)
+        secondary_blend = max(0.05, blend * 0.8)
+        return (
+            f"chromakey={color}:{similarity}:{blend},"
+            f"chromakey={secondary_color}:{secondary_sim:.2f}:{secondary_blend:.2f},"
+            f"despill=type={despill_type},"
+            f"format=yuva420p"
+        )
+
+    def _plan_preview_inputs(self, seeks_ms: list[int]) -> list[list[int]]:
+        """Group sorted source positions that one decoder input reads in sequence."""
+        groups: list[list[int]] = []
+        for seek_ms in sorted(set(seeks_ms)):
+            if groups and seek_ms - groups[-1][0] <= PREVIEW_INPUT_SPAN_MS:
+                groups[-1].append(seek_ms)
             else:
-                with open(output_path, "rb") as handle:
-                    frame_data = handle.read()
-                image_format = "jpeg"
-            frames.append(
-                {
-                    "time_ms": time_ms,
-                    "resolution": f"{width}x{height}",
-                    "frame_base64": base64.b64encode(frame_data).decode("utf-8"),
-                    "size_bytes": len(frame_data),
-                    "skip_chroma_key": skip_chroma_key,
-                    "image_format": image_format,
-                }
+                groups.append([seek_ms])
+        return groups
+
+    def _build_preview_decode_command(
+        self, input_url: str, groups: list[list[int]], width: int, height: int
+    ) -> list[str]:
+        """One process decoding the frame at every position of ``groups``.
+
+        Each group is one input seeked to its first position and read just
+        past its last one; a ``select`` keeps the first frame at or after
+        each position.  The selected frames are scaled, concatenated in
+        order and written to stdout as raw ``yuv420p`` — the format the key
+        filters work in, so keyed previews never round-trip through RGB.
+        """
+        cmd = [self.settings.ffmpeg_path, "-v", "error"]
+        filter_parts: list[str] = []
+        for idx, group in enumerate(groups):
+            start_ms = group[0]
+            span_s = (group[-1] - start_ms) / 1000.0 + 1.0
+            cmd += [
+                "-rw_timeout",
+                "20000000",
+                "-ss",
+                f"{start_ms / 1000.0:.3f}",
+                "-t",
+                f"{span_s:.3f}",
+                "-i",
+                input_url,
+            ]
+            offsets = [f"{(seek_ms - start_ms) / 1000.0:.3f}" for seek_ms in group]
+            select = "+".join(f"gte(t,{o})*not(gte(prev_pts*TB,{o}))" for o in offsets)
+            filter_parts.append(
+                f"[{idx}:v]select='{select}',scale={width}:{height},format=yuv420p[pv{idx}]"
             )
+        if len(groups) > 1:
+            labels = "".join(f"[pv{idx}]" for idx in range(len(groups)))
+            filter_parts.append(f"{labels}concat=n={len(groups)}:v=1:a=0[pvout]")
+            out_label = "[pvout]"
+        else:
+            out_label = "[pv0]"
+        cmd += [
+            "-filter_complex",
+            ";".join(filter_parts),
+            "-map",
+            out_label,
+            "-fps_mode",
+            "passthrough",
+            "-f",
+            "rawvideo",
+            "-pix_fmt",
+            "yuv420p",
+            "pipe:1",
+        ]
+        return cmd
+
+    async def _decode_preview_frames(
+        self, input_url: str, seeks_ms: list[int], width: int, height: int
+    ) -> dict[int, bytes]:
+        """Decoded ``yuv420p`` frame at each source position (ms), in one process.
 
+        Positions closer together than the source frame interval select the
+        same frame, so the batch yields fewer frames than asked; those
+        batches are decoded again one position per input.
+        """
+        frame_size = _yuv420p_frame_size(width, height)
+        groups = self._plan_preview_inputs(seeks_ms)
+        cmd = self._build_preview_decode_command(input_url, groups, width, height)
+        output = await self._run_preview_ffmpeg(cmd, None, "decode")
+        positions = [seek_ms for group in groups for seek_ms in group]
+        if len(output) == frame_size * len(positions):
+            return {
+                seek_ms: output[idx * frame_size : (idx + 1) * frame_size]
+                for idx, seek_ms in enumerate(positions)
+            }
+
+        if len(positions) == 1:
+            raise RuntimeError(
+                f"FFmpeg chroma key preview failed at {positions[0]}ms: no frame decoded"
+            )
+        logger.info(
+            "render_preview_frames: batch decoded %d of %d frames, decoding singly",
+            len(output) // frame_size,
+            len(positions),
+        )
+        frames: dict[int, bytes] = {}
+        for seek_ms in positions:
+            frames.update(await self._decode_preview_frames(input_url, [seek_ms], width, height))
         return frames
 
+    async def _key_preview_frames(
+        self, frames: list[bytes], width: int, height: int, chain: str
+    ) -> list[bytes]:
+        """Key decoded ``yuv420p`` frames in one process; returns ``rgba`` frames.
+
+        The key filters read the frames as decoded; the only conversion to
+        RGB is the output one the preview image needs.
+        """
+        cmd = [
+            self.settings.ffmpeg_path,
+            "-v",
+            "error",
+            "-f",
+            "rawvideo",
+            "-pix_fmt",
+            "yuv420p",
+            "-s",
+            f"{width}x{height}",
+            "-i",
+            "pipe:0",
+            "-vf",
+            chain,
+            "-fps_mode",
+            "passthrough",
+            "-f",
+            "rawvideo",
+            "-pix_fmt",
+            "rgba",
+            "pipe:1",
+        ]
+        output = await self._run_preview_ffmpeg(cmd, b"".join(frames), "key")
+        frame_size = width * height * 4
+        if len(output) != frame_size * len(frames):
+            raise RuntimeError(
+                f"FFmpeg chroma key preview returned {len(output) // frame_size} "
+                f"of {len(frames)} keyed frames"
+            )
+        return [output[idx * frame_size : (idx + 1) * frame_size] for idx in range(len(frames))]
+
+    async def _run_preview_ffmpeg(self, cmd: list[str], stdin: bytes | None, stage: str) -> bytes:
+        process = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdin=asyncio.subprocess.PIPE if stdin is not None else asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        try:
+            stdout, stderr = await asyncio.wait_for(
+                process.communicate(stdin), timeout=PREVIEW_TIMEOUT_S
+            )
+        except TimeoutError:
+            process.kill()
+            await process.wait()
+            raise RuntimeError(
+                f"FFmpeg chroma key preview ({stage}) timed out after {PREVIEW_TIMEOUT_S} seconds"
+            )
+        if process.returncode != 0:
+            stderr_full = stderr.decode("utf-8", errors="ignore") or "(no stderr)"
+            # Log command without URL (privacy/length)
+            cmd_safe = [arg if not arg.startswith("http") else "<URL>" for arg in cmd]
+            logger.error(
+                "FFmpeg chroma key preview (%s) FAILED returncode=%s", stage, process.returncode
+            )
+            logger.error("FFmpeg command: %s", " ".join(cmd_safe))
+            logger.error("FFmpeg stderr (full):\n%s", stderr_full)
+            raise RuntimeError(
+                f"FFmpeg chroma key preview ({stage}) failed. "
+                f"returncode={process.returncode}. stderr={stderr_full[:2000]}"
+            )
+        return stdout
+
+    def _encode_preview_frame(
+        self, frame: bytes, width: int, height: int, *, keyed: bool, transparent: bool
+    ) -> tuple[bytes, str]:
+        """Encode a raw frame as the preview image; returns (data, image_format)."""
+        import io
+
+        from PIL import Image
+
+        buffer = io.BytesIO()
+        if not keyed:
+            rgb = self._yuv420p_to_rgb(frame, width, height)
+            Image.frombytes("RGB", (width, height), rgb).save(buffer, format="JPEG", quality=85)
+            return buffer.getvalue(), "jpeg"
+
+        fg_img = Image.frombytes("RGBA", (width, height), frame)
+        if transparent:
+            # Return PNG with transparency for frontend compositing
+            fg_img.save(buffer, format="PNG", optimize=True)
+            return buffer.getvalue(), "png"
+        # Composite onto a black background, save as JPEG
+        bg_img = Image.new("RGBA", fg_img.size, (0, 0, 0, 255))
+        composited = Image.alpha_composite(bg_img, fg_img).convert("RGB")
+        composited.save(buffer, format="JPEG", quality=85)
+        return buffer.getvalue(), "jpeg"
+
+    def _yuv420p_to_rgb(self, frame: bytes, width: int, height: int) -> bytes:
+        """``rgb24`` of a decoded ``yuv420p`` frame (BT.601 limited range, like swscale)."""
+        import numpy as np
+
+        luma = width * height
+        chroma_w, chroma_h = (width + 1) // 2, (height + 1) // 2
+        chroma = chroma_w * chroma_h
+        planes = np.frombuffer(frame, dtype=np.uint8)
+        y = planes[:luma].reshape(height, width).astype(np.float32)
+        u, v = (
+            planes[luma + i * chroma : luma + (i + 1) * chroma]
+            .reshape(chroma_h, chroma_w)
+            .repeat(2, axis=0)
+            .repeat(2, axis=1)[:height, :width]
+            .astype(np.float32)
+            - 128.0
+            for i in (0, 1)
+        )
+        y = (y - 16.0) * 1.164
+        rgb = np.stack((y + 1.596 * v, y - 0.392 * u - 0.813 * v, y + 2.017 * u), axis=-1)
+        return bytes(np.clip(np.rint(rgb), 0, 255).astype(np.uint8).tobytes())
+
     def _parse_resolution(self, resolution: str) -> tuple[int, int]:
         try:
             width_str, height_str = resolution.lower().split("x", 1)
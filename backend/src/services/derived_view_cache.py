@@ -0,0 +1,293 @@
+"""Memoized derived views of a timeline version.
+
+Overview, structure, analysis, composition validation and event detection
+are pure functions of the timeline document (plus a few asset attributes),
+yet agents request them over and over between edits.  This module caches
+their results keyed by::
+
+    (project_id, sequence_id, version_token, view, params_digest)
+
+``version_token`` combines the sequence's ``version`` with its
+``updated_at`` (and the project's ``updated_at`` for project-level fields).
+V1 mutation endpoints persist through ``flag_modified`` without bumping
+``version``, so ``updated_at`` is what guarantees a new key after every
+committed write.  Views that embed asset names (overview, structure,
+timeline overview, snapshot) also fold in :func:`asset_catalog_token`, since
+renaming or deleting an asset changes them without touching the timeline.
+Because a write always produces a new key, a missed invalidation — on
+another instance, or a read racing the writer's commit — can only waste
+memory; it can never serve a stale view.  Write paths still call
+:meth:`DerivedViewCache.invalidate_project` so old versions are evicted
+eagerly.
+
+Values are shared between requests and MUST be treated as read-only by
+callers (build new lists/dicts when filtering).
+
+Storage is an in-process LRU.  A shared backend (e.g. Redis / Memorystore)
+can be plugged in with :meth:`DerivedViewCache.set_backend`; it is consulted
+after a local miss and populated on compute.
+
+Timeline snapshot images (``GET /timeline-overview?include_snapshot=true``)
+are tens to hundreds of KB of base64 each, far above a typical view, so they
+live in a second instance, :data:`timeline_snapshots`, bounded by total
+bytes rather than entry count.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import inspect
+import json
+import logging
+import threading
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from typing import TYPE_CHECKING, Any, NamedTuple, Protocol, TypeVar
+
+from sqlalchemy import func, select
+
+from src.models.asset import Asset
+from src.utils.metrics import metrics
+
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+    from src.models.project import Project
+    from src.models.sequence import Sequence
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Each entry is one rendered view (typically a few KB to a few hundred KB),
+# so a few hundred entries bound the cache to tens of MB per instance.
+DEFAULT_MAX_ENTRIES = 512
+
+# Snapshots are tens to hundreds of KB of base64: this holds a few hundred
+SNAPSHOT_MAX_BYTES = 32 * 1024 * 1024
+
+
+class DerivedViewKey(NamedTuple):
+    project_id: str
+    sequence_id: str
+    version: str
+    view: str
+    params: str
+
+    def as_str(self) -> str:
+        return ":".join(self)
+
+    def slot(self) -> tuple[str, str, str, str]:
+        """Identity of the view regardless of version: (project, sequence, view, params)."""
+        return (self.project_id, self.sequence_id, self.view, self.params)
+
+
+class DerivedViewBackend(Protocol):
+    """Optional shared store consulted after an in-process miss."""
+
+    def get(self, key: str) -> Any | None: ...
+
+    def set(self, key: str, value: Any) -> None: ...
+
+    def invalidate_project(self, project_id: str) -> None: ...
+
+
+def timeline_version_token(project: Project, sequence: Sequence | None = None) -> str:
+    """Return a token that changes whenever the viewed timeline may have changed."""
+    target: Any = sequence if sequence is not None else project
+    parts = [
+        str(getattr(target, "version", "")),
+        _iso(getattr(target, "updated_at", None)),
+    ]
+    if sequence is not None:
+        parts.append(_iso(getattr(project, "updated_at", None)))
+    return "/".join(parts)
+
+
+async def asset_catalog_token(db: AsyncSession, project_id: Any) -> str:
+    """Return a token that changes whenever a project's asset names may have changed.
+
+    Built from the asset count and the latest ``assets.updated_at``: a rename
+    bumps ``updated_at``, an upload adds a newer row, a delete lowers the count.
+    """
+    result = await db.execute(
+        select(func.count(Asset.id), func.max(Asset.updated_at)).where(
+            Asset.project_id == project_id
+        )
+    )
+    count, latest = result.one()
+    return f"{count}@{_iso(latest)}"
+
+
+def params_digest(params: Any) -> str:
+    """Stable short digest of JSON-serialisable view parameters."""
+    if not params:
+        return "-"
+    serialized = json.dumps(params, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha256(serialized.encode("utf-8")).hexdigest()[:16]
+
+
+def view_key(
+    project: Project,
+    sequence: Sequence | None,
+    view: str,
+    params: Any = None,
+    *,
+    assets: str | None = None,
+) -> DerivedViewKey:
+    """Build the cache key for ``view`` of the timeline shown by (project, sequence).
+
+    Pass ``assets=await asset_catalog_token(db, project.id)`` for views that
+    embed asset names.
+    """
+    version = timeline_version_token(project, sequence)
+    if assets is not None:
+        version = f"{version}/{assets}"
+    return DerivedViewKey(
+        project_id=str(project.id),
+        sequence_id=str(sequence.id) if sequence is not None else "-",
+        version=version,
+        view=view,
+        params=params_digest(params),
+    )
+
+
+def _iso(value: Any) -> str:
+    return value.isoformat() if value is not None else "-"
+
+
+class DerivedViewCache:
+    """Bounded LRU of derived timeline views with optional shared backing.
+
+    With ``max_bytes`` the cache is also bounded by the total ``sizeof`` of
+    its values; a value larger than ``max_bytes`` is not cached.  Hits and
+    misses are counted as ``<metric>.hit`` / ``<metric>.miss``.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        backend: DerivedViewBackend | None = None,
+        *,
+        max_bytes: int | None = None,
+        sizeof: Callable[[Any], int] = len,
+        metric: str = "derived_view",
+    ) -> None:
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self._sizeof = sizeof
+        self._metric = metric
+        self._backend = backend
+        self._entries: OrderedDict[DerivedViewKey, Any] = OrderedDict()
+        # slot -> the one cached version of that view, so a newer version
+        # supersedes the older one without scanning every entry.
+        self._slots: dict[tuple[str, str, str, str], DerivedViewKey] = {}
+        self._sizes: dict[DerivedViewKey, int] = {}
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def set_backend(self, backend: DerivedViewBackend | None) -> None:
+        self._backend = backend
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def size_bytes(self) -> int:
+        """Total size of the cached values (0 unless ``max_bytes`` is set)."""
+        return self._size
+
+    def get(self, key: DerivedViewKey) -> Any | None:
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+        if self._backend is not None:
+            try:
+                value = self._backend.get(key.as_str())
+            except Exception:
+                logger.warning("derived view backend get failed", exc_info=True)
+                return None
+            if value is not None:
+                self._store(key, value)
+                return value
+        return None
+
+    def put(self, key: DerivedViewKey, value: Any) -> None:
+        self._store(key, value)
+        if self._backend is not None:
+            try:
+                self._backend.set(key.as_str(), value)
+            except Exception:
+                logger.warning("derived view backend set failed", exc_info=True)
+
+    async def get_or_compute(
+        self,
+        key: DerivedViewKey,
+        compute: Callable[[], Awaitable[T]] | Callable[[], T],
+    ) -> T:
+        """Return the cached view for ``key`` or compute, store and return it."""
+        cached = self.get(key)
+        if cached is not None:
+            metrics.incr(f"{self._metric}.hit")
+            return cached  # type: ignore[no-any-return]
+
+        metrics.incr(f"{self._metric}.miss")
+        value = compute()
+        if inspect.isawaitable(value):
+            value = await value
+        if value is not None:
+            self.put(key, value)
+        return value
+
+    def invalidate_project(self, project_id: Any) -> int:
+        """Drop every cached view of ``project_id``; returns the number evicted."""
+        project_id_str = str(project_id)
+        with self._lock:
+            stale = [k for k in self._entries if k.project_id == project_id_str]
+            for k in stale:
+                self._drop(k)
+        if self._backend is not None:
+            try:
+                self._backend.invalidate_project(project_id_str)
+            except Exception:
+                logger.warning("derived view backend invalidate failed", exc_info=True)
+        return len(stale)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._slots.clear()
+            self._sizes.clear()
+            self._size = 0
+
+    def _store(self, key: DerivedViewKey, value: Any) -> None:
+        size = self._sizeof(value) if self._max_bytes is not None else 0
+        with self._lock:
+            # A newer version supersedes the older one for the same view/params.
+            previous = self._slots.get(key.slot())
+            if previous is not None:
+                self._drop(previous)
+            if self._max_bytes is not None and size > self._max_bytes:
+                return
+            self._entries[key] = value
+            self._slots[key.slot()] = key
+            if self._max_bytes is not None:
+                self._sizes[key] = size
+                self._size += size
+            while len(self._entries) > self._max_entries or (
+                self._max_bytes is not None and self._size > self._max_bytes
+            ):
+                self._drop(next(iter(self._entries)))
+
+    def _drop(self, key: DerivedViewKey) -> None:
+        """Remove ``key`` and its slot index entry.  Caller holds the lock."""
+        self._entries.pop(key, None)
+        self._size -= self._sizes.pop(key, 0)
+        if self._slots.get(key.slot()) == key:
+            del self._slots[key.slot()]
+
+
+# Process-wide cache instances
+derived_views = DerivedViewCache()
+timeline_snapshots = DerivedViewCache(max_bytes=SNAPSHOT_MAX_BYTES, metric="timeline_snapshot")
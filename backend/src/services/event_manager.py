@@ -1,32 +1,99 @@
 """Firestore Event Manager for project change notifications.
 
 Publishes project update events to Firestore for real-time sync with frontend.
+
+While the app is running (:meth:`ProjectEventManager.start` is called from
+the lifespan), :meth:`~ProjectEventManager.publish` only enqueues: events for
+the same project arriving within ``window_s`` are merged into one (see
+:func:`_merge_events`) and written off the event loop in one Firestore batch.
+The queue is bounded by the number of projects with a pending event; when it
+is full, publishers wait briefly for the next flush and drop their event if
+it does not come.  :meth:`~ProjectEventManager.stop` flushes what is left,
+dropping it after a timeout.
+
+Without a running publisher (scripts, jobs, tests) each event is written
+immediately, still off the event loop.
 """
 
+import asyncio
 import logging
 from datetime import UTC, datetime
+from typing import Any
 from uuid import UUID
 
 from firebase_admin import firestore
 
-from src.api.deps import get_firebase_app
+from src.config import get_settings
+from src.services.derived_view_cache import derived_views, timeline_snapshots
+from src.utils.metrics import metrics
 
 logger = logging.getLogger(__name__)
 
+# Firestore rejects batches with more than 500 writes
+_MAX_BATCH_WRITES = 500
+
+
+def _merge_events(old: dict[str, Any], new: dict[str, Any]) -> dict[str, Any]:
+    """Coalesce two pending events for the same project into one.
+
+    The newer event's timestamp and operation win, but the highest ``version``
+    seen is kept even when the newer event carries none.  The frontend skips
+    events whose ``user_id`` is its own, so when the merged events came from
+    different users the attribution (``user_id``, ``user_name``, ``source``)
+    is cleared to ``None``; writing it explicitly also overwrites the previous
+    attribution in the merged Firestore document.
+    """
+    merged = {**old, **new}
+    versions = [v for v in (old.get("version"), new.get("version")) if isinstance(v, int)]
+    if versions:
+        merged["version"] = max(versions)
+    if old.get("user_id") != new.get("user_id"):
+        merged["user_id"] = None
+        merged["user_name"] = None
+        merged["source"] = None
+    return merged
+
 
 class ProjectEventManager:
     """Manages event publishing for projects via Firestore."""
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        *,
+        window_s: float = 0.1,
+        max_pending: int = 1000,
+        backpressure_timeout_s: float = 1.0,
+        shutdown_timeout_s: float = 5.0,
+    ) -> None:
         self._db = None
+        self.window_s = window_s
+        self.max_pending = max_pending
+        self.backpressure_timeout_s = backpressure_timeout_s
+        self.shutdown_timeout_s = shutdown_timeout_s
+        self._pending: dict[str, dict[str, Any]] = {}
+        self._task: asyncio.Task[None] | None = None
+        self._wakeup: asyncio.Event | None = None
+        self._urgent: asyncio.Event | None = None
+        self._drained: asyncio.Condition | None = None
 
     def _get_db(self):
         """Lazy initialization of Firestore client."""
         if self._db is None:
+            # Imported lazily: src.api routers import this module
+            from src.api.deps import get_firebase_app
+
             get_firebase_app()  # Ensure Firebase is initialized
             self._db = firestore.client()
         return self._db
 
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    @property
+    def pending(self) -> dict[str, dict[str, Any]]:
+        return dict(self._pending)
+
     async def publish(
         self,
         project_id: str | UUID,
@@ -45,33 +112,146 @@ class ProjectEventManager:
         """
         project_id_str = str(project_id)
 
+        # Every timeline write path publishes here, so drop this instance's
+        # memoized views and snapshots of the old version eagerly.
+        derived_views.invalidate_project(project_id_str)
+        timeline_snapshots.invalidate_project(project_id_str)
+
+        update_data: dict[str, Any] = {
+            "updated_at": datetime.now(UTC),
+            "source": data.get("source", "api") if data else "api",
+            "operation": event_type,
+        }
+
+        # Include additional fields from data if present
+        if data:
+            if "version" in data:
+                update_data["version"] = data["version"]
+            if "user_id" in data:
+                update_data["user_id"] = data["user_id"]
+            if "user_name" in data:
+                update_data["user_name"] = data["user_name"]
+
+        if not self.running:
+            await self._write_now(project_id_str, event_type, update_data)
+            return
+        await self._enqueue(project_id_str, update_data)
+
+    async def _write_now(
+        self, project_id_str: str, event_type: str, update_data: dict[str, Any]
+    ) -> None:
         try:
             db = self._get_db()
             doc_ref = db.collection("project_updates").document(project_id_str)
-
-            update_data = {
-                "updated_at": datetime.now(UTC),
-                "source": data.get("source", "api") if data else "api",
-                "operation": event_type,
-            }
-
-            # Include additional fields from data if present
-            if data:
-                if "version" in data:
-                    update_data["version"] = data["version"]
-                if "user_id" in data:
-                    update_data["user_id"] = data["user_id"]
-                if "user_name" in data:
-                    update_data["user_name"] = data["user_name"]
-
             # Use merge=True to preserve existing allowed_users without overwriting
-            doc_ref.set(update_data, merge=True)
+            await asyncio.to_thread(doc_ref.set, update_data, merge=True)
 
             logger.info(f"Published {event_type} to Firestore for project {project_id_str}")
         except Exception as e:
             # Log error but don't fail the main operation
             logger.error(f"Failed to publish event to Firestore: {e}")
 
+    async def _enqueue(self, project_id_str: str, update_data: dict[str, Any]) -> None:
+        assert self._wakeup is not None and self._urgent is not None
+        assert self._drained is not None
+        if project_id_str not in self._pending and len(self._pending) >= self.max_pending:
+            # Backpressure: flush now and wait (briefly) for room
+            metrics.incr("events.firestore.backpressure")
+            self._wakeup.set()
+            self._urgent.set()
+            try:
+                async with self._drained:
+                    await asyncio.wait_for(
+                        self._drained.wait_for(lambda: len(self._pending) < self.max_pending),
+                        timeout=self.backpressure_timeout_s,
+                    )
+            except TimeoutError:
+                metrics.incr("events.firestore.dropped")
+                logger.warning(
+                    "Firestore event queue full (%d projects); dropped event for project %s",
+                    len(self._pending),
+                    project_id_str,
+                )
+                return
+
+        existing = self._pending.get(project_id_str)
+        if existing is not None:
+            metrics.incr("events.firestore.coalesced")
+            update_data = _merge_events(existing, update_data)
+        self._pending[project_id_str] = update_data
+        self._wakeup.set()
+
+    async def flush(self) -> int:
+        """Write all pending events in Firestore batches; returns the number written."""
+        if not self._pending:
+            return 0
+        batch, self._pending = self._pending, {}
+        if self._drained is not None:
+            async with self._drained:
+                self._drained.notify_all()
+
+        items = list(batch.items())
+        written = 0
+        for start in range(0, len(items), _MAX_BATCH_WRITES):
+            chunk = items[start : start + _MAX_BATCH_WRITES]
+            try:
+                await asyncio.to_thread(self._commit, chunk)
+            except Exception as e:
+                metrics.incr("events.firestore.failed", len(chunk))
+                logger.error(f"Failed to publish {len(chunk)} events to Firestore: {e}")
+                continue
+            written += len(chunk)
+        metrics.incr("events.firestore.written", written)
+        return written
+
+    def _commit(self, items: list[tuple[str, dict[str, Any]]]) -> None:
+        """Blocking: one Firestore batch commit (runs in a worker thread)."""
+        db = self._get_db()
+        batch = db.batch()
+        collection = db.collection("project_updates")
+        for project_id_str, update_data in items:
+            # Use merge=True to preserve existing allowed_users without overwriting
+            batch.set(collection.document(project_id_str), update_data, merge=True)
+        batch.commit()
+        logger.info(f"Published {len(items)} project events to Firestore")
+
+    def start(self) -> None:
+        if not self.running:
+            self._wakeup = asyncio.Event()
+            self._urgent = asyncio.Event()
+            self._drained = asyncio.Condition()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the publisher, flushing pending events (dropped after the timeout)."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        pending = len(self._pending)
+        try:
+            await asyncio.wait_for(self.flush(), timeout=self.shutdown_timeout_s)
+        except TimeoutError:
+            metrics.incr("events.firestore.dropped", pending)
+            logger.warning("Dropped %d Firestore events on shutdown (flush timed out)", pending)
+
+    async def _run(self) -> None:
+        assert self._wakeup is not None and self._urgent is not None
+        while True:
+            await self._wakeup.wait()
+            # Let a burst of writes for the same project collapse into one event
+            # (cut short when the queue is full)
+            try:
+                await asyncio.wait_for(self._urgent.wait(), timeout=self.window_s)
+            except TimeoutError:
+                pass
+            self._wakeup.clear()
+            self._urgent.clear()
+            await self.flush()
+
     async def set_allowed_users(
         self,
         project_id: str | UUID,
@@ -87,6 +267,9 @@ class ProjectEventManager:
         - member invited / accepted
         - member removed
 
+        Access changes are never queued: the write completes (off the event
+        loop) before this returns.
+
         Args:
             project_id: Project UUID
             firebase_uids: List of Firebase Auth UIDs (owner + accepted members)
@@ -104,7 +287,7 @@ class ProjectEventManager:
         try:
             db = self._get_db()
             doc_ref = db.collection("project_updates").document(project_id_str)
-            doc_ref.set({"allowed_users": firebase_uids}, merge=True)
+            await asyncio.to_thread(doc_ref.set, {"allowed_users": firebase_uids}, merge=True)
 
             logger.info(
                 f"Updated allowed_users for project {project_id_str}: {len(firebase_uids)} UIDs"
@@ -116,5 +299,10 @@ class ProjectEventManager:
             return False
 
 
+_settings = get_settings()
+
 # Global event manager instance
-event_manager = ProjectEventManager()
+event_manager = ProjectEventManager(
+    window_s=_settings.event_publish_window_seconds,
+    max_pending=_settings.event_publish_max_pending,
+)
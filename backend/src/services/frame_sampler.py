@@ -8,6 +8,7 @@ import asyncio
 import base64
 import logging
 import os
+import shutil
 import subprocess
 import tempfile
 from typing import Any
@@ -17,6 +18,13 @@ from src.config import get_settings
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+# Batched sampling (FrameSampler.sample_frames): times showing the same clips
+# share one FFmpeg process, up to this many frames spread over at most this
+# span, with this many processes at once
+BATCH_MAX_FRAMES = 8
+BATCH_MAX_SPAN_MS = 10_000
+BATCH_CONCURRENCY = 3
+
 
 def _parse_hex_color(color_str: str, default: str = "ffffff") -> tuple[int, int, int]:
     """Parse hex color string to (r, g, b) tuple. Falls back to default for invalid colors."""
@@ -83,6 +91,11 @@ def _calculate_fade_opacity(time_in_clip_ms, duration_ms, fade_in_ms, fade_out_m
     return max(0.0, min(1.0, mult))
 
 
+def _is_overlay_clip(clip: dict[str, Any]) -> bool:
+    """Shape and text clips are drawn as PNG overlays rather than decoded."""
+    return bool(clip.get("shape")) or clip.get("text_content") is not None
+
+
 def _coerce_int(value: Any, default: int = 0) -> int:
     try:
         return int(float(value))
@@ -362,13 +375,339 @@ class FrameSampler:
 
         finally:
             # Cleanup temp directory
-            import shutil
-
             try:
                 shutil.rmtree(temp_dir, ignore_errors=True)
             except Exception:
                 pass
 
+    async def sample_frames(
+        self,
+        times_ms: list[int],
+        resolution: str = "640x360",
+        max_concurrency: int = BATCH_CONCURRENCY,
+    ) -> list[dict[str, Any] | None]:
+        """Render frames at several times, sharing FFmpeg processes.
+
+        Times are grouped by the clips visible at them (see
+        :meth:`plan_batches`); each group renders in a single FFmpeg
+        invocation with one output per time, and at most ``max_concurrency``
+        groups run at once.  A group that fails falls back to
+        :meth:`sample_frame` per time.
+
+        Returns:
+            One result per entry of ``times_ms``, in the same order and with
+            the same shape as :meth:`sample_frame`; ``None`` where the frame
+            could not be rendered at all.
+        """
+        width, height = self._parse_resolution(resolution)
+        results: dict[int, dict[str, Any] | None] = {}
+        semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+        async def run(batch: list[int]) -> None:
+            async with semaphore:
+                results.update(await self._sample_batch(batch, width, height))
+
+        await asyncio.gather(*(run(batch) for batch in self.plan_batches(times_ms)))
+        return [results.get(time_ms) for time_ms in times_ms]
+
+    def plan_batches(self, times_ms: list[int]) -> list[list[int]]:
+        """Split ``times_ms`` into groups that can share one FFmpeg process.
+
+        Times with the same visible clips form a group, which is cut into
+        batches of at most ``BATCH_MAX_FRAMES`` times spanning at most
+        ``BATCH_MAX_SPAN_MS`` (each input is decoded across the whole span,
+        so distant times are cheaper as separate seeks).  Times with nothing
+        visible form a single batch: they all render the same blank frame.
+        """
+        groups: dict[tuple[int, ...], list[int]] = {}
+        for time_ms in sorted(set(times_ms)):
+            key = tuple(id(clip) for _, _, clip in self._visible_clips(time_ms))
+            groups.setdefault(key, []).append(time_ms)
+
+        batches: list[list[int]] = []
+        for key, group in groups.items():
+            if not key:
+                batches.append(group)
+                continue
+            batch: list[int] = []
+            for time_ms in group:
+                if batch and (
+                    len(batch) >= BATCH_MAX_FRAMES or time_ms - batch[0] > BATCH_MAX_SPAN_MS
+                ):
+                    batches.append(batch)
+                    batch = []
+                batch.append(time_ms)
+            batches.append(batch)
+        return batches
+
+    async def _sample_batch(
+        self, times_ms: list[int], width: int, height: int
+    ) -> dict[int, dict[str, Any] | None]:
+        """Render one batch from :meth:`plan_batches`; ``{time_ms: result}``."""
+        import time as time_mod
+
+        resolution = f"{width}x{height}"
+        visible = self._visible_clips(times_ms[0])
+        if not visible:
+            blank = await self._sample_frame_or_none(times_ms[0], resolution)
+            return {t: {**blank, "time_ms": t} if blank else None for t in times_ms}
+
+        t0 = time_mod.monotonic()
+        temp_dir = tempfile.mkdtemp(prefix="douga_sample_")
+        try:
+            cmd, output_paths, active_clips = self._build_batch_command(
+                times_ms, visible, width, height, temp_dir
+            )
+            print(
+                f"[FRAME-SAMPLE] Rendering {len(times_ms)} frames "
+                f"({times_ms[0]}-{times_ms[-1]}ms) in one pass...",
+                flush=True,
+            )
+            result = await asyncio.to_thread(subprocess.run, cmd, capture_output=True, text=True)
+            elapsed = time_mod.monotonic() - t0
+            if result.returncode != 0:
+                logger.warning(
+                    f"[FRAME-SAMPLE] Batch failed at {times_ms[0]}-{times_ms[-1]}ms "
+                    f"({elapsed:.1f}s), sampling frames one by one: {result.stderr[:300]}"
+                )
+
+            frames: dict[int, dict[str, Any] | None] = {}
+            for time_ms, path in zip(times_ms, output_paths, strict=True):
+                if result.returncode != 0 or not os.path.exists(path):
+                    continue
+                with open(path, "rb") as f:
+                    frame_data = f.read()
+                frames[time_ms] = {
+                    "time_ms": time_ms,
+                    "resolution": resolution,
+                    "frame_base64": base64.b64encode(frame_data).decode("utf-8"),
+                    "size_bytes": len(frame_data),
+                    "active_clips": active_clips[time_ms],
+                }
+            if result.returncode == 0:
+                print(
+                    f"[FRAME-SAMPLE] Done {len(frames)}/{len(times_ms)} frames ({elapsed:.1f}s)",
+                    flush=True,
+                )
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+        for time_ms in times_ms:
+            if time_ms not in frames:
+                frames[time_ms] = await self._sample_frame_or_none(time_ms, resolution)
+        return frames
+
+    async def _sample_frame_or_none(self, time_ms: int, resolution: str) -> dict[str, Any] | None:
+        try:
+            return await self.sample_frame(time_ms=time_ms, resolution=resolution)
+        except Exception as e:
+            logger.warning(f"[FRAME-SAMPLE] Failed to sample frame at {time_ms}ms: {e}")
+            return None
+
+    def _build_batch_command(
+        self,
+        times_ms: list[int],
+        visible: list[tuple[dict[str, Any], str, dict[str, Any]]],
+        width: int,
+        height: int,
+        temp_dir: str,
+    ) -> tuple[list[str], list[str], dict[int, list[dict[str, Any]]]]:
+        """FFmpeg command rendering every time in ``times_ms`` in one process.
+
+        Each asset is opened once, seeking to cover the whole batch, and
+        ``split`` into one branch per time; each branch is trimmed to its own
+        frame and composited exactly like :meth:`_render_single_frame` onto
+        its own canvas, ending in its own PNG output.
+
+        Returns:
+            ``(cmd, output_paths, active_clips)``, with output paths in the
+            order of ``times_ms`` and active clip metadata keyed by time.
+        """
+        inputs: list[str] = []
+        filter_parts: list[str] = []
+        outputs: list[str] = []
+        output_paths: list[str] = []
+        active_clips: dict[int, list[dict[str, Any]]] = {t: [] for t in times_ms}
+        input_idx = 0
+
+        # Asset clip position in ``visible`` -> (input index, branch labels, fine offsets)
+        sources: dict[int, tuple[int, list[str], list[float]]] = {}
+        for pos, (_, _, clip) in enumerate(visible):
+            if _is_overlay_clip(clip):
+                continue
+            seeks = [self._asset_seek_s(clip, t) for t in times_ms]
+            # Same hybrid seek as the single-frame path, widened to the batch
+            coarse_seek = max(0, min(seeks) - 5.0)
+            fine_offsets = [seek - coarse_seek for seek in seeks]
+            inputs.extend(
+                [
+                    "-ss",
+                    str(coarse_seek),
+                    "-t",
+                    str(round(max(fine_offsets) + 1.0, 3)),
+                    "-i",
+                    self.assets[str(clip.get("asset_id"))],
+                ]
+            )
+            if len(times_ms) == 1:
+                labels = [f"{input_idx}:v"]
+            else:
+                labels = [f"smp_src{input_idx}_{j}" for j in range(len(times_ms))]
+                filter_parts.append(
+                    f"[{input_idx}:v]split={len(labels)}" + "".join(f"[{x}]" for x in labels)
+                )
+            sources[pos] = (input_idx, labels, fine_offsets)
+            input_idx += 1
+
+        shape_idx = 0
+        for j, time_ms in enumerate(times_ms):
+            current_output = f"smp_canvas{j}"
+            filter_parts.append(
+                f"color=c=black:s={self.project_width}x{self.project_height}:r=1:d=0.5"
+                f"[{current_output}]"
+            )
+            for pos, (layer, layer_type, clip) in enumerate(visible):
+                if _is_overlay_clip(clip):
+                    png_path = self._generate_simple_overlay(clip, shape_idx, temp_dir, time_ms)
+                    if png_path:
+                        inputs.extend(["-i", png_path])
+                        output_label = f"smp_shape{shape_idx}"
+                        filter_parts.append(
+                            self._overlay_filter(
+                                current_output, f"{input_idx}:v", clip, time_ms, output_label
+                            )
+                        )
+                        current_output = output_label
+                        input_idx += 1
+                        shape_idx += 1
+                        active_clips[time_ms].append(self._clip_info(layer, clip, time_ms))
+                    continue
+
+                source_idx, labels, fine_offsets = sources[pos]
+                tag = f"{source_idx}_{j}"
+                filter_parts.append(
+                    self._build_sample_clip_filter_fast(
+                        source_idx,
+                        clip,
+                        layer_type,
+                        current_output,
+                        fine_offset=fine_offsets[j],
+                        time_ms=time_ms,
+                        source=labels[j],
+                        tag=tag,
+                    )
+                )
+                current_output = f"smp{tag}"
+                active_clips[time_ms].append(
+                    self._clip_info(layer, clip, time_ms, str(clip.get("asset_id")))
+                )
+
+            filter_parts.append(f"[{current_output}]scale={width}:{height}[smp_out{j}]")
+            output_path = os.path.join(temp_dir, f"frame_{j}.png")
+            outputs.extend(["-map", f"[smp_out{j}]", "-frames:v", "1", output_path])
+            output_paths.append(output_path)
+
+        cmd = [
+            settings.ffmpeg_path,
+            "-y",
+            *inputs,
+            "-filter_complex",
+            ";\n".join(filter_parts),
+            *outputs,
+        ]
+        return cmd, output_paths, active_clips
+
+    def _visible_clips(self, time_ms: int) -> list[tuple[dict[str, Any], str, dict[str, Any]]]:
+        """``(layer, layer_type, clip)`` for each clip drawn at ``time_ms``.
+
+        Bottom layer first (composite order).  Asset clips whose file is not
+        available locally are left out, as they cannot be rendered.
+        """
+        visible_clips: list[tuple[dict[str, Any], str, dict[str, Any]]] = []
+        for layer in reversed(self.timeline.get("layers") or []):
+            visible = layer.get("visible")
+            if visible is None:
+                visible = True
+            if not visible:
+                continue
+
+            layer_type = layer.get("type") or "content"
+
+            for clip in layer.get("clips") or []:
+                clip_start = clip.get("start_ms") or 0
+                clip_dur = clip.get("duration_ms") or 0
+                freeze_frame_ms = clip.get("freeze_frame_ms") or 0
+                clip_end = clip_start + clip_dur + freeze_frame_ms
+
+                # Skip clips not visible at target time
+                if clip_dur <= 0 or clip_start > time_ms or clip_end <= time_ms:
+                    continue
+
+                if not _is_overlay_clip(clip):
+                    asset_id = str(clip.get("asset_id") or "")
+                    if not asset_id or asset_id not in self.assets:
+                        continue
+
+                visible_clips.append((layer, layer_type, clip))
+        return visible_clips
+
+    @staticmethod
+    def _asset_seek_s(clip: dict[str, Any], time_ms: int) -> float:
+        """Position in the clip's asset (seconds) shown at timeline ``time_ms``."""
+        clip_start = clip.get("start_ms") or 0
+        clip_dur = clip.get("duration_ms") or 0
+        freeze_frame_ms = clip.get("freeze_frame_ms") or 0
+        in_point_ms = clip.get("in_point_ms") or 0
+        if freeze_frame_ms > 0 and time_ms >= clip_start + clip_dur:
+            # Freeze zone: hold the last frame of the clip's content
+            offset_in_asset_ms = in_point_ms + clip_dur - 1
+        else:
+            offset_in_asset_ms = in_point_ms + (time_ms - clip_start)
+        return float(max(0, offset_in_asset_ms / 1000))
+
+    @staticmethod
+    def _overlay_filter(
+        base_output: str,
+        overlay_ref: str,
+        clip: dict[str, Any],
+        time_ms: int,
+        output_label: str,
+    ) -> str:
+        """Overlay a rendered shape/text PNG centred at the clip's position."""
+        interp = _interpolate_transform_at(clip, time_ms)
+        overlay_x = f"(main_w/2)+({int(interp['x'])})-(overlay_w/2)"
+        overlay_y = f"(main_h/2)+({int(interp['y'])})-(overlay_h/2)"
+        return f"[{base_output}][{overlay_ref}]overlay=x={overlay_x}:y={overlay_y}[{output_label}]"
+
+    def _clip_info(
+        self,
+        layer: dict[str, Any],
+        clip: dict[str, Any],
+        time_ms: int,
+        asset_id: str | None = None,
+    ) -> dict[str, Any]:
+        """Active clip metadata returned alongside a sampled frame."""
+        clip_start = clip.get("start_ms") or 0
+        clip_dur = clip.get("duration_ms") or 0
+        if asset_id is not None:
+            clip_type = "video"
+        elif clip.get("text_content") is not None:
+            clip_type = "text"
+        else:
+            clip_type = "shape"
+        return {
+            "clip_id": clip.get("id", ""),
+            "layer_name": layer.get("name", layer.get("type", "unknown")),
+            "asset_id": asset_id,
+            "asset_name": self.asset_name_map.get(asset_id) if asset_id else None,
+            "clip_type": clip_type,
+            "transform": clip.get("transform", {}),
+            "text_content": clip.get("text_content") if asset_id is None else None,
+            "progress_percent": round(
+                ((time_ms - clip_start) / clip_dur * 100) if clip_dur > 0 else 0, 1
+            ),
+        }
+
     async def _render_single_frame(
         self,
         time_ms: int,
@@ -393,15 +732,11 @@ class FrameSampler:
 
         t0 = time_mod.monotonic()
 
-        layers = self.timeline.get("layers") or []
-
         inputs: list[str] = []
         filter_parts: list[str] = []
         input_idx = 0
         active_clips_info: list[dict[str, Any]] = []
 
-        sorted_layers = list(reversed(layers))
-
         # Base canvas - short duration (needs enough for trim+setpts)
         inputs.extend(
             [
@@ -417,126 +752,55 @@ class FrameSampler:
         shape_idx = 0
         has_clips = False
 
-        for layer in sorted_layers:
-            visible = layer.get("visible")
-            if visible is None:
-                visible = True
-            if not visible:
-                continue
-
-            clips = layer.get("clips") or []
-            if not clips:
-                continue
-
-            layer_type = layer.get("type") or "content"
-
-            for clip in clips:
-                clip_start = clip.get("start_ms") or 0
-                clip_dur = clip.get("duration_ms") or 0
-                freeze_frame_ms = clip.get("freeze_frame_ms") or 0
-                clip_end = clip_start + clip_dur + freeze_frame_ms
-
-                # Skip clips not visible at target time
-                if clip_dur <= 0 or clip_start > time_ms or clip_end <= time_ms:
-                    continue
-
-                # Shape/text clips
-                if clip.get("shape") or clip.get("text_content") is not None:
-                    png_path = self._generate_simple_overlay(clip, shape_idx, temp_dir, time_ms)
-                    if png_path:
-                        inputs.extend(["-i", png_path])
-                        interp = _interpolate_transform_at(clip, time_ms)
-                        center_x = interp["x"]
-                        center_y = interp["y"]
-
-                        overlay_x = f"(main_w/2)+({int(center_x)})-(overlay_w/2)"
-                        overlay_y = f"(main_h/2)+({int(center_y)})-(overlay_h/2)"
-
-                        output_label = f"smp_shape{shape_idx}"
-                        filter_parts.append(
-                            f"[{current_output}][{input_idx}:v]overlay="
-                            f"x={overlay_x}:y={overlay_y}"
-                            f"[{output_label}]"
+        for layer, layer_type, clip in self._visible_clips(time_ms):
+            # Shape/text clips
+            if _is_overlay_clip(clip):
+                png_path = self._generate_simple_overlay(clip, shape_idx, temp_dir, time_ms)
+                if png_path:
+                    inputs.extend(["-i", png_path])
+                    output_label = f"smp_shape{shape_idx}"
+                    filter_parts.append(
+                        self._overlay_filter(
+                            current_output, f"{input_idx}:v", clip, time_ms, output_label
                         )
-                        current_output = output_label
-                        input_idx += 1
-                        shape_idx += 1
-                        has_clips = True
-
-                        # Collect metadata for shape/text clip
-                        clip_type = "text" if clip.get("text_content") is not None else "shape"
-                        active_clips_info.append(
-                            {
-                                "clip_id": clip.get("id", ""),
-                                "layer_name": layer.get("name", layer.get("type", "unknown")),
-                                "asset_id": None,
-                                "asset_name": None,
-                                "clip_type": clip_type,
-                                "transform": clip.get("transform", {}),
-                                "text_content": clip.get("text_content"),
-                                "progress_percent": round(
-                                    ((time_ms - clip_start) / clip_dur * 100)
-                                    if clip_dur > 0
-                                    else 0,
-                                    1,
-                                ),
-                            }
-                        )
-                    continue
+                    )
+                    current_output = output_label
+                    input_idx += 1
+                    shape_idx += 1
+                    has_clips = True
 
-                # Asset-based clips
-                asset_id = str(clip.get("asset_id") or "")
-                if not asset_id or asset_id not in self.assets:
-                    continue
+                    # Collect metadata for shape/text clip
+                    active_clips_info.append(self._clip_info(layer, clip, time_ms))
+                continue
 
-                asset_path = self.assets[asset_id]
+            # Asset-based clips
+            asset_id = str(clip.get("asset_id"))
+            seek_s = self._asset_seek_s(clip, time_ms)
+
+            # Hybrid seeking: coarse input-level seek + fine trim filter
+            # Input-level -ss seeks to nearest keyframe which can be
+            # seconds away, causing black frames with short durations.
+            # So we seek 5s before target and use trim for exact position.
+            coarse_seek = max(0, seek_s - 5.0)
+            fine_offset = seek_s - coarse_seek
+            inputs.extend(["-ss", str(coarse_seek), "-t", "6", "-i", self.assets[asset_id]])
+
+            # Build filter with fine trim to get exact frame
+            clip_filter = self._build_sample_clip_filter_fast(
+                input_idx,
+                clip,
+                layer_type,
+                current_output,
+                fine_offset=fine_offset,
+                time_ms=time_ms,
+            )
+            filter_parts.append(clip_filter)
+            current_output = f"smp{input_idx}"
+            input_idx += 1
+            has_clips = True
 
-                # Calculate seek position within the asset
-                in_point_ms = clip.get("in_point_ms") or 0
-                time_in_clip = time_ms - clip_start
-                if freeze_frame_ms > 0 and time_ms >= clip_start + clip_dur:
-                    offset_in_asset_ms = in_point_ms + clip_dur - 1
-                else:
-                    offset_in_asset_ms = in_point_ms + time_in_clip
-                seek_s = max(0, offset_in_asset_ms / 1000)
-
-                # Hybrid seeking: coarse input-level seek + fine trim filter
-                # Input-level -ss seeks to nearest keyframe which can be
-                # seconds away, causing black frames with short durations.
-                # So we seek 5s before target and use trim for exact position.
-                coarse_seek = max(0, seek_s - 5.0)
-                fine_offset = seek_s - coarse_seek
-                inputs.extend(["-ss", str(coarse_seek), "-t", "6", "-i", asset_path])
-
-                # Build filter with fine trim to get exact frame
-                clip_filter = self._build_sample_clip_filter_fast(
-                    input_idx,
-                    clip,
-                    layer_type,
-                    current_output,
-                    fine_offset=fine_offset,
-                    time_ms=time_ms,
-                )
-                filter_parts.append(clip_filter)
-                current_output = f"smp{input_idx}"
-                input_idx += 1
-                has_clips = True
-
-                # Collect metadata for asset-based clip
-                active_clips_info.append(
-                    {
-                        "clip_id": clip.get("id", ""),
-                        "layer_name": layer.get("name", layer.get("type", "unknown")),
-                        "asset_id": asset_id,
-                        "asset_name": self.asset_name_map.get(asset_id),
-                        "clip_type": "video",
-                        "transform": clip.get("transform", {}),
-                        "text_content": None,
-                        "progress_percent": round(
-                            ((time_ms - clip_start) / clip_dur * 100) if clip_dur > 0 else 0, 1
-                        ),
-                    }
-                )
+            # Collect metadata for asset-based clip
+            active_clips_info.append(self._clip_info(layer, clip, time_ms, asset_id))
 
         if not has_clips:
             cmd = [
@@ -608,14 +872,22 @@ class FrameSampler:
         base_output: str,
         fine_offset: float = 0.0,
         time_ms: int = 0,
+        source: str | None = None,
+        tag: str | None = None,
     ) -> str:
         """Build FFmpeg filter for a single clip at a single frame.
 
         Uses hybrid seeking: input-level coarse seek already done, then
         trim+setpts for exact frame positioning. Clip visibility already checked.
+
+        ``source`` overrides the input stream label (``"{input_idx}:v"``) and
+        ``tag`` the suffix of the labels created here (``input_idx``); batched
+        sampling uses them to draw one input into several frames.
         """
         effects = clip.get("effects") or {}
-        output_label = f"smp{input_idx}"
+        source = source or f"{input_idx}:v"
+        tag = tag or str(input_idx)
+        output_label = f"smp{tag}"
 
         clip_filters: list[str] = []
 
@@ -693,23 +965,23 @@ class FrameSampler:
 
         # Build filter string
         if chroma_key_enabled and clip_filters:
-            ck_m = f"sck{input_idx}_m"
-            ck_a = f"sck{input_idx}_a"
-            ck_e = f"sck{input_idx}_e"
+            ck_m = f"sck{tag}_m"
+            ck_a = f"sck{tag}_a"
+            ck_e = f"sck{tag}_e"
             pre_str = ",".join(clip_filters)
             post_str = ("," + ",".join(post_chroma_filters)) if post_chroma_filters else ""
             filter_str = (
-                f"[{input_idx}:v]{pre_str},split[{ck_m}][{ck_a}];\n"
+                f"[{source}]{pre_str},split[{ck_m}][{ck_a}];\n"
                 f"[{ck_a}]alphaextract,erosion,gblur=sigma=1.5[{ck_e}];\n"
-                f"[{ck_m}][{ck_e}]alphamerge{post_str}[smp_clip{input_idx}];\n"
+                f"[{ck_m}][{ck_e}]alphamerge{post_str}[smp_clip{tag}];\n"
             )
-            clip_ref = f"smp_clip{input_idx}"
+            clip_ref = f"smp_clip{tag}"
         elif clip_filters:
-            filter_str = f"[{input_idx}:v]" + ",".join(clip_filters) + f"[smp_clip{input_idx}];\n"
-            clip_ref = f"smp_clip{input_idx}"
+            filter_str = f"[{source}]" + ",".join(clip_filters) + f"[smp_clip{tag}];\n"
+            clip_ref = f"smp_clip{tag}"
         else:
             filter_str = ""
-            clip_ref = f"{input_idx}:v"
+            clip_ref = source
 
         # Overlay (no enable needed - clip visibility already confirmed)
         crop_offset_x_expr = "0"
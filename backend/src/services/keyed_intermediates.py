@@ -0,0 +1,354 @@
+"""Pre-keyed alpha intermediates for chroma-keyed clips.
+
+Keying avatar footage live (two ``chromakey`` passes, ``despill`` and alpha
+refinement on every frame) dominates the CPU of avatar-heavy exports, and
+every render — and every chunk of a chunked render — keys the same frames
+again.  This module keys each (source asset, key settings) pair once into a
+VP9-alpha file (:meth:`ChromaKeyService.render_keyed_intermediate`) stored
+in object storage under::
+
+    keyed-intermediates/<sha256(source content key, color, similarity, blend)>.webm
+
+so every instance reuses it.  The content key is the source's immutable
+storage key (:func:`src.services.media_probe.storage_content_key`).
+
+Intermediates are generated ahead of time: :meth:`KeyedIntermediateCache.
+schedule_for_timeline` runs when a plan is applied, and a render schedules
+the ones it had to key live.  A generation is a whole-video encode, so in
+inline mode it holds a ``draft`` slot of the render scheduler
+(:mod:`src.render.scheduler`) and counts against the instance's render
+budget; a Cloud Run Jobs worker has its container to itself and waits for
+its generations (:meth:`~KeyedIntermediateCache.drain`) before exiting.
+:meth:`KeyedIntermediateCache.fetch_for_render` downloads those that exist
+into the render's asset map under :func:`keyed_asset_ref`; the renderer
+then overlays the pre-keyed input instead of keying it (clips without one
+are keyed live as before).
+
+Crop is not part of the key: the renderer crops after keying, and clip
+``transform.width/height`` and the overlay offsets are defined against the
+uncropped frame, so one intermediate serves every crop.  The clip's size is:
+the renderer scales before keying and the alpha erosion/blur act in output
+pixels, so an intermediate is keyed at the clip's render size
+(:func:`prekey_scale_filter`).  Clips with click highlights or keyframes
+keep live keying (boxes are drawn before the key; animated scale has no
+single size).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import dataclasses
+import hashlib
+import logging
+import math
+import os
+import shutil
+import tempfile
+import time
+from collections.abc import AsyncIterator, Iterable, Mapping
+from typing import TYPE_CHECKING, Any
+from uuid import UUID, uuid4
+
+from src.config import get_settings
+from src.services.chroma_key_service import ChromaKeyService, RenderKeyParams
+from src.services.media_probe import storage_content_key
+from src.utils.metrics import metrics
+
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+logger = logging.getLogger(__name__)
+
+INTERMEDIATE_PREFIX = "keyed-intermediates"
+
+# Keying a whole video is CPU-bound: generate one at a time per instance
+DEFAULT_CONCURRENCY = 1
+
+# Peak memory of one keying encode (decode + keying filters + VP9 encoder)
+KEYING_MEMORY_BYTES = 512 * 1024 * 1024
+
+KeyRequest = tuple[str, RenderKeyParams]
+
+
+def _as_float(value: Any, default: float) -> float:
+    try:
+        return default if value is None else float(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def prekey_scale_filter(clip: dict[str, Any]) -> str | None:
+    """Scale filter the renderer applies to a video clip before keying it.
+
+    Mirrors the video branch of ``RenderPipeline._build_clip_filter`` for
+    clips without keyframes ("" when the source size is kept); None for
+    keyframed clips, whose scale may change per frame.
+    """
+    if clip.get("keyframes"):
+        return None
+    transform = clip.get("transform") or {}
+    legacy_scale = _as_float(transform.get("scale"), 1.0)
+    scale_x = _as_float(transform.get("scaleX"), legacy_scale)
+    scale_y = _as_float(transform.get("scaleY"), legacy_scale)
+    width = transform.get("width")
+    height = transform.get("height")
+    if width and height:
+        return (
+            f"scale=w='max(2,trunc({int(width)}*({scale_x:.6f})))':"
+            f"h='max(2,trunc({int(height)}*({scale_y:.6f})))':eval=init"
+        )
+    if not math.isclose(scale_x, 1.0) or not math.isclose(scale_y, 1.0):
+        return (
+            f"scale=w='max(2,trunc(iw*({scale_x:.6f})))':"
+            f"h='max(2,trunc(ih*({scale_y:.6f})))':eval=init"
+        )
+    return ""
+
+
+def clip_key_params(clip: dict[str, Any]) -> RenderKeyParams | None:
+    """Key settings of an asset clip that can use a pre-keyed intermediate."""
+    chroma_key = (clip.get("effects") or {}).get("chroma_key") or {}
+    if not chroma_key.get("enabled") or not clip.get("asset_id") or clip.get("highlights"):
+        return None
+    scale = prekey_scale_filter(clip)
+    if scale is None:
+        return None
+    return dataclasses.replace(RenderKeyParams.from_effects(chroma_key), scale=scale)
+
+
+def timeline_key_requests(timeline: dict[str, Any]) -> set[KeyRequest]:
+    """``(asset_id, params)`` for every clip that can be pre-keyed."""
+    requests: set[KeyRequest] = set()
+    for layer in timeline.get("layers") or []:
+        for clip in layer.get("clips") or []:
+            params = clip_key_params(clip)
+            if params is not None:
+                requests.add((str(clip["asset_id"]), params))
+    return requests
+
+
+def keyed_asset_ref(asset_id: str, params: RenderKeyParams) -> str:
+    """Key of a clip's keyed intermediate in a render's asset map."""
+    return f"keyed:{asset_id}:{params.token}"
+
+
+def intermediate_storage_key(source_storage_key: str, params: RenderKeyParams) -> str:
+    identity = f"{storage_content_key(source_storage_key)}|{params.token}"
+    digest = hashlib.sha256(identity.encode("utf-8")).hexdigest()
+    return f"{INTERMEDIATE_PREFIX}/{digest}.webm"
+
+
+@contextlib.asynccontextmanager
+async def _render_slot() -> AsyncIterator[None]:
+    """Hold a ``draft`` render slot for one generation (inline mode only).
+
+    Inline renders run in this process, so a keying encode must fit the same
+    budget; final exports queued meanwhile are admitted first.
+    """
+    settings = get_settings()
+    if settings.render_execution_mode != "inline":
+        yield
+        return
+    # Imported lazily: src.render imports this module through the pipeline
+    from src.render.scheduler import RenderDemand, get_render_scheduler
+
+    demand = RenderDemand(KEYING_MEMORY_BYTES, float(settings.render_ffmpeg_threads))
+    ticket = get_render_scheduler().submit(uuid4(), demand, priority="draft")
+    try:
+        await ticket.wait()
+        yield
+    finally:
+        ticket.release()
+
+
+class KeyedIntermediateCache:
+    """Generates, stores and fetches keyed intermediates (see module docstring)."""
+
+    def __init__(self, concurrency: int = DEFAULT_CONCURRENCY) -> None:
+        self._concurrency = concurrency
+        self._semaphore: asyncio.Semaphore | None = None
+        self._inflight: dict[str, asyncio.Future[str]] = {}
+        self._tasks: set[asyncio.Task[None]] = set()
+
+    @property
+    def enabled(self) -> bool:
+        return get_settings().render_prekeyed_chroma
+
+    async def ensure(
+        self,
+        source_storage_key: str,
+        params: RenderKeyParams,
+        source_path: str | None = None,
+    ) -> str:
+        """Generate the intermediate unless it is stored; returns its storage key.
+
+        Concurrent calls for the same intermediate share one generation.
+        ``source_path`` is a local copy of the source, if the caller has one.
+        """
+        key = intermediate_storage_key(source_storage_key, params)
+        pending = self._inflight.get(key)
+        if pending is None:
+            pending = asyncio.ensure_future(
+                self._generate(key, source_storage_key, params, source_path)
+            )
+            self._inflight[key] = pending
+            pending.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(pending)
+
+    async def _generate(
+        self,
+        key: str,
+        source_storage_key: str,
+        params: RenderKeyParams,
+        source_path: str | None,
+    ) -> str:
+        from src.services.storage_service import get_storage_service
+
+        storage = get_storage_service()
+        if await storage.file_exists(key):
+            return key
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self._concurrency)
+
+        async with self._semaphore, _render_slot():
+            t0 = time.monotonic()
+            temp_dir = tempfile.mkdtemp(prefix="douga_keyed_")
+            try:
+                if source_path is None:
+                    ext = source_storage_key.rsplit(".", 1)[-1] if "." in source_storage_key else ""
+                    source_path = os.path.join(temp_dir, f"source.{ext}")
+                    await storage.download_file(source_storage_key, source_path)
+                output_path = os.path.join(temp_dir, "keyed.webm")
+                await ChromaKeyService().render_keyed_intermediate(source_path, output_path, params)
+                await storage.upload_file(output_path, key, "video/webm")
+            finally:
+                shutil.rmtree(temp_dir, ignore_errors=True)
+
+        metrics.incr("render.keyed.generated")
+        logger.info(
+            "[KEYED] Generated %s for %s (%s) in %.1fs",
+            key,
+            source_storage_key,
+            params.token,
+            time.monotonic() - t0,
+        )
+        return key
+
+    async def _ensure_logged(self, source_storage_key: str, params: RenderKeyParams) -> None:
+        try:
+            await self.ensure(source_storage_key, params)
+        except Exception as e:
+            metrics.incr("render.keyed.failed")
+            logger.warning(
+                "[KEYED] Failed to generate intermediate for %s (%s): %s",
+                source_storage_key,
+                params.token,
+                e,
+            )
+
+    def schedule(self, requests: Iterable[tuple[str, RenderKeyParams]]) -> int:
+        """Generate ``(source_storage_key, params)`` intermediates in the background.
+
+        Returns the number of generations scheduled.  Failures are logged;
+        affected clips keep being keyed live.
+        """
+        if not self.enabled:
+            return 0
+        scheduled = 0
+        for source_storage_key, params in requests:
+            task = asyncio.ensure_future(self._ensure_logged(source_storage_key, params))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+            scheduled += 1
+        return scheduled
+
+    async def schedule_for_timeline(self, timeline: dict[str, Any], db: AsyncSession) -> int:
+        """Schedule intermediates for a timeline's keyed clips (e.g. on plan apply)."""
+        requests = timeline_key_requests(timeline) if self.enabled else set()
+        if not requests:
+            return 0
+        from sqlalchemy import select
+
+        from src.models.asset import Asset
+
+        asset_ids: set[UUID] = set()
+        for asset_id, _ in requests:
+            try:
+                asset_ids.add(UUID(asset_id))
+            except ValueError:
+                continue
+        result = await db.execute(select(Asset).where(Asset.id.in_(asset_ids)))
+        assets = {str(asset.id): asset for asset in result.scalars().all()}
+        return self.schedule(
+            (assets[asset_id].storage_key, params)
+            for asset_id, params in sorted(requests, key=lambda r: (r[0], r[1].token))
+            if asset_id in assets and assets[asset_id].type == "video"
+        )
+
+    async def fetch_for_render(
+        self,
+        timeline: dict[str, Any],
+        assets_db: Mapping[str, Any],
+        dest_dir: str,
+    ) -> dict[str, str]:
+        """Download the stored intermediates of a timeline's keyed clips.
+
+        Args:
+            timeline: Timeline being rendered.
+            assets_db: ``{asset_id: Asset}`` of the render.
+            dest_dir: Directory to download into.
+
+        Returns:
+            ``{keyed_asset_ref: local_path}`` to merge into the render's asset
+            map.  Intermediates not stored yet are scheduled for generation.
+        """
+        if not self.enabled:
+            return {}
+        from src.services.storage_service import get_storage_service
+
+        storage = get_storage_service()
+        found: dict[str, str] = {}
+        missing: list[tuple[str, RenderKeyParams]] = []
+        for asset_id, params in sorted(
+            timeline_key_requests(timeline), key=lambda r: (r[0], r[1].token)
+        ):
+            asset = assets_db.get(asset_id)
+            if asset is None or asset.type != "video":
+                continue
+            key = intermediate_storage_key(asset.storage_key, params)
+            if key in self._inflight or not await storage.file_exists(key):
+                metrics.incr("render.keyed.miss")
+                missing.append((asset.storage_key, params))
+                continue
+            local_path = os.path.join(dest_dir, os.path.basename(key))
+            await storage.download_file(key, local_path)
+            found[keyed_asset_ref(asset_id, params)] = local_path
+            metrics.incr("render.keyed.hit")
+
+        if found or missing:
+            logger.info(
+                "[KEYED] %d pre-keyed intermediate(s) found, %d keyed live",
+                len(found),
+                len(missing),
+            )
+        self.schedule(missing)
+        return found
+
+    async def drain(self) -> None:
+        """Wait for background generations to finish (before a worker exits)."""
+        tasks = list(self._tasks)
+        if tasks:
+            logger.info("[KEYED] Waiting for %d intermediate generation(s)", len(tasks))
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def stop(self) -> None:
+        """Cancel background generations (on API shutdown)."""
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+# Process-wide instance
+keyed_intermediates = KeyedIntermediateCache()
@@ -0,0 +1,348 @@
+"""Memoized ffprobe metadata keyed by content identity.
+
+Probing used to be spread over half a dozen helpers (``media_info``,
+``PreviewService``, ``TranscriptionService``, ``VideoTrimmer``,
+``LayerCompositor``, ``audio_extractor``, ``AudioMixer``), each running its
+own narrow ffprobe query — the same file was often probed two or three times
+per operation.  :class:`MediaProbe` runs one ``-show_format -show_streams``
+call per file and answers every question from that result.
+
+Results are cached under two kinds of key:
+
+- ``(realpath, size, mtime_ns)`` for a local file, so a rewritten file is
+  probed again;
+- an optional caller-supplied ``content_key`` (asset hash or immutable
+  storage key), so a fresh download of the same asset is never re-probed.
+
+:meth:`ProbeResult.to_metadata` is the compact form persisted into
+``Asset.asset_metadata["probe"]``, stamped with the storage key it was probed
+from; :meth:`MediaProbe.seed_from_metadata` loads it back (only while that key
+is still the asset's file) so another instance can skip the probe entirely.
+
+:meth:`MediaProbe.aprobe` runs ffprobe as an asyncio subprocess (never
+blocking the event loop) and coalesces concurrent probes of the same file.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import subprocess
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any
+
+from src.config import get_settings
+from src.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Key under which probe results are persisted in Asset.asset_metadata
+ASSET_METADATA_KEY = "probe"
+
+# Entries are a few hundred bytes each
+DEFAULT_MAX_ENTRIES = 2048
+
+# Only these fields are kept (and persisted); tags/side data can be large
+_FORMAT_FIELDS = ("duration", "format_name", "bit_rate", "size")
+_STREAM_FIELDS = (
+    "index",
+    "codec_type",
+    "codec_name",
+    "width",
+    "height",
+    "pix_fmt",
+    "r_frame_rate",
+    "avg_frame_rate",
+    "duration",
+    "sample_rate",
+    "channels",
+)
+
+
+class ProbeError(RuntimeError):
+    """ffprobe failed or produced unparseable output."""
+
+
+def _to_ms(seconds: Any) -> int | None:
+    try:
+        return int(float(seconds) * 1000)
+    except (TypeError, ValueError):
+        return None
+
+
+@dataclass(frozen=True)
+class ProbeResult:
+    """The ``format`` section and streams of one ffprobe run (read-only)."""
+
+    format: dict[str, Any] = field(default_factory=dict)
+    streams: tuple[dict[str, Any], ...] = ()
+
+    @classmethod
+    def from_ffprobe(cls, data: dict[str, Any]) -> ProbeResult:
+        fmt = data.get("format") or {}
+        return cls(
+            format={k: fmt[k] for k in _FORMAT_FIELDS if k in fmt},
+            streams=tuple(
+                {k: s[k] for k in _STREAM_FIELDS if k in s} for s in data.get("streams") or []
+            ),
+        )
+
+    @classmethod
+    def from_metadata(cls, data: Any) -> ProbeResult | None:
+        """Rebuild from :meth:`to_metadata` output; None if absent or malformed."""
+        if not isinstance(data, dict) or not isinstance(data.get("streams"), list):
+            return None
+        return cls.from_ffprobe(data)
+
+    def to_metadata(self, storage_key: str | None = None) -> dict[str, Any]:
+        data: dict[str, Any] = {
+            "format": dict(self.format),
+            "streams": [dict(s) for s in self.streams],
+        }
+        if storage_key:
+            data["storage_key"] = storage_key
+        return data
+
+    def _first(self, codec_type: str) -> dict[str, Any] | None:
+        return next((s for s in self.streams if s.get("codec_type") == codec_type), None)
+
+    @property
+    def video_stream(self) -> dict[str, Any] | None:
+        return self._first("video")
+
+    @property
+    def audio_stream(self) -> dict[str, Any] | None:
+        return self._first("audio")
+
+    @property
+    def has_video(self) -> bool:
+        return self.video_stream is not None
+
+    @property
+    def has_audio(self) -> bool:
+        return self.audio_stream is not None
+
+    @property
+    def duration_ms(self) -> int | None:
+        """Container duration, falling back to the first stream that reports one."""
+        duration = _to_ms(self.format.get("duration"))
+        if duration is not None:
+            return duration
+        for stream in self.streams:
+            duration = _to_ms(stream.get("duration"))
+            if duration is not None:
+                return duration
+        return None
+
+    def media_info(self) -> dict[str, Any]:
+        """The flat dict returned by ``utils.media_info.get_media_info``."""
+        result: dict[str, Any] = {
+            "duration_ms": _to_ms(self.format.get("duration")),
+            "width": None,
+            "height": None,
+            "fps": None,
+            "video_codec": None,
+            "audio_codec": None,
+            "sample_rate": None,
+            "channels": None,
+            "has_video": False,
+            "has_audio": False,
+        }
+        video = self.video_stream
+        if video is not None:
+            result["has_video"] = True
+            result["width"] = video.get("width")
+            result["height"] = video.get("height")
+            result["video_codec"] = video.get("codec_name")
+            num, _, den = str(video.get("r_frame_rate", "0/1")).partition("/")
+            if den and int(den) > 0:
+                result["fps"] = int(int(num) / int(den))
+        audio = self.audio_stream
+        if audio is not None:
+            result["has_audio"] = True
+            result["audio_codec"] = audio.get("codec_name")
+            result["sample_rate"] = int(audio.get("sample_rate", 0)) or None
+            result["channels"] = audio.get("channels")
+        return result
+
+    def video_info(self) -> dict[str, int]:
+        """``{"width", "height", "duration_ms"}`` of the first video stream (0 if absent)."""
+        video = self.video_stream or {}
+        return {
+            "width": video.get("width", 0),
+            "height": video.get("height", 0),
+            "duration_ms": _to_ms(self.format.get("duration"))
+            or _to_ms(video.get("duration"))
+            or 0,
+        }
+
+
+def _file_key(path: str) -> tuple[str, int, int]:
+    st = os.stat(path)
+    return os.path.realpath(path), st.st_size, st.st_mtime_ns
+
+
+class MediaProbe:
+    """One ffprobe run per file, cached by file identity and content key."""
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES) -> None:
+        self.max_entries = max_entries
+        self._entries: OrderedDict[object, ProbeResult] = OrderedDict()
+        self._lock = threading.Lock()
+        self._inflight: dict[object, asyncio.Future[ProbeResult]] = {}
+
+    # ------------------------------------------------------------------
+    # Cache
+    # ------------------------------------------------------------------
+
+    def _get(self, key: object) -> ProbeResult | None:
+        with self._lock:
+            result = self._entries.get(key)
+            if result is not None:
+                self._entries.move_to_end(key)
+        return result
+
+    def _put(self, keys: list[object], result: ProbeResult) -> None:
+        with self._lock:
+            for key in keys:
+                self._entries[key] = result
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _lookup(
+        self, path: str, content_key: str | None
+    ) -> tuple[list[object], ProbeResult | None]:
+        try:
+            keys: list[object] = [_file_key(path)]
+        except OSError as e:
+            raise ProbeError(f"Cannot probe {path}: {e}") from e
+        if content_key:
+            keys.append(content_key)
+        for key in reversed(keys):
+            result = self._get(key)
+            if result is not None:
+                metrics.incr("media.probe.hit")
+                self._put(keys, result)
+                return keys, result
+        metrics.incr("media.probe.miss")
+        return keys, None
+
+    def cached(self, content_key: str) -> ProbeResult | None:
+        """Result for a content key without touching any file."""
+        return self._get(content_key)
+
+    def seed(
+        self, result: ProbeResult, *, path: str | None = None, content_key: str | None = None
+    ) -> None:
+        """Prime the cache, e.g. from ``Asset.asset_metadata["probe"]``."""
+        keys: list[object] = []
+        if path is not None:
+            try:
+                keys.append(_file_key(path))
+            except OSError:
+                logger.debug("Not seeding probe for missing file %s", path)
+        if content_key:
+            keys.append(content_key)
+        self._put(keys, result)
+
+    def seed_from_metadata(
+        self,
+        asset_metadata: dict[str, Any] | None,
+        *,
+        storage_key: str,
+        path: str | None = None,
+    ) -> bool:
+        """Seed from a persisted ``Asset.asset_metadata``.
+
+        Returns False when there is no probe, or when it was taken from a
+        different file than ``storage_key`` (the asset was replaced since).
+        """
+        data = (asset_metadata or {}).get(ASSET_METADATA_KEY)
+        if not isinstance(data, dict) or data.get("storage_key") != storage_key:
+            return False
+        result = ProbeResult.from_metadata(data)
+        if result is None:
+            return False
+        self.seed(result, path=path, content_key=storage_content_key(storage_key))
+        return True
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    # ------------------------------------------------------------------
+    # Probing
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _command(path: str) -> list[str]:
+        return [
+            get_settings().ffprobe_path,
+            "-v",
+            "error",
+            "-print_format",
+            "json",
+            "-show_format",
+            "-show_streams",
+            path,
+        ]
+
+    @staticmethod
+    def _parse(path: str, returncode: int | None, stdout: bytes, stderr: bytes) -> ProbeResult:
+        if returncode != 0:
+            raise ProbeError(f"ffprobe failed for {path}: {stderr.decode(errors='replace')}")
+        try:
+            return ProbeResult.from_ffprobe(json.loads(stdout))
+        except (json.JSONDecodeError, AttributeError) as e:
+            raise ProbeError(f"Failed to parse ffprobe output for {path}: {e}") from e
+
+    def probe(self, path: str, *, content_key: str | None = None) -> ProbeResult:
+        """Probe synchronously (for worker threads and sync services).
+
+        Raises:
+            ProbeError: If the file is missing or ffprobe fails.
+        """
+        keys, result = self._lookup(path, content_key)
+        if result is not None:
+            return result
+        completed = subprocess.run(self._command(path), capture_output=True)
+        result = self._parse(path, completed.returncode, completed.stdout, completed.stderr)
+        self._put(keys, result)
+        return result
+
+    async def aprobe(self, path: str, *, content_key: str | None = None) -> ProbeResult:
+        """Probe without blocking the event loop; concurrent probes share one run."""
+        keys, result = self._lookup(path, content_key)
+        if result is not None:
+            return result
+        pending = self._inflight.get(keys[0])
+        if pending is None:
+            pending = asyncio.ensure_future(self._run_async(path))
+            self._inflight[keys[0]] = pending
+            pending.add_done_callback(lambda _: self._inflight.pop(keys[0], None))
+        result = await asyncio.shield(pending)
+        self._put(keys, result)
+        return result
+
+    async def _run_async(self, path: str) -> ProbeResult:
+        process = await asyncio.create_subprocess_exec(
+            *self._command(path),
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        stdout, stderr = await process.communicate()
+        return self._parse(path, process.returncode, stdout, stderr)
+
+
+def storage_content_key(storage_key: str) -> str:
+    """Content key for an uploaded object (storage keys are never overwritten)."""
+    return f"storage:{storage_key}"
+
+
+# Process-wide instance
+media_probe = MediaProbe()
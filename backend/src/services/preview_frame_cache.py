@@ -0,0 +1,83 @@
+"""Decoded source frames for chroma key previews.
+
+Users tune similarity/blend by requesting the same preview frames over and
+over with new key settings.  Decoding is the expensive part (seek, often
+over a signed URL, then decode up to the target frame); keying a frame
+already in memory is cheap.  This cache keeps the scaled, decoded
+``yuv420p`` frames (the format the key filters consume) keyed by::
+
+    (source_key, seek_ms, width, height)
+
+``source_key`` must identify the source content, not the request (signed
+URLs change on every call) — callers pass
+:func:`src.services.media_probe.storage_content_key`.
+
+Storage is an in-process LRU bounded by total frame bytes.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import NamedTuple
+
+from src.utils.metrics import metrics
+
+# One 640x360 yuv420p frame is ~338 KiB, so this holds ~290 preview frames
+DEFAULT_MAX_BYTES = 96 * 1024 * 1024
+
+
+class PreviewFrameKey(NamedTuple):
+    source_key: str
+    seek_ms: int
+    width: int
+    height: int
+
+
+class PreviewFrameCache:
+    """Bounded LRU of decoded ``yuv420p`` preview frames."""
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        self._max_bytes = max_bytes
+        self._entries: OrderedDict[PreviewFrameKey, bytes] = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def size_bytes(self) -> int:
+        return self._size
+
+    def get(self, key: PreviewFrameKey) -> bytes | None:
+        with self._lock:
+            frame = self._entries.get(key)
+            if frame is None:
+                metrics.incr("chroma_preview.frame_cache.miss")
+                return None
+            self._entries.move_to_end(key)
+        metrics.incr("chroma_preview.frame_cache.hit")
+        return frame
+
+    def put(self, key: PreviewFrameKey, frame: bytes) -> None:
+        if len(frame) > self._max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous)
+            self._entries[key] = frame
+            self._size += len(frame)
+            while self._size > self._max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+
+# Process-wide instance
+preview_frame_cache = PreviewFrameCache()
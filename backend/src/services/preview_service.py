@@ -7,7 +7,6 @@ Provides:
 - Preview clip generation
 """
 
-import json
 import struct
 import subprocess
 from dataclasses import dataclass
@@ -16,7 +15,7 @@ from pathlib import Path
 
 from google.cloud import storage
 
-from src.config import get_settings
+from src.services.media_probe import ProbeError, media_probe
 
 
 @dataclass
@@ -59,53 +58,17 @@ class PreviewService:
 
     def _has_audio_track(self, file_path: str) -> bool:
         """Check if file has an audio track."""
-        settings = get_settings()
-        result = subprocess.run(
-            [
-                settings.ffprobe_path,
-                "-v",
-                "error",
-                "-select_streams",
-                "a",
-                "-show_entries",
-                "stream=index",
-                "-of",
-                "json",
-                file_path,
-            ],
-            capture_output=True,
-            text=True,
-        )
-        if result.returncode != 0:
-            return False
-
         try:
-            data = json.loads(result.stdout)
-            return len(data.get("streams", [])) > 0
-        except json.JSONDecodeError:
+            return media_probe.probe(file_path).has_audio
+        except ProbeError:
             return False
 
     def _get_duration_ms(self, file_path: str) -> int:
         """Get media duration in milliseconds."""
-        settings = get_settings()
-        result = subprocess.run(
-            [
-                settings.ffprobe_path,
-                "-v",
-                "error",
-                "-show_entries",
-                "format=duration",
-                "-of",
-                "json",
-                file_path,
-            ],
-            capture_output=True,
-            text=True,
-            check=True,
-        )
-        data = json.loads(result.stdout)
-        duration_seconds = float(data["format"]["duration"])
-        return int(duration_seconds * 1000)
+        duration_ms = media_probe.probe(file_path).duration_ms
+        if duration_ms is None:
+            raise ProbeError(f"Duration not found in: {file_path}")
+        return duration_ms
 
     def generate_waveform(
         self,
@@ -0,0 +1,223 @@
+"""Cache of verified authentication principals.
+
+Every authenticated request used to re-verify its credential from scratch:
+``verify_id_token(check_revoked=True)`` (a Firebase round trip) for Bearer
+tokens, or a SELECT on ``api_keys`` + UPDATE of ``last_used_at`` + SELECT on
+``users`` for API keys.  MCP agents issue hundreds of requests a minute with
+the same credential, so this module remembers who a credential belongs to.
+
+- :class:`PrincipalCache` maps a credential digest to the verified user id.
+  Entries expire after ``ttl_s`` or when the credential itself expires
+  (Firebase ``exp`` / ``APIKey.expires_at``), whichever comes first, so a
+  revoked credential keeps working on an instance for at most ``ttl_s``.
+  Explicit revocations (API key deactivation) call :meth:`revoke`, which also
+  refuses to re-cache the credential for ``ttl_s`` so a request that read the
+  row before the revoking transaction committed cannot put it back.
+- :class:`LastUsedRecorder` collects ``APIKey.last_used_at`` timestamps and
+  writes them in one batched UPDATE per flush interval instead of one UPDATE
+  per request.
+
+Raw credentials are never stored; keys are SHA-256 digests.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy import update
+
+from src.config import get_settings
+from src.models.api_key import APIKey
+from src.models.database import async_session_maker
+from src.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+def token_cache_key(token: str) -> str:
+    """Cache key for a Firebase ID token."""
+    return "fb:" + hashlib.sha256(token.encode()).hexdigest()
+
+
+def api_key_cache_key(key_hash: str) -> str:
+    """Cache key for an API key, from its stored SHA-256 hash."""
+    return "ak:" + key_hash
+
+
+@dataclass(frozen=True)
+class CachedPrincipal:
+    """A verified credential: who it belongs to and until when it is trusted."""
+
+    user_id: UUID
+    expires_at: float  # time.monotonic() deadline
+    api_key_id: UUID | None = None
+
+
+class PrincipalCache:
+    """Bounded LRU of verified principals with per-entry expiry."""
+
+    def __init__(
+        self,
+        ttl_s: float = 60.0,
+        max_entries: int = 10000,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.ttl_s = ttl_s
+        self._max_entries = max_entries
+        self._clock = clock
+        self._entries: OrderedDict[str, CachedPrincipal] = OrderedDict()
+        # key -> deadline until which put() ignores the key (see revoke())
+        self._revoked: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> CachedPrincipal | None:
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at <= now:
+                del self._entries[key]
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+        metrics.incr("auth.principal_cache.hit" if entry else "auth.principal_cache.miss")
+        return entry
+
+    def put(
+        self,
+        key: str,
+        user_id: UUID,
+        *,
+        not_after: datetime | None = None,
+        api_key_id: UUID | None = None,
+    ) -> None:
+        """Remember ``key`` → ``user_id`` for ``ttl_s`` (capped at ``not_after``)."""
+        if self.ttl_s <= 0:
+            return
+        lifetime = self.ttl_s
+        if not_after is not None:
+            lifetime = min(lifetime, (not_after - datetime.now(UTC)).total_seconds())
+            if lifetime <= 0:
+                return
+        now = self._clock()
+        entry = CachedPrincipal(
+            user_id=user_id,
+            expires_at=now + lifetime,
+            api_key_id=api_key_id,
+        )
+        with self._lock:
+            revoked_until = self._revoked.get(key)
+            if revoked_until is not None:
+                if revoked_until > now:
+                    return
+                del self._revoked[key]
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def revoke(self, key: str) -> None:
+        """Drop ``key`` and keep it out of the cache for the next ``ttl_s``.
+
+        Call this before the revoking transaction commits: concurrent requests
+        may still see the credential as valid until then, but none of them
+        can cache it past the revocation.
+        """
+        now = self._clock()
+        with self._lock:
+            self._entries.pop(key, None)
+            self._revoked = {k: t for k, t in self._revoked.items() if t > now}
+            self._revoked[key] = now + self.ttl_s
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._revoked.clear()
+
+
+class LastUsedRecorder:
+    """Batches ``APIKey.last_used_at`` updates.
+
+    :meth:`mark` is O(1) and never touches the DB; :meth:`flush` writes all
+    pending timestamps in a single executemany UPDATE.  :meth:`start` runs
+    the flush periodically for the lifetime of the app.
+    """
+
+    def __init__(self, interval_s: float = 30.0) -> None:
+        self.interval_s = interval_s
+        self._pending: dict[UUID, datetime] = {}
+        self._task: asyncio.Task[None] | None = None
+
+    @property
+    def pending(self) -> dict[UUID, datetime]:
+        return dict(self._pending)
+
+    def mark(self, api_key_id: UUID, when: datetime | None = None) -> None:
+        self._pending[api_key_id] = when or datetime.now(UTC)
+
+    async def flush(self, session_factory: Any = None) -> int:
+        """Write pending timestamps; returns the number of keys updated."""
+        if not self._pending:
+            return 0
+        batch, self._pending = self._pending, {}
+        try:
+            async with (session_factory or async_session_maker)() as db:
+                await db.execute(
+                    update(APIKey),
+                    [{"id": key_id, "last_used_at": ts} for key_id, ts in batch.items()],
+                )
+                await db.commit()
+        except Exception as exc:
+            logger.warning("[AUTH] last_used_at flush failed (%d keys): %s", len(batch), exc)
+            # Keep the newest timestamp per key for the next attempt
+            for key_id, ts in batch.items():
+                self._pending.setdefault(key_id, ts)
+            return 0
+        metrics.incr("auth.last_used.flushed", len(batch))
+        return len(batch)
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the periodic flush and write whatever is still pending."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval_s)
+            await self.flush()
+
+
+_settings = get_settings()
+
+# Process-wide instances
+principal_cache = PrincipalCache(
+    ttl_s=_settings.auth_cache_ttl_seconds,
+    max_entries=_settings.auth_cache_max_entries,
+)
+api_key_last_used = LastUsedRecorder(interval_s=_settings.api_key_last_used_flush_seconds)
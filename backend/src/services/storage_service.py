@@ -1,16 +1,23 @@
 from __future__ import annotations
 
 import asyncio
+import contextlib
 import shutil
 import uuid
+from collections.abc import Iterator
 from datetime import UTC, datetime, timedelta
 from pathlib import Path
+from types import TracebackType
 from typing import Any, BinaryIO, TypeAlias, cast
 
 from src.config import get_settings
 
 settings = get_settings()
 
+# Resumable upload chunk size for write streams (GCS needs a multiple of 256 KiB).
+# Bounds the memory a streamed upload buffers, whatever the object size.
+STREAM_UPLOAD_CHUNK_SIZE = 16 * 1024 * 1024
+
 
 class LocalStorageService:
     """Local file storage for development without GCS."""
@@ -179,6 +186,21 @@ class LocalStorageService:
         """Upload content bytes to local storage (async)."""
         return await self.upload_file_from_bytes(storage_key, content, content_type)
 
+    @contextlib.contextmanager
+    def open_write_stream(self, storage_key: str, content_type: str) -> Iterator[BinaryIO]:
+        """Write an object as a stream (blocking; use from a worker thread).
+
+        The object is complete when the block exits; on error the partial
+        file is removed.
+        """
+        full_path = self._get_full_path(storage_key)
+        try:
+            with open(full_path, "wb") as stream:
+                yield stream
+        except BaseException:
+            full_path.unlink(missing_ok=True)
+            raise
+
 
 class GCSStorageService:
     """Google Cloud Storage service for production."""
@@ -399,11 +421,71 @@ class GCSStorageService:
         await asyncio.to_thread(blob.upload_from_string, content, content_type)
         return self.get_public_url(storage_key)
 
+    @contextlib.contextmanager
+    def open_write_stream(self, storage_key: str, content_type: str) -> Iterator[BinaryIO]:
+        """Write an object as a chunked resumable upload (blocking; use from a worker thread).
+
+        Chunks of :data:`STREAM_UPLOAD_CHUNK_SIZE` are sent as they fill,
+        and the upload is finalized when the block exits.  On error it is
+        left unfinalized, so no partial object is created.
+        """
+        blob = self.bucket.blob(storage_key)
+        writer = blob.open(
+            "wb",
+            chunk_size=STREAM_UPLOAD_CHUNK_SIZE,
+            content_type=content_type,
+            # Writers such as zipfile flush; only chunk boundaries upload
+            ignore_flush=True,
+        )
+        yield writer
+        writer.close()
+
 
 # Shared storage service type used by API and services.
 StorageService: TypeAlias = LocalStorageService | GCSStorageService
 
 
+class StreamingUpload:
+    """Async writer over :meth:`open_write_stream` for data produced incrementally.
+
+    Usage::
+
+        async with StreamingUpload(storage, key, "video/mp4") as upload:
+            await upload.write(chunk)
+
+    Each write runs in a worker thread, so a slow upload backs up into the
+    producer instead of buffering.  The object is finalized when the block
+    exits cleanly and discarded if it raises.
+    """
+
+    def __init__(self, storage: StorageService, storage_key: str, content_type: str) -> None:
+        self.storage_key = storage_key
+        self.bytes_written = 0
+        self._context: contextlib.AbstractContextManager[BinaryIO] = storage.open_write_stream(
+            storage_key, content_type
+        )
+        self._stream: BinaryIO | None = None
+
+    async def __aenter__(self) -> StreamingUpload:
+        self._stream = await asyncio.to_thread(self._context.__enter__)
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        self._stream = None
+        await asyncio.to_thread(self._context.__exit__, exc_type, exc, tb)
+
+    async def write(self, data: bytes) -> None:
+        if self._stream is None:
+            raise RuntimeError("StreamingUpload is not open")
+        await asyncio.to_thread(self._stream.write, data)
+        self.bytes_written += len(data)
+
+
 # Use LocalStorageService or GCSStorageService based on config
 _StorageServiceImpl: type[LocalStorageService] | type[GCSStorageService]
 _StorageServiceImpl = LocalStorageService if settings.use_local_storage else GCSStorageService
@@ -7,8 +7,12 @@ actionable improvement suggestions for AI agents.
 
 from __future__ import annotations
 
+import bisect
 import logging
 import uuid
+from dataclasses import dataclass, field
+
+import numpy as np
 
 logger = logging.getLogger(__name__)
 
@@ -20,6 +24,195 @@ SHORT_CLIP_RATIO = 0.5  # If >50% of clips are short, flag as too_fast
 LONG_CLIP_RATIO = 0.3  # If >30% of clips are long, flag as too_slow
 SECTION_GAP_MS = 500  # Minimum gap in primary content to detect section boundary
 
+# Interval counts at or above this are merged/scanned with NumPy; below it the
+# array setup costs more than the pure-Python loop.
+NUMPY_MIN_INTERVALS = 256
+
+Interval = tuple[int, int]
+
+
+def _clip_interval(clip: dict) -> Interval:
+    start = clip.get("start_ms", 0)
+    return (start, start + clip.get("duration_ms", 0))
+
+
+def _merge_intervals(intervals: list[Interval]) -> list[Interval]:
+    """Merge overlapping/touching intervals into a start-sorted disjoint list.
+
+    Intervals are merged when ``start <= running_end`` of the current group,
+    which is the rule every analysis in this module has always used.
+    """
+    if not intervals:
+        return []
+    if len(intervals) >= NUMPY_MIN_INTERVALS:
+        return _merge_intervals_numpy(intervals)
+
+    ordered = sorted(intervals, key=lambda x: x[0])
+    merged: list[Interval] = [ordered[0]]
+    for start, end in ordered[1:]:
+        prev_start, prev_end = merged[-1]
+        if start <= prev_end:
+            merged[-1] = (prev_start, max(prev_end, end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def _merge_intervals_numpy(intervals: list[Interval]) -> list[Interval]:
+    arr = np.asarray(intervals)
+    order = np.argsort(arr[:, 0], kind="stable")
+    starts = arr[order, 0]
+    running_end = np.maximum.accumulate(arr[order, 1])
+    # A new group begins wherever a start lies beyond every earlier end.
+    breaks = np.flatnonzero(starts[1:] > running_end[:-1]) + 1
+    group_starts = starts[np.concatenate(([0], breaks))]
+    group_ends = running_end[np.concatenate((breaks - 1, [len(starts) - 1]))]
+    return list(zip(group_starts.tolist(), group_ends.tolist(), strict=True))
+
+
+def _overlaps_any(merged: list[Interval], start_ms: int, end_ms: int) -> bool:
+    """True if any merged interval intersects the open range (start_ms, end_ms)."""
+    # First interval whose end lies beyond start_ms is the only candidate:
+    # earlier ones end too soon and later ones start even later.
+    idx = bisect.bisect_right(merged, start_ms, key=lambda iv: iv[1])
+    return idx < len(merged) and merged[idx][0] < end_ms
+
+
+def _gaps_between(merged: list[Interval], threshold_ms: int) -> list[dict]:
+    """Interior gaps longer than ``threshold_ms`` between merged intervals."""
+    gaps: list[dict] = []
+    for (_, prev_end), (start, _) in zip(merged, merged[1:], strict=False):
+        if start - prev_end > threshold_ms:
+            gaps.append({"start_ms": prev_end, "end_ms": start, "duration_ms": start - prev_end})
+    return gaps
+
+
+@dataclass
+class _RowIndex:
+    """Precomputed view of one video layer or audio track."""
+
+    id: str
+    name: str
+    raw_type: str | None
+    clips: list[dict]
+    merged: list[Interval]
+    coverage_ms: int
+    first_start: int
+    last_end: int
+    asset_usage: dict[str, int]
+    has_volume_keyframes: bool
+
+
+@dataclass
+class _TimelineIndex:
+    """Single-pass precompute shared by every analysis of one timeline.
+
+    Built once per :class:`TimelineAnalyzer`; all analyses read merged
+    intervals, coverage and per-row aggregates from here instead of
+    re-walking (and re-sorting) the clip lists.
+    """
+
+    layers: list[_RowIndex] = field(default_factory=list)
+    tracks: list[_RowIndex] = field(default_factory=list)
+    max_clip_end: int = 0
+    # Merged intervals across all rows of a kind, e.g. "audio:narration".
+    groups: dict[str, list[Interval]] = field(default_factory=dict)
+    audio_group_ids: set[str] = field(default_factory=set)
+    grouped_video_clips: list[dict] = field(default_factory=list)
+    # Layer clips flattened in layer order then stored order, as parallel arrays.
+    layer_clip_ids: list[str] = field(default_factory=list)
+    layer_clip_starts: list[int] = field(default_factory=list)
+    layer_clip_ends: list[int] = field(default_factory=list)
+    _clip_arrays: tuple[np.ndarray, np.ndarray] | None = field(default=None, repr=False)
+
+    def group(self, name: str) -> list[Interval]:
+        return self.groups.get(name, [])
+
+    def clip_ids_overlapping(self, start_ms: int, end_ms: int) -> list[str]:
+        """IDs of layer clips intersecting (start_ms, end_ms), in timeline order."""
+        ids = self.layer_clip_ids
+        if len(ids) >= NUMPY_MIN_INTERVALS:
+            if self._clip_arrays is None:
+                self._clip_arrays = (
+                    np.asarray(self.layer_clip_starts),
+                    np.asarray(self.layer_clip_ends),
+                )
+            starts, ends = self._clip_arrays
+            mask = (starts < end_ms) & (ends > start_ms)
+            return [ids[i] for i in np.flatnonzero(mask).tolist() if ids[i]]
+        return [
+            cid
+            for cid, c_start, c_end in zip(
+                ids, self.layer_clip_starts, self.layer_clip_ends, strict=True
+            )
+            if c_start < end_ms and c_end > start_ms and cid
+        ]
+
+    @classmethod
+    def build(cls, timeline: dict) -> _TimelineIndex:
+        index = cls()
+        grouped: dict[str, list[Interval]] = {}
+
+        def add_row(row: list[Interval], *keys: str) -> None:
+            for key in keys:
+                grouped.setdefault(key, []).extend(row)
+
+        for layer in timeline.get("layers", []):
+            row = index._build_row(layer)
+            index.layers.append(row)
+            add_row(row.merged, "layers")
+            if layer.get("type", "content") == "content":
+                add_row(row.merged, "layer:content")
+            else:
+                add_row(row.merged, f"layer:{row.raw_type}")
+            for clip in row.clips:
+                c_start, c_end = _clip_interval(clip)
+                index.layer_clip_ids.append(clip.get("id", ""))
+                index.layer_clip_starts.append(c_start)
+                index.layer_clip_ends.append(c_end)
+                if clip.get("group_id"):
+                    index.grouped_video_clips.append(clip)
+
+        for track in timeline.get("audio_tracks", []):
+            row = index._build_row(track)
+            index.tracks.append(row)
+            add_row(row.merged, "audio", f"audio:{row.raw_type}")
+            for clip in row.clips:
+                gid = clip.get("group_id")
+                if gid:
+                    index.audio_group_ids.add(gid)
+
+        # Each row is already merged, so re-merging the union is cheap.
+        index.groups = {key: _merge_intervals(ivs) for key, ivs in grouped.items()}
+        return index
+
+    def _build_row(self, row: dict) -> _RowIndex:
+        clips = row.get("clips", [])
+        intervals = [_clip_interval(c) for c in clips]
+        merged = _merge_intervals(intervals)
+        usage: dict[str, int] = {}
+        has_kf = False
+        for clip in clips:
+            aid = clip.get("asset_id")
+            if aid:
+                usage[aid] = usage.get(aid, 0) + 1
+            if clip.get("volume_keyframes"):
+                has_kf = True
+        last_end = merged[-1][1] if merged else 0
+        self.max_clip_end = max(self.max_clip_end, last_end)
+        return _RowIndex(
+            id=row.get("id", ""),
+            name=row.get("name", ""),
+            raw_type=row.get("type"),
+            clips=clips,
+            merged=merged,
+            coverage_ms=sum(end - start for start, end in merged),
+            first_start=merged[0][0] if merged else 0,
+            last_end=last_end,
+            asset_usage=usage,
+            has_volume_keyframes=has_kf,
+        )
+
 
 class TimelineAnalyzer:
     """Analyzes timeline composition quality for AI agents."""
@@ -34,6 +227,14 @@ class TimelineAnalyzer:
         self.asset_map = asset_map or {}
         self.project_id = project_id
         self._project_duration_ms: int | None = None
+        self._index_cache: _TimelineIndex | None = None
+        self._sections: list[dict] | None = None
+
+    @property
+    def _index(self) -> _TimelineIndex:
+        if self._index_cache is None:
+            self._index_cache = _TimelineIndex.build(self.timeline)
+        return self._index_cache
 
     @property
     def project_duration_ms(self) -> int:
@@ -41,15 +242,7 @@ class TimelineAnalyzer:
         if self._project_duration_ms is not None:
             return self._project_duration_ms
 
-        max_end = 0
-        for layer in self.timeline.get("layers", []):
-            for clip in layer.get("clips", []):
-                end = clip.get("start_ms", 0) + clip.get("duration_ms", 0)
-                max_end = max(max_end, end)
-        for track in self.timeline.get("audio_tracks", []):
-            for clip in track.get("clips", []):
-                end = clip.get("start_ms", 0) + clip.get("duration_ms", 0)
-                max_end = max(max_end, end)
+        max_end = self._index.max_clip_end
 
         # Also check the timeline-level duration_ms if set
         timeline_duration = self.timeline.get("duration_ms", 0)
@@ -127,74 +320,50 @@ class TimelineAnalyzer:
         layer_gaps: list[dict] = []
         total_gaps = 0
         total_gap_duration_ms = 0
+        index = self._index
 
-        # Pre-build per-layer merged coverage intervals for cross-layer checks.
-        # Keys are layer/track id, values are sorted merged interval lists.
-        video_layer_intervals: dict[str, list[tuple[int, int]]] = {}
-        video_layer_names: dict[str, str] = {}
-        for layer in self.timeline.get("layers", []):
-            lid = layer.get("id", "")
-            lname = layer.get("name", "")
-            video_layer_names[lid] = lname
-            clips = layer.get("clips", [])
-            if clips:
-                intervals = sorted(
-                    [
-                        (c.get("start_ms", 0), c.get("start_ms", 0) + c.get("duration_ms", 0))
-                        for c in clips
-                    ],
-                    key=lambda x: x[0],
-                )
-                merged: list[tuple[int, int]] = [intervals[0]]
-                for start, end in intervals[1:]:
-                    if start <= merged[-1][1]:
-                        merged[-1] = (merged[-1][0], max(merged[-1][1], end))
-                    else:
-                        merged.append((start, end))
-                video_layer_intervals[lid] = merged
-            else:
-                video_layer_intervals[lid] = []
+        # Per-layer merged coverage intervals for cross-layer checks.
+        video_layer_intervals = {row.id: row.merged for row in index.layers}
+        video_layer_names = {row.id: row.name for row in index.layers}
 
-        # Video layers
-        for layer in self.timeline.get("layers", []):
-            layer_id = layer.get("id", "")
-            gaps = self._find_gaps_in_clips(layer.get("clips", []))
-            # Check leading gap (from 0 to first clip)
-            clips = sorted(layer.get("clips", []), key=lambda c: c.get("start_ms", 0))
-            if clips:
-                first_start = clips[0].get("start_ms", 0)
-                if first_start > GAP_THRESHOLD_MS:
+        for row, is_audio in [(r, False) for r in index.layers] + [(r, True) for r in index.tracks]:
+            gaps = _gaps_between(row.merged, GAP_THRESHOLD_MS)
+            if row.clips:
+                # Leading gap (from 0 to first clip)
+                if row.first_start > GAP_THRESHOLD_MS:
                     gaps.insert(
                         0,
                         {
                             "start_ms": 0,
-                            "end_ms": first_start,
-                            "duration_ms": first_start,
+                            "end_ms": row.first_start,
+                            "duration_ms": row.first_start,
                         },
                     )
                 # Trailing gap
-                last_end = max(c.get("start_ms", 0) + c.get("duration_ms", 0) for c in clips)
                 if (
                     self.project_duration_ms > 0
-                    and self.project_duration_ms - last_end > GAP_THRESHOLD_MS
+                    and self.project_duration_ms - row.last_end > GAP_THRESHOLD_MS
                 ):
                     gaps.append(
                         {
-                            "start_ms": last_end,
+                            "start_ms": row.last_end,
                             "end_ms": self.project_duration_ms,
-                            "duration_ms": self.project_duration_ms - last_end,
+                            "duration_ms": self.project_duration_ms - row.last_end,
                         }
                     )
 
-            # Cross-layer coverage annotation
             for gap in gaps:
-                covered_by = self._find_covering_layers(
-                    gap["start_ms"],
-                    gap["end_ms"],
-                    layer_id,
-                    video_layer_intervals,
-                    video_layer_names,
-                )
+                if is_audio:
+                    # Audio gaps: no cross-layer coverage (audio layers are independent)
+                    covered_by = []
+                else:
+                    covered_by = self._find_covering_layers(
+                        gap["start_ms"],
+                        gap["end_ms"],
+                        row.id,
+                        video_layer_intervals,
+                        video_layer_names,
+                    )
                 gap["covered_by"] = covered_by
                 gap["is_intentional"] = len(covered_by) > 0
 
@@ -203,54 +372,9 @@ class TimelineAnalyzer:
 
             layer_gaps.append(
                 {
-                    "layer_id": layer_id,
-                    "layer_name": layer.get("name", ""),
-                    "type": "video",
-                    "gaps": gaps,
-                }
-            )
-
-        # Audio tracks
-        for track in self.timeline.get("audio_tracks", []):
-            gaps = self._find_gaps_in_clips(track.get("clips", []))
-            clips = sorted(track.get("clips", []), key=lambda c: c.get("start_ms", 0))
-            if clips:
-                first_start = clips[0].get("start_ms", 0)
-                if first_start > GAP_THRESHOLD_MS:
-                    gaps.insert(
-                        0,
-                        {
-                            "start_ms": 0,
-                            "end_ms": first_start,
-                            "duration_ms": first_start,
-                        },
-                    )
-                last_end = max(c.get("start_ms", 0) + c.get("duration_ms", 0) for c in clips)
-                if (
-                    self.project_duration_ms > 0
-                    and self.project_duration_ms - last_end > GAP_THRESHOLD_MS
-                ):
-                    gaps.append(
-                        {
-                            "start_ms": last_end,
-                            "end_ms": self.project_duration_ms,
-                            "duration_ms": self.project_duration_ms - last_end,
-                        }
-                    )
-
-            # Audio gaps: no cross-layer coverage (audio layers are independent)
-            for gap in gaps:
-                gap["covered_by"] = []
-                gap["is_intentional"] = False
-
-            total_gaps += len(gaps)
-            total_gap_duration_ms += sum(g["duration_ms"] for g in gaps)
-
-            layer_gaps.append(
-                {
-                    "layer_id": track.get("id", ""),
-                    "layer_name": track.get("name", ""),
-                    "type": "audio",
+                    "layer_id": row.id,
+                    "layer_name": row.name,
+                    "type": "audio" if is_audio else "video",
                     "gaps": gaps,
                 }
             )
@@ -285,16 +409,11 @@ class TimelineAnalyzer:
                 continue
             if not intervals:
                 continue
-            # Check if the merged intervals fully cover [gap_start, gap_end)
-            cursor = gap_start
-            for iv_start, iv_end in intervals:
-                if iv_start > cursor:
-                    break  # uncovered region
-                if iv_end > cursor:
-                    cursor = iv_end
-                if cursor >= gap_end:
-                    break
-            if cursor >= gap_end:
+            # Merged intervals are disjoint and never touch, so [gap_start, gap_end)
+            # is covered only if the last interval starting at or before
+            # gap_start also reaches gap_end.
+            idx = bisect.bisect_right(intervals, gap_start, key=lambda iv: iv[0]) - 1
+            if idx >= 0 and intervals[idx][1] >= gap_end:
                 covering.append(layer_names.get(lid, lid))
         return covering
 
@@ -304,26 +423,7 @@ class TimelineAnalyzer:
         Only reports gaps > GAP_THRESHOLD_MS between clip interiors.
         Does NOT include leading/trailing gaps here (handled by caller).
         """
-        if not clips:
-            return []
-
-        sorted_clips = sorted(clips, key=lambda c: c.get("start_ms", 0))
-        gaps: list[dict] = []
-        current_end = sorted_clips[0].get("start_ms", 0) + sorted_clips[0].get("duration_ms", 0)
-
-        for clip in sorted_clips[1:]:
-            start = clip.get("start_ms", 0)
-            if start - current_end > GAP_THRESHOLD_MS:
-                gaps.append(
-                    {
-                        "start_ms": current_end,
-                        "end_ms": start,
-                        "duration_ms": start - current_end,
-                    }
-                )
-            current_end = max(current_end, start + clip.get("duration_ms", 0))
-
-        return gaps
+        return _gaps_between(_merge_intervals([_clip_interval(c) for c in clips]), GAP_THRESHOLD_MS)
 
     # =========================================================================
     # Pacing Analysis
@@ -343,14 +443,13 @@ class TimelineAnalyzer:
         """
         all_clips: list[dict] = []
 
-        for layer in self.timeline.get("layers", []):
-            layer_id = layer.get("id", "")
-            for clip in layer.get("clips", []):
+        for row in self._index.layers:
+            for clip in row.clips:
                 all_clips.append(
                     {
                         "id": clip.get("id", ""),
                         "duration_ms": clip.get("duration_ms", 0),
-                        "layer_id": layer_id,
+                        "layer_id": row.id,
                     }
                 )
 
@@ -423,46 +522,30 @@ class TimelineAnalyzer:
                 "issues": [],
             }
 
+        index = self._index
         tracks_info: list[dict] = []
-        narration_intervals: list[tuple[int, int]] = []
-        bgm_intervals: list[tuple[int, int]] = []
-        all_audio_intervals: list[tuple[int, int]] = []
         issues: list[str] = []
 
-        for track in self.timeline.get("audio_tracks", []):
-            track_type = track.get("type", "")
-            clips = track.get("clips", [])
-            intervals = [
-                (c.get("start_ms", 0), c.get("start_ms", 0) + c.get("duration_ms", 0))
-                for c in clips
-            ]
-            coverage_ms = self._merged_coverage(intervals)
+        for row in index.tracks:
             coverage_pct = (
-                round((coverage_ms / self.project_duration_ms) * 100, 1)
+                round((row.coverage_ms / self.project_duration_ms) * 100, 1)
                 if self.project_duration_ms > 0
                 else 0.0
             )
 
             tracks_info.append(
                 {
-                    "track_id": track.get("id", ""),
-                    "track_name": track.get("name", ""),
-                    "track_type": track_type,
-                    "clip_count": len(clips),
-                    "coverage_ms": coverage_ms,
+                    "track_id": row.id,
+                    "track_name": row.name,
+                    "track_type": row.raw_type or "",
+                    "clip_count": len(row.clips),
+                    "coverage_ms": row.coverage_ms,
                     "coverage_pct": coverage_pct,
                 }
             )
 
-            all_audio_intervals.extend(intervals)
-
-            if track_type == "narration":
-                narration_intervals.extend(intervals)
-            elif track_type == "bgm":
-                bgm_intervals.extend(intervals)
-
-        narration_coverage_ms = self._merged_coverage(narration_intervals)
-        bgm_coverage_ms = self._merged_coverage(bgm_intervals)
+        narration_coverage_ms = self._merged_coverage(index.group("audio:narration"))
+        bgm_coverage_ms = self._merged_coverage(index.group("audio:bgm"))
         narration_pct = (
             round((narration_coverage_ms / self.project_duration_ms) * 100, 1)
             if self.project_duration_ms > 0
@@ -476,15 +559,13 @@ class TimelineAnalyzer:
 
         # Detect silent intervals (no narration AND no BGM)
         silent_intervals = self._find_uncovered_intervals(
-            all_audio_intervals, self.project_duration_ms
+            index.group("audio"), self.project_duration_ms
         )
 
         # Issues
         if narration_pct == 0 and self.project_duration_ms > 0:
             # Check if narration track exists but is empty
-            narration_exists = any(
-                t.get("type") == "narration" for t in self.timeline.get("audio_tracks", [])
-            )
+            narration_exists = any(row.raw_type == "narration" for row in index.tracks)
             if narration_exists:
                 issues.append("Narration track exists but has no clips")
         elif narration_pct < 50:
@@ -493,7 +574,7 @@ class TimelineAnalyzer:
             )
 
         if bgm_pct == 0 and self.project_duration_ms > 0:
-            bgm_exists = any(t.get("type") == "bgm" for t in self.timeline.get("audio_tracks", []))
+            bgm_exists = any(row.raw_type == "bgm" for row in index.tracks)
             if bgm_exists:
                 issues.append(
                     "BGM track exists but has no clips. Consider adding background music."
@@ -518,20 +599,7 @@ class TimelineAnalyzer:
 
     def _merged_coverage(self, intervals: list[tuple[int, int]]) -> int:
         """Calculate total coverage of merged (possibly overlapping) intervals."""
-        if not intervals:
-            return 0
-
-        sorted_intervals = sorted(intervals, key=lambda x: x[0])
-        merged: list[tuple[int, int]] = [sorted_intervals[0]]
-
-        for start, end in sorted_intervals[1:]:
-            prev_start, prev_end = merged[-1]
-            if start <= prev_end:
-                merged[-1] = (prev_start, max(prev_end, end))
-            else:
-                merged.append((start, end))
-
-        return sum(end - start for start, end in merged)
+        return sum(end - start for start, end in _merge_intervals(intervals))
 
     def _find_uncovered_intervals(
         self, intervals: list[tuple[int, int]], total_duration: int
@@ -549,16 +617,7 @@ class TimelineAnalyzer:
                 }
             ]
 
-        sorted_intervals = sorted(intervals, key=lambda x: x[0])
-        merged: list[tuple[int, int]] = [sorted_intervals[0]]
-
-        for start, end in sorted_intervals[1:]:
-            prev_start, prev_end = merged[-1]
-            if start <= prev_end:
-                merged[-1] = (prev_start, max(prev_end, end))
-            else:
-                merged.append((start, end))
-
+        merged = _merge_intervals(intervals)
         uncovered: list[dict] = []
         current = 0
         for start, end in merged:
@@ -604,61 +663,28 @@ class TimelineAnalyzer:
                 "audio_score": 0,
             }
 
+        index = self._index
         tracks_result: list[dict] = []
-        all_audio_intervals: list[tuple[int, int]] = []
-        narration_intervals: list[tuple[int, int]] = []
-        bgm_intervals: list[tuple[int, int]] = []
-        has_bgm_track = False
-        has_bgm_clips = False
-        bgm_ducking_enabled = False
-        narration_has_clips = False
-
-        # --- Collect audio group_ids ---
-        audio_group_ids: set[str] = set()
-
-        for track in self.timeline.get("audio_tracks", []):
-            track_type = track.get("type", "")
-            track_id = track.get("id", "")
-            track_name = track.get("name", "")
-            clips = track.get("clips", [])
-            if track_type == "narration":
-                if clips:
-                    narration_has_clips = True
-            elif track_type == "bgm":
-                has_bgm_track = True
-                # ダッキングはvolume keyframesで実現されるため、
-                # BGMクリップにvolume_keyframesが1つ以上あれば「ダッキング済み」と判定
-                for clip in clips:
-                    kfs = clip.get("volume_keyframes", [])
-                    if kfs:
-                        bgm_ducking_enabled = True
-                        break
-                if clips:
-                    has_bgm_clips = True
+        narration_tracks = [row for row in index.tracks if row.raw_type == "narration"]
+        bgm_tracks = [row for row in index.tracks if row.raw_type == "bgm"]
+        narration_has_clips = any(row.clips for row in narration_tracks)
+        has_bgm_track = bool(bgm_tracks)
+        has_bgm_clips = any(row.clips for row in bgm_tracks)
+        # ダッキングはvolume keyframesで実現されるため、
+        # BGMクリップにvolume_keyframesが1つ以上あれば「ダッキング済み」と判定
+        bgm_ducking_enabled = any(row.has_volume_keyframes for row in bgm_tracks)
+
+        for row in index.tracks:
+            track_type = row.raw_type or ""
+            track_name = row.name
+            clips = row.clips
 
             # Per-clip volume analysis
-            volumes: list[float] = []
+            volumes: list[float] = [clip.get("volume", 1.0) for clip in clips]
             issues: list[dict] = []
-            intervals: list[tuple[int, int]] = []
-
-            for clip in clips:
-                vol = clip.get("volume", 1.0)
-                volumes.append(vol)
-                start = clip.get("start_ms", 0)
-                end = start + clip.get("duration_ms", 0)
-                intervals.append((start, end))
-                gid = clip.get("group_id")
-                if gid:
-                    audio_group_ids.add(gid)
-
-            all_audio_intervals.extend(intervals)
-            if track_type == "narration":
-                narration_intervals.extend(intervals)
-            elif track_type == "bgm":
-                bgm_intervals.extend(intervals)
 
             # Coverage
-            coverage_ms = self._merged_coverage(intervals)
+            coverage_ms = row.coverage_ms
             coverage_pct = (
                 round((coverage_ms / self.project_duration_ms) * 100, 1)
                 if self.project_duration_ms > 0
@@ -690,7 +716,7 @@ class TimelineAnalyzer:
 
             tracks_result.append(
                 {
-                    "track_id": track_id,
+                    "track_id": row.id,
                     "track_name": track_name,
                     "track_type": track_type,
                     "clip_count": len(clips),
@@ -698,7 +724,7 @@ class TimelineAnalyzer:
                     "coverage_pct": coverage_pct,
                     "avg_volume": avg_volume,
                     "volume_range": {"min": vol_min, "max": vol_max},
-                    "has_ducking": any(clip.get("volume_keyframes") for clip in clips),
+                    "has_ducking": row.has_volume_keyframes,
                     "issues": issues,
                 }
             )
@@ -735,7 +761,9 @@ class TimelineAnalyzer:
         # Narration overlaps with BGM but no ducking
         if narration_has_clips and has_bgm_clips and not bgm_ducking_enabled:
             # Check actual overlap
-            has_overlap = self._intervals_overlap(narration_intervals, bgm_intervals)
+            has_overlap = self._intervals_overlap(
+                index.group("audio:narration"), index.group("audio:bgm")
+            )
             if has_overlap:
                 cross_track_issues.append(
                     {
@@ -749,25 +777,23 @@ class TimelineAnalyzer:
 
         # Audio-video misalignment: video clips with group_id that have
         # no matching audio clip
-        for layer in self.timeline.get("layers", []):
-            for clip in layer.get("clips", []):
-                gid = clip.get("group_id")
-                if gid and gid not in audio_group_ids:
-                    cross_track_issues.append(
-                        {
-                            "type": "audio_video_misalignment",
-                            "message": (
-                                f"Video clip at {clip.get('start_ms', 0)}ms "
-                                f"has no matching audio (no group_id link)"
-                            ),
-                            "video_clip_id": clip.get("id", ""),
-                            "time_ms": clip.get("start_ms", 0),
-                        }
-                    )
+        for clip in index.grouped_video_clips:
+            if clip["group_id"] not in index.audio_group_ids:
+                cross_track_issues.append(
+                    {
+                        "type": "audio_video_misalignment",
+                        "message": (
+                            f"Video clip at {clip.get('start_ms', 0)}ms "
+                            f"has no matching audio (no group_id link)"
+                        ),
+                        "video_clip_id": clip.get("id", ""),
+                        "time_ms": clip.get("start_ms", 0),
+                    }
+                )
 
         # --- Silent intervals ---
         silent_intervals = self._find_uncovered_intervals(
-            all_audio_intervals, self.project_duration_ms
+            index.group("audio"), self.project_duration_ms
         )
 
         # --- Recommendations ---
@@ -789,7 +815,7 @@ class TimelineAnalyzer:
 
         # --- Audio score (0-100) ---
         # Narration coverage: 30 points
-        narration_coverage_ms = self._merged_coverage(narration_intervals)
+        narration_coverage_ms = self._merged_coverage(index.group("audio:narration"))
         narration_pct = (
             (narration_coverage_ms / self.project_duration_ms) * 100
             if self.project_duration_ms > 0
@@ -845,23 +871,8 @@ class TimelineAnalyzer:
         if not intervals_a or not intervals_b:
             return False
 
-        # Merge intervals_a
-        sorted_a = sorted(intervals_a, key=lambda x: x[0])
-        merged_a: list[tuple[int, int]] = [sorted_a[0]]
-        for start, end in sorted_a[1:]:
-            if start <= merged_a[-1][1]:
-                merged_a[-1] = (merged_a[-1][0], max(merged_a[-1][1], end))
-            else:
-                merged_a.append((start, end))
-
-        # Merge intervals_b
-        sorted_b = sorted(intervals_b, key=lambda x: x[0])
-        merged_b: list[tuple[int, int]] = [sorted_b[0]]
-        for start, end in sorted_b[1:]:
-            if start <= merged_b[-1][1]:
-                merged_b[-1] = (merged_b[-1][0], max(merged_b[-1][1], end))
-            else:
-                merged_b.append((start, end))
+        merged_a = _merge_intervals(intervals_a)
+        merged_b = _merge_intervals(intervals_b)
 
         # Two-pointer overlap check
         i, j = 0, 0
@@ -900,26 +911,20 @@ class TimelineAnalyzer:
         """
         layers_info: list[dict] = []
 
-        for layer in self.timeline.get("layers", []):
-            clips = layer.get("clips", [])
-            intervals = [
-                (c.get("start_ms", 0), c.get("start_ms", 0) + c.get("duration_ms", 0))
-                for c in clips
-            ]
-            coverage_ms = self._merged_coverage(intervals)
+        for row in self._index.layers:
             coverage_pct = (
-                round((coverage_ms / self.project_duration_ms) * 100, 1)
+                round((row.coverage_ms / self.project_duration_ms) * 100, 1)
                 if self.project_duration_ms > 0
                 else 0.0
             )
 
             layers_info.append(
                 {
-                    "layer_id": layer.get("id", ""),
-                    "layer_name": layer.get("name", ""),
-                    "type": layer.get("type", ""),
-                    "clip_count": len(clips),
-                    "coverage_ms": coverage_ms,
+                    "layer_id": row.id,
+                    "layer_name": row.name,
+                    "type": row.raw_type or "",
+                    "clip_count": len(row.clips),
+                    "coverage_ms": row.coverage_ms,
                     "coverage_pct": coverage_pct,
                 }
             )
@@ -938,23 +943,28 @@ class TimelineAnalyzer:
         2. Marker positions (explicit section markers)
         3. Background changes (different background clips = different sections)
 
-        Returns a list of section dicts sorted by start_ms.
+        Returns a list of section dicts sorted by start_ms.  The result is
+        computed once per analyzer and shared by ``analyze_all`` and
+        ``generate_suggestions``.
         """
+        if self._sections is None:
+            self._sections = self._detect_sections()
+        return self._sections
+
+    def _detect_sections(self) -> list[dict]:
         if self.project_duration_ms == 0:
             return []
 
-        # --- Step 1: Find content-layer clip boundaries ---
-        content_clips: list[dict] = []
-        for layer in self.timeline.get("layers", []):
-            if layer.get("type", "content") == "content":
-                content_clips.extend(layer.get("clips", []))
+        index = self._index
+
+        # --- Step 1: Find content-layer coverage ---
+        content_merged = index.group("layer:content")
 
         # If no content layer, fall back to all layers
-        if not content_clips:
-            for layer in self.timeline.get("layers", []):
-                content_clips.extend(layer.get("clips", []))
+        if not content_merged:
+            content_merged = index.group("layers")
 
-        if not content_clips:
+        if not content_merged:
             # No clips at all -- return single section spanning the timeline
             return [
                 self._build_section(
@@ -966,16 +976,10 @@ class TimelineAnalyzer:
                 )
             ]
 
-        sorted_clips = sorted(content_clips, key=lambda c: c.get("start_ms", 0))
-
         # --- Step 2: Collect boundary timestamps from content gaps ---
-        boundaries: list[int] = []
-        current_end = sorted_clips[0].get("start_ms", 0) + sorted_clips[0].get("duration_ms", 0)
-        for clip in sorted_clips[1:]:
-            clip_start = clip.get("start_ms", 0)
-            if clip_start - current_end > SECTION_GAP_MS:
-                boundaries.append(clip_start)
-            current_end = max(current_end, clip_start + clip.get("duration_ms", 0))
+        boundaries: list[int] = [
+            gap["end_ms"] for gap in _gaps_between(content_merged, SECTION_GAP_MS)
+        ]
 
         # --- Step 3: Add marker positions as boundaries ---
         markers = self.timeline.get("markers", [])
@@ -987,16 +991,15 @@ class TimelineAnalyzer:
                 marker_map[t] = marker.get("name", "")
 
         # --- Step 4: Add background-change boundaries ---
-        bg_clips: list[dict] = []
-        for layer in self.timeline.get("layers", []):
-            if layer.get("type") == "background":
-                bg_clips.extend(layer.get("clips", []))
-        if len(bg_clips) > 1:
-            sorted_bg = sorted(bg_clips, key=lambda c: c.get("start_ms", 0))
-            for bg_clip in sorted_bg[1:]:
-                bg_start = bg_clip.get("start_ms", 0)
-                if 0 < bg_start < self.project_duration_ms:
-                    boundaries.append(bg_start)
+        bg_starts = sorted(
+            clip.get("start_ms", 0)
+            for row in index.layers
+            if row.raw_type == "background"
+            for clip in row.clips
+        )
+        for bg_start in bg_starts[1:]:
+            if 0 < bg_start < self.project_duration_ms:
+                boundaries.append(bg_start)
 
         # --- Step 5: Deduplicate and sort boundaries ---
         # Merge boundaries that are within SECTION_GAP_MS of each other
@@ -1031,15 +1034,7 @@ class TimelineAnalyzer:
                 name = f"Section {idx + 1}"
 
             # Collect clip IDs that overlap this section
-            clip_ids: list[str] = []
-            for layer in self.timeline.get("layers", []):
-                for clip in layer.get("clips", []):
-                    c_start = clip.get("start_ms", 0)
-                    c_end = c_start + clip.get("duration_ms", 0)
-                    if c_start < s_end and c_end > s_start:
-                        cid = clip.get("id", "")
-                        if cid:
-                            clip_ids.append(cid)
+            clip_ids = index.clip_ids_overlapping(s_start, s_end)
 
             sections.append(
                 self._build_section(
@@ -1062,49 +1057,12 @@ class TimelineAnalyzer:
         clip_ids: list[str],
     ) -> dict:
         """Build a section dict with metadata about what the section contains."""
-        has_narration = False
-        has_background = False
-        has_text = False
         suggested_improvements: list[str] = []
 
-        # Check narration coverage
-        for track in self.timeline.get("audio_tracks", []):
-            if track.get("type") != "narration":
-                continue
-            for clip in track.get("clips", []):
-                c_start = clip.get("start_ms", 0)
-                c_end = c_start + clip.get("duration_ms", 0)
-                if c_start < end_ms and c_end > start_ms:
-                    has_narration = True
-                    break
-            if has_narration:
-                break
-
-        # Check background coverage
-        for layer in self.timeline.get("layers", []):
-            if layer.get("type") != "background":
-                continue
-            for clip in layer.get("clips", []):
-                c_start = clip.get("start_ms", 0)
-                c_end = c_start + clip.get("duration_ms", 0)
-                if c_start < end_ms and c_end > start_ms:
-                    has_background = True
-                    break
-            if has_background:
-                break
-
-        # Check text coverage
-        for layer in self.timeline.get("layers", []):
-            if layer.get("type") != "text":
-                continue
-            for clip in layer.get("clips", []):
-                c_start = clip.get("start_ms", 0)
-                c_end = c_start + clip.get("duration_ms", 0)
-                if c_start < end_ms and c_end > start_ms:
-                    has_text = True
-                    break
-            if has_text:
-                break
+        index = self._index
+        has_narration = _overlaps_any(index.group("audio:narration"), start_ms, end_ms)
+        has_background = _overlaps_any(index.group("layer:background"), start_ms, end_ms)
+        has_text = _overlaps_any(index.group("layer:text"), start_ms, end_ms)
 
         # Generate suggestions
         if not has_narration:
@@ -1136,15 +1094,10 @@ class TimelineAnalyzer:
 
         Returns a dict of {asset_id: count} (only non-None asset_ids).
         """
-        counts: dict[str, int] = {}
-        for layer in self.timeline.get("layers", []):
-            if layer.get("id") == layer_id:
-                for clip in layer.get("clips", []):
-                    aid = clip.get("asset_id")
-                    if aid:
-                        counts[aid] = counts.get(aid, 0) + 1
-                break
-        return counts
+        for row in self._index.layers:
+            if row.id == layer_id:
+                return dict(row.asset_usage)
+        return {}
 
     def _count_asset_usage_in_audio_track(self, track_type: str) -> dict[str, int]:
         """Count how many times each asset_id appears in audio tracks of a given type.
@@ -1152,12 +1105,10 @@ class TimelineAnalyzer:
         Returns a dict of {asset_id: count}.
         """
         counts: dict[str, int] = {}
-        for track in self.timeline.get("audio_tracks", []):
-            if track.get("type") == track_type:
-                for clip in track.get("clips", []):
-                    aid = clip.get("asset_id")
-                    if aid:
-                        counts[aid] = counts.get(aid, 0) + 1
+        for row in self._index.tracks:
+            if row.raw_type == track_type:
+                for aid, count in row.asset_usage.items():
+                    counts[aid] = counts.get(aid, 0) + count
         return counts
 
     def _find_suggested_asset_for_layer(self, layer_id: str) -> str | None:
@@ -1246,17 +1197,7 @@ class TimelineAnalyzer:
         """Find the largest time interval not covered by any clip."""
         if total_duration_ms <= 0:
             return None
-        intervals = sorted(
-            [(c.get("start_ms", 0), c.get("start_ms", 0) + c.get("duration_ms", 0)) for c in clips],
-            key=lambda x: x[0],
-        )
-        # Merge overlapping intervals
-        merged: list[tuple[int, int]] = []
-        for start, end in intervals:
-            if merged and start <= merged[-1][1]:
-                merged[-1] = (merged[-1][0], max(merged[-1][1], end))
-            else:
-                merged.append((start, end))
+        merged = _merge_intervals([_clip_interval(c) for c in clips])
         # Find gaps
         gaps: list[dict] = []
         prev_end = 0
@@ -1356,9 +1297,11 @@ class TimelineAnalyzer:
                         # Audio gap: find a suitable audio asset
                         # Determine track_type from the layer's corresponding audio track
                         audio_track_type = "narration"
-                        for track in self.timeline.get("audio_tracks", []):
-                            if track.get("id") == layer_info["layer_id"]:
-                                audio_track_type = track.get("type", "narration")
+                        for row in self._index.tracks:
+                            if row.id == layer_info["layer_id"]:
+                                audio_track_type = (
+                                    row.raw_type if row.raw_type is not None else "narration"
+                                )
                                 break
                         suggested_aid = self._find_suggested_audio_asset(audio_track_type)
                     else:
@@ -0,0 +1,144 @@
+"""Copy-on-write timeline documents.
+
+Timelines are plain JSON dicts (``timeline_data``) that can grow to several
+MB.  Call sites that need an independent version of one used to
+``copy.deepcopy`` the whole document, even when they only rewrite a few
+top-level fields or touch a handful of clips.
+
+:func:`fork_timeline` is the cheap alternative: it copies the document's
+*containers* (the top-level dict, the ``layers`` / ``audio_tracks`` lists,
+each layer/track dict and its ``clips`` list) and shares every clip dict
+with the source.  A fork costs one pointer copy per clip and may be freely
+modified at the container level — top-level keys, layer/track properties,
+adding, removing or reordering clips — without affecting the source.
+
+Clip dicts (and anything nested below them) are shared, so they must not be
+mutated in place.  :class:`TimelineDocument` adds the missing piece: it
+keeps track of which clips are still shared and hands out private copies on
+first write via :meth:`TimelineDocument.own_clip`, so an edit session costs
+time proportional to the clips it touches rather than to the timeline size.
+
+Code that mutates clips in place without going through a document (most
+single-op editor methods do) still needs a fully independent copy;
+:func:`deep_clone` provides one about three times faster than
+``copy.deepcopy`` for JSON-shaped data.
+"""
+
+from __future__ import annotations
+
+import pickle
+from typing import Any, Literal, TypeVar
+
+T = TypeVar("T")
+
+ClipKind = Literal["video", "audio"]
+
+ROW_KEYS: dict[ClipKind, str] = {"video": "layers", "audio": "audio_tracks"}
+
+
+def deep_clone(value: T) -> T:
+    """Return a fully independent copy of JSON-shaped ``value``.
+
+    Timeline data only holds dicts, lists and scalars, so a pickle round
+    trip gives the same result as ``copy.deepcopy`` without its per-object
+    memo and dispatch overhead.
+    """
+    clone: T = pickle.loads(pickle.dumps(value, pickle.HIGHEST_PROTOCOL))
+    return clone
+
+
+def fork_timeline(timeline: dict[str, Any]) -> dict[str, Any]:
+    """Return a structurally shared fork of ``timeline``.
+
+    Containers are copied, clip dicts are shared with ``timeline``.  The
+    fork can be modified at the container level without affecting the
+    source; clips must be replaced rather than mutated in place (see
+    :class:`TimelineDocument` for copy-on-write access to clips).
+    """
+    forked = dict(timeline)
+    for key in ROW_KEYS.values():
+        rows = timeline.get(key)
+        if isinstance(rows, list):
+            forked[key] = [_fork_row(row) for row in rows]
+    return forked
+
+
+def _fork_row(row: Any) -> Any:
+    if not isinstance(row, dict):
+        return row
+    row_copy = dict(row)
+    if isinstance(row.get("clips"), list):
+        row_copy["clips"] = list(row["clips"])
+    return row_copy
+
+
+class TimelineDocument:
+    """Copy-on-write working copy of a timeline dict.
+
+    ``working`` is a :func:`fork_timeline` of ``base`` and shares every clip
+    dict with it until :meth:`own_clip` replaces the clip with a private deep
+    copy.  ``base`` is never mutated, so discarding the edits is simply a
+    matter of keeping ``base``.
+    """
+
+    def __init__(self, base: dict[str, Any]) -> None:
+        self.base = base
+        self.working = fork_timeline(base)
+        self._shared_clip_ids: set[int] = set()
+        # Exact-id index per kind: clip id -> (clip, container)
+        self._index: dict[ClipKind, dict[str, tuple[dict[str, Any], dict[str, Any]]]] = {
+            "video": {},
+            "audio": {},
+        }
+        for kind, key in ROW_KEYS.items():
+            for row in self.working.get(key) or []:
+                for clip in row.get("clips") or []:
+                    self._shared_clip_ids.add(id(clip))
+                    self._index[kind].setdefault(clip.get("id", ""), (clip, row))
+
+    def is_working(self, timeline: Any) -> bool:
+        return timeline is self.working
+
+    def own_clip(self, container: dict[str, Any], clip: dict[str, Any]) -> dict[str, Any]:
+        """Return a private copy of ``clip`` that is safe to mutate in place."""
+        if id(clip) not in self._shared_clip_ids:
+            return clip
+        clips: list[dict[str, Any]] = container["clips"]
+        for pos, candidate in enumerate(clips):
+            if candidate is clip:
+                owned = deep_clone(clip)
+                clips[pos] = owned
+                self._shared_clip_ids.discard(id(clip))
+                return owned
+        return clip
+
+    def find_clip(
+        self, kind: ClipKind, clip_id: str
+    ) -> tuple[dict[str, Any] | None, dict[str, Any] | None, str | None]:
+        """Find a clip by full or partial ID, taking ownership of it.
+
+        Exact IDs are served from the index when the indexed clip is still
+        in its container; anything else (prefix IDs, moved or deleted clips)
+        falls back to an ordered scan of ``working``.
+        """
+        entry = self._index[kind].get(clip_id)
+        if entry is not None:
+            clip, container = entry
+            if any(c is clip for c in container.get("clips", [])):
+                owned = self.own_clip(container, clip)
+                self._index[kind][clip_id] = (owned, container)
+                return owned, container, clip_id
+
+        for row in self.working.get(ROW_KEYS[kind], []):
+            for clip in row.get("clips", []):
+                full_id = clip.get("id", "")
+                if full_id == clip_id or full_id.startswith(clip_id):
+                    owned = self.own_clip(row, clip)
+                    self._index[kind][full_id] = (owned, row)
+                    return owned, row, full_id
+        return None, None, None
+
+    def peek_clip(self, kind: ClipKind, clip_id: str) -> dict[str, Any] | None:
+        """Read-only lookup by exact ID (no ownership, no fallback scan)."""
+        entry = self._index[kind].get(clip_id)
+        return entry[0] if entry is not None else None
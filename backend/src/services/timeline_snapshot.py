@@ -2,13 +2,18 @@
 
 Generates a visual overview image of the timeline as a horizontal bar chart.
 Each layer/track is rendered as a row, with clips shown as colored rectangles.
+
+Rows with many clips are rasterized in one NumPy pass: clip extents are
+coalesced into pixel spans and filled as a column mask, instead of one
+Pillow call per (often sub-pixel) clip.
 """
 
 import base64
 import io
 import logging
-from typing import Any
+from typing import Any, Literal
 
+import numpy as np
 from PIL import Image, ImageDraw, ImageFont
 
 logger = logging.getLogger(__name__)
@@ -42,6 +47,20 @@ TRACK_AREA_LEFT = LABEL_WIDTH
 TRACK_AREA_WIDTH = IMAGE_WIDTH - LABEL_WIDTH
 ROW_PADDING = 2
 CLIP_CORNER_RADIUS = 3
+CLIP_MIN_WIDTH = 2
+
+# Rows with at least this many clips are drawn with the NumPy raster pass
+DENSE_ROW_MIN_CLIPS = 48
+
+# Output encodings: JPEG (default) or the cheaper PNG / WebP variants
+SnapshotFormat = Literal["jpeg", "png", "webp"]
+SNAPSHOT_MEDIA_TYPES: dict[str, str] = {
+    "jpeg": "image/jpeg",
+    "png": "image/png",
+    "webp": "image/webp",
+}
+# The palette has a handful of flat colors plus anti-aliased text
+PNG_PALETTE_COLORS = 64
 
 
 def _hex_to_rgb(hex_color: str) -> tuple[int, int, int]:
@@ -94,6 +113,80 @@ def _draw_rounded_rect(
     draw.rounded_rectangle(xy, radius=radius, fill=fill)
 
 
+def _clip_label(clip: dict[str, Any], asset_name_map: dict[str, str]) -> str | None:
+    """Label shown on a clip: its asset name or text content."""
+    aid = clip.get("asset_id")
+    if aid and aid in asset_name_map:
+        return asset_name_map[aid]
+    if clip.get("text_content"):
+        text: str = clip["text_content"]
+        return text[:30] + ".." if len(text) > 30 else text
+    return None
+
+
+def _draw_clip_label(
+    draw: ImageDraw.ImageDraw,
+    label: str,
+    xy: tuple[int, int, int, int],
+    font: ImageFont.FreeTypeFont | ImageFont.ImageFont,
+) -> None:
+    """Draw a clip label inside its rectangle if the clip is wide enough."""
+    cx0, cy0, cx1, cy1 = xy
+    if (cx1 - cx0) <= 20:
+        return
+    # Truncate to fit
+    max_chars = max(1, (cx1 - cx0 - 4) // 6)
+    if len(label) > max_chars:
+        label = label[: max_chars - 1] + ".."
+    text_y = cy0 + (cy1 - cy0 - 10) // 2
+    draw.text((cx0 + 3, text_y), label, fill=CLIP_TEXT_COLOR, font=font)
+
+
+def _clip_spans(
+    clips: list[dict[str, Any]], duration_ms: int, width: int
+) -> tuple[list[dict[str, Any]], np.ndarray, np.ndarray]:
+    """Pixel extents of a row's visible clips, computed as arrays.
+
+    Returns the clips with a positive duration and their inclusive
+    ``(x0, x1)`` columns, with the same minimum width and clamping as
+    single-clip drawing.  Clips entirely outside the track area are dropped.
+    """
+    visible = [c for c in clips if c.get("duration_ms", 0) > 0]
+    starts = np.array([c.get("start_ms", 0) for c in visible], dtype=np.float64)
+    ends = starts + np.array([c["duration_ms"] for c in visible], dtype=np.float64)
+    track_width = width - TRACK_AREA_LEFT
+    x0 = TRACK_AREA_LEFT + (starts / duration_ms * track_width).astype(np.int64)
+    x1 = TRACK_AREA_LEFT + (ends / duration_ms * track_width).astype(np.int64)
+    x1 = np.maximum(x1, x0 + CLIP_MIN_WIDTH)
+    x0 = np.maximum(x0, TRACK_AREA_LEFT)
+    x1 = np.minimum(x1, width - 1)
+    keep = x1 >= x0
+    kept = [clip for clip, k in zip(visible, keep.tolist(), strict=True) if k]
+    return kept, x0[keep], x1[keep]
+
+
+def _span_mask(x0: np.ndarray, x1: np.ndarray, width: int) -> np.ndarray:
+    """Columns covered by any inclusive ``[x0, x1]`` span, as a boolean mask."""
+    edges = np.zeros(width + 1, dtype=np.int64)
+    np.add.at(edges, x0, 1)
+    np.add.at(edges, x1 + 1, -1)
+    mask: np.ndarray = np.cumsum(edges[:width]) > 0
+    return mask
+
+
+def _encode_image(img: Image.Image, image_format: SnapshotFormat) -> bytes:
+    """Encode the snapshot image in ``image_format``."""
+    buf = io.BytesIO()
+    if image_format == "png":
+        palette = img.quantize(PNG_PALETTE_COLORS, method=Image.Quantize.FASTOCTREE)
+        palette.save(buf, format="PNG", compress_level=6)
+    elif image_format == "webp":
+        img.save(buf, format="WEBP", quality=80, method=2)
+    else:
+        img.save(buf, format="JPEG", quality=80)
+    return buf.getvalue()
+
+
 def _ms_to_label(ms: int) -> str:
     """Convert milliseconds to a human-readable label (e.g. '1:30' or '45s')."""
     total_sec = ms / 1000
@@ -109,17 +202,22 @@ def generate_timeline_snapshot(
     audio_tracks: list[dict[str, Any]],
     duration_ms: int,
     asset_name_map: dict[str, str] | None = None,
+    *,
+    width: int = IMAGE_WIDTH,
+    image_format: SnapshotFormat = "jpeg",
 ) -> str | None:
-    """Generate a timeline snapshot image and return as base64-encoded JPEG.
+    """Generate a timeline snapshot image and return it base64-encoded.
 
     Args:
         layers: List of layer dicts from timeline_data (each with clips).
         audio_tracks: List of audio track dicts from timeline_data.
         duration_ms: Total project duration in milliseconds.
         asset_name_map: Optional mapping of asset_id -> asset_name.
+        width: Image width in pixels; the minimum height scales with it.
+        image_format: ``"jpeg"`` (default), ``"png"`` or ``"webp"``.
 
     Returns:
-        Base64-encoded JPEG string, or None if generation fails.
+        Base64-encoded image string, or None if generation fails.
     """
     if asset_name_map is None:
         asset_name_map = {}
@@ -136,15 +234,18 @@ def generate_timeline_snapshot(
         # Nothing to render
         return None
 
+    track_area_width = width - TRACK_AREA_LEFT
+    min_height = IMAGE_HEIGHT * width // IMAGE_WIDTH
+
     # Calculate row height dynamically
-    usable_height = IMAGE_HEIGHT - RULER_HEIGHT
+    usable_height = min_height - RULER_HEIGHT
     row_height = max(20, min(50, usable_height // total_rows))
 
     # Adjust image height if rows overflow
     needed_height = RULER_HEIGHT + total_rows * row_height
-    img_height = max(IMAGE_HEIGHT, needed_height)
+    img_height = max(min_height, needed_height)
 
-    img = Image.new("RGB", (IMAGE_WIDTH, img_height), BG_COLOR)
+    img = Image.new("RGB", (width, img_height), BG_COLOR)
     draw = ImageDraw.Draw(img)
 
     font_small = _get_font(11)  # clip name
@@ -152,7 +253,7 @@ def generate_timeline_snapshot(
     font_ruler = _get_font(10)  # time ruler
 
     # --- Draw ruler ---
-    draw.rectangle((0, 0, IMAGE_WIDTH, RULER_HEIGHT), fill=RULER_BG)
+    draw.rectangle((0, 0, width, RULER_HEIGHT), fill=RULER_BG)
 
     # Determine tick interval
     duration_sec = duration_ms / 1000
@@ -170,7 +271,7 @@ def generate_timeline_snapshot(
     tick_ms = int(tick_interval_sec * 1000)
     t = 0
     while t <= duration_ms:
-        x = TRACK_AREA_LEFT + int(t / duration_ms * TRACK_AREA_WIDTH)
+        x = TRACK_AREA_LEFT + int(t / duration_ms * track_area_width)
         draw.line([(x, 0), (x, RULER_HEIGHT)], fill=GRID_LINE, width=1)
         label = _ms_to_label(t)
         draw.text((x + 2, 2), label, fill=RULER_TEXT, font=font_ruler)
@@ -178,9 +279,11 @@ def generate_timeline_snapshot(
 
     # --- Draw rows ---
     y_offset = RULER_HEIGHT
+    # Dense rows: (y0, y1, column mask, color), filled after all Pillow drawing
+    dense_fills: list[tuple[int, int, np.ndarray, tuple[int, int, int]]] = []
+    dense_labels: list[tuple[str, tuple[int, int, int, int]]] = []
 
     def _draw_row(
-        row_index: int,
         label: str,
         clips: list[dict[str, Any]],
         color: tuple[int, int, int],
@@ -190,7 +293,7 @@ def generate_timeline_snapshot(
         y_bottom = y_top + row_height
 
         # Track separator line
-        draw.line([(0, y_top), (IMAGE_WIDTH, y_top)], fill=TRACK_SEPARATOR, width=1)
+        draw.line([(0, y_top), (width, y_top)], fill=TRACK_SEPARATOR, width=1)
 
         # Label background
         draw.rectangle((0, y_top, LABEL_WIDTH, y_bottom), fill=LABEL_BG)
@@ -203,55 +306,29 @@ def generate_timeline_snapshot(
         # Grid lines (vertical, extending through the track area)
         t_grid = 0
         while t_grid <= duration_ms:
-            gx = TRACK_AREA_LEFT + int(t_grid / duration_ms * TRACK_AREA_WIDTH)
+            gx = TRACK_AREA_LEFT + int(t_grid / duration_ms * track_area_width)
             draw.line([(gx, y_top), (gx, y_bottom)], fill=GRID_LINE, width=1)
             t_grid += tick_ms
 
-        # Clips
-        for clip in clips:
-            start = clip.get("start_ms", 0)
-            dur = clip.get("duration_ms", 0)
-            end = start + dur
-            if dur <= 0:
-                continue
-
-            cx0 = TRACK_AREA_LEFT + int(start / duration_ms * TRACK_AREA_WIDTH)
-            cx1 = TRACK_AREA_LEFT + int(end / duration_ms * TRACK_AREA_WIDTH)
-            # Ensure minimum visible width
-            if cx1 - cx0 < 2:
-                cx1 = cx0 + 2
-            # Clamp to track area
-            cx0 = max(cx0, TRACK_AREA_LEFT)
-            cx1 = min(cx1, IMAGE_WIDTH - 1)
-
-            cy0 = y_top + ROW_PADDING
-            cy1 = y_bottom - ROW_PADDING
+        cy0 = y_top + ROW_PADDING
+        cy1 = y_bottom - ROW_PADDING
+        y_offset = y_bottom
 
+        visible, xs0, xs1 = _clip_spans(clips, duration_ms, width)
+        if len(visible) >= DENSE_ROW_MIN_CLIPS:
+            dense_fills.append((cy0, cy1, _span_mask(xs0, xs1, width), color))
+            # Only clips wider than a label's minimum can show one
+            for i in np.flatnonzero(xs1 - xs0 > 20).tolist():
+                clip_label = _clip_label(visible[i], asset_name_map)
+                if clip_label:
+                    dense_labels.append((clip_label, (int(xs0[i]), cy0, int(xs1[i]), cy1)))
+            return
+
+        for clip, cx0, cx1 in zip(visible, xs0.tolist(), xs1.tolist(), strict=True):
             _draw_rounded_rect(draw, (cx0, cy0, cx1, cy1), fill=color, radius=CLIP_CORNER_RADIUS)
-
-            # Clip label (asset name or text content)
-            clip_label = None
-            aid = clip.get("asset_id")
-            if aid and aid in asset_name_map:
-                clip_label = asset_name_map[aid]
-            elif clip.get("text_content"):
-                text = clip["text_content"]
-                clip_label = text[:30] + ".." if len(text) > 30 else text
-
-            if clip_label and (cx1 - cx0) > 20:
-                # Truncate to fit
-                max_chars = max(1, (cx1 - cx0 - 4) // 6)
-                if len(clip_label) > max_chars:
-                    clip_label = clip_label[: max_chars - 1] + ".."
-                text_y = cy0 + (cy1 - cy0 - 10) // 2
-                draw.text(
-                    (cx0 + 3, text_y),
-                    clip_label,
-                    fill=CLIP_TEXT_COLOR,
-                    font=font_small,
-                )
-
-        y_offset = y_bottom
+            clip_label = _clip_label(clip, asset_name_map)
+            if clip_label:
+                _draw_clip_label(draw, clip_label, (cx0, cy0, cx1, cy1), font_small)
 
     # Video layers (render top to bottom: text, effects, avatar, content, background)
     for layer in layers:
@@ -259,12 +336,12 @@ def generate_timeline_snapshot(
         color = LAYER_COLORS.get(layer_type, (100, 100, 140))
         label = layer.get("name", layer_type.capitalize())
         clips = layer.get("clips", [])
-        _draw_row(0, label, clips, color)
+        _draw_row(label, clips, color)
 
     # Audio separator
     if num_audio_rows > 0 and num_video_rows > 0:
         draw.line(
-            [(0, y_offset), (IMAGE_WIDTH, y_offset)],
+            [(0, y_offset), (width, y_offset)],
             fill=(80, 80, 120),
             width=2,
         )
@@ -273,14 +350,21 @@ def generate_timeline_snapshot(
     for track in audio_tracks:
         label = track.get("name", track.get("type", "Audio"))
         clips = track.get("clips", [])
-        _draw_row(0, label, clips, AUDIO_CLIP_COLOR)
-
-    # --- Encode to JPEG base64 ---
-    buf = io.BytesIO()
+        _draw_row(label, clips, AUDIO_CLIP_COLOR)
+
+    # --- Raster pass for dense rows ---
+    if dense_fills:
+        pixels = np.array(img)
+        for y0, y1, mask, fill in dense_fills:
+            pixels[y0 : y1 + 1, mask] = fill
+        img = Image.fromarray(pixels)
+        draw = ImageDraw.Draw(img)
+        for clip_label, xy in dense_labels:
+            _draw_clip_label(draw, clip_label, xy, font_small)
+
+    # --- Encode to base64 ---
     # Crop to actual used height
     actual_height = y_offset if y_offset > RULER_HEIGHT else img_height
     if actual_height < img_height:
-        img = img.crop((0, 0, IMAGE_WIDTH, actual_height))
-    img.save(buf, format="JPEG", quality=80)
-    buf.seek(0)
-    return base64.b64encode(buf.read()).decode("ascii")
+        img = img.crop((0, 0, width, actual_height))
+    return base64.b64encode(_encode_image(img, image_format)).decode("ascii")
@@ -8,7 +8,6 @@ Features:
 - Repetition/mistake detection
 """
 
-import json
 import subprocess
 import tempfile
 import uuid
@@ -23,6 +22,7 @@ from src.schemas.timeline import (
     TranscriptionSegment,
     TranscriptionWord,
 )
+from src.services.media_probe import ProbeError, media_probe
 
 # Japanese filler words to detect
 JAPANESE_FILLERS = [
@@ -372,42 +372,17 @@ class TranscriptionService:
                             break
 
     def _get_duration_ms(self, audio_path: str) -> int:
-        """Get audio duration in milliseconds using ffprobe."""
-        cmd = [
-            self.settings.ffprobe_path,
-            "-v",
-            "quiet",
-            "-show_entries",
-            "format=duration",
-            "-of",
-            "default=noprint_wrappers=1:nokey=1",
-            audio_path,
-        ]
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        if result.returncode != 0:
+        """Get audio duration in milliseconds (0 if it cannot be probed)."""
+        try:
+            return media_probe.probe(audio_path).duration_ms or 0
+        except ProbeError:
             return 0
-        return int(float(result.stdout.strip()) * 1000)
 
     def _has_audio_track(self, file_path: str) -> bool:
         """Check if file has an audio track."""
-        cmd = [
-            self.settings.ffprobe_path,
-            "-v",
-            "quiet",
-            "-print_format",
-            "json",
-            "-show_streams",
-            "-select_streams",
-            "a",
-            file_path,
-        ]
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        if result.returncode != 0:
-            return False
         try:
-            data = json.loads(result.stdout)
-            return len(data.get("streams", [])) > 0
-        except json.JSONDecodeError:
+            return media_probe.probe(file_path).has_audio
+        except ProbeError:
             return False
 
     def detect_silences_ffmpeg(self, audio_path: str) -> list[SilenceRegion]:
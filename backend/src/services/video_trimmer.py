@@ -6,13 +6,13 @@ Provides:
 - Video export with codec options
 """
 
-import json
 import subprocess
 import tempfile
 from dataclasses import dataclass
 from pathlib import Path
 
 from src.config import get_settings
+from src.services.media_probe import media_probe
 
 
 @dataclass
@@ -63,45 +63,7 @@ class VideoTrimmer:
 
     def _get_video_info(self, video_path: str) -> dict:
         """Get video information using ffprobe."""
-        result = subprocess.run(
-            [
-                self.settings.ffprobe_path,
-                "-v",
-                "error",
-                "-select_streams",
-                "v:0",
-                "-show_entries",
-                "stream=width,height,duration",
-                "-show_entries",
-                "format=duration",
-                "-of",
-                "json",
-                video_path,
-            ],
-            capture_output=True,
-            text=True,
-            check=True,
-        )
-        data = json.loads(result.stdout)
-
-        width = height = 0
-        duration = 0.0
-
-        if data.get("streams"):
-            stream = data["streams"][0]
-            width = stream.get("width", 0)
-            height = stream.get("height", 0)
-            if "duration" in stream:
-                duration = float(stream["duration"])
-
-        if data.get("format") and "duration" in data["format"]:
-            duration = float(data["format"]["duration"])
-
-        return {
-            "width": width,
-            "height": height,
-            "duration_ms": int(duration * 1000),
-        }
+        return media_probe.probe(video_path).video_info()
 
     def trim(
         self,
@@ -1,15 +1,13 @@
-"""Media file information utilities using FFprobe."""
+"""Media file information utilities using FFprobe.
 
-import json
-import subprocess
-from dataclasses import dataclass
-
-from src.config import get_settings
+All helpers answer from a single memoized ``-show_format -show_streams`` run
+(see :mod:`src.services.media_probe`), so asking for duration, dimensions and
+audio info of the same file costs one ffprobe call.
+"""
 
+from dataclasses import dataclass
 
-def _get_settings():
-    """Get settings lazily to avoid import issues in tests."""
-    return get_settings()
+from src.services.media_probe import ProbeResult, media_probe
 
 
 @dataclass
@@ -28,27 +26,9 @@ class MediaInfo:
     has_audio: bool = False
 
 
-def _run_ffprobe(file_path: str, *args) -> dict:
-    """Run ffprobe and return parsed JSON."""
-    settings = _get_settings()
-    cmd = [
-        settings.ffprobe_path,
-        "-v",
-        "quiet",
-        "-print_format",
-        "json",
-        *args,
-        file_path,
-    ]
-
-    result = subprocess.run(cmd, capture_output=True, text=True)
-    if result.returncode != 0:
-        raise RuntimeError(f"ffprobe failed: {result.stderr}")
-
-    try:
-        return json.loads(result.stdout)
-    except json.JSONDecodeError as e:
-        raise RuntimeError(f"Failed to parse ffprobe output: {e}")
+def _probe(file_path: str) -> ProbeResult:
+    """Probe once via the shared, memoized probe service."""
+    return media_probe.probe(file_path)
 
 
 def get_media_duration(file_path: str) -> int:
@@ -64,13 +44,11 @@ def get_media_duration(file_path: str) -> int:
     Raises:
         RuntimeError: If ffprobe fails or duration not found
     """
-    data = _run_ffprobe(file_path, "-show_format")
-    format_info = data.get("format", {})
-
-    if "duration" not in format_info:
+    duration_ms = _probe(file_path).media_info()["duration_ms"]
+    if duration_ms is None:
         raise RuntimeError(f"Duration not found in: {file_path}")
 
-    return int(float(format_info["duration"]) * 1000)
+    return int(duration_ms)
 
 
 def get_video_dimensions(file_path: str) -> tuple[int, int]:
@@ -86,13 +64,10 @@ def get_video_dimensions(file_path: str) -> tuple[int, int]:
     Raises:
         RuntimeError: If ffprobe fails or video stream not found
     """
-    data = _run_ffprobe(file_path, "-show_streams", "-select_streams", "v")
-
-    streams = data.get("streams", [])
-    if not streams:
+    stream = _probe(file_path).video_stream
+    if stream is None:
         raise RuntimeError(f"No video stream found in: {file_path}")
 
-    stream = streams[0]
     width = stream.get("width")
     height = stream.get("height")
 
@@ -113,8 +88,7 @@ def has_audio_track(file_path: str) -> bool:
         True if audio track exists, False otherwise
     """
     try:
-        data = _run_ffprobe(file_path, "-show_streams", "-select_streams", "a")
-        return len(data.get("streams", [])) > 0
+        return _probe(file_path).has_audio
     except RuntimeError:
         return False
 
@@ -130,15 +104,13 @@ def get_audio_info(file_path: str) -> dict | None:
         Dictionary with codec, sample_rate, channels, or None if no audio
     """
     try:
-        data = _run_ffprobe(file_path, "-show_streams", "-select_streams", "a")
+        stream = _probe(file_path).audio_stream
     except RuntimeError:
         return None
 
-    streams = data.get("streams", [])
-    if not streams:
+    if stream is None:
         return None
 
-    stream = streams[0]
     return {
         "codec": stream.get("codec_name"),
         "sample_rate": int(stream.get("sample_rate", 0)) or None,
@@ -159,47 +131,4 @@ def get_media_info(file_path: str) -> dict:
     Raises:
         RuntimeError: If ffprobe fails
     """
-    data = _run_ffprobe(file_path, "-show_format", "-show_streams")
-
-    result = {
-        "duration_ms": None,
-        "width": None,
-        "height": None,
-        "fps": None,
-        "video_codec": None,
-        "audio_codec": None,
-        "sample_rate": None,
-        "channels": None,
-        "has_video": False,
-        "has_audio": False,
-    }
-
-    # Get format info
-    format_info = data.get("format", {})
-    if "duration" in format_info:
-        result["duration_ms"] = int(float(format_info["duration"]) * 1000)
-
-    # Get stream info
-    for stream in data.get("streams", []):
-        codec_type = stream.get("codec_type")
-
-        if codec_type == "video":
-            result["has_video"] = True
-            result["width"] = stream.get("width")
-            result["height"] = stream.get("height")
-            result["video_codec"] = stream.get("codec_name")
-
-            # Calculate FPS
-            r_frame_rate = stream.get("r_frame_rate", "0/1")
-            if "/" in r_frame_rate:
-                num, den = r_frame_rate.split("/")
-                if int(den) > 0:
-                    result["fps"] = int(int(num) / int(den))
-
-        elif codec_type == "audio":
-            result["has_audio"] = True
-            result["audio_codec"] = stream.get("codec_name")
-            result["sample_rate"] = int(stream.get("sample_rate", 0)) or None
-            result["channels"] = stream.get("channels")
-
-    return result
+    return _probe(file_path).media_info()
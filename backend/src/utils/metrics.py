@@ -0,0 +1,102 @@
+"""In-process metrics registry.
+
+Lightweight counters and timing summaries for hot-path instrumentation
+(cache hit rates, conditional-GET short-circuits, upstream latencies).
+Values are per-instance only; Cloud Run scrapes nothing, so operators read
+them through ``GET /health/metrics`` (gated by ``metrics_token``) or
+structured logs.
+
+Usage:
+    from src.utils.metrics import metrics
+
+    metrics.incr("etag.precondition.hit")
+    metrics.observe("llm.ttfb_ms", 182.0)
+
+Counters named ``<prefix>.hit`` / ``<prefix>.miss`` are summarised into a
+``hit_rates`` entry for ``<prefix>`` in :meth:`MetricsRegistry.snapshot`.
+"""
+
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass
+from typing import Any
+
+
+@dataclass
+class _Summary:
+    """Running count/sum/max for an observed value."""
+
+    count: int = 0
+    total: float = 0.0
+    maximum: float = 0.0
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        if value > self.maximum:
+            self.maximum = value
+
+
+class MetricsRegistry:
+    """Thread-safe counters and summaries keyed by dotted metric names."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._counters: dict[str, int] = {}
+        self._summaries: dict[str, _Summary] = {}
+
+    def incr(self, name: str, value: int = 1) -> None:
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def observe(self, name: str, value: float) -> None:
+        with self._lock:
+            summary = self._summaries.get(name)
+            if summary is None:
+                summary = self._summaries[name] = _Summary()
+            summary.add(value)
+
+    def counter(self, name: str) -> int:
+        with self._lock:
+            return self._counters.get(name, 0)
+
+    def hit_rate(self, prefix: str) -> float | None:
+        """Return hits / (hits + misses) for ``prefix``, or None with no samples."""
+        with self._lock:
+            hits = self._counters.get(f"{prefix}.hit", 0)
+            misses = self._counters.get(f"{prefix}.miss", 0)
+        total = hits + misses
+        return hits / total if total else None
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            counters = dict(self._counters)
+            summaries = {
+                name: {
+                    "count": s.count,
+                    "avg": round(s.total / s.count, 3) if s.count else 0.0,
+                    "max": round(s.maximum, 3),
+                }
+                for name, s in self._summaries.items()
+            }
+
+        hit_rates: dict[str, float] = {}
+        for name in counters:
+            if not name.endswith(".hit"):
+                continue
+            prefix = name[: -len(".hit")]
+            total = counters[name] + counters.get(f"{prefix}.miss", 0)
+            if total:
+                hit_rates[prefix] = round(counters[name] / total, 4)
+
+        return {"counters": counters, "summaries": summaries, "hit_rates": hit_rates}
+
+    def reset(self) -> None:
+        """Clear all values (tests only)."""
+        with self._lock:
+            self._counters.clear()
+            self._summaries.clear()
+
+
+metrics = MetricsRegistry()
@@ -459,6 +459,103 @@ async def test_register_asset_integrity_error_deletes_orphaned_upload(monkeypatc
     assert deleted_keys == ["projects/p/assets/new-upload.png"]
 
 
+@pytest.mark.asyncio
+async def test_register_asset_replace_drops_stale_probe(monkeypatch):
+    """Replacing an asset's file must not leave its old probe for render to seed."""
+    from src.services.media_probe import ASSET_METADATA_KEY, MediaProbe, ProbeResult
+
+    project_id = uuid4()
+    old_probe = ProbeResult(
+        format={"duration": "6.0"},
+        streams=({"codec_type": "audio", "sample_rate": "48000", "channels": 1},),
+    )
+    existing_asset = _make_asset(
+        project_id=project_id,
+        storage_url="audio/narration.mp3",
+        thumbnail_storage_key=None,
+        width=None,
+        height=None,
+        file_size=123,
+        mime_type="audio/mpeg",
+        has_alpha=False,
+        chroma_key_color=None,
+        hash=None,
+        folder_id=None,
+        created_at=datetime.now(UTC),
+        asset_metadata={
+            "transcription": {"status": "done"},
+            ASSET_METADATA_KEY: old_probe.to_metadata("audio/narration.mp3"),
+        },
+    )
+
+    class FakeResultExisting:
+        def scalar_one_or_none(self):
+            return existing_asset
+
+    class FakeDb:
+        async def execute(self, query):
+            return FakeResultExisting()
+
+        async def commit(self):
+            return None
+
+        async def refresh(self, asset):
+            return None
+
+    async def fake_verify_project_access(
+        current_project_id, current_user_id, db, require_role=None
+    ):
+        return None
+
+    storage = MagicMock()
+    storage.generate_download_url.return_value = "https://signed.example.com/v2.mp3"
+
+    async def fake_delete_file(storage_key):
+        return None
+
+    storage.delete_file = fake_delete_file
+    monkeypatch.setattr(assets_api, "verify_project_access", fake_verify_project_access)
+    monkeypatch.setattr(assets_api, "get_storage_service", lambda: storage)
+
+    background_tasks = BackgroundTasks()
+    await assets_api.register_asset(
+        project_id=project_id,
+        asset_data=AssetCreate(
+            name="narration.mp3",
+            type="audio",
+            subtype="narration",
+            storage_key="audio/narration-v2.mp3",
+            storage_url="https://storage.googleapis.com/douga-assets/narration-v2.mp3",
+            file_size=456,
+            mime_type="audio/mpeg",
+            duration_ms=9000,
+        ),
+        current_user=SimpleNamespace(id=uuid4()),
+        db=FakeDb(),
+        background_tasks=background_tasks,
+    )
+
+    assert existing_asset.storage_key == "audio/narration-v2.mp3"
+    assert existing_asset.asset_metadata == {"transcription": {"status": "done"}}
+    probe_tasks = [
+        t for t in background_tasks.tasks if t.func is assets_api._probe_media_metadata_background
+    ]
+    assert [t.args[1] for t in probe_tasks] == ["audio/narration-v2.mp3"]
+
+    # What render does after downloading the replaced file: nothing to seed,
+    # and a stale record that survived elsewhere is rejected by its key.
+    media_probe = MediaProbe()
+    assert (
+        media_probe.seed_from_metadata(
+            existing_asset.asset_metadata, storage_key=existing_asset.storage_key
+        )
+        is False
+    )
+    stale = {ASSET_METADATA_KEY: old_probe.to_metadata("audio/narration.mp3")}
+    assert media_probe.seed_from_metadata(stale, storage_key=existing_asset.storage_key) is False
+    assert media_probe.cached("storage:audio/narration-v2.mp3") is None
+
+
 def test_asset_response_storage_signing_failure_falls_back_to_public_url():
     asset = SimpleNamespace(
         id=uuid4(),
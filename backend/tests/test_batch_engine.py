@@ -0,0 +1,224 @@
+"""Tests for the bulk batch engine (COW journal, single validation, asset prefetch)."""
+
+from __future__ import annotations
+
+import copy
+from typing import Any
+from uuid import uuid4
+
+from src.models.asset import Asset
+from src.models.project import Project
+from src.schemas.ai import BatchClipOperation
+from src.services.ai.batch_engine import TimelineJournal, prepare_operations
+from src.services.ai_service import AIService
+
+
+class _FakeScalars:
+    def __init__(self, items: list[Any]):
+        self._items = items
+
+    def __iter__(self) -> Any:
+        return iter(self._items)
+
+
+class _FakeResult:
+    def __init__(self, items: list[Any]):
+        self._items = items
+
+    def scalars(self) -> _FakeScalars:
+        return _FakeScalars(self._items)
+
+    def scalar_one_or_none(self) -> Any:
+        return self._items[0] if self._items else None
+
+
+class _FakeDb:
+    """Records executed statements; every query returns ``rows``."""
+
+    def __init__(self, rows: list[Any] | None = None):
+        self.rows = rows or []
+        self.statements: list[Any] = []
+        self.flushes = 0
+
+    async def execute(self, stmt: Any) -> _FakeResult:
+        self.statements.append(stmt)
+        return _FakeResult(self.rows)
+
+    async def flush(self) -> None:
+        self.flushes += 1
+
+
+def _clip(clip_id: str, start: int, duration: int, **extra: Any) -> dict[str, Any]:
+    return {
+        "id": clip_id,
+        "start_ms": start,
+        "duration_ms": duration,
+        "transform": {"x": 0, "y": 0, "scale": 1.0},
+        "effects": {"opacity": 1.0},
+        **extra,
+    }
+
+
+def _timeline() -> dict[str, Any]:
+    return {
+        "duration_ms": 6000,
+        "layers": [
+            {
+                "id": "layer-text",
+                "name": "Text",
+                "type": "text",
+                "clips": [
+                    _clip("clip-a", 0, 2000, text_content="A"),
+                    _clip("clip-b", 2000, 2000, text_content="B"),
+                    _clip("clip-c", 4000, 2000, text_content="C"),
+                ],
+            }
+        ],
+        "audio_tracks": [],
+    }
+
+
+def _project(timeline: dict[str, Any]) -> Project:
+    return Project(id=uuid4(), name="p", timeline_data=timeline, duration_ms=6000)
+
+
+class TestTimelineJournal:
+    def test_untouched_clips_are_shared(self) -> None:
+        base = _timeline()
+        journal = TimelineJournal(base)
+        assert journal.working is not base
+        assert journal.working["layers"][0] is not base["layers"][0]
+        assert journal.working["layers"][0]["clips"][0] is base["layers"][0]["clips"][0]
+
+    def test_find_clip_copies_on_write(self) -> None:
+        base = _timeline()
+        snapshot = copy.deepcopy(base)
+        journal = TimelineJournal(base)
+
+        clip, layer, full_id = journal.find_clip("video", "clip-b")
+        assert clip is not None and layer is not None
+        clip["transform"]["x"] = 100
+        layer["clips"].remove(journal.find_clip("video", "clip-c")[0])
+
+        assert base == snapshot
+        assert full_id == "clip-b"
+        assert journal.find_clip("video", "clip-c") == (None, None, None)
+        # Prefix IDs still resolve through the fallback scan
+        assert journal.find_clip("video", "clip-a")[2] == "clip-a"
+        assert journal.find_clip("video", "clip")[2] == "clip-a"
+
+    def test_changes_report_modified_and_deleted(self) -> None:
+        journal = TimelineJournal(_timeline())
+        clip, _, _ = journal.find_clip("video", "clip-b")
+        assert clip is not None
+        clip["start_ms"] = 2500
+        _, _, _ = journal.find_clip("video", "clip-a")  # touched but unchanged
+        victim, layer, _ = journal.find_clip("video", "clip-c")
+        assert layer is not None
+        layer["clips"].remove(victim)
+
+        changes = {(c.entity_id, c.change_type) for c in journal.changes()}
+        assert changes == {("clip-b", "modified"), ("clip-c", "deleted")}
+
+
+class TestPrepareOperations:
+    def test_errors_are_captured_per_operation(self) -> None:
+        prepared = prepare_operations(
+            [
+                BatchClipOperation(operation="move", clip_id="clip-a", data={}),
+                BatchClipOperation(operation="trim", clip_id="clip-a", data={"duration_ms": 10}),
+                BatchClipOperation(operation="update_effects", clip_type="audio", clip_id="x"),
+            ]
+        )
+        assert isinstance(prepared[0].error, ValueError)
+        assert "new_start_ms is required" in str(prepared[0].error)
+        assert prepared[1].error is None and prepared[1].request == 10
+        assert "does not support audio clips" in str(prepared[2].error)
+
+
+class TestExecuteBatchOperations:
+    async def test_applies_operations_with_single_flush_and_diff(self) -> None:
+        base = _timeline()
+        project = _project(base)
+        db = _FakeDb()
+        service = AIService(db)  # type: ignore[arg-type]
+
+        execution = await service.execute_batch_operations(
+            project,
+            [
+                BatchClipOperation(operation="move", clip_id="clip-b", data={"new_start_ms": 2500}),
+                BatchClipOperation(operation="delete", clip_id="clip-c"),
+                BatchClipOperation(
+                    operation="update_layer", layer_id="layer-text", data={"name": "T"}
+                ),
+            ],
+        )
+        result = execution.result
+
+        assert result.success and result.successful_operations == 3
+        assert db.flushes == 1
+        # No asset was referenced, so nothing was fetched
+        assert db.statements == []
+        layer = project.timeline_data["layers"][0]
+        assert [c["id"] for c in layer["clips"]] == ["clip-a", "clip-b"]
+        assert layer["name"] == "T"
+        assert project.duration_ms == 4500
+        assert {(c.entity_id, c.change_type) for c in execution.changes} == {
+            ("clip-b", "modified"),
+            ("clip-c", "deleted"),
+            ("layer-text", "modified"),
+        }
+        assert execution.duration_before_ms == 6000
+        assert execution.duration_after_ms == 4500
+        # The original document object was not mutated
+        assert base == _timeline()
+
+    async def test_rollback_keeps_original_timeline(self) -> None:
+        base = _timeline()
+        project = _project(base)
+        service = AIService(_FakeDb())  # type: ignore[arg-type]
+
+        execution = await service.execute_batch_operations(
+            project,
+            [
+                BatchClipOperation(operation="move", clip_id="clip-b", data={"new_start_ms": 9000}),
+                BatchClipOperation(operation="delete", clip_id="missing"),
+            ],
+            rollback_on_failure=True,
+        )
+        result = execution.result
+
+        assert result.rolled_back and result.stopped_at_index == 1
+        assert result.successful_operations == 0
+        assert project.timeline_data is base
+        assert base == _timeline()
+        assert execution.changes == []
+
+    async def test_assets_prefetched_in_one_query(self) -> None:
+        asset_id = uuid4()
+        project = _project(_timeline())
+        asset = Asset(id=asset_id, project_id=project.id, name="bgm.mp3", type="audio")
+        db = _FakeDb(rows=[asset])
+        service = AIService(db)  # type: ignore[arg-type]
+        project.timeline_data["audio_tracks"].append(
+            {"id": "track-bgm", "name": "BGM", "type": "bgm", "clips": []}
+        )
+
+        ops = [
+            BatchClipOperation(
+                operation="add",
+                clip_type="audio",
+                data={
+                    "track_id": "track-bgm",
+                    "asset_id": str(asset_id),
+                    "start_ms": i * 1000,
+                    "duration_ms": 1000,
+                },
+            )
+            for i in range(5)
+        ]
+        result = (await service.execute_batch_operations(project, ops)).result
+
+        assert result.successful_operations == 5, result.errors
+        assert len(db.statements) == 1
+        assert len(project.timeline_data["audio_tracks"][0]["clips"]) == 5
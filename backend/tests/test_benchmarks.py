@@ -0,0 +1,143 @@
+"""Tests for the offline benchmark harness and synthetic timeline generator."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from benchmarks.harness import (
+    Result,
+    Scenario,
+    compare,
+    load_baselines,
+    measure,
+    save_baselines,
+)
+from benchmarks.scenarios import SIZES, all_scenarios
+from benchmarks.synthetic import (
+    TimelineSpec,
+    asset_map,
+    build_timeline,
+    ffmpeg_available,
+    generate_media,
+)
+from src.schemas.timeline import TimelineData
+
+TINY = TimelineSpec(
+    layers=2,
+    clips_per_layer=5,
+    keyframes_per_clip=3,
+    telops=2,
+    audio_tracks=2,
+    clips_per_audio_track=4,
+    volume_keyframes_per_clip=2,
+)
+
+
+def _result(name: str, median_ms: float, peak_kib: float) -> Result:
+    return Result(name, 3, median_ms, median_ms, median_ms, peak_kib)
+
+
+class TestSyntheticTimeline:
+    def test_matches_the_timeline_schema(self) -> None:
+        timeline = build_timeline(TINY)
+        TimelineData.model_validate(timeline)
+
+        visual = [c for layer in timeline["layers"] for c in layer["clips"]]
+        assert len(visual) == TINY.layers * TINY.clips_per_layer + TINY.telops
+        assert sum(len(t["clips"]) for t in timeline["audio_tracks"]) == 8
+        assert timeline["duration_ms"] == TINY.duration_ms
+        assert all(len(c["keyframes"]) == 3 for c in visual if "asset_id" in c)
+        used = {c["asset_id"] for c in visual if "asset_id" in c}
+        assert used <= set(asset_map(TINY))
+
+    def test_is_deterministic(self) -> None:
+        assert build_timeline(TINY, seed=3) == build_timeline(TINY, seed=3)
+        assert build_timeline(TINY, seed=3) != build_timeline(TINY, seed=4)
+
+    @pytest.mark.skipif(not ffmpeg_available(), reason="FFmpeg not installed")
+    def test_generates_lavfi_media(self, tmp_path: Path) -> None:
+        spec = TimelineSpec(video_assets=1, audio_assets=1)
+        paths = generate_media(spec, str(tmp_path), duration_s=0.5)
+        assert len(paths) == 2
+        assert all(Path(p).stat().st_size > 0 for p in paths.values())
+
+
+class TestHarness:
+    def test_measures_sync_and_async_callables(self) -> None:
+        calls: list[str] = []
+
+        @contextmanager
+        def sync_prepare() -> Iterator[Callable[[], Any]]:
+            yield lambda: calls.append("sync")
+
+        @contextmanager
+        def async_prepare() -> Iterator[Callable[[], Any]]:
+            async def run() -> None:
+                await asyncio.sleep(0)
+                calls.append("async")
+
+            yield run
+
+        sync_result = measure(Scenario("sync", sync_prepare), repeats=3)
+        async_result = measure(Scenario("async", async_prepare), repeats=3)
+
+        # warm-up + timed runs + one traced run
+        assert calls.count("sync") == calls.count("async") == 5
+        assert sync_result.runs == 3 and sync_result.min_ms <= sync_result.median_ms
+        assert async_result.peak_kib >= 0
+
+    def test_compare_flags_only_real_regressions(self) -> None:
+        baselines = {
+            "slow": {"median_ms": 100.0, "peak_kib": 1000.0},
+            "tiny": {"median_ms": 0.5, "peak_kib": 10.0},
+            "fat": {"median_ms": 10.0, "peak_kib": 1000.0},
+        }
+        results = [
+            _result("slow", 140.0, 1000.0),
+            _result("tiny", 1.5, 20.0),  # 3x, but within the noise floor
+            _result("fat", 10.0, 2000.0),
+            _result("new", 5.0, 5.0),
+        ]
+
+        regressions = {(r.name, r.metric) for r in compare(results, baselines, threshold=0.25)}
+        assert regressions == {("slow", "median_ms"), ("fat", "peak_kib")}
+
+    def test_baseline_round_trip_keeps_other_scenarios(self, tmp_path: Path) -> None:
+        path = tmp_path / "baselines.json"
+        save_baselines([_result("a", 1.0, 2.0), _result("b", 3.0, 4.0)], path)
+        save_baselines([_result("a", 5.0, 6.0)], path)
+
+        assert load_baselines(path) == {
+            "a": {"median_ms": 5.0, "peak_kib": 6.0},
+            "b": {"median_ms": 3.0, "peak_kib": 4.0},
+        }
+        assert load_baselines(tmp_path / "missing.json") == {}
+
+
+def test_every_target_has_a_scenario_per_size() -> None:
+    names = {s.name for s in all_scenarios()}
+    for size in SIZES:
+        for target in (
+            "render.composite_command",
+            "render.audio_mix_command",
+            "analysis.timeline",
+            "analysis.composition_validation",
+            "analysis.event_detection",
+            "api.batch_operations",
+        ):
+            assert f"{target}.{size}" in names
+
+
+@pytest.mark.parametrize(
+    "name",
+    ["analysis.timeline.small", "api.batch_operations.small", "render.audio_mix_command.small"],
+)
+def test_small_scenarios_run(name: str) -> None:
+    scenario = next(s for s in all_scenarios() if s.name == name)
+    assert measure(scenario, repeats=1, warmup=0).median_ms > 0
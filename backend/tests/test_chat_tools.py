@@ -13,8 +13,10 @@ import uuid
 from typing import Any
 from unittest.mock import AsyncMock, MagicMock, patch
 
+import httpx
 import pytest
 
+from src.services.ai.http_pool import LLMHttpPool
 from src.services.chat_tools import (
     CHAT_TOOLS,
     AnthropicToolAdapter,
@@ -488,7 +490,7 @@ class TestExecuteToolCallsDispatch:
         Verifies the double-wrapping (tool args -> BatchClipOperation -> {"type": "batch"})
         passes operation fields through to execute_batch_operations intact.
         """
-        from src.schemas.ai import BatchOperationResult
+        from src.schemas.ai import BatchExecution, BatchOperationResult
 
         project = _make_project_mock()
 
@@ -496,11 +498,13 @@ class TestExecuteToolCallsDispatch:
 
         async def fake_execute_batch(_project, batch_ops):
             captured["batch_ops"] = batch_ops
-            return BatchOperationResult(
-                success=True,
-                total_operations=len(batch_ops),
-                successful_operations=len(batch_ops),
-                failed_operations=0,
+            return BatchExecution(
+                result=BatchOperationResult(
+                    success=True,
+                    total_operations=len(batch_ops),
+                    successful_operations=len(batch_ops),
+                    failed_operations=0,
+                )
             )
 
         ai_service_mock.execute_batch_operations = AsyncMock(side_effect=fake_execute_batch)
@@ -584,51 +588,26 @@ class TestBuildChatResponse:
 
 
 # ---------------------------------------------------------------------------
-# Streaming helpers: mock httpx SSE stream
+# Streaming helpers: mock provider SSE stream
 # ---------------------------------------------------------------------------
 
 
-class _FakeStreamResponse:
-    """Mimics an httpx streaming response yielding SSE lines via aiter_lines()."""
+def _make_streaming_client(sse_lines: list[str], status_code: int = 200) -> LLMHttpPool:
+    """Build an ``LLMHttpPool`` whose provider serves the given SSE lines.
 
-    def __init__(self, lines: list[str], status_code: int = 200):
-        self._lines = lines
-        self.status_code = status_code
-
-    async def aiter_lines(self):
-        for line in self._lines:
-            yield line
-
-    async def aread(self) -> bytes:
-        return b"error body"
-
-
-class _FakeStreamCM:
-    """Async context manager returned by client.stream(...)."""
-
-    def __init__(self, response: _FakeStreamResponse):
-        self._response = response
-
-    async def __aenter__(self) -> _FakeStreamResponse:
-        return self._response
-
-    async def __aexit__(self, *args) -> None:
-        return None
-
-
-def _make_streaming_client(sse_lines: list[str], status_code: int = 200):
-    """Build a mock object usable as ``httpx.AsyncClient(...)`` for streaming.
-
-    The returned object supports ``async with`` and exposes ``.stream(...)`` which
-    returns an async context manager yielding the given SSE lines.
+    Patched in place of ``llm_http_pool``; every request is answered locally by
+    an ``httpx.MockTransport``.
     """
-    response = _FakeStreamResponse(sse_lines, status_code=status_code)
+    body = "".join(f"{line}\n" for line in sse_lines).encode()
+
+    def handler(_request: httpx.Request) -> httpx.Response:
+        return httpx.Response(status_code, content=body)
 
-    client = MagicMock()
-    client.__aenter__ = AsyncMock(return_value=client)
-    client.__aexit__ = AsyncMock(return_value=None)
-    client.stream = MagicMock(return_value=_FakeStreamCM(response))
-    return client
+    base = "http://mock-provider"
+    return LLMHttpPool(
+        {"openai": base, "gemini": base, "anthropic": base},
+        transport=httpx.MockTransport(handler),
+    )
 
 
 async def _collect_events(agen) -> list[str]:
@@ -679,7 +658,7 @@ class TestStreamingToolCalls:
         ]
         client = _make_streaming_client(sse_lines)
 
-        with patch("src.services.ai.llm_gateway.httpx.AsyncClient", return_value=client):
+        with patch("src.services.ai.llm_gateway.llm_http_pool", new=client):
             events = await _collect_events(
                 ai_service_mock._stream_openai(project, "msg", [], "sys", "fake-key")
             )
@@ -707,7 +686,7 @@ class TestStreamingToolCalls:
         ]
         client = _make_streaming_client(sse_lines)
 
-        with patch("src.services.ai.llm_gateway.httpx.AsyncClient", return_value=client):
+        with patch("src.services.ai.llm_gateway.llm_http_pool", new=client):
             events = await _collect_events(
                 ai_service_mock._stream_openai(project, "msg", [], "sys", "fake-key")
             )
@@ -757,7 +736,7 @@ class TestStreamingToolCalls:
         ]
         client = _make_streaming_client(sse_lines)
 
-        with patch("src.services.ai.llm_gateway.httpx.AsyncClient", return_value=client):
+        with patch("src.services.ai.llm_gateway.llm_http_pool", new=client):
             events = await _collect_events(
                 ai_service_mock._stream_anthropic(project, "msg", [], "sys", "fake-key")
             )
@@ -784,7 +763,7 @@ class TestStreamingToolCalls:
         ]
         client = _make_streaming_client(sse_lines)
 
-        with patch("src.services.ai.llm_gateway.httpx.AsyncClient", return_value=client):
+        with patch("src.services.ai.llm_gateway.llm_http_pool", new=client):
             events = await _collect_events(
                 ai_service_mock._stream_anthropic(project, "msg", [], "sys", "fake-key")
             )
@@ -817,7 +796,7 @@ class TestStreamingToolCalls:
         ]
         client = _make_streaming_client(sse_lines)
 
-        with patch("src.services.ai.llm_gateway.httpx.AsyncClient", return_value=client):
+        with patch("src.services.ai.llm_gateway.llm_http_pool", new=client):
             events = await _collect_events(
                 ai_service_mock._stream_gemini(project, "msg", [], "sys", "fake-key")
             )
@@ -855,7 +834,7 @@ class TestStreamingToolCalls:
         ]
         client = _make_streaming_client(sse_lines)
 
-        with patch("src.services.ai.llm_gateway.httpx.AsyncClient", return_value=client):
+        with patch("src.services.ai.llm_gateway.llm_http_pool", new=client):
             events = await _collect_events(
                 ai_service_mock._stream_gemini(project, "msg", [], "sys", "fake-key")
             )
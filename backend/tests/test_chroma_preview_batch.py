@@ -0,0 +1,164 @@
+"""Tests for batched chroma key preview rendering (ChromaKeyService.render_preview_frames).
+
+FFmpeg is faked at ``_run_preview_ffmpeg``: decode commands return one raw
+``yuv420p`` frame per selected position, key commands one RGBA frame per
+input frame.
+"""
+
+import base64
+from typing import Any
+
+import pytest
+
+from src.services import chroma_key_service
+from src.services.chroma_key_service import ChromaKeyService
+from src.services.preview_frame_cache import PreviewFrameCache, PreviewFrameKey
+
+WIDTH, HEIGHT = 8, 4
+YUV_FRAME = WIDTH * HEIGHT * 3 // 2
+
+
+class _FakeFFmpeg:
+    def __init__(self) -> None:
+        self.commands: list[list[str]] = []
+        self.short_batches = False
+
+    def run(self, cmd: list[str], stdin: bytes | None) -> bytes:
+        self.commands.append(cmd)
+        if stdin is not None:  # key pass: RGBA frame per yuv420p input frame
+            return b"\xff" * (len(stdin) // YUV_FRAME * WIDTH * HEIGHT * 4)
+        graph = cmd[cmd.index("-filter_complex") + 1]
+        count = graph.count("gte(t,")
+        if self.short_batches and count > 1:
+            count -= 1
+        # Distinct content per decode so cache hits are observable
+        marker = len(self.commands).to_bytes(1, "big")
+        return marker * (YUV_FRAME * count)
+
+    @property
+    def decodes(self) -> list[list[str]]:
+        return [cmd for cmd in self.commands if "pipe:0" not in cmd]
+
+    @property
+    def keys(self) -> list[list[str]]:
+        return [cmd for cmd in self.commands if "pipe:0" in cmd]
+
+
+@pytest.fixture
+def fake_ffmpeg(monkeypatch: pytest.MonkeyPatch) -> _FakeFFmpeg:
+    fake = _FakeFFmpeg()
+    cache = PreviewFrameCache()
+    monkeypatch.setattr(chroma_key_service, "preview_frame_cache", cache)
+
+    async def run(self: ChromaKeyService, cmd: list[str], stdin: bytes | None, stage: str) -> bytes:
+        return fake.run(cmd, stdin)
+
+    monkeypatch.setattr(ChromaKeyService, "_run_preview_ffmpeg", run)
+    return fake
+
+
+async def _preview(times_ms: list[int], **overrides: Any) -> list[dict[str, Any]]:
+    kwargs: dict[str, Any] = {
+        "input_url": "https://storage.example/a.mp4?sig=1",
+        "times_ms": times_ms,
+        "clip_start_ms": 1000,
+        "in_point_ms": 500,
+        "resolution": f"{WIDTH}x{HEIGHT}",
+        "key_color": "#00FF00",
+        "similarity": 0.4,
+        "blend": 0.1,
+        "source_key": "storage:projects/p/a.mp4",
+    }
+    kwargs.update(overrides)
+    return await ChromaKeyService().render_preview_frames(**kwargs)
+
+
+def test_decode_command_reads_close_positions_through_one_input() -> None:
+    service = ChromaKeyService()
+    groups = service._plan_preview_inputs([9000, 1500, 2500, 30000, 2500])
+    cmd = service._build_preview_decode_command("https://x/a.mp4", groups, 640, 360)
+    graph = cmd[cmd.index("-filter_complex") + 1]
+
+    assert groups == [[1500, 2500], [9000], [30000]]
+    assert cmd.count("-i") == 3
+    assert cmd[cmd.index("-ss") : cmd.index("-ss") + 4] == ["-ss", "1.500", "-t", "2.000"]
+    assert (
+        "[0:v]select='gte(t,0.000)*not(gte(prev_pts*TB,0.000))"
+        "+gte(t,1.000)*not(gte(prev_pts*TB,1.000))',scale=640:360,format=yuv420p[pv0]" in graph
+    )
+    assert graph.endswith("[pv0][pv1][pv2]concat=n=3:v=1:a=0[pvout]")
+    assert cmd[-3:] == ["-pix_fmt", "yuv420p", "pipe:1"]
+
+
+async def test_one_decode_and_one_key_process(fake_ffmpeg: _FakeFFmpeg) -> None:
+    frames = await _preview([1000, 2000, 1000, 3000])
+
+    assert len(fake_ffmpeg.decodes) == 1
+    assert len(fake_ffmpeg.keys) == 1
+    key_cmd = fake_ffmpeg.keys[0]
+    assert "chromakey=0x00FF00:0.4:0.1" in " ".join(key_cmd)
+    # Decoded frames are keyed as yuv420p: no RGB before the key filters
+    assert key_cmd[key_cmd.index("-pix_fmt") + 1] == "yuv420p"
+    assert not any("rgb24" in arg for cmd in fake_ffmpeg.commands for arg in cmd)
+    assert [f["time_ms"] for f in frames] == [1000, 2000, 1000, 3000]
+    assert {f["image_format"] for f in frames} == {"jpeg"}
+    assert base64.b64decode(frames[0]["frame_base64"]).startswith(b"\xff\xd8")
+
+
+async def test_rekeying_reuses_decoded_frames(fake_ffmpeg: _FakeFFmpeg) -> None:
+    await _preview([1000, 2000])
+    frames = await _preview([2000, 1000], similarity=0.2, return_transparent_png=True)
+
+    assert len(fake_ffmpeg.decodes) == 1
+    assert len(fake_ffmpeg.keys) == 2
+    assert "chromakey=0x00FF00:0.2:0.1" in " ".join(fake_ffmpeg.keys[1])
+    assert [f["image_format"] for f in frames] == ["png", "png"]
+
+    # A new position decodes only itself
+    await _preview([1000, 4000])
+    assert fake_ffmpeg.decodes[-1].count("-i") == 1
+    assert fake_ffmpeg.decodes[-1][fake_ffmpeg.decodes[-1].index("-ss") + 1] == "3.500"
+
+
+async def test_without_source_key_nothing_is_cached(fake_ffmpeg: _FakeFFmpeg) -> None:
+    await _preview([1000], source_key=None)
+    await _preview([1000], source_key=None)
+
+    assert len(fake_ffmpeg.decodes) == 2
+
+
+async def test_short_batch_falls_back_to_single_positions(fake_ffmpeg: _FakeFFmpeg) -> None:
+    fake_ffmpeg.short_batches = True
+    frames = await _preview([1000, 1010, 1020], skip_chroma_key=True)
+
+    assert len(fake_ffmpeg.decodes) == 4  # short batch + three single positions
+    assert not fake_ffmpeg.keys
+    assert [f["skip_chroma_key"] for f in frames] == [True, True, True]
+
+
+def test_unkeyed_frames_convert_to_rgb_for_encoding() -> None:
+    service = ChromaKeyService()
+    luma = WIDTH * HEIGHT
+
+    def frame(y: int, u: int, v: int) -> bytes:
+        return bytes([y]) * luma + bytes([u]) * (luma // 4) + bytes([v]) * (luma // 4)
+
+    assert service._yuv420p_to_rgb(frame(235, 128, 128), WIDTH, HEIGHT) == b"\xff" * luma * 3
+    assert service._yuv420p_to_rgb(frame(16, 128, 128), WIDTH, HEIGHT) == b"\x00" * luma * 3
+    # Limited-range pure green (BT.601)
+    green = service._yuv420p_to_rgb(frame(145, 54, 34), WIDTH, HEIGHT)
+    r, g, b = green[:3]
+    assert r < 5 and g > 250 and b < 5
+
+
+def test_frame_cache_is_bounded_by_bytes() -> None:
+    cache = PreviewFrameCache(max_bytes=10)
+    first, second = PreviewFrameKey("s", 0, 1, 1), PreviewFrameKey("s", 40, 1, 1)
+    cache.put(first, b"x" * 6)
+    cache.put(second, b"y" * 6)
+
+    assert cache.get(first) is None
+    assert cache.get(second) == b"y" * 6
+    assert cache.size_bytes == 6
+    cache.put(PreviewFrameKey("s", 80, 1, 1), b"z" * 11)  # larger than the cache
+    assert len(cache) == 1
@@ -0,0 +1,239 @@
+"""Tests for the per-version derived view cache (overview/structure/analysis)."""
+
+from __future__ import annotations
+
+from datetime import UTC, datetime
+from types import SimpleNamespace
+from typing import Any
+from uuid import uuid4
+
+from src.services.derived_view_cache import (
+    DerivedViewCache,
+    asset_catalog_token,
+    timeline_version_token,
+    view_key,
+)
+from src.utils.metrics import metrics
+
+
+def _project(**overrides: Any) -> Any:
+    defaults = {
+        "id": uuid4(),
+        "version": 1,
+        "updated_at": datetime(2026, 1, 1, tzinfo=UTC),
+    }
+    return SimpleNamespace(**{**defaults, **overrides})
+
+
+def _sequence(**overrides: Any) -> Any:
+    defaults = {
+        "id": uuid4(),
+        "version": 3,
+        "updated_at": datetime(2026, 1, 2, tzinfo=UTC),
+    }
+    return SimpleNamespace(**{**defaults, **overrides})
+
+
+class TestViewKey:
+    def test_same_version_same_key(self) -> None:
+        project, seq = _project(), _sequence()
+        assert view_key(project, seq, "structure") == view_key(project, seq, "structure")
+
+    def test_version_bump_changes_key(self) -> None:
+        project, seq = _project(), _sequence()
+        before = view_key(project, seq, "structure")
+        seq.version += 1
+        assert view_key(project, seq, "structure") != before
+
+    def test_updated_at_change_changes_key(self) -> None:
+        """V1 writes persist via flag_modified without bumping version."""
+        project, seq = _project(), _sequence()
+        before = view_key(project, seq, "structure")
+        seq.updated_at = datetime(2026, 1, 3, tzinfo=UTC)
+        assert view_key(project, seq, "structure") != before
+
+    def test_params_are_order_insensitive(self) -> None:
+        project = _project()
+        a = view_key(project, None, "events", {"min_gap_ms": 500, "include_audio": True})
+        b = view_key(project, None, "events", {"include_audio": True, "min_gap_ms": 500})
+        c = view_key(project, None, "events", {"include_audio": False, "min_gap_ms": 500})
+        assert a == b
+        assert a != c
+
+    def test_legacy_project_without_sequence(self) -> None:
+        project = _project()
+        assert timeline_version_token(project, None).startswith("1/")
+        assert view_key(project, None, "overview").sequence_id == "-"
+
+
+class TestDerivedViewCache:
+    async def test_computes_once_per_version(self) -> None:
+        cache = DerivedViewCache()
+        project, seq = _project(), _sequence()
+        calls = 0
+
+        def compute() -> dict[str, int]:
+            nonlocal calls
+            calls += 1
+            return {"value": calls}
+
+        first = await cache.get_or_compute(view_key(project, seq, "analysis"), compute)
+        second = await cache.get_or_compute(view_key(project, seq, "analysis"), compute)
+        assert first is second
+        assert calls == 1
+
+        seq.version += 1
+        third = await cache.get_or_compute(view_key(project, seq, "analysis"), compute)
+        assert third == {"value": 2}
+        assert calls == 2
+
+    async def test_accepts_async_compute(self) -> None:
+        cache = DerivedViewCache()
+
+        async def compute() -> str:
+            return "overview"
+
+        key = view_key(_project(), None, "overview")
+        assert await cache.get_or_compute(key, compute) == "overview"
+        assert cache.get(key) == "overview"
+
+    async def test_new_version_evicts_previous(self) -> None:
+        cache = DerivedViewCache()
+        project, seq = _project(), _sequence()
+        await cache.get_or_compute(view_key(project, seq, "structure"), lambda: "v3")
+        seq.version += 1
+        await cache.get_or_compute(view_key(project, seq, "structure"), lambda: "v4")
+        assert len(cache) == 1
+
+    async def test_supersede_after_lru_eviction_and_invalidation(self) -> None:
+        cache = DerivedViewCache(max_entries=2)
+        project, other = _project(), _project()
+        await cache.get_or_compute(view_key(project, None, "overview"), lambda: "v1")
+        await cache.get_or_compute(view_key(other, None, "overview"), lambda: "o")
+        await cache.get_or_compute(view_key(other, None, "structure"), lambda: "s")
+        # project's v1 was LRU-evicted; storing v2 must not resurrect or trip on it.
+        project.version += 1
+        await cache.get_or_compute(view_key(project, None, "overview"), lambda: "v2")
+        assert cache.get(view_key(project, None, "overview")) == "v2"
+        assert len(cache) == 2
+
+        cache.invalidate_project(project.id)
+        project.version += 1
+        await cache.get_or_compute(view_key(project, None, "overview"), lambda: "v3")
+        assert cache.get(view_key(project, None, "overview")) == "v3"
+
+    async def test_invalidate_project_drops_only_that_project(self) -> None:
+        cache = DerivedViewCache()
+        p1, p2 = _project(), _project()
+        await cache.get_or_compute(view_key(p1, None, "overview"), lambda: 1)
+        await cache.get_or_compute(view_key(p1, None, "structure"), lambda: 2)
+        await cache.get_or_compute(view_key(p2, None, "overview"), lambda: 3)
+
+        assert cache.invalidate_project(p1.id) == 2
+        assert cache.get(view_key(p1, None, "overview")) is None
+        assert cache.get(view_key(p2, None, "overview")) == 3
+
+    async def test_lru_bound(self) -> None:
+        cache = DerivedViewCache(max_entries=2)
+        projects = [_project() for _ in range(3)]
+        for i, p in enumerate(projects):
+            await cache.get_or_compute(view_key(p, None, "overview"), lambda i=i: i)
+        assert len(cache) == 2
+        assert cache.get(view_key(projects[0], None, "overview")) is None
+
+    async def test_shared_backend_consulted_after_local_miss(self) -> None:
+        class _DictBackend:
+            def __init__(self) -> None:
+                self.store: dict[str, Any] = {}
+
+            def get(self, key: str) -> Any | None:
+                return self.store.get(key)
+
+            def set(self, key: str, value: Any) -> None:
+                self.store[key] = value
+
+            def invalidate_project(self, project_id: str) -> None:
+                for k in [k for k in self.store if k.startswith(f"{project_id}:")]:
+                    del self.store[k]
+
+        backend = _DictBackend()
+        project = _project()
+        key = view_key(project, None, "overview")
+
+        # Instance A computes and writes through to the shared backend.
+        await DerivedViewCache(backend=backend).get_or_compute(key, lambda: "shared")
+
+        # Instance B has an empty local cache but finds the shared value.
+        def must_not_compute() -> str:
+            raise AssertionError("should be served from the shared backend")
+
+        other = DerivedViewCache(backend=backend)
+        assert await other.get_or_compute(key, must_not_compute) == "shared"
+
+        other.invalidate_project(project.id)
+        assert backend.store == {}
+
+    async def test_hit_miss_metrics(self) -> None:
+        metrics.reset()
+        cache = DerivedViewCache()
+        key = view_key(_project(), None, "overview")
+        await cache.get_or_compute(key, lambda: 1)
+        await cache.get_or_compute(key, lambda: 1)
+        assert metrics.counter("derived_view.miss") == 1
+        assert metrics.counter("derived_view.hit") == 1
+
+
+class _CatalogResult:
+    def __init__(self, row: tuple[Any, ...]) -> None:
+        self._row = row
+
+    def one(self) -> tuple[Any, ...]:
+        return self._row
+
+
+class _CatalogDb:
+    """Answers the asset_catalog_token aggregate with a mutable (count, max) row."""
+
+    def __init__(self, count: int, latest: datetime | None) -> None:
+        self.row: tuple[Any, ...] = (count, latest)
+
+    async def execute(self, _stmt: Any) -> _CatalogResult:
+        return _CatalogResult(self.row)
+
+
+class TestAssetCatalogToken:
+    async def test_rename_serves_new_names_without_invalidation(self) -> None:
+        """A rename (on another instance, or before the writer commits) must not
+        leave an overview with the old asset name in the cache."""
+        cache = DerivedViewCache()
+        project, seq = _project(), _sequence()
+        db = _CatalogDb(2, datetime(2026, 1, 5, tzinfo=UTC))
+        names = {"a1": "intro.mp4"}
+
+        async def overview() -> dict[str, str]:
+            assets = await asset_catalog_token(db, project.id)
+            return await cache.get_or_compute(
+                view_key(project, seq, "overview", assets=assets), lambda: dict(names)
+            )
+
+        assert await overview() == {"a1": "intro.mp4"}
+
+        # Renamed: the timeline is untouched, only assets.updated_at moves.
+        names["a1"] = "opening.mp4"
+        db.row = (2, datetime(2026, 1, 6, tzinfo=UTC))
+        assert await overview() == {"a1": "opening.mp4"}
+
+        # Deleted: the count drops even though no remaining row changed.
+        names.pop("a1")
+        db.row = (1, datetime(2026, 1, 6, tzinfo=UTC))
+        assert await overview() == {}
+        assert len(cache) == 1  # older versions are superseded
+
+    async def test_token_is_stable_without_changes(self) -> None:
+        db = _CatalogDb(0, None)
+        project = _project()
+        token = await asset_catalog_token(db, project.id)
+        assert token == await asset_catalog_token(db, project.id)
+        assert view_key(project, None, "overview", assets=token) != view_key(
+            project, None, "overview"
+        )
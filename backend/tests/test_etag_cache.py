@@ -491,3 +491,173 @@ def test_sequence_list_etag_response_304_when_only_thumbnail_differs() -> None:
     assert resp.status_code == 304, (
         "etag_response must return 304 when only thumbnail_url (volatile) differs."
     )
+
+
+# ---------------------------------------------------------------------------
+# Version-based precondition: 304 before the handler loads the timeline
+# ---------------------------------------------------------------------------
+
+
+class _FakeRowResult:
+    def __init__(self, row: tuple[Any, ...] | None):
+        self._row = row
+
+    def one_or_none(self) -> tuple[Any, ...] | None:
+        return self._row
+
+    def one(self) -> tuple[Any, ...]:
+        # Asset catalog aggregate: an empty catalog once rows are exhausted
+        return self._row if self._row is not None else (0, None)
+
+
+class _FakeDb:
+    """Records executed statements and returns one row per statement.
+
+    The first row answers the project query; later ones answer the sequence
+    lookup and the asset catalog aggregate (``None`` once exhausted — a
+    legacy project without sequences and assets).
+    """
+
+    def __init__(self, row: tuple[Any, ...] | None, *sequence_rows: tuple[Any, ...] | None):
+        self._rows = [row, *sequence_rows]
+        self.statements: list[Any] = []
+
+    async def execute(self, stmt: Any) -> _FakeRowResult:
+        self.statements.append(stmt)
+        return _FakeRowResult(self._rows.pop(0) if self._rows else None)
+
+
+class _FakeUser:
+    def __init__(self) -> None:
+        self.id = uuid4()
+
+
+async def test_precondition_returns_304_without_loading_project() -> None:
+    from src.api._etag import with_asset_catalog
+    from src.api.ai_v1._helpers import _format_project_etag, check_project_not_modified
+    from src.utils.metrics import metrics
+
+    metrics.reset()
+    project_id = uuid4()
+    updated_at = datetime(2026, 3, 1, 12, 0, tzinfo=UTC)
+    etag = with_asset_catalog(_format_project_etag(project_id, updated_at), "0@-")
+    db = _FakeDb((updated_at,))
+
+    resp = await check_project_not_modified(
+        _FakeRequest(headers={"if-none-match": etag}), project_id, _FakeUser(), db
+    )
+
+    assert resp is not None
+    assert resp.status_code == 304
+    assert resp.headers["ETag"] == etag
+    # Only narrow columns are selected, never timeline_data.
+    selected = [c.name for c in db.statements[0].selected_columns]
+    assert selected == ["updated_at"]
+    assert [c.name for c in db.statements[1].selected_columns] == ["id", "version", "updated_at"]
+    assert len(db.statements) == 3  # plus the asset catalog aggregate
+    assert metrics.counter("etag.precondition.hit") == 1
+
+
+async def test_precondition_falls_through_on_stale_etag() -> None:
+    from src.api.ai_v1._helpers import _format_project_etag, check_project_not_modified
+    from src.utils.metrics import metrics
+
+    metrics.reset()
+    project_id = uuid4()
+    stale = _format_project_etag(project_id, datetime(2026, 3, 1, tzinfo=UTC))
+    db = _FakeDb((datetime(2026, 3, 2, tzinfo=UTC),))
+
+    resp = await check_project_not_modified(
+        _FakeRequest(headers={"if-none-match": stale}), project_id, _FakeUser(), db
+    )
+
+    assert resp is None
+    assert metrics.counter("etag.precondition.miss") == 1
+    assert metrics.hit_rate("etag.precondition") == 0.0
+
+
+async def test_precondition_skips_query_without_if_none_match() -> None:
+    from src.api.ai_v1._helpers import check_project_not_modified
+
+    db = _FakeDb((datetime(2026, 3, 1, tzinfo=UTC),))
+    resp = await check_project_not_modified(_FakeRequest(), uuid4(), _FakeUser(), db)
+
+    assert resp is None
+    assert db.statements == []
+
+
+async def test_precondition_defers_to_handler_when_not_accessible() -> None:
+    """No row (missing project or no membership) → handler produces the 404."""
+    from src.api.ai_v1._helpers import check_project_not_modified
+
+    db = _FakeDb(None)
+    resp = await check_project_not_modified(
+        _FakeRequest(headers={"if-none-match": "*"}), uuid4(), _FakeUser(), db
+    )
+    assert resp is None
+
+
+def test_precondition_etag_matches_full_handler_etag() -> None:
+    """The narrow-query ETag must equal compute_project_etag on the loaded row."""
+    from types import SimpleNamespace
+
+    from src.api.ai_v1._helpers import _format_project_etag, compute_project_etag
+
+    project = SimpleNamespace(id=uuid4(), updated_at=datetime(2026, 3, 1, tzinfo=UTC))
+    assert compute_project_etag(project) == _format_project_etag(  # type: ignore[arg-type]
+        project.id, project.updated_at
+    )
+
+
+async def test_precondition_covers_the_default_sequence() -> None:
+    """A sequence save (UI PUT /sequences/{id}) must invalidate the read ETag."""
+    from types import SimpleNamespace
+
+    from src.api.ai_v1._helpers import check_project_not_modified, compute_read_etag
+
+    project = SimpleNamespace(id=uuid4(), updated_at=datetime(2026, 3, 1, tzinfo=UTC))
+    seq = SimpleNamespace(id=uuid4(), version=3, updated_at=datetime(2026, 3, 2, tzinfo=UTC))
+    etag = compute_read_etag(project, seq, "0@-")  # type: ignore[arg-type]
+    request = _FakeRequest(headers={"if-none-match": etag})
+
+    unchanged = _FakeDb((project.updated_at,), (seq.id, seq.version, seq.updated_at))
+    resp = await check_project_not_modified(request, project.id, _FakeUser(), unchanged)
+    assert resp is not None and resp.status_code == 304
+
+    # Saved through the sequence API: project row untouched, sequence bumped
+    saved = _FakeDb((project.updated_at,), (seq.id, 4, datetime(2026, 3, 3, tzinfo=UTC)))
+    assert await check_project_not_modified(request, project.id, _FakeUser(), saved) is None
+
+
+async def test_precondition_covers_the_asset_catalog() -> None:
+    """An asset upload touches neither the project nor the sequence row."""
+    from types import SimpleNamespace
+
+    from src.api.ai_v1._helpers import check_project_not_modified, compute_read_etag
+
+    project = SimpleNamespace(id=uuid4(), updated_at=datetime(2026, 3, 1, tzinfo=UTC))
+    seq = SimpleNamespace(id=uuid4(), version=3, updated_at=datetime(2026, 3, 2, tzinfo=UTC))
+    uploaded = datetime(2026, 3, 4, tzinfo=UTC)
+    etag = compute_read_etag(project, seq, "1@2026-03-02T00:00:00+00:00")  # type: ignore[arg-type]
+    request = _FakeRequest(headers={"if-none-match": etag})
+    rows = ((project.updated_at,), (seq.id, seq.version, seq.updated_at))
+
+    unchanged = _FakeDb(*rows, (1, datetime(2026, 3, 2, tzinfo=UTC)))
+    resp = await check_project_not_modified(request, project.id, _FakeUser(), unchanged)
+    assert resp is not None and resp.status_code == 304
+
+    after_upload = _FakeDb(*rows, (2, uploaded))
+    assert await check_project_not_modified(request, project.id, _FakeUser(), after_upload) is None
+
+
+def test_if_match_compares_the_timeline_part_of_read_etags() -> None:
+    from src.api._etag import timeline_etag, with_asset_catalog
+    from src.middleware.request_context import create_request_context, validate_headers
+
+    timeline = 'W/"p1:2026-03-01T00:00:00+00:00"'
+    request = _FakeRequest(headers={"If-Match": with_asset_catalog(timeline, "2@-")})
+
+    headers = validate_headers(request, create_request_context(), validate_only=True)  # type: ignore[arg-type]
+
+    assert headers["if_match"] == timeline
+    assert timeline_etag(timeline) == timeline
@@ -0,0 +1,201 @@
+"""Tests for queued, coalesced Firestore event publishing."""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+from typing import Any
+from uuid import uuid4
+
+import pytest
+
+from src.services.event_manager import ProjectEventManager
+from src.utils.metrics import metrics
+
+
+class _FakeFirestore:
+    """In-memory stand-in for the Firestore client (documents + batches)."""
+
+    def __init__(self) -> None:
+        self.docs: dict[str, dict[str, Any]] = {}
+        self.commits: list[list[str]] = []
+        self.threads: set[int] = set()
+        self.gate = threading.Event()
+        self.gate.set()
+
+    def collection(self, name: str) -> _FakeFirestore:
+        assert name == "project_updates"
+        return self
+
+    def document(self, doc_id: str) -> str:
+        return doc_id
+
+    def batch(self) -> _FakeBatch:
+        return _FakeBatch(self)
+
+
+class _FakeBatch:
+    def __init__(self, db: _FakeFirestore) -> None:
+        self._db = db
+        self._writes: list[tuple[str, dict[str, Any]]] = []
+
+    def set(self, doc_id: str, data: dict[str, Any], merge: bool = False) -> None:
+        assert merge is True
+        self._writes.append((doc_id, data))
+
+    def commit(self) -> None:
+        self._db.gate.wait(timeout=5)
+        self._db.threads.add(threading.get_ident())
+        for doc_id, data in self._writes:
+            self._db.docs.setdefault(doc_id, {}).update(data)
+        self._db.commits.append([doc_id for doc_id, _ in self._writes])
+
+
+@pytest.fixture(autouse=True)
+def _reset_metrics():
+    metrics.reset()
+    yield
+
+
+def _manager(**kwargs: Any) -> tuple[ProjectEventManager, _FakeFirestore]:
+    manager = ProjectEventManager(**kwargs)
+    db = _FakeFirestore()
+    manager._db = db
+    return manager, db
+
+
+async def test_burst_for_one_project_is_one_write_off_the_loop() -> None:
+    manager, db = _manager(window_s=0.05)
+    manager.start()
+    project_id = uuid4()
+
+    for version in range(1, 51):
+        await manager.publish(project_id, "timeline_updated", {"version": version})
+    await asyncio.sleep(0.2)
+    await manager.stop()
+
+    assert db.commits == [[str(project_id)]]
+    assert db.docs[str(project_id)]["version"] == 50
+    assert threading.get_ident() not in db.threads
+    assert metrics.counter("events.firestore.coalesced") == 49
+
+
+async def test_projects_in_one_window_share_a_batch() -> None:
+    manager, db = _manager(window_s=0.05)
+    manager.start()
+    ids = [uuid4() for _ in range(3)]
+
+    for project_id in ids:
+        await manager.publish(project_id, "timeline_updated")
+    await asyncio.sleep(0.2)
+    await manager.stop()
+
+    assert len(db.commits) == 1
+    assert sorted(db.commits[0]) == sorted(str(i) for i in ids)
+
+
+async def test_stale_version_does_not_replace_newer_one() -> None:
+    manager, db = _manager(window_s=10)
+    manager.start()
+    project_id = uuid4()
+
+    await manager.publish(project_id, "timeline_updated", {"version": 7, "user_id": "a"})
+    await manager.publish(project_id, "timeline_updated", {"version": 6, "user_id": "a"})
+    await manager.stop()
+
+    assert db.docs[str(project_id)]["version"] == 7
+    assert db.docs[str(project_id)]["user_id"] == "a"
+
+
+async def test_unversioned_event_keeps_pending_version() -> None:
+    manager, db = _manager(window_s=10)
+    manager.start()
+    project_id = uuid4()
+
+    await manager.publish(project_id, "timeline_updated", {"version": 7, "user_id": "a"})
+    await manager.publish(project_id, "asset_updated", {"user_id": "a"})
+    await manager.stop()
+
+    doc = db.docs[str(project_id)]
+    assert doc["version"] == 7
+    assert doc["operation"] == "asset_updated"
+    assert doc["user_id"] == "a"
+
+
+async def test_events_from_different_users_clear_attribution() -> None:
+    manager, db = _manager(window_s=10)
+    manager.start()
+    project_id = uuid4()
+    db.docs[str(project_id)] = {"user_id": "earlier", "source": "mcp"}
+
+    await manager.publish(
+        project_id, "timeline_updated", {"version": 3, "user_id": "a", "source": "ui"}
+    )
+    await manager.publish(
+        project_id, "timeline_updated", {"version": 4, "user_id": "b", "source": "mcp"}
+    )
+    await manager.publish(project_id, "timeline_updated", {"version": 5, "user_id": "a"})
+    await manager.stop()
+
+    doc = db.docs[str(project_id)]
+    # Neither user's frontend may treat the merged event as its own change
+    assert doc["user_id"] is None
+    assert doc["source"] is None
+    assert doc["version"] == 5
+
+
+async def test_full_queue_flushes_early() -> None:
+    manager, db = _manager(window_s=10, max_pending=2)
+    manager.start()
+
+    for _ in range(3):
+        await manager.publish(uuid4(), "timeline_updated")
+    await asyncio.sleep(0.05)
+
+    assert len(db.commits) == 1 and len(db.commits[0]) == 2
+    assert len(manager.pending) == 1
+    assert metrics.counter("events.firestore.backpressure") == 1
+    await manager.stop()
+
+
+async def test_full_queue_drops_when_writer_is_stuck() -> None:
+    manager, db = _manager(window_s=0, max_pending=1, backpressure_timeout_s=0.05)
+    manager.start()
+    db.gate.clear()
+
+    await manager.publish(uuid4(), "timeline_updated")
+    await asyncio.sleep(0.05)  # the writer is now blocked committing it
+    await manager.publish(uuid4(), "timeline_updated")
+    await manager.publish(uuid4(), "timeline_updated")
+
+    assert metrics.counter("events.firestore.dropped") == 1
+    db.gate.set()
+    await manager.stop()
+    assert sum(len(c) for c in db.commits) == 2
+
+
+async def test_stop_flushes_pending_events() -> None:
+    manager, db = _manager(window_s=10)
+    manager.start()
+    project_id = uuid4()
+
+    await manager.publish(project_id, "timeline_updated", {"version": 3})
+    assert db.commits == []
+    await manager.stop()
+
+    assert db.docs[str(project_id)]["version"] == 3
+    assert not manager.running
+
+
+async def test_failed_batch_does_not_raise() -> None:
+    manager, db = _manager(window_s=10)
+
+    def boom() -> None:
+        raise RuntimeError("Firestore unavailable")
+
+    db.batch = lambda: type("B", (), {"set": lambda *a, **k: None, "commit": boom})()  # type: ignore[method-assign]
+    manager.start()
+    await manager.publish(uuid4(), "timeline_updated")
+    await manager.stop()
+
+    assert metrics.counter("events.firestore.failed") == 1
@@ -0,0 +1,184 @@
+"""Tests for batched multi-timestamp frame sampling (FrameSampler.sample_frames).
+
+FFmpeg is faked: the stub writes a PNG to every output path of the command,
+so grouping, command building and fallback can be checked without it.
+"""
+
+import subprocess
+from typing import Any
+
+import pytest
+
+from src.services import frame_sampler
+from src.services.frame_sampler import FrameSampler
+
+
+def _timeline() -> dict[str, Any]:
+    return {
+        "duration_ms": 30000,
+        "layers": [
+            {
+                "id": "text",
+                "name": "Text",
+                "type": "text",
+                "clips": [
+                    {
+                        "id": "telop",
+                        "start_ms": 0,
+                        "duration_ms": 4000,
+                        "text_content": "Hello",
+                        "text_style": {"fontSize": 32},
+                    }
+                ],
+            },
+            {
+                "id": "content",
+                "name": "Content",
+                "type": "content",
+                "clips": [
+                    {
+                        "id": "a",
+                        "asset_id": "asset-a",
+                        "start_ms": 0,
+                        "duration_ms": 6000,
+                        "in_point_ms": 1000,
+                    },
+                    {
+                        "id": "b",
+                        "asset_id": "asset-b",
+                        "start_ms": 6000,
+                        "duration_ms": 20000,
+                        "freeze_frame_ms": 2000,
+                    },
+                ],
+            },
+        ],
+    }
+
+
+def _sampler() -> FrameSampler:
+    return FrameSampler(
+        timeline_data=_timeline(),
+        assets={"asset-a": "/media/a.mp4", "asset-b": "/media/b.mp4"},
+        asset_name_map={"asset-a": "a.mp4", "asset-b": "b.mp4"},
+    )
+
+
+class _FakeFFmpeg:
+    """Stands in for ``subprocess.run``: writes a PNG per output, or fails."""
+
+    def __init__(self, fail_batches: bool = False) -> None:
+        self.fail_batches = fail_batches
+        self.commands: list[list[str]] = []
+
+    def __call__(self, cmd: list[str], **kwargs: Any) -> subprocess.CompletedProcess[str]:
+        self.commands.append(cmd)
+        outputs = [arg for arg in cmd if arg.endswith((".png", ".jpg"))]
+        outputs = [path for path in outputs if "smp_overlay_" not in path]
+        if self.fail_batches and len(outputs) > 1:
+            return subprocess.CompletedProcess(cmd, 1, "", "boom")
+        for path in outputs:
+            with open(path, "wb") as f:
+                f.write(b"\x89PNG" + path.encode())
+        return subprocess.CompletedProcess(cmd, 0, "", "")
+
+
+@pytest.fixture
+def fake_ffmpeg(monkeypatch: pytest.MonkeyPatch) -> _FakeFFmpeg:
+    fake = _FakeFFmpeg()
+    monkeypatch.setattr(frame_sampler.subprocess, "run", fake)
+    # Text overlays need fonts; a fixed stand-in PNG keeps the test hermetic
+    monkeypatch.setattr(
+        FrameSampler,
+        "_generate_simple_overlay",
+        lambda self, clip, idx, temp_dir, time_ms=0: f"{temp_dir}/smp_overlay_{idx}.png",
+    )
+    return fake
+
+
+class TestPlanBatches:
+    def test_groups_times_by_visible_clips(self) -> None:
+        batches = _sampler().plan_batches([5000, 1000, 3000, 7000, 29000, 8000])
+
+        # 1000/3000: telop + a; 5000: a only; 7000/8000: b; 29000: nothing
+        assert sorted(batches) == [[1000, 3000], [5000], [7000, 8000], [29000]]
+
+    def test_freeze_zone_shares_the_clip_group(self) -> None:
+        assert _sampler().plan_batches([25000, 27000]) == [[25000, 27000]]
+
+    def test_splits_by_span_and_size(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(frame_sampler, "BATCH_MAX_FRAMES", 3)
+        times = [7000, 8000, 9000, 10000, 17000, 25000]
+
+        assert _sampler().plan_batches(times) == [[7000, 8000, 9000], [10000, 17000], [25000]]
+
+    def test_blank_times_form_one_batch(self) -> None:
+        sampler = FrameSampler(timeline_data={"layers": []}, assets={})
+        assert sampler.plan_batches([100, 50000, 100]) == [[100, 50000]]
+
+
+class TestBatchCommand:
+    def test_opens_each_asset_once_and_splits_per_time(self, tmp_path: Any) -> None:
+        sampler = _sampler()
+        times = [1000, 3000]
+        visible = sampler._visible_clips(1000)
+        cmd, paths, active = sampler._build_batch_command(times, visible, 640, 360, str(tmp_path))
+
+        assert cmd.count("-i") == 1 + len(times)  # asset a + one text overlay per time
+        assert cmd[cmd.index("/media/a.mp4") - 5 : cmd.index("/media/a.mp4")] == [
+            "-ss",
+            "0",
+            "-t",
+            "5.0",
+            "-i",
+        ]
+        graph = cmd[cmd.index("-filter_complex") + 1]
+        assert "[0:v]split=2[smp_src0_0][smp_src0_1]" in graph
+        # Per-time fine offsets: asset position 2s and 4s after a 0s seek
+        assert "[smp_src0_0]trim=start=2.0:end=2.5" in graph
+        assert "[smp_src0_1]trim=start=4.0:end=4.5" in graph
+        assert graph.count("color=c=black:s=1920x1080") == len(times)
+        assert [cmd[i + 1] for i, arg in enumerate(cmd) if arg == "-map"] == [
+            "[smp_out0]",
+            "[smp_out1]",
+        ]
+        assert paths == [f"{tmp_path}/frame_0.png", f"{tmp_path}/frame_1.png"]
+        assert [c["clip_id"] for c in active[3000]] == ["a", "telop"]
+        assert active[3000][0]["progress_percent"] == 50.0
+
+    async def test_single_frame_command_keeps_its_labels(
+        self, fake_ffmpeg: _FakeFFmpeg, tmp_path: Any
+    ) -> None:
+        active = await _sampler()._render_single_frame(
+            1000, 640, 360, str(tmp_path / "frame.png"), str(tmp_path)
+        )
+        cmd = fake_ffmpeg.commands[0]
+        graph = cmd[cmd.index("-filter_complex") + 1]
+
+        assert "[1:v]trim=start=2.0:end=2.5,setpts=PTS-STARTPTS[smp_clip1]" in graph
+        assert "[0:v][smp_clip1]overlay=" in graph
+        assert "[smp1][2:v]overlay=" in graph
+        assert graph.endswith("[smp_shape0]scale=640:360[smp_out]")
+        assert [c["clip_type"] for c in active] == ["video", "text"]
+
+
+class TestSampleFrames:
+    async def test_one_process_per_batch_in_request_order(self, fake_ffmpeg: _FakeFFmpeg) -> None:
+        times = [3000, 29000, 1000, 3000]
+        results = await _sampler().sample_frames(times, resolution="320x180")
+
+        assert len(fake_ffmpeg.commands) == 2  # one batch + one blank frame
+        assert [r["time_ms"] for r in results if r] == times
+        assert results[0] == results[3]
+        assert results[0]["frame_base64"] != results[2]["frame_base64"]
+        assert results[0]["resolution"] == "320x180"
+        assert [c["clip_id"] for c in results[2]["active_clips"]] == ["a", "telop"]
+        assert results[1]["active_clips"] == []
+
+    async def test_failed_batch_falls_back_to_single_frames(self, fake_ffmpeg: _FakeFFmpeg) -> None:
+        fake_ffmpeg.fail_batches = True
+        results = await _sampler().sample_frames([7000, 8000])
+
+        assert len(fake_ffmpeg.commands) == 3  # failed batch + two single frames
+        assert [r["time_ms"] for r in results if r] == [7000, 8000]
+        assert all(r and r["active_clips"][0]["clip_id"] == "b" for r in results)
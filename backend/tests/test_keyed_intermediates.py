@@ -0,0 +1,314 @@
+"""Tests for pre-keyed chroma intermediates (src.services.keyed_intermediates)."""
+
+import asyncio
+import os
+import shutil
+import subprocess
+from types import SimpleNamespace
+from typing import Any
+from uuid import uuid4
+
+import numpy as np
+import pytest
+
+from src.render.pipeline import RenderPipeline
+from src.render.scheduler import RenderDemand, RenderScheduler
+from src.services import keyed_intermediates as keyed_module
+from src.services.chroma_key_service import RENDER_ALPHA_REFINE, ChromaKeyService, RenderKeyParams
+from src.services.keyed_intermediates import (
+    KeyedIntermediateCache,
+    clip_key_params,
+    intermediate_storage_key,
+    keyed_asset_ref,
+    timeline_key_requests,
+)
+
+GREEN = {"enabled": True, "color": "#00ff00", "similarity": 0.4, "blend": 0.1}
+
+
+def _clip(clip_id: str, asset_id: str, **extra: Any) -> dict[str, Any]:
+    return {
+        "id": clip_id,
+        "asset_id": asset_id,
+        "start_ms": 0,
+        "duration_ms": 3000,
+        "in_point_ms": 0,
+        "transform": {"x": 0, "y": 0, "scale": 1.0, "width": 640, "height": 360},
+        "effects": {"chroma_key": GREEN},
+        **extra,
+    }
+
+
+def _timeline(*clips: dict[str, Any]) -> dict[str, Any]:
+    return {
+        "duration_ms": 3000,
+        "layers": [{"id": "avatar", "type": "avatar", "clips": list(clips)}],
+        "audio_tracks": [],
+    }
+
+
+class _FakeStorage:
+    def __init__(self, stored: set[str] | None = None) -> None:
+        self.stored = set(stored or ())
+        self.downloads: list[str] = []
+        self.uploads: list[tuple[str, str]] = []
+
+    async def file_exists(self, key: str) -> bool:
+        return key in self.stored
+
+    async def download_file(self, key: str, path: str) -> None:
+        self.downloads.append(key)
+        with open(path, "wb") as f:
+            f.write(key.encode())
+
+    async def upload_file(self, path: str, key: str, content_type: str) -> None:
+        assert os.path.exists(path)
+        self.uploads.append((key, content_type))
+        self.stored.add(key)
+
+
+@pytest.fixture
+def storage(monkeypatch: pytest.MonkeyPatch) -> _FakeStorage:
+    fake = _FakeStorage()
+    monkeypatch.setattr("src.services.storage_service.get_storage_service", lambda: fake)
+    return fake
+
+
+@pytest.fixture
+def keyed_runs(monkeypatch: pytest.MonkeyPatch) -> list[tuple[str, str]]:
+    runs: list[tuple[str, str]] = []
+
+    async def fake_render(
+        self: Any, input_path: str, output_path: str, params: RenderKeyParams, **_: Any
+    ) -> None:
+        await asyncio.sleep(0)
+        runs.append((os.path.basename(input_path), params.token))
+        with open(output_path, "wb") as f:
+            f.write(b"webm")
+
+    monkeypatch.setattr(keyed_module.ChromaKeyService, "render_keyed_intermediate", fake_render)
+    return runs
+
+
+def test_render_key_filters_match_live_keying() -> None:
+    params = RenderKeyParams.from_effects({"color": "#0000ff", "similarity": 3, "blend": 0.2})
+
+    assert params.token == "0000FF:1.0000:0.2000"
+    assert params.filters()[0] == "chromakey=0x0000FF:1.0:0.2"
+    assert params.filters()[2] == "despill=type=blue"
+
+
+def test_requests_skip_disabled_and_highlighted_clips() -> None:
+    timeline = _timeline(
+        _clip("a", "asset-1"),
+        _clip("b", "asset-1", crop={"left": 0.1}),  # crop shares the intermediate
+        _clip("c", "asset-2", highlights=[{"x": 1, "y": 1}]),
+        _clip("d", "asset-3", effects={}),
+    )
+
+    assert clip_key_params(timeline["layers"][0]["clips"][2]) is None
+    size = "scale=w='max(2,trunc(640*(1.000000)))':h='max(2,trunc(360*(1.000000)))':eval=init"
+    assert timeline_key_requests(timeline) == {
+        ("asset-1", RenderKeyParams("00FF00", 0.4, 0.1, scale=size))
+    }
+
+
+def test_keyframed_clips_are_keyed_live() -> None:
+    clip = _clip("a", "asset-1", keyframes=[{"time_ms": 0, "transform": {"scale": 2.0}}])
+
+    assert clip_key_params(clip) is None
+
+
+@pytest.mark.parametrize(
+    "transform",
+    [
+        {"scale": 1.0, "width": 640, "height": 360},
+        {"scaleX": 0.5, "scaleY": 0.75, "width": 640, "height": 360},
+        {"scale": 0.5},
+        {"scale": 1.0},
+    ],
+)
+def test_intermediates_key_at_the_live_render_size(
+    transform: dict[str, Any], tmp_path: Any
+) -> None:
+    clip = _clip("a", "asset-1", transform={"x": 0, "y": 0, **transform})
+    params = clip_key_params(clip)
+    assert params is not None
+
+    live = RenderPipeline().build_composite_command(
+        _timeline(clip), {"asset-1": "/media/a.mp4"}, 3000, str(tmp_path / "out.mp4")
+    )
+    assert live is not None
+    graph = live[0][live[0].index("-filter_complex") + 1]
+    # The renderer scales, then keys: the intermediate applies the same prefix
+    chain = ",".join(params.filters())
+    if params.scale:
+        assert f"{params.scale},{chain},split" in graph
+    else:
+        assert f"eval=init,{chain}" not in graph and f"{chain},split" in graph
+
+    assets = {"asset-1": "/media/a.mp4", keyed_asset_ref("asset-1", params): "/keyed/a.webm"}
+    prekeyed = RenderPipeline().build_composite_command(
+        _timeline(clip), assets, 3000, str(tmp_path / "out.mp4")
+    )
+    assert prekeyed is not None
+    if params.scale:
+        assert params.scale not in prekeyed[0][prekeyed[0].index("-filter_complex") + 1]
+
+
+def test_storage_key_depends_on_source_and_settings() -> None:
+    green = RenderKeyParams.from_effects(GREEN)
+    blue = RenderKeyParams.from_effects({**GREEN, "color": "#0000FF"})
+    key = intermediate_storage_key("projects/p/a.mp4", green)
+
+    assert key.startswith("keyed-intermediates/") and key.endswith(".webm")
+    assert key == intermediate_storage_key("projects/p/a.mp4", green)
+    assert key != intermediate_storage_key("projects/p/b.mp4", green)
+    assert key != intermediate_storage_key("projects/p/a.mp4", blue)
+
+
+def test_pipeline_overlays_prekeyed_input_without_keying(tmp_path: Any) -> None:
+    clip = _clip("a", "asset-1")
+    params = clip_key_params(clip)
+    assert params is not None
+    assets = {"asset-1": "/media/a.mp4", keyed_asset_ref("asset-1", params): "/keyed/a.webm"}
+
+    result = RenderPipeline().build_composite_command(
+        _timeline(clip), assets, 3000, str(tmp_path / "out.mp4")
+    )
+    assert result is not None
+    cmd = result[0]
+    graph = cmd[cmd.index("-filter_complex") + 1]
+
+    assert "chromakey" not in graph and "alphamerge" not in graph
+    assert cmd[cmd.index("/keyed/a.webm") - 3 : cmd.index("/keyed/a.webm")] == [
+        "-c:v",
+        "libvpx-vp9",
+        "-i",
+    ]
+    assert "/media/a.mp4" not in cmd
+
+    # Without an intermediate the clip is keyed live
+    live = RenderPipeline().build_composite_command(
+        _timeline(clip), {"asset-1": "/media/a.mp4"}, 3000, str(tmp_path / "out.mp4")
+    )
+    assert live is not None
+    assert "chromakey=0x00FF00:0.4:0.1" in live[0][live[0].index("-filter_complex") + 1]
+
+
+async def test_fetch_downloads_hits_and_schedules_misses(
+    storage: _FakeStorage, keyed_runs: list[tuple[str, str]], tmp_path: Any
+) -> None:
+    cache = KeyedIntermediateCache()
+    params = clip_key_params(_clip("a", "asset-1"))
+    assert params is not None
+    stored_key = intermediate_storage_key("p/a.mp4", params)
+    storage.stored.add(stored_key)
+    assets_db = {
+        "asset-1": SimpleNamespace(storage_key="p/a.mp4", type="video"),
+        "asset-2": SimpleNamespace(storage_key="p/b.mp4", type="video"),
+    }
+    timeline = _timeline(_clip("a", "asset-1"), _clip("b", "asset-2"))
+
+    found = await cache.fetch_for_render(timeline, assets_db, str(tmp_path))
+
+    assert list(found) == [keyed_asset_ref("asset-1", params)]
+    assert storage.downloads == [stored_key]
+    await cache.drain()
+    assert keyed_runs == [("source.mp4", params.token)]
+    assert storage.uploads == [(intermediate_storage_key("p/b.mp4", params), "video/webm")]
+
+
+async def test_concurrent_ensure_generates_once(
+    storage: _FakeStorage, keyed_runs: list[tuple[str, str]]
+) -> None:
+    cache = KeyedIntermediateCache()
+    params = RenderKeyParams.from_effects(GREEN)
+
+    keys = await asyncio.gather(*(cache.ensure("p/a.mp4", params) for _ in range(3)))
+
+    assert len(set(keys)) == 1
+    assert len(keyed_runs) == 1
+    # Stored: later calls do not key again
+    await cache.ensure("p/a.mp4", params)
+    assert len(keyed_runs) == 1
+
+
+async def test_generation_waits_for_a_render_slot(
+    storage: _FakeStorage, keyed_runs: list[tuple[str, str]], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    scheduler = RenderScheduler(max_jobs=1)
+    monkeypatch.setattr("src.render.scheduler.get_render_scheduler", lambda: scheduler)
+    render = scheduler.submit(uuid4(), RenderDemand(1, 1.0))
+    cache = KeyedIntermediateCache()
+
+    cache.schedule([("p/a.mp4", RenderKeyParams.from_effects(GREEN))])
+    await asyncio.sleep(0.01)
+    assert keyed_runs == [] and scheduler.waiting == 1
+
+    render.release()
+    await cache.drain()
+    assert len(keyed_runs) == 1
+    assert scheduler.running == 0 and scheduler.waiting == 0
+
+
+async def test_disabled_by_setting(
+    storage: _FakeStorage, monkeypatch: pytest.MonkeyPatch, tmp_path: Any
+) -> None:
+    monkeypatch.setattr(
+        keyed_module, "get_settings", lambda: SimpleNamespace(render_prekeyed_chroma=False)
+    )
+    cache = KeyedIntermediateCache()
+    assets_db = {"asset-1": SimpleNamespace(storage_key="p/a.mp4", type="video")}
+
+    assert await cache.fetch_for_render(_timeline(_clip("a", "asset-1")), assets_db, "x") == {}
+    assert not cache._tasks
+
+
+def _rgba_frames(args: list[str], width: int, height: int) -> np.ndarray:
+    raw = subprocess.run(
+        ["ffmpeg", "-v", "error", *args, "-f", "rawvideo", "-pix_fmt", "rgba", "-"],
+        check=True,
+        capture_output=True,
+    ).stdout
+    return np.frombuffer(raw, dtype=np.uint8).reshape(-1, height, width, 4)
+
+
+@pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="ffmpeg is required")
+async def test_prekeyed_pixels_match_live_keying(tmp_path: Any) -> None:
+    source = str(tmp_path / "source.mp4")
+    subprocess.run(
+        [
+            "ffmpeg",
+            "-v",
+            "error",
+            "-f",
+            "lavfi",
+            "-i",
+            "testsrc2=size=320x240:rate=10:duration=1,"
+            "drawbox=x=80:y=60:w=160:h=120:color=0x00FF00:t=fill",
+            "-pix_fmt",
+            "yuv420p",
+            source,
+        ],
+        check=True,
+    )
+    clip = _clip("a", "asset-1", transform={"x": 0, "y": 0, "scale": 0.5})
+    params = clip_key_params(clip)
+    assert params is not None
+    keyed = str(tmp_path / "keyed.webm")
+    await ChromaKeyService().render_keyed_intermediate(source, keyed, params)
+
+    # The renderer's live chain for this clip (see the render-size test above)
+    live_graph = (
+        f"[0:v]format=yuva420p,{params.scale},{','.join(params.filters())},split[m][a];"
+        f"[a]{RENDER_ALPHA_REFINE}[e];[m][e]alphamerge[out]"
+    )
+    live = _rgba_frames(["-i", source, "-filter_complex", live_graph, "-map", "[out]"], 160, 120)
+    prekeyed = _rgba_frames(["-c:v", "libvpx-vp9", "-i", keyed], 160, 120)
+
+    assert live.shape == prekeyed.shape
+    alpha_error = np.abs(live[..., 3].astype(int) - prekeyed[..., 3].astype(int))
+    # VP9 at crf 18 is near-lossless, not exact
+    assert alpha_error.mean() < 2
+    assert (live[..., 3] < 128).any() and (live[..., 3] > 128).any()
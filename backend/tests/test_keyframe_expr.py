@@ -0,0 +1,96 @@
+"""Tests for keyframe expression compilation (src.render.keyframe_expr)."""
+
+import math
+import random
+
+import pytest
+
+from src.render.keyframe_expr import (
+    choose_strategy,
+    compile_keyframe_expr,
+    estimate_cost,
+    is_constant_expr,
+)
+
+
+def _evaluate(expr: str, t: float) -> float:
+    """Evaluate the FFmpeg ``if``/``lt`` expression subset in Python."""
+    namespace = {
+        "t": t,
+        "_if": lambda cond, a, b: a if cond else b,
+        "lt": lambda a, b: 1.0 if a < b else 0.0,
+    }
+    return float(eval(expr.replace("if(", "_if("), namespace))
+
+
+def _reference(points: list[tuple[float, float]], t: float) -> float:
+    points = sorted(points)
+    if t < points[0][0]:
+        return points[0][1]
+    for (t0, v0), (t1, v1) in zip(points, points[1:], strict=False):
+        if t < t1:
+            return v1 if math.isclose(t0, t1) else v0 + (v1 - v0) * (t - t0) / (t1 - t0)
+    return points[-1][1]
+
+
+def _dense_track(count: int, seed: int = 0) -> list[tuple[float, float]]:
+    rng = random.Random(seed)
+    return [(i * 0.25, rng.uniform(-400, 400)) for i in range(count)]
+
+
+def test_chain_matches_the_original_nested_form() -> None:
+    expr = compile_keyframe_expr([(0.6, 2.0), (0.0, 1.0)], "t", 0.0, strategy="chain")
+
+    assert expr == (
+        "if(lt((t),0.000000),1.000000,"
+        "if(lt((t),0.600000),(1.000000+((2.000000)-(1.000000))*((t)-(0.000000))/(0.600000)),"
+        "2.000000))"
+    )
+
+
+@pytest.mark.parametrize("count", [2, 3, 4, 7, 16, 33])
+@pytest.mark.parametrize("strategy", ["chain", "balanced"])
+def test_strategies_interpolate_identically(count: int, strategy: str) -> None:
+    points = _dense_track(count, seed=count)
+    points.insert(count // 2, points[count // 2])  # duplicate time: a hold step
+    expr = compile_keyframe_expr(points, "t", 0.0, strategy=strategy)  # type: ignore[arg-type]
+
+    for step in range(-4, count * 4 + 8):
+        t = step * 0.0625
+        assert _evaluate(expr, t) == pytest.approx(_reference(points, t), abs=1e-4)
+
+
+def test_balanced_expression_depth_is_logarithmic() -> None:
+    points = _dense_track(64)
+    chain = compile_keyframe_expr(points, "t", 0.0, strategy="chain")
+    balanced = compile_keyframe_expr(points, "t", 0.0, strategy="balanced")
+
+    # Same pieces and comparisons, arranged as a tree instead of a list
+    assert balanced.count("lt(") == chain.count("lt(") == 64
+    window = (0.0, 16.0)
+    assert estimate_cost(points, "chain", window) > 30
+    assert estimate_cost(points, "balanced", window) <= math.ceil(math.log2(65))
+
+
+def test_cost_estimate_picks_the_cheaper_shape() -> None:
+    # Two keyframes: both shapes need two comparisons, keep the chain
+    assert choose_strategy([(0.0, 0.0), (1.0, 1.0)], (0.0, 1.0)) == "chain"
+    # Most of the clip sits before the second of many keyframes: chain is cheaper
+    front_loaded = [(0.0, 0.0), (9.0, 1.0), *[(9.0 + i * 0.1, float(i)) for i in range(1, 8)]]
+    assert choose_strategy(front_loaded, (0.0, 10.0)) == "chain"
+    # Evenly spread dense keyframes: binary search wins
+    assert choose_strategy(_dense_track(12), (0.0, 3.0)) == "balanced"
+    assert compile_keyframe_expr(_dense_track(12), "t", 0.0, window=(0.0, 3.0)).startswith(
+        "if(lt((t),1.250000)"
+    )
+
+
+def test_constant_tracks_compile_to_numbers() -> None:
+    assert compile_keyframe_expr([], "t", 0.5) == "0.500000"
+    assert compile_keyframe_expr([(1.0, 2.0)], "t", 0.5) == "2.000000"
+    constant = compile_keyframe_expr([(0.0, 1.2), (1.0, 1.2), (2.0, 1.2)], "t", 1.0)
+
+    assert constant == "1.200000"
+    assert is_constant_expr(constant)
+    assert not is_constant_expr(compile_keyframe_expr(_dense_track(3), "t", 0.0))
+    assert estimate_cost([(0.0, 1.2), (1.0, 1.2)], "chain") == 0.0
@@ -0,0 +1,145 @@
+"""Tests for the pooled LLM provider HTTP clients."""
+
+from __future__ import annotations
+
+from datetime import UTC, datetime, timedelta
+from email.utils import format_datetime
+
+import httpx
+import pytest
+
+from src.services.ai.http_pool import LLMHttpPool, output_tokens, parse_retry_after
+from src.utils.metrics import metrics
+
+
+class _MockProvider:
+    """Local stand-in for a provider: replays scripted responses in order."""
+
+    def __init__(self, *responses: httpx.Response) -> None:
+        self._responses = list(responses)
+        self.requests: list[httpx.Request] = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        if len(self._responses) > 1:
+            return self._responses.pop(0)
+        return self._responses[0]
+
+
+def _pool(provider: _MockProvider, **kwargs) -> tuple[LLMHttpPool, list[float]]:
+    sleeps: list[float] = []
+
+    async def _sleep(delay: float) -> None:
+        sleeps.append(delay)
+
+    pool = LLMHttpPool(
+        {"openai": "http://mock", "gemini": "http://mock", "anthropic": "http://mock"},
+        transport=httpx.MockTransport(provider),
+        sleep=_sleep,
+        **kwargs,
+    )
+    return pool, sleeps
+
+
+@pytest.fixture(autouse=True)
+def _reset_metrics():
+    metrics.reset()
+    yield
+
+
+class TestRetryAfter:
+    def test_seconds_and_http_date(self) -> None:
+        assert parse_retry_after("3") == 3.0
+        assert parse_retry_after(None) is None
+        assert parse_retry_after("soon") is None
+        future = format_datetime(datetime.now(UTC) + timedelta(seconds=30), usegmt=True)
+        assert 25 <= (parse_retry_after(future) or 0) <= 30
+
+
+class TestLLMHttpPool:
+    async def test_client_is_reused_across_calls(self) -> None:
+        provider = _MockProvider(httpx.Response(200, json={"usage": {"completion_tokens": 5}}))
+        pool, _ = _pool(provider)
+
+        first = pool.client("openai")
+        await pool.post("openai", "/v1/chat/completions", headers={}, json={})
+        await pool.post("openai", "/v1/chat/completions", headers={}, json={})
+        assert pool.client("openai") is first
+        assert pool.client("anthropic") is not first
+        assert len(provider.requests) == 2
+        assert str(provider.requests[0].url) == "http://mock/v1/chat/completions"
+        assert metrics.snapshot()["summaries"]["llm.openai.ttfb_ms"]["count"] == 2
+        await pool.aclose()
+
+    async def test_429_honors_retry_after(self) -> None:
+        provider = _MockProvider(
+            httpx.Response(429, headers={"Retry-After": "2"}),
+            httpx.Response(200, json={}),
+        )
+        pool, sleeps = _pool(provider)
+
+        response = await pool.post("anthropic", "/v1/messages", headers={}, json={})
+        assert response.status_code == 200
+        assert sleeps == [2.0]
+        assert metrics.counter("llm.anthropic.retries") == 1
+
+    async def test_gives_up_after_max_retries(self) -> None:
+        provider = _MockProvider(httpx.Response(503, text="overloaded"))
+        pool, sleeps = _pool(provider, max_retries=2)
+
+        response = await pool.post("gemini", "/m", headers={}, json={}, params={"key": "k"})
+        assert response.status_code == 503
+        assert response.text == "overloaded"
+        assert len(provider.requests) == 3
+        assert len(sleeps) == 2
+        assert provider.requests[0].url.params["key"] == "k"
+
+    async def test_long_retry_after_is_not_waited_for(self) -> None:
+        provider = _MockProvider(httpx.Response(429, headers={"Retry-After": "120"}))
+        pool, sleeps = _pool(provider, retry_max_delay_s=30)
+
+        response = await pool.post("openai", "/v1", headers={}, json={})
+        assert response.status_code == 429
+        assert sleeps == []
+
+    async def test_client_errors_are_not_retried(self) -> None:
+        provider = _MockProvider(httpx.Response(400, json={"error": "bad"}))
+        pool, sleeps = _pool(provider)
+
+        response = await pool.post("openai", "/v1", headers={}, json={})
+        assert response.status_code == 400
+        assert len(provider.requests) == 1
+
+    async def test_connect_error_is_retried(self) -> None:
+        calls = 0
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            nonlocal calls
+            calls += 1
+            if calls == 1:
+                raise httpx.ConnectError("refused", request=request)
+            return httpx.Response(200, json={})
+
+        pool, sleeps = _pool(handler)  # type: ignore[arg-type]
+        response = await pool.post("openai", "/v1", headers={}, json={})
+        assert response.status_code == 200
+        assert len(sleeps) == 1
+
+    async def test_stream_records_tokens_per_second(self) -> None:
+        body = b"data: a\n\ndata: b\n\n"
+        provider = _MockProvider(httpx.Response(200, content=body))
+        pool, _ = _pool(provider)
+
+        async with pool.stream("openai", "/v1", headers={}, json={}) as (response, meter):
+            lines = [line async for line in response.aiter_lines() if line]
+            meter.add(len(lines))
+
+        assert lines == ["data: a", "data: b"]
+        assert metrics.snapshot()["summaries"]["llm.openai.tokens_per_s"]["count"] == 1
+
+
+def test_output_tokens_per_provider() -> None:
+    assert output_tokens("openai", {"usage": {"completion_tokens": 7}}) == 7
+    assert output_tokens("anthropic", {"usage": {"output_tokens": 3}}) == 3
+    assert output_tokens("gemini", {"usageMetadata": {"candidatesTokenCount": 9}}) == 9
+    assert output_tokens("openai", {}) is None
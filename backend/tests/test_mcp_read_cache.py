@@ -0,0 +1,187 @@
+"""Tests for the MCP server's pooled client, ETag read cache and coalescing."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+from datetime import UTC, datetime, timedelta
+from types import SimpleNamespace
+from uuid import uuid4
+
+import httpx
+import pytest
+
+import src.mcp.server as mcp_server_mod
+from src.api.ai_v1._helpers import compute_read_etag
+from src.mcp.read_cache import ReadCache, project_scope
+
+OVERVIEW = "/api/ai/v1/projects/p1/overview"
+
+
+class _Backend:
+    """Stand-in backend: ETag-tagged GETs, 304 on a matching If-None-Match."""
+
+    def __init__(self) -> None:
+        self.requests: list[httpx.Request] = []
+        self.version = 1
+        self.gate: asyncio.Event | None = None
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        if self.gate is not None:
+            await self.gate.wait()
+        if request.method != "GET":
+            self.version += 1
+            return httpx.Response(200, json={"data": {"ok": True}})
+        etag = f'"{request.url.path}-v{self.version}"'
+        if request.headers.get("if-none-match") == etag:
+            return httpx.Response(304, headers={"ETag": etag})
+        body = {"path": request.url.path, "version": self.version}
+        return httpx.Response(200, json=body, headers={"ETag": etag})
+
+
+@pytest.fixture
+async def backend(monkeypatch: pytest.MonkeyPatch):
+    fake = _Backend()
+    client = httpx.AsyncClient(transport=httpx.MockTransport(fake))
+    monkeypatch.setattr(mcp_server_mod, "_http_client", client)
+    monkeypatch.setattr(mcp_server_mod, "_read_cache", ReadCache())
+    yield fake
+    await client.aclose()
+
+
+def test_project_scope() -> None:
+    assert project_scope("/api/ai/v1/projects/abc/clips/c1") == "abc"
+    assert project_scope("/api/ai/project/abc/overview") == "abc"
+    assert project_scope("/api/projects") is None
+
+
+async def test_client_is_shared_across_calls(backend: _Backend) -> None:
+    client = mcp_server_mod._get_http_client()
+    await mcp_server_mod._call_api("GET", OVERVIEW)
+    await mcp_server_mod._call_api_v1_write("POST", "/api/ai/v1/projects/p1/clips", {})
+    assert mcp_server_mod._get_http_client() is client
+    assert len(backend.requests) == 2
+
+
+async def test_repeated_read_revalidates_with_304(backend: _Backend) -> None:
+    first = await mcp_server_mod._call_api("GET", OVERVIEW)
+    second = await mcp_server_mod._call_api("GET", OVERVIEW)
+
+    assert first == second == {"path": OVERVIEW, "version": 1}
+    assert "if-none-match" not in backend.requests[0].headers
+    assert backend.requests[1].headers["if-none-match"] == f'"{OVERVIEW}-v1"'
+    # Callers get independent objects even when the body came from the cache
+    first["version"] = 99
+    assert (await mcp_server_mod._call_api("GET", OVERVIEW))["version"] == 1
+
+
+async def test_write_invalidates_same_project_only(backend: _Backend) -> None:
+    other = "/api/ai/v1/projects/p2/overview"
+    await mcp_server_mod._call_api("GET", OVERVIEW)
+    await mcp_server_mod._call_api("GET", other)
+
+    await mcp_server_mod._call_api_v1_write("PATCH", "/api/ai/v1/projects/p1/clips/c1", {})
+    backend.requests.clear()
+
+    assert (await mcp_server_mod._call_api("GET", OVERVIEW))["version"] == 2
+    await mcp_server_mod._call_api("GET", other)
+    assert "if-none-match" not in backend.requests[0].headers
+    assert "if-none-match" in backend.requests[1].headers
+
+
+async def test_preview_post_does_not_invalidate(backend: _Backend) -> None:
+    await mcp_server_mod._call_api("GET", OVERVIEW)
+    await mcp_server_mod._call_api("POST", "/api/projects/p1/preview/sample-frame", {})
+    assert len(mcp_server_mod._read_cache) == 1
+
+    await mcp_server_mod._call_api("POST", "/api/projects/p1/render")
+    assert len(mcp_server_mod._read_cache) == 0
+
+
+async def test_concurrent_identical_reads_are_coalesced(backend: _Backend) -> None:
+    backend.gate = asyncio.Event()
+    calls = [asyncio.create_task(mcp_server_mod._call_api("GET", OVERVIEW)) for _ in range(5)]
+    await asyncio.sleep(0)
+    backend.gate.set()
+    results = await asyncio.gather(*calls)
+
+    assert len(backend.requests) == 1
+    assert all(r == results[0] for r in results)
+    assert len({id(r) for r in results}) == 5
+
+
+async def test_read_racing_a_write_is_not_cached(backend: _Backend) -> None:
+    backend.gate = asyncio.Event()
+    read = asyncio.create_task(mcp_server_mod._call_api("GET", OVERVIEW))
+    await asyncio.sleep(0)
+    mcp_server_mod._invalidate_reads("/api/ai/v1/projects/p1/clips")
+    backend.gate.set()
+    await read
+
+    assert len(mcp_server_mod._read_cache) == 0
+
+
+async def test_errors_are_converted_and_not_cached(monkeypatch: pytest.MonkeyPatch) -> None:
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(404, content=json.dumps({"detail": "missing"}).encode())
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(mcp_server_mod, "_http_client", client)
+    monkeypatch.setattr(mcp_server_mod, "_read_cache", ReadCache())
+
+    with pytest.raises(RuntimeError, match="404"):
+        await mcp_server_mod._call_api("GET", OVERVIEW)
+    assert len(mcp_server_mod._read_cache) == 0
+    await client.aclose()
+
+
+class _ProjectBackend:
+    """Backend answering reads with the real project ETag of its current state."""
+
+    def __init__(self) -> None:
+        self.project = SimpleNamespace(id=uuid4(), updated_at=datetime(2026, 3, 1, tzinfo=UTC))
+        self.sequence = SimpleNamespace(
+            id=uuid4(), version=1, updated_at=datetime(2026, 3, 1, tzinfo=UTC)
+        )
+        self.assets: list[str] = ["intro.mp4"]
+        self.statuses: list[int] = []
+
+    def edit_sequence_in_ui(self) -> None:
+        # PUT /sequences/{id}: only the sequence row changes
+        self.sequence.version += 1
+        self.sequence.updated_at += timedelta(seconds=1)
+
+    def upload_asset(self, name: str) -> None:
+        self.assets.append(name)
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        catalog = f"{len(self.assets)}@-"
+        etag = compute_read_etag(self.project, self.sequence, catalog)  # type: ignore[arg-type]
+        if request.headers.get("if-none-match") == etag:
+            self.statuses.append(304)
+            return httpx.Response(304, headers={"ETag": etag})
+        self.statuses.append(200)
+        body = {"version": self.sequence.version, "assets": list(self.assets)}
+        return httpx.Response(200, json=body, headers={"ETag": etag})
+
+
+async def test_ui_edits_are_visible_through_the_cache(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Edits made outside the MCP process (no MCP write to invalidate) still
+    change the ETag, so revalidation fetches the new body."""
+    fake = _ProjectBackend()
+    client = httpx.AsyncClient(transport=httpx.MockTransport(fake))
+    monkeypatch.setattr(mcp_server_mod, "_http_client", client)
+    monkeypatch.setattr(mcp_server_mod, "_read_cache", ReadCache())
+
+    assert (await mcp_server_mod._call_api("GET", OVERVIEW))["version"] == 1
+    assert (await mcp_server_mod._call_api("GET", OVERVIEW))["version"] == 1
+
+    fake.edit_sequence_in_ui()
+    assert (await mcp_server_mod._call_api("GET", OVERVIEW))["version"] == 2
+
+    fake.upload_asset("outro.mp4")
+    assets = (await mcp_server_mod._call_api("GET", OVERVIEW))["assets"]
+    assert assets == ["intro.mp4", "outro.mp4"]
+    assert fake.statuses == [200, 304, 200, 200]
+    await client.aclose()
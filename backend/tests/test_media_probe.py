@@ -0,0 +1,182 @@
+"""Tests for the memoized ffprobe metadata service."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+from src.config import get_settings
+from src.services.media_probe import (
+    ASSET_METADATA_KEY,
+    MediaProbe,
+    ProbeError,
+    ProbeResult,
+)
+from src.utils.metrics import metrics
+
+FFPROBE_OUTPUT = {
+    "format": {"duration": "12.5", "format_name": "mov,mp4", "tags": {"title": "x" * 500}},
+    "streams": [
+        {
+            "index": 0,
+            "codec_type": "video",
+            "codec_name": "h264",
+            "width": 1920,
+            "height": 1080,
+            "r_frame_rate": "30000/1001",
+            "disposition": {"default": 1},
+        },
+        {
+            "index": 1,
+            "codec_type": "audio",
+            "codec_name": "aac",
+            "sample_rate": "48000",
+            "channels": 2,
+        },
+    ],
+}
+
+
+@pytest.fixture
+def fake_ffprobe(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """Install a stand-in ffprobe that logs each call and prints FFPROBE_OUTPUT."""
+    calls = tmp_path / "calls.log"
+    script = tmp_path / "ffprobe"
+    script.write_text(
+        f"#!{sys.executable}\n"
+        "import sys\n"
+        f"open({str(calls)!r}, 'a').write(' '.join(sys.argv[1:]) + '\\n')\n"
+        "if sys.argv[-1].endswith('.bad'):\n"
+        "    sys.stderr.write('Invalid data found')\n"
+        "    sys.exit(1)\n"
+        f"print({json.dumps(FFPROBE_OUTPUT)!r})\n"
+    )
+    script.chmod(0o755)
+    monkeypatch.setattr(get_settings(), "ffprobe_path", str(script))
+    metrics.reset()
+    return calls
+
+
+def _calls(log: Path) -> list[str]:
+    return log.read_text().splitlines() if log.exists() else []
+
+
+def _media(tmp_path: Path, name: str = "clip.mp4") -> str:
+    path = tmp_path / name
+    path.write_bytes(b"not really a video")
+    return str(path)
+
+
+class TestProbeResult:
+    def test_answers_every_question_from_one_run(self) -> None:
+        result = ProbeResult.from_ffprobe(FFPROBE_OUTPUT)
+
+        assert result.duration_ms == 12500
+        assert result.has_video and result.has_audio
+        assert result.video_info() == {"width": 1920, "height": 1080, "duration_ms": 12500}
+        info = result.media_info()
+        assert info["fps"] == 29
+        assert info["sample_rate"] == 48000
+        assert info["channels"] == 2
+
+    def test_metadata_round_trip_drops_bulky_fields(self) -> None:
+        result = ProbeResult.from_ffprobe(FFPROBE_OUTPUT)
+        stored = json.loads(json.dumps(result.to_metadata()))
+
+        assert "tags" not in stored["format"]
+        assert "disposition" not in stored["streams"][0]
+        assert ProbeResult.from_metadata(stored) == result
+        assert ProbeResult.from_metadata(None) is None
+        assert ProbeResult.from_metadata({"format": {}}) is None
+
+    def test_duration_falls_back_to_stream(self) -> None:
+        result = ProbeResult.from_ffprobe(
+            {"format": {}, "streams": [{"codec_type": "audio", "duration": "3.2"}]}
+        )
+        assert result.duration_ms == 3200
+
+
+class TestMediaProbe:
+    def test_one_full_probe_per_file(
+        self, fake_ffprobe: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        from src.utils import media_info
+
+        monkeypatch.setattr(media_info, "media_probe", MediaProbe())
+        path = _media(tmp_path)
+
+        assert media_info.get_media_duration(path) == 12500
+        assert media_info.get_video_dimensions(path) == (1920, 1080)
+        assert media_info.has_audio_track(path) is True
+        assert media_info.get_audio_info(path)["codec"] == "aac"  # type: ignore[index]
+
+        calls = _calls(fake_ffprobe)
+        assert len(calls) == 1
+        assert "-show_format -show_streams" in calls[0]
+        assert metrics.counter("media.probe.hit") == 3
+
+    def test_rewritten_file_is_probed_again(self, fake_ffprobe: Path, tmp_path: Path) -> None:
+        probe = MediaProbe()
+        path = _media(tmp_path)
+        probe.probe(path)
+        Path(path).write_bytes(b"a different, longer payload")
+        probe.probe(path)
+        assert len(_calls(fake_ffprobe)) == 2
+
+    def test_content_key_survives_a_new_download(self, fake_ffprobe: Path, tmp_path: Path) -> None:
+        probe = MediaProbe()
+        probe.probe(_media(tmp_path, "first.mp4"), content_key="storage:a.mp4")
+        probe.probe(_media(tmp_path, "second.mp4"), content_key="storage:a.mp4")
+
+        assert len(_calls(fake_ffprobe)) == 1
+        assert probe.cached("storage:a.mp4") is not None
+
+    def test_seed_from_persisted_metadata(self, fake_ffprobe: Path, tmp_path: Path) -> None:
+        probe = MediaProbe()
+        path = _media(tmp_path)
+        result = ProbeResult.from_ffprobe(FFPROBE_OUTPUT)
+        stored = {ASSET_METADATA_KEY: result.to_metadata("a.mp4")}
+
+        assert probe.seed_from_metadata(stored, storage_key="a.mp4", path=path) is True
+        assert probe.seed_from_metadata({"transcription": {}}, storage_key="a.mp4") is False
+        assert probe.probe(path).duration_ms == 12500
+        assert probe.cached("storage:a.mp4") == result
+        assert _calls(fake_ffprobe) == []
+
+    def test_stale_persisted_probe_is_not_seeded(self, tmp_path: Path) -> None:
+        """A probe taken from a replaced file must not describe the new one."""
+        probe = MediaProbe()
+        result = ProbeResult.from_ffprobe(FFPROBE_OUTPUT)
+        stale = {ASSET_METADATA_KEY: result.to_metadata("old.mp4")}
+        legacy = {ASSET_METADATA_KEY: result.to_metadata()}
+
+        assert probe.seed_from_metadata(stale, storage_key="new.mp4") is False
+        assert probe.seed_from_metadata(legacy, storage_key="new.mp4") is False
+        assert probe.cached("storage:new.mp4") is None
+
+    async def test_async_probes_are_coalesced(self, fake_ffprobe: Path, tmp_path: Path) -> None:
+        probe = MediaProbe()
+        path = _media(tmp_path)
+
+        results = await asyncio.gather(*(probe.aprobe(path) for _ in range(4)))
+
+        assert len(_calls(fake_ffprobe)) == 1
+        assert all(r is results[0] for r in results)
+
+    async def test_failures_raise_probe_error(self, fake_ffprobe: Path, tmp_path: Path) -> None:
+        probe = MediaProbe()
+        bad = _media(tmp_path, "broken.bad")
+
+        with pytest.raises(ProbeError, match="Invalid data"):
+            await probe.aprobe(bad)
+        with pytest.raises(ProbeError):
+            probe.probe(os.path.join(tmp_path, "missing.mp4"))
+        # Failures are not cached
+        with pytest.raises(ProbeError):
+            probe.probe(bad)
+        assert len(_calls(fake_ffprobe)) == 2
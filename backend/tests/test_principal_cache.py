@@ -0,0 +1,210 @@
+"""Tests for the verified-principal cache and batched API key last_used_at."""
+
+from __future__ import annotations
+
+from datetime import UTC, datetime, timedelta
+from types import SimpleNamespace
+from typing import Any
+from unittest.mock import AsyncMock, patch
+from uuid import uuid4
+
+import pytest
+from fastapi.security import HTTPAuthorizationCredentials
+
+from src.api import deps
+from src.services.principal_cache import (
+    LastUsedRecorder,
+    PrincipalCache,
+    api_key_last_used,
+    principal_cache,
+)
+from src.utils.metrics import metrics
+
+
+@pytest.fixture(autouse=True)
+def _reset_cache():
+    principal_cache.clear()
+    api_key_last_used._pending.clear()
+    metrics.reset()
+    yield
+    principal_cache.clear()
+    api_key_last_used._pending.clear()
+
+
+class _Result:
+    def __init__(self, value: Any):
+        self._value = value
+
+    def scalar_one_or_none(self) -> Any:
+        return self._value
+
+
+class _FakeDb:
+    """Serves one APIKey row and one User; records every round trip."""
+
+    def __init__(self, api_key: Any, user: Any):
+        self.api_key = api_key
+        self.user = user
+        self.executed: list[str] = []
+        self.gets: list[Any] = []
+
+    async def execute(self, stmt: Any, *_: Any) -> _Result:
+        text = str(stmt)
+        self.executed.append(text)
+        if "FROM api_keys" in text:
+            return _Result(self.api_key)
+        return _Result(self.user)
+
+    async def get(self, _model: Any, pk: Any) -> Any:
+        self.gets.append(pk)
+        return self.user if pk == self.user.id else None
+
+    def add(self, _obj: Any) -> None:
+        pass
+
+    async def flush(self) -> None:
+        pass
+
+
+class TestPrincipalCache:
+    def test_entries_expire_after_ttl(self) -> None:
+        now = [100.0]
+        cache = PrincipalCache(ttl_s=60, clock=lambda: now[0])
+        user_id = uuid4()
+        cache.put("k", user_id)
+
+        assert cache.get("k").user_id == user_id
+        now[0] += 61
+        assert cache.get("k") is None
+        assert metrics.hit_rate("auth.principal_cache") == 0.5
+
+    def test_credential_expiry_caps_lifetime(self) -> None:
+        cache = PrincipalCache(ttl_s=60)
+        cache.put("expired", uuid4(), not_after=datetime.now(UTC) - timedelta(seconds=1))
+        assert cache.get("expired") is None
+
+        now = [0.0]
+        cache = PrincipalCache(ttl_s=60, clock=lambda: now[0])
+        cache.put("soon", uuid4(), not_after=datetime.now(UTC) + timedelta(seconds=5))
+        now[0] = 10
+        assert cache.get("soon") is None
+
+    def test_bounded(self) -> None:
+        cache = PrincipalCache(ttl_s=60, max_entries=2)
+        alice, bob = uuid4(), uuid4()
+        cache.put("a1", alice)
+        cache.put("a2", alice)
+        cache.put("b1", bob)
+        assert len(cache) == 2 and cache.get("a1") is None
+        assert cache.get("b1") is not None
+
+    def test_revoked_key_is_not_recached_by_inflight_request(self) -> None:
+        now = [0.0]
+        cache = PrincipalCache(ttl_s=60, clock=lambda: now[0])
+        user_id = uuid4()
+        cache.put("k", user_id)
+
+        cache.revoke("k")
+        assert cache.get("k") is None
+        # A request that verified the key before the revocation committed
+        cache.put("k", user_id)
+        assert cache.get("k") is None
+
+        now[0] += 61
+        cache.put("k", user_id)
+        assert cache.get("k") is not None
+
+    def test_zero_ttl_disables(self) -> None:
+        cache = PrincipalCache(ttl_s=0)
+        cache.put("k", uuid4())
+        assert len(cache) == 0
+
+
+class TestApiKeyAuthentication:
+    async def test_second_lookup_is_a_single_pk_load(self) -> None:
+        user = SimpleNamespace(id=uuid4())
+        key_row = SimpleNamespace(id=uuid4(), user_id=user.id, expires_at=None)
+        db = _FakeDb(key_row, user)
+
+        first = await deps.get_user_by_api_key(db, "douga_sk_secret")  # type: ignore[arg-type]
+        assert first is user
+        assert len(db.executed) == 2
+        assert not any(s.startswith("UPDATE") for s in db.executed)
+
+        second = await deps.get_user_by_api_key(db, "douga_sk_secret")  # type: ignore[arg-type]
+        assert second is user
+        assert len(db.executed) == 2
+        assert db.gets == [user.id]
+        assert key_row.id in api_key_last_used.pending
+
+    async def test_lightweight_auth_hit_skips_session(self) -> None:
+        user = SimpleNamespace(id=uuid4())
+        key_row = SimpleNamespace(id=uuid4(), user_id=user.id, expires_at=None)
+        await deps.get_user_by_api_key(_FakeDb(key_row, user), "douga_sk_x")  # type: ignore[arg-type]
+
+        with patch.object(deps, "async_session_maker", side_effect=AssertionError("no DB")):
+            principal = await deps.get_authenticated_user(None, x_api_key="douga_sk_x")
+        assert principal.id == user.id
+
+
+class TestFirebaseAuthentication:
+    async def test_verified_token_is_not_reverified(self, monkeypatch) -> None:
+        patched = SimpleNamespace(**vars(deps.settings))
+        patched.dev_mode = False
+        monkeypatch.setattr(deps, "settings", patched)
+        monkeypatch.setattr(deps, "get_firebase_app", lambda: None)
+
+        user = SimpleNamespace(id=uuid4())
+        db = _FakeDb(None, user)
+        creds = HTTPAuthorizationCredentials(scheme="Bearer", credentials="tok")
+        verify = AsyncMock(return_value={"uid": "u1", "email": "a@b.c"})
+
+        with patch("src.api.deps.asyncio.to_thread", new=verify):
+            assert await deps._authenticate_user(db, creds, None) is user  # type: ignore[arg-type]
+            assert await deps._authenticate_user(db, creds, None) is user  # type: ignore[arg-type]
+
+        assert verify.await_count == 1
+        assert db.gets == [user.id]
+
+
+class TestLastUsedRecorder:
+    async def test_flush_writes_one_batched_update(self) -> None:
+        calls: list[tuple[Any, Any]] = []
+
+        class _Session:
+            async def __aenter__(self):
+                return self
+
+            async def __aexit__(self, *_):
+                return None
+
+            async def execute(self, stmt, params):
+                calls.append((stmt, params))
+
+            async def commit(self):
+                pass
+
+        recorder = LastUsedRecorder()
+        k1, k2 = uuid4(), uuid4()
+        for _ in range(50):
+            recorder.mark(k1)
+        recorder.mark(k2)
+
+        assert await recorder.flush(_Session) == 2
+        assert len(calls) == 1
+        assert {p["id"] for p in calls[0][1]} == {k1, k2}
+        assert recorder.pending == {}
+
+    async def test_failed_flush_is_retried(self) -> None:
+        class _Broken:
+            async def __aenter__(self):
+                raise RuntimeError("db down")
+
+            async def __aexit__(self, *_):
+                return None
+
+        recorder = LastUsedRecorder()
+        key = uuid4()
+        recorder.mark(key)
+        assert await recorder.flush(_Broken) == 0
+        assert key in recorder.pending
@@ -0,0 +1,154 @@
+"""Tests for render deduplication (src.render.fingerprint, start_render reuse)."""
+
+from types import SimpleNamespace
+from typing import Any
+from uuid import uuid4
+
+import pytest
+
+from src.api import render as render_api
+from src.render import fingerprint as fingerprint_module
+from src.render.fingerprint import asset_content_identity, render_fingerprint
+from src.render.timeline_normalization import normalize_export_timeline
+
+
+def _timeline() -> dict[str, Any]:
+    return {
+        "duration_ms": 4000,
+        "layers": [
+            {
+                "id": "L1",
+                "type": "content",
+                "clips": [{"id": "c1", "asset_id": "a1", "start_ms": 0, "duration_ms": 4000}],
+            }
+        ],
+        "audio_tracks": [
+            {
+                "id": "A1",
+                "type": "narration",
+                "clips": [{"id": "n1", "asset_id": "a2", "start_ms": 0, "duration_ms": 4000}],
+            }
+        ],
+    }
+
+
+def _fingerprint(
+    timeline: dict[str, Any] | None = None, identities: dict[str, str] | None = None, **kw: Any
+) -> str:
+    normalized, _ = normalize_export_timeline(timeline or _timeline(), 4000)
+    output = {"width": 1920, "height": 1080, "fps": 30, "audio_only": False, **kw}
+    return render_fingerprint(
+        normalized, identities or {"a1": "hash:aaa", "a2": "hash:bbb"}, **output
+    )
+
+
+def test_identical_renders_share_a_fingerprint() -> None:
+    reordered = {"a2": "hash:bbb", "a1": "hash:aaa", "unused": "hash:ccc"}
+
+    assert _fingerprint() == _fingerprint(identities=reordered)
+    assert len(_fingerprint()) == 64
+
+
+def test_fingerprint_covers_content_output_and_range() -> None:
+    base = _fingerprint()
+    moved = _timeline()
+    moved["layers"][0]["clips"][0]["start_ms"] = 500
+    normalized, _ = normalize_export_timeline(_timeline(), 4000, start_ms=1000)
+
+    assert _fingerprint(moved) != base
+    assert _fingerprint(identities={"a1": "hash:zzz", "a2": "hash:bbb"}) != base
+    assert _fingerprint(fps=60) != base
+    assert _fingerprint(audio_only=True) != base
+    assert (
+        render_fingerprint(
+            normalized,
+            {"a1": "hash:aaa", "a2": "hash:bbb"},
+            width=1920,
+            height=1080,
+            fps=30,
+            audio_only=False,
+        )
+        != base
+    )
+
+
+def test_fingerprint_covers_encoder_settings(monkeypatch: pytest.MonkeyPatch) -> None:
+    base = _fingerprint()
+    settings = SimpleNamespace(
+        render_ffmpeg_preset="medium",
+        render_audio_bitrate="320k",
+        render_audio_sample_rate=48000,
+        render_stream_upload=False,
+    )
+    monkeypatch.setattr(fingerprint_module, "get_settings", lambda: settings)
+
+    assert _fingerprint() != base
+
+
+def test_asset_identity_prefers_content_hash() -> None:
+    assert asset_content_identity(SimpleNamespace(hash="abc", storage_key="k")) == "hash:abc"
+    assert asset_content_identity(SimpleNamespace(hash=None, storage_key="p/a.mp4")) == (
+        "storage:p/a.mp4"
+    )
+
+
+class _FakeResult:
+    def __init__(self, item: Any) -> None:
+        self._item = item
+
+    def scalar_one_or_none(self) -> Any:
+        return self._item
+
+
+class _FakeDb:
+    def __init__(self, previous: Any) -> None:
+        self.previous = previous
+        self.added: list[Any] = []
+        self.committed = False
+
+    async def execute(self, _query: Any) -> _FakeResult:
+        return _FakeResult(self.previous)
+
+    def add(self, obj: Any) -> None:
+        self.added.append(obj)
+
+    async def flush(self) -> None:
+        pass
+
+    async def refresh(self, _obj: Any) -> None:
+        pass
+
+    async def commit(self) -> None:
+        self.committed = True
+
+
+class _FakeStorage:
+    def __init__(self, stored: set[str]) -> None:
+        self.stored = stored
+
+    async def file_exists(self, key: str) -> bool:
+        return key in self.stored
+
+    async def get_signed_url(self, key: str, expiration_minutes: int = 60) -> str:
+        return f"https://signed/{key}"
+
+
+async def test_completed_render_is_reused_while_its_output_exists(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    previous = SimpleNamespace(
+        id=uuid4(), output_key="projects/p/renders/j/out.mp4", output_size=42
+    )
+    storage = _FakeStorage({previous.output_key})
+    monkeypatch.setattr(render_api, "get_storage_service", lambda: storage)
+    db = _FakeDb(previous)
+
+    job = await render_api._reuse_completed_render(db, uuid4(), "f" * 64)
+
+    assert job is not None and db.committed
+    assert (job.status, job.progress, job.output_size) == ("completed", 100, 42)
+    assert job.output_key == previous.output_key
+    assert job.output_url == f"https://signed/{previous.output_key}"
+
+    storage.stored.clear()  # output expired / deleted
+    assert await render_api._reuse_completed_render(_FakeDb(previous), uuid4(), "f" * 64) is None
@@ -0,0 +1,181 @@
+"""Tests for push-based render cancellation and coalesced progress writes."""
+
+import asyncio
+from datetime import UTC, datetime
+from unittest.mock import patch
+from uuid import uuid4
+
+import pytest
+
+from src.render.executor import InlineExecutor
+from src.render.job_control import (
+    CoalescedProgressWriter,
+    ProgressFanout,
+    RenderCancellation,
+    StageClock,
+    render_cancellations,
+    stage_name,
+)
+
+
+class TestRenderCancellation:
+    @pytest.mark.asyncio
+    async def test_check_is_rate_limited(self):
+        """The poll callable must not run on every check."""
+        polls: list[int] = []
+
+        async def _poll() -> bool:
+            polls.append(1)
+            return False
+
+        cancellation = RenderCancellation(poll=_poll, poll_interval_s=3600)
+        for _ in range(1000):
+            assert await cancellation.check() is False
+        assert polls == []
+
+        cancellation = RenderCancellation(poll=_poll, poll_interval_s=0)
+        await cancellation.check()
+        assert polls == [1]
+
+    @pytest.mark.asyncio
+    async def test_poll_result_latches(self):
+        async def _poll() -> bool:
+            return True
+
+        cancellation = RenderCancellation(poll=_poll, poll_interval_s=0)
+        assert await cancellation.check() is True
+        assert cancellation.cancelled
+
+    @pytest.mark.asyncio
+    async def test_inline_executor_pushes_signal(self):
+        job_id = uuid4()
+        cancellation = render_cancellations.register(job_id, RenderCancellation())
+        try:
+            InlineExecutor().cancel(job_id, None)
+            assert await cancellation.check() is True
+        finally:
+            render_cancellations.unregister(job_id)
+
+        # Unknown jobs are simply not delivered
+        assert render_cancellations.signal(uuid4()) is False
+
+    @pytest.mark.asyncio
+    async def test_heartbeat_forwards_db_cancellation(self):
+        from src.api.render import _heartbeat_loop
+
+        job_id = uuid4()
+        stop_event = asyncio.Event()
+
+        class FakeJob:
+            status = "cancelled"
+            updated_at = datetime(2020, 1, 1, tzinfo=UTC)
+
+        class FakeResult:
+            def scalar_one_or_none(self):
+                return FakeJob()
+
+        class FakeDB:
+            async def execute(self, _stmt):
+                return FakeResult()
+
+            async def commit(self):
+                pass
+
+            async def __aenter__(self):
+                return self
+
+            async def __aexit__(self, *_):
+                pass
+
+        cancellation = render_cancellations.register(job_id, RenderCancellation())
+        try:
+            with patch("src.api.render.async_session_maker", return_value=FakeDB()):
+                task = asyncio.create_task(_heartbeat_loop(job_id, stop_event))
+                await asyncio.sleep(0.05)
+                stop_event.set()
+                await asyncio.wait_for(task, timeout=2)
+            assert cancellation.cancelled
+        finally:
+            render_cancellations.unregister(job_id)
+
+
+class TestCoalescedProgressWriter:
+    @pytest.mark.asyncio
+    async def test_burst_is_folded_into_latest_value(self):
+        writes: list[tuple[int, str]] = []
+
+        async def _write(progress: int, stage: str) -> None:
+            writes.append((progress, stage))
+
+        writer = CoalescedProgressWriter(_write, min_interval_s=0.05)
+        writer.submit(10, "step 10")
+        await asyncio.sleep(0)
+        for pct in range(11, 60):
+            writer.submit(pct, f"step {pct}")
+        await asyncio.sleep(0.2)
+
+        assert writes == [(10, "step 10"), (59, "step 59")]
+        await writer.close()
+
+    @pytest.mark.asyncio
+    async def test_close_drops_pending_update(self):
+        writes: list[int] = []
+
+        async def _write(progress: int, stage: str) -> None:
+            writes.append(progress)
+
+        writer = CoalescedProgressWriter(_write, min_interval_s=60)
+        writer.submit(10, "a")
+        await asyncio.sleep(0)
+        writer.submit(50, "b")
+        await asyncio.wait_for(writer.close(), timeout=1)
+        writer.submit(70, "c")
+        await asyncio.sleep(0)
+
+        assert writes == [10]
+
+
+class TestProgressFanout:
+    def test_stage_name_strips_counters(self):
+        assert stage_name("Downloading assets (3/12)") == "Downloading assets"
+        assert stage_name("Compositing video (40%)") == "Compositing video"
+        assert stage_name("Chunk 2/5: Mixing audio") == "Mixing audio"
+        assert stage_name("Complete") == "Complete"
+
+    def test_stage_clock_accumulates_per_stage(self):
+        now = [100.0]
+        with patch("src.render.job_control.time.monotonic", lambda: now[0]):
+            clock = StageClock()
+            clock.mark("Downloading assets (1/2)")
+            now[0] += 1.0
+            clock.mark("Downloading assets (2/2)")
+            now[0] += 0.5
+            clock.mark("Rendering video")
+            now[0] += 2.0
+
+            assert clock.timings() == {"Downloading assets": 1500, "Rendering video": 2000}
+            assert clock.elapsed_ms == 3500
+
+    @pytest.mark.asyncio
+    async def test_each_writer_keeps_its_own_rate(self):
+        slow: list[int] = []
+        fast: list[int] = []
+
+        async def _slow(progress: int, stage: str) -> None:
+            slow.append(progress)
+
+        async def _fast(progress: int, stage: str) -> None:
+            fast.append(progress)
+
+        fanout = ProgressFanout(
+            CoalescedProgressWriter(_slow, min_interval_s=60),
+            CoalescedProgressWriter(_fast, min_interval_s=0.01),
+        )
+        for pct in (10, 20, 30):
+            fanout.submit(pct, "Rendering video")
+            await asyncio.sleep(0.05)
+        await fanout.close()
+
+        assert slow == [10]
+        assert fast == [10, 20, 30]
+        assert list(fanout.clock.timings()) == ["Rendering video"]
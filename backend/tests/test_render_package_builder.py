@@ -1,8 +1,11 @@
+import contextlib
 import copy
+import io
 import json
 import shutil
 import subprocess
 import zipfile
+from collections.abc import Iterator
 from pathlib import Path
 
 import pytest
@@ -192,6 +195,101 @@ async def test_chunked_render_package_composite_script_omits_server_thread_cap(
         builder.cleanup()
 
 
+class _UploadStream:
+    """Append-only stand-in for a chunked upload (no tell/seek)."""
+
+    def __init__(self) -> None:
+        self._buffer = io.BytesIO()
+
+    def write(self, data: bytes) -> int:
+        return self._buffer.write(data)
+
+    def flush(self) -> None:
+        pass
+
+    def getvalue(self) -> bytes:
+        return self._buffer.getvalue()
+
+
+class _StreamingStorage:
+    def __init__(self) -> None:
+        self.objects: dict[str, tuple[bytes, str]] = {}
+
+    @contextlib.contextmanager
+    def open_write_stream(self, storage_key: str, content_type: str) -> Iterator[_UploadStream]:
+        stream = _UploadStream()
+        yield stream
+        self.objects[storage_key] = (stream.getvalue(), content_type)
+
+
+@pytest.mark.asyncio
+async def test_render_package_streams_stored_media_into_storage(temp_output_dir: Path) -> None:
+    image_path = temp_output_dir / "background.png"
+    Image.new("RGBA", (320, 180), (24, 78, 164, 255)).save(image_path)
+    storage = _StreamingStorage()
+
+    builder = RenderPackageBuilder(
+        project_id="proj-streaming",
+        project_name="Streaming",
+        width=320,
+        height=180,
+        fps=30,
+    )
+    try:
+        size = await builder.build_and_upload(
+            _minimal_image_timeline(),
+            {"asset-image-1": str(image_path)},
+            {"asset-image-1": "background.png"},
+            storage=storage,  # type: ignore[arg-type]
+            storage_key="projects/p/packages/render_package.zip",
+        )
+
+        # Assets are linked into the package, not copied
+        linked = Path(builder.package_dir) / "assets" / "background.png"
+        assert linked.stat().st_ino == image_path.stat().st_ino
+        assert not list(Path(builder.work_dir).glob("*.zip"))
+
+        data, content_type = storage.objects["projects/p/packages/render_package.zip"]
+        assert (len(data), content_type) == (size, "application/zip")
+        with zipfile.ZipFile(io.BytesIO(data)) as archive:
+            infos = {info.filename: info for info in archive.infolist()}
+            asset = infos["render_package_Streaming/assets/background.png"]
+            manifest = infos["render_package_Streaming/manifest.json"]
+            render_sh = infos["render_package_Streaming/render.sh"]
+
+            assert asset.compress_type == zipfile.ZIP_STORED
+            assert archive.read(asset) == image_path.read_bytes()
+            assert manifest.compress_type == zipfile.ZIP_DEFLATED
+            assert (render_sh.external_attr >> 16) & 0o111
+    finally:
+        builder.cleanup()
+
+
+def test_render_package_references_assets_it_cannot_link(
+    temp_output_dir: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    asset_path = temp_output_dir / "clip.mp4"
+    asset_path.write_bytes(b"\x00\x00\x00\x18ftypmp42" * 64)
+
+    def cross_device(src: str, dst: str) -> None:
+        raise OSError("cross-device link")
+
+    monkeypatch.setattr(package_builder_module.os, "link", cross_device)
+    builder = RenderPackageBuilder(project_id="proj-reference", project_name="Ref")
+    try:
+        builder._link_assets({"asset-1": str(asset_path)}, {"asset-1": "clip.mp4"})
+        stream = _UploadStream()
+        builder.write_zip(stream)  # type: ignore[arg-type]
+
+        assert not (Path(builder.assets_dir) / "clip.mp4").exists()
+        with zipfile.ZipFile(io.BytesIO(stream.getvalue())) as archive:
+            info = archive.getinfo("render_package_Ref/assets/clip.mp4")
+            assert info.compress_type == zipfile.ZIP_STORED
+            assert archive.read(info) == asset_path.read_bytes()
+    finally:
+        builder.cleanup()
+
+
 @pytest.mark.asyncio
 @pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="ffmpeg is required")
 async def test_render_package_output_matches_server_export(temp_output_dir: Path) -> None:
@@ -389,7 +389,10 @@ class TestRenderPipeline:
         assert "rotate='(" in filter_str
         assert "0.600000" in filter_str
         assert "1.200000" in filter_str
-        assert "alpha(X,Y)*((if(lt(((T-0.500000)),0.000000),0.900000" in filter_str
+        # Three keyframes across the clip compile to a binary search whose
+        # root splits at the middle keyframe
+        assert "alpha(X,Y)*((if(lt(((T-0.500000)),0.600000),if(lt(((T-0.500000))," in filter_str
+        assert "0.900000" in filter_str
 
     def test_generate_shape_image_prefers_shape_dimensions_like_browser_preview(
         self, temp_output_dir
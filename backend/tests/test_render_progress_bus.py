@@ -0,0 +1,182 @@
+"""Tests for render progress push (progress bus, notifier and WebSocket route)."""
+
+from __future__ import annotations
+
+import json
+from types import SimpleNamespace
+from typing import Any
+from unittest.mock import AsyncMock, patch
+from uuid import uuid4
+
+import pytest
+from fastapi import FastAPI, HTTPException, WebSocket
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+from src.api import render as render_api
+from src.api.websocket import RenderProgressNotifier, WebSocketManager
+from src.render.progress_bus import LocalProgressBus, PostgresProgressBus, _asyncpg_dsn
+from src.utils.metrics import metrics
+
+
+@pytest.fixture(autouse=True)
+def _reset_metrics():
+    metrics.reset()
+    yield
+
+
+class TestLocalBus:
+    async def test_notifier_publishes_through_the_bus(self) -> None:
+        manager = WebSocketManager()
+        websocket = AsyncMock(spec=WebSocket)
+        await manager.connect(websocket, "job1")
+        notifier = RenderProgressNotifier(manager, bus=LocalProgressBus())
+        await notifier.start()
+
+        await notifier.notify_progress(
+            "job1", 42, "processing", "Rendering video", 1200, {"Rendering video": 800}
+        )
+        await notifier.notify_complete("job1", "https://example.com/out.mp4", 5000, 10)
+
+        sent = [call.args[0] for call in websocket.send_json.await_args_list]
+        assert [m["type"] for m in sent] == ["progress", "complete"]
+        assert sent[0]["stage_timings"] == {"Rendering video": 800}
+        assert metrics.counter("render.progress.published") == 2
+        await notifier.stop()
+
+    async def test_nothing_is_delivered_before_start(self) -> None:
+        deliver = AsyncMock()
+        bus = LocalProgressBus()
+        await bus.publish("job1", {"type": "progress"})
+        await bus.start(deliver)
+        await bus.stop()
+        await bus.publish("job1", {"type": "progress"})
+
+        deliver.assert_not_awaited()
+
+    async def test_notifier_never_raises(self) -> None:
+        bus = LocalProgressBus()
+        await bus.start(AsyncMock(side_effect=RuntimeError("boom")))
+        notifier = RenderProgressNotifier(WebSocketManager(), bus=bus)
+
+        await notifier.notify_error("job1", "failed")
+
+
+class TestPostgresBus:
+    def test_dsn_drops_the_sqlalchemy_driver(self) -> None:
+        assert _asyncpg_dsn("postgresql+asyncpg://u:p@db:5432/douga") == (
+            "postgresql://u:p@db:5432/douga"
+        )
+
+    async def test_notification_is_delivered(self) -> None:
+        delivered: list[tuple[str, dict[str, Any]]] = []
+
+        async def deliver(job_id: str, message: dict[str, Any]) -> None:
+            delivered.append((job_id, message))
+
+        bus = PostgresProgressBus("postgresql://unused", "render_progress")
+        bus._deliver = deliver
+        payload = json.dumps({"job_id": "job1", "message": {"type": "progress", "percent": 5}})
+        bus._on_notify(None, 1, "render_progress", payload)
+        bus._on_notify(None, 1, "render_progress", "not json")
+        await next(iter(bus._deliveries))
+
+        assert delivered == [("job1", {"type": "progress", "percent": 5})]
+
+    async def test_oversized_message_is_dropped_without_connecting(self) -> None:
+        bus = PostgresProgressBus("postgresql://unused", "render_progress")
+        with patch("src.render.progress_bus.asyncpg.connect") as connect:
+            await bus.publish("job1", {"type": "error", "error_message": "x" * 10_000})
+
+        connect.assert_not_called()
+        assert metrics.counter("render.progress.dropped") == 1
+
+
+class _FakeSession:
+    def __init__(self, job: Any) -> None:
+        self.job = job
+
+    async def __aenter__(self) -> _FakeSession:
+        return self
+
+    async def __aexit__(self, *exc: object) -> None:
+        return None
+
+    async def get(self, model: Any, key: Any) -> Any:
+        return self.job if self.job is not None and key == self.job.id else None
+
+    async def refresh(self, obj: Any) -> None:
+        return None
+
+    async def commit(self) -> None:
+        return None
+
+
+def _job(project_id: Any, status: str = "processing") -> SimpleNamespace:
+    return SimpleNamespace(
+        id=uuid4(),
+        project_id=project_id,
+        status=status,
+        progress=35,
+        current_stage="Rendering video",
+        output_url="https://example.com/out.mp4",
+        output_size=10,
+        error_message=None,
+    )
+
+
+class TestProgressWebSocket:
+    @pytest.fixture
+    def client(self) -> TestClient:
+        app = FastAPI()
+        app.include_router(render_api.router, prefix="/api")
+        return TestClient(app)
+
+    def _patch(self, job: Any, *, authorized: bool = True):
+        auth = AsyncMock(return_value=SimpleNamespace(id=uuid4()))
+        if not authorized:
+            auth.side_effect = HTTPException(status_code=401, detail="no")
+        return (
+            patch.object(render_api, "async_session_maker", lambda: _FakeSession(job)),
+            patch.object(render_api, "_authenticate_user", auth),
+            patch.object(render_api, "get_accessible_project", AsyncMock()),
+        )
+
+    def test_snapshot_then_live_messages(self, client: TestClient) -> None:
+        project_id = uuid4()
+        job = _job(project_id)
+        p1, p2, p3 = self._patch(job)
+        url = f"/api/projects/{project_id}/render/{job.id}/ws?token=t"
+        with p1, p2, p3, client.websocket_connect(url) as ws:
+            snapshot = ws.receive_json()
+            assert snapshot["type"] == "progress"
+            assert snapshot["percent"] == 35
+            assert render_api.websocket_manager.get_connection_count(str(job.id)) == 1
+
+    def test_finished_job_sends_result_and_closes(self, client: TestClient) -> None:
+        project_id = uuid4()
+        job = _job(project_id, status="completed")
+        p1, p2, p3 = self._patch(job)
+        url = f"/api/projects/{project_id}/render/{job.id}/ws?token=t"
+        with p1, p2, p3, client.websocket_connect(url) as ws:
+            assert ws.receive_json()["type"] == "complete"
+            with pytest.raises(WebSocketDisconnect):
+                ws.receive_json()
+
+    def test_unauthenticated_client_is_rejected(self, client: TestClient) -> None:
+        project_id = uuid4()
+        job = _job(project_id)
+        p1, p2, p3 = self._patch(job, authorized=False)
+        url = f"/api/projects/{project_id}/render/{job.id}/ws"
+        with p1, p2, p3, pytest.raises(WebSocketDisconnect) as exc:
+            with client.websocket_connect(url) as ws:
+                ws.receive_json()
+        assert exc.value.code == 1008
+
+    def test_job_of_another_project_is_rejected(self, client: TestClient) -> None:
+        job = _job(uuid4())
+        p1, p2, p3 = self._patch(job)
+        url = f"/api/projects/{uuid4()}/render/{job.id}/ws?token=t"
+        with p1, p2, p3, pytest.raises(WebSocketDisconnect):
+            with client.websocket_connect(url) as ws:
+                ws.receive_json()
@@ -0,0 +1,184 @@
+"""Tests for render admission control (src.render.scheduler)."""
+
+import asyncio
+from datetime import UTC, datetime, timedelta
+from types import SimpleNamespace
+from typing import Any
+from unittest.mock import AsyncMock
+from uuid import UUID, uuid4
+
+import pytest
+
+from src.render import executor as executor_module
+from src.render.executor import CloudRunJobsExecutor, InlineExecutor, jobs_queue_position
+from src.render.scheduler import RenderDemand, RenderScheduler
+
+GiB = 1024**3
+
+
+def _demand(gib: float, cpu: float = 2.0) -> RenderDemand:
+    return RenderDemand(int(gib * GiB), cpu)
+
+
+def test_admits_while_memory_and_cpu_fit() -> None:
+    scheduler = RenderScheduler(memory_budget_bytes=4 * GiB, cpu_budget=4.0)
+
+    first = scheduler.submit(uuid4(), _demand(1.5))
+    second = scheduler.submit(uuid4(), _demand(1.5))
+    third = scheduler.submit(uuid4(), _demand(0.5))  # fits memory, not CPU
+
+    assert first.admitted and second.admitted
+    assert not third.admitted and third.position == 1
+
+    first.release()
+    assert third.admitted
+    assert scheduler.running == 2 and scheduler.waiting == 0
+
+
+def test_final_renders_go_ahead_of_drafts_in_order() -> None:
+    scheduler = RenderScheduler(max_jobs=1)
+    scheduler.submit(uuid4(), _demand(1))
+    draft = scheduler.submit(uuid4(), _demand(1), "draft")
+    big_final = scheduler.submit(uuid4(), _demand(8))
+    small_final = scheduler.submit(uuid4(), _demand(0.1))
+
+    assert [big_final.position, small_final.position, draft.position] == [1, 2, 3]
+
+
+def test_oversized_render_runs_alone() -> None:
+    scheduler = RenderScheduler(memory_budget_bytes=2 * GiB)
+    small = scheduler.submit(uuid4(), _demand(1))
+    huge = scheduler.submit(uuid4(), _demand(6))
+    behind = scheduler.submit(uuid4(), _demand(0.5))
+
+    assert not huge.admitted
+    assert not behind.admitted  # strictly in queue order
+    small.release()
+    assert huge.admitted and not behind.admitted
+    huge.release()
+    assert behind.admitted
+
+
+async def test_wait_reports_positions_and_withdrawal() -> None:
+    scheduler = RenderScheduler(max_jobs=1)
+    running = scheduler.submit(uuid4(), _demand(1))
+    ahead = scheduler.submit(uuid4(), _demand(1))
+    job_id = uuid4()
+    ticket = scheduler.submit(job_id, _demand(1))
+    positions: list[int] = []
+
+    async def on_position(position: int) -> None:
+        positions.append(position)
+
+    waiter = asyncio.create_task(ticket.wait(on_position))
+    await asyncio.sleep(0.01)
+    scheduler.withdraw(ahead.job_id)
+    await asyncio.sleep(0.01)
+    running.release()
+
+    assert await waiter is True
+    assert positions == [2, 1]
+
+    other = scheduler.submit(uuid4(), _demand(1))
+    waiter = asyncio.create_task(other.wait())
+    await asyncio.sleep(0.01)
+    assert scheduler.withdraw(other.job_id)
+    assert await waiter is False
+
+
+async def test_inline_executor_runs_render_once_admitted(monkeypatch: pytest.MonkeyPatch) -> None:
+    scheduler = RenderScheduler(max_jobs=1)
+    monkeypatch.setattr(executor_module, "get_render_scheduler", lambda: scheduler)
+    persisted: list[tuple[UUID, int | None]] = []
+
+    async def fake_persist(job_id: UUID, position: int | None, *, admitted_status: str) -> bool:
+        persisted.append((job_id, position))
+        return True
+
+    monkeypatch.setattr(executor_module, "_persist_queue_state", fake_persist)
+    done: list[str] = []
+    release = asyncio.Event()
+
+    async def render(name: str) -> None:
+        if name == "first":
+            await release.wait()
+        done.append(name)
+
+    first_id, second_id, third_id = uuid4(), uuid4(), uuid4()
+    executor = InlineExecutor()
+    executor.dispatch(first_id, render("first"), ticket=scheduler.submit(first_id, _demand(1)))
+    executor.dispatch(second_id, render("second"), ticket=scheduler.submit(second_id, _demand(1)))
+    executor.dispatch(third_id, render("third"), ticket=scheduler.submit(third_id, _demand(1)))
+    await asyncio.sleep(0.01)
+
+    executor.cancel(third_id, None)  # queued: leaves the queue, never renders
+    release.set()
+    await asyncio.sleep(0.01)
+
+    assert done == ["first", "second"]
+    assert (second_id, 1) in persisted and (second_id, None) in persisted
+    assert scheduler.running == 0 and scheduler.waiting == 0
+
+
+def _row(priority: str = "final", *, started: bool = False, age_s: float = 0, order: int = 0):
+    now = datetime(2026, 1, 1, 12, tzinfo=UTC)
+    return SimpleNamespace(
+        id=uuid4(),
+        priority=priority,
+        started_at=now if started else None,
+        created_at=now + timedelta(seconds=order),
+        updated_at=now - timedelta(seconds=age_s),
+    )
+
+
+def test_jobs_admission_counts_every_instance_from_the_table() -> None:
+    now = datetime(2026, 1, 1, 12, tzinfo=UTC)
+    running = [_row(started=True) for _ in range(2)]
+    dead = _row(started=True, age_s=executor_module.JOBS_STALE_AFTER_S + 1)
+    draft = _row("draft", order=1)
+    final = _row(order=2)
+    orphaned = _row(order=0, age_s=executor_module.JOBS_QUEUE_STALE_AFTER_S + 1)
+    rows = [*running, dead, draft, final, orphaned]
+
+    # Two live executions hold slots; the dead and orphaned rows do not count
+    assert jobs_queue_position(final.id, rows, 3, now) is None
+    assert jobs_queue_position(draft.id, rows, 3, now) == 1
+    assert jobs_queue_position(final.id, rows, 2, now) == 1
+    assert jobs_queue_position(draft.id, rows, 2, now) == 2
+
+
+async def test_jobs_executor_launches_once_a_slot_is_claimed(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    claims = iter([2, 1, 0])
+    monkeypatch.setattr(executor_module, "JOBS_QUEUE_POLL_INTERVAL_S", 0)
+
+    async def fake_claim(job_id: UUID, max_jobs: int) -> int | None:
+        return next(claims)
+
+    monkeypatch.setattr(executor_module, "_claim_jobs_slot", fake_claim)
+    executor = CloudRunJobsExecutor(project_id="p", region="r", job_name="j")
+    dispatched: list[UUID] = []
+
+    async def fake_dispatch(job_id: UUID, *, env_overrides: Any = None) -> str:
+        dispatched.append(job_id)
+        return "executions/1"
+
+    monkeypatch.setattr(executor, "dispatch_and_persist", fake_dispatch)
+    job_id = uuid4()
+
+    assert await executor.dispatch(job_id) == "executions/1"
+    assert dispatched == [job_id]
+
+
+async def test_jobs_executor_stops_when_job_leaves_the_queue(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    async def fake_claim(job_id: UUID, max_jobs: int) -> int | None:
+        return None
+
+    monkeypatch.setattr(executor_module, "_claim_jobs_slot", fake_claim)
+    executor = CloudRunJobsExecutor(project_id="p", region="r", job_name="j")
+    monkeypatch.setattr(executor, "dispatch_and_persist", AsyncMock(side_effect=AssertionError))
+
+    assert await executor.dispatch(uuid4()) == ""
@@ -0,0 +1,135 @@
+"""Tests for segment-parallel encoding (RenderPipeline._composite_segments)."""
+
+import asyncio
+import json
+import os
+import sys
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from src.render import pipeline as pipeline_module
+from src.render.pipeline import RenderPipeline, segment_workers_for
+
+GiB = 1024**3
+
+
+def _timeline(duration_ms: int, clip_edges: list[int], **extra: Any) -> dict[str, Any]:
+    edges = [0, *clip_edges, duration_ms]
+    clips = [
+        {"id": f"c{i}", "asset_id": "a1", "start_ms": start, "duration_ms": end - start}
+        for i, (start, end) in enumerate(zip(edges[:-1], edges[1:], strict=True))
+    ]
+    return {"duration_ms": duration_ms, "layers": [{"id": "L1", "clips": clips}], **extra}
+
+
+def _mem_info(duration_s: float, estimated_gib: float, *, needs_chunking: bool = False) -> Any:
+    return {
+        "duration_s": duration_s,
+        "estimated_bytes": int(estimated_gib * GiB),
+        "safety_limit_bytes": 4 * GiB,
+        "needs_chunking": needs_chunking,
+    }
+
+
+@pytest.fixture
+def segment_settings(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(pipeline_module.settings, "render_segment_workers", 4)
+    monkeypatch.setattr(pipeline_module.settings, "render_segment_duration_s", 30)
+
+
+def test_segments_cut_at_clip_edges_on_frame_times(segment_settings: None) -> None:
+    timeline = _timeline(90_000, [29_000, 61_005])
+    pipeline = RenderPipeline(fps=30)
+
+    segments = pipeline._plan_segments(timeline, 4)
+
+    # 61005 is not a frame time at 30fps (every 100ms is); it snaps to 61000
+    assert segments == [(0, 29_000), (29_000, 61_000), (61_000, 90_000)]
+    assert pipeline._plan_segments(timeline, 1) == []
+
+
+def test_segments_follow_the_export_range(segment_settings: None) -> None:
+    timeline = _timeline(120_000, [40_017], export_start_ms=10_010, export_end_ms=100_000)
+
+    segments = RenderPipeline(fps=24)._plan_segments(timeline, 4)
+
+    # Frame times at 24fps are whole milliseconds every 125ms from the start
+    assert segments == [(10_010, 40_010), (40_010, 70_010), (70_010, 100_000)]
+
+
+def test_segment_workers_fit_the_memory_budget(segment_settings: None) -> None:
+    assert segment_workers_for(_mem_info(120, 1)) == 4
+    assert segment_workers_for(_mem_info(120, 1.5)) == 2
+    assert segment_workers_for(_mem_info(45, 1)) == 1  # shorter than two segments
+    assert segment_workers_for(_mem_info(600, 6, needs_chunking=True)) == 1
+
+
+def _probe_script(frames: int, duration_s: float) -> str:
+    info = {"streams": [{"nb_read_packets": str(frames)}], "format": {"duration": duration_s}}
+    return f"print({json.dumps(json.dumps(info))})"
+
+
+@pytest.mark.parametrize(
+    ("frames", "duration_s", "ok"),
+    [(300, 10.0, True), (299, 10.0, False), (300, 10.1, False)],
+)
+async def test_verification_checks_frames_and_duration(
+    monkeypatch: pytest.MonkeyPatch, frames: int, duration_s: float, ok: bool
+) -> None:
+    script = _probe_script(frames, duration_s)
+    monkeypatch.setattr(pipeline_module.settings, "ffprobe_path", sys.executable)
+
+    real_exec = asyncio.create_subprocess_exec
+
+    async def fake_exec(program: str, *args: str, **kwargs: Any) -> Any:
+        return await real_exec(program, "-c", script, **kwargs)
+
+    monkeypatch.setattr(asyncio, "create_subprocess_exec", fake_exec)
+
+    assert await RenderPipeline(fps=30)._verify_segmented_video("v.mp4", 10_000) is ok
+
+
+async def test_segments_composite_in_parallel_and_fall_back_on_mismatch(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    pipeline = RenderPipeline(fps=30)
+    pipeline.output_dir = str(tmp_path)
+    running = 0
+    peak = 0
+    composited: list[tuple[int, int]] = []
+    joined: list[list[str]] = []
+    verified = [False]
+
+    async def fake_composite(self: Any, timeline: Any, assets: Any, duration_ms: int) -> str:
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        composited.append((timeline.get("export_start_ms", 0), duration_ms))
+        path = os.path.join(self.output_dir, "composite.mp4")
+        Path(path).write_bytes(b"video")
+        return path
+
+    async def fake_concat(self: Any, files: list[str], output_path: str) -> None:
+        joined.append([os.path.basename(f) for f in files])
+        Path(output_path).write_bytes(b"joined")
+
+    async def fake_verify(self: Any, video_path: str, duration_ms: int) -> bool:
+        return verified.pop()
+
+    monkeypatch.setattr(RenderPipeline, "_composite_video", fake_composite)
+    monkeypatch.setattr(RenderPipeline, "_concatenate_chunks", fake_concat)
+    monkeypatch.setattr(RenderPipeline, "_verify_segmented_video", fake_verify)
+
+    segments = [(0, 30_000), (30_000, 60_000), (60_000, 90_000)]
+    await pipeline._composite_segments(_timeline(90_000, []), {}, 90_000, segments, 2)
+
+    assert peak == 2
+    assert joined == [["segment_000.mp4", "segment_001.mp4", "segment_002.mp4"]]
+    # Mismatch: the whole video is composited once more in a single pass
+    assert sorted(composited[:3]) == [(0, 30_000), (30_000, 30_000), (60_000, 30_000)]
+    assert composited[3] == (0, 90_000)
+    assert not (tmp_path / "segments").exists()
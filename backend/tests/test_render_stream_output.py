@@ -0,0 +1,124 @@
+"""Tests for streamed render output (RenderPipeline.render(output_sink=...))."""
+
+import asyncio
+import sys
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from src.render import pipeline as pipeline_module
+from src.render.pipeline import FRAGMENTED_MP4_MOVFLAGS, RenderPipeline
+from src.services import storage_service as storage_service_module
+from src.services.storage_service import LocalStorageService, StreamingUpload
+
+
+class _Sink:
+    def __init__(self) -> None:
+        self.chunks: list[bytes] = []
+
+    async def write(self, data: bytes) -> None:
+        self.chunks.append(data)
+
+
+@pytest.fixture
+def local_storage(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> LocalStorageService:
+    monkeypatch.setattr(storage_service_module.settings, "local_storage_path", str(tmp_path))
+    return LocalStorageService()
+
+
+async def test_final_mux_writes_fragmented_mp4_to_stdout(monkeypatch: pytest.MonkeyPatch) -> None:
+    commands: list[list[str]] = []
+
+    async def fake_stream(self: Any, cmd: list[str], *_: Any) -> int:
+        commands.append(cmd)
+        return 0
+
+    monkeypatch.setattr(RenderPipeline, "_stream_ffmpeg_output", fake_stream)
+    await RenderPipeline()._stream_final("/tmp/composite.fifo", "/tmp/a.aac", 3000, _Sink())
+
+    cmd = commands[0]
+    assert cmd[cmd.index("-movflags") + 1] == FRAGMENTED_MP4_MOVFLAGS
+    assert cmd[-3:] == ["-f", "mp4", "pipe:1"]
+    assert cmd[cmd.index("-c:v") + 1] == "copy"
+
+
+async def test_ffmpeg_output_is_forwarded_in_chunks(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(pipeline_module, "STREAM_READ_SIZE", 1000)
+    sink = _Sink()
+    script = "import sys; sys.stdout.buffer.write(b'x' * 2500)"
+
+    written = await RenderPipeline()._stream_ffmpeg_output(
+        [sys.executable, "-c", script], sink, "Test", 10
+    )
+
+    assert written == 2500
+    assert b"".join(sink.chunks) == b"x" * 2500
+    assert max(len(chunk) for chunk in sink.chunks) <= 1000
+
+
+async def test_ffmpeg_failure_raises_with_stderr() -> None:
+    script = "import sys; sys.stderr.write('bad input'); sys.exit(1)"
+
+    with pytest.raises(RuntimeError, match="Test failed: bad input"):
+        await RenderPipeline()._stream_ffmpeg_output(
+            [sys.executable, "-c", script], _Sink(), "Test", 10
+        )
+
+
+async def test_streaming_upload_finalizes_or_discards(local_storage: LocalStorageService) -> None:
+    async with StreamingUpload(local_storage, "renders/ok.mp4", "video/mp4") as upload:
+        await upload.write(b"moov")
+        await upload.write(b"moof")
+
+    assert upload.bytes_written == 8
+    assert (local_storage.base_path / "renders/ok.mp4").read_bytes() == b"moovmoof"
+
+    with pytest.raises(RuntimeError):
+        async with StreamingUpload(local_storage, "renders/failed.mp4", "video/mp4") as upload:
+            await upload.write(b"moov")
+            raise RuntimeError("mux failed")
+
+    assert not (local_storage.base_path / "renders/failed.mp4").exists()
+
+
+async def test_composite_failure_aborts_the_streaming_mux(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    pipeline = RenderPipeline()
+    pipeline.output_dir = str(tmp_path)
+    mux_cancelled = False
+    composite_cmds: list[list[str]] = []
+
+    def fake_build(self: Any, timeline: Any, assets: Any, duration_ms: int, output: str) -> Any:
+        return ["ffmpeg", "-i", "a.mp4", "-t", "3.0", output], []
+
+    async def fake_composite(self: Any, cmd: list[str], duration_ms: int) -> None:
+        composite_cmds.append(cmd)
+        raise pipeline_module.RenderError("composite failed")
+
+    async def fake_mux(self: Any, video_path: str, *_: Any) -> None:
+        nonlocal mux_cancelled
+        try:
+            await asyncio.Event().wait()  # blocked reading the FIFO
+        except asyncio.CancelledError:
+            mux_cancelled = True
+            raise
+
+    monkeypatch.setattr(RenderPipeline, "build_composite_command", fake_build)
+    monkeypatch.setattr(RenderPipeline, "_run_composite", fake_composite)
+    monkeypatch.setattr(RenderPipeline, "_stream_final", fake_mux)
+
+    with pytest.raises(pipeline_module.RenderError):
+        await pipeline._composite_and_stream({}, {}, "a.aac", 3000, _Sink())
+
+    assert mux_cancelled
+    fifo = str(tmp_path / "composite.fifo")
+    assert composite_cmds[0][-6:] == [
+        "3.0",
+        "-movflags",
+        FRAGMENTED_MP4_MOVFLAGS,
+        "-f",
+        "mp4",
+        fifo,
+    ]
@@ -451,3 +451,21 @@ async def test_get_edit_context_raises_400_on_decode_error():
                     x_edit_session="bad-token-value",
                 )
     assert exc_info.value.status_code == 400
+
+
+def test_health_metrics_requires_metrics_token(client_no_dev_mode, monkeypatch):
+    """/health/metrics は X-Metrics-Token が一致する場合のみ応答する（内部専用）。"""
+    import src.main as main_module
+
+    patched = deepcopy(main_module.settings)
+    patched.metrics_token = ""
+    monkeypatch.setattr(main_module, "settings", patched)
+    assert client_no_dev_mode.get("/health/metrics").status_code == 404
+
+    patched.metrics_token = "s3cret"
+    assert client_no_dev_mode.get("/health/metrics").status_code == 404
+    wrong = client_no_dev_mode.get("/health/metrics", headers={"X-Metrics-Token": "nope"})
+    assert wrong.status_code == 404
+
+    resp = client_no_dev_mode.get("/health/metrics", headers={"X-Metrics-Token": "s3cret"})
+    assert resp.status_code == 200
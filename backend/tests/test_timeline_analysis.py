@@ -0,0 +1,122 @@
+"""Tests for the TimelineAnalyzer single-pass precompute stage."""
+
+from __future__ import annotations
+
+import random
+
+import pytest
+
+from src.services import timeline_analysis
+from src.services.timeline_analysis import (
+    NUMPY_MIN_INTERVALS,
+    TimelineAnalyzer,
+    _merge_intervals,
+    _overlaps_any,
+)
+
+
+def _naive_merge(intervals: list[tuple[int, int]]) -> list[tuple[int, int]]:
+    merged: list[tuple[int, int]] = []
+    for start, end in sorted(intervals, key=lambda x: x[0]):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def _clip(cid: str, start: int, duration: int, **extra: object) -> dict:
+    return {"id": cid, "start_ms": start, "duration_ms": duration, **extra}
+
+
+def _large_timeline(n: int, seed: int = 7) -> dict:
+    rng = random.Random(seed)
+
+    def clips(prefix: str) -> list[dict]:
+        return [
+            _clip(f"{prefix}{i}", rng.randint(0, 600_000), rng.randint(0, 5000)) for i in range(n)
+        ]
+
+    return {
+        "layers": [
+            {"id": "content", "type": "content", "clips": clips("c")},
+            {"id": "bg", "type": "background", "clips": clips("b")},
+            {"id": "text", "type": "text", "clips": clips("t")},
+        ],
+        "audio_tracks": [
+            {"id": "narr", "type": "narration", "clips": clips("n")},
+            {"id": "bgm", "type": "bgm", "clips": clips("m")},
+        ],
+    }
+
+
+class TestMergeIntervals:
+    def test_touching_intervals_merge(self) -> None:
+        assert _merge_intervals([(1000, 2000), (0, 1000), (2500, 3000)]) == [
+            (0, 2000),
+            (2500, 3000),
+        ]
+
+    def test_numpy_path_matches_python_merge(self) -> None:
+        rng = random.Random(3)
+        intervals = [
+            (s, s + rng.randint(0, 3000))
+            for s in (rng.randint(0, 200_000) for _ in range(NUMPY_MIN_INTERVALS * 4))
+        ]
+        merged = _merge_intervals(intervals)
+        assert merged == _naive_merge(intervals)
+        assert all(type(v) is int for iv in merged for v in iv)
+
+    def test_overlaps_any_uses_open_range(self) -> None:
+        merged = [(0, 1000), (2000, 3000)]
+        assert _overlaps_any(merged, 500, 600)
+        assert not _overlaps_any(merged, 1000, 2000)
+        assert _overlaps_any(merged, 1000, 2001)
+        assert not _overlaps_any([], 0, 10)
+
+
+class TestTimelineAnalyzerPrecompute:
+    def test_gaps_and_coverage_from_index(self) -> None:
+        timeline = {
+            "layers": [
+                {
+                    "id": "L1",
+                    "name": "Content",
+                    "type": "content",
+                    "clips": [_clip("a", 0, 1000), _clip("b", 500, 1000), _clip("c", 3000, 1000)],
+                },
+                {"id": "L2", "name": "Background", "type": "background", "clips": []},
+            ],
+        }
+        analyzer = TimelineAnalyzer(timeline)
+        gaps = analyzer.analyze_gaps()["layers"][0]["gaps"]
+        assert [(g["start_ms"], g["end_ms"]) for g in gaps] == [(1500, 3000)]
+        coverage = analyzer.analyze_layer_coverage()["layers"][0]
+        assert coverage["coverage_ms"] == 2500
+        assert analyzer.project_duration_ms == 4000
+
+    def test_sections_computed_once(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        analyzer = TimelineAnalyzer(_large_timeline(50))
+        calls = 0
+        original = analyzer._detect_sections
+
+        def counting() -> list[dict]:
+            nonlocal calls
+            calls += 1
+            return original()
+
+        monkeypatch.setattr(analyzer, "_detect_sections", counting)
+        analyzer.analyze_all()
+        assert calls == 1
+
+    def test_large_timeline_matches_python_path(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        timeline = _large_timeline(NUMPY_MIN_INTERVALS * 2)
+
+        vectorized = TimelineAnalyzer(timeline).analyze_all()
+        monkeypatch.setattr(timeline_analysis, "NUMPY_MIN_INTERVALS", 10**9)
+        pure_python = TimelineAnalyzer(timeline).analyze_all()
+
+        for key in ("gap_analysis", "audio_analysis", "audio_balance", "layer_coverage"):
+            assert vectorized[key] == pure_python[key]
+        assert vectorized["sections"] == pure_python["sections"]
+        assert vectorized["quality_score"] == pure_python["quality_score"]
@@ -0,0 +1,96 @@
+"""Tests for copy-on-write timeline documents."""
+
+from __future__ import annotations
+
+import copy
+from typing import Any
+
+from src.render.pipeline import RenderPipeline
+from src.services.timeline_document import TimelineDocument, deep_clone, fork_timeline
+
+
+def _timeline() -> dict[str, Any]:
+    return {
+        "duration_ms": 3000,
+        "layers": [
+            {
+                "id": "L1",
+                "name": "Content",
+                "clips": [
+                    {"id": "c1", "start_ms": 0, "duration_ms": 1000, "transform": {"x": 0}},
+                    {"id": "c2", "start_ms": 1000, "duration_ms": 2000, "transform": {"x": 5}},
+                ],
+            }
+        ],
+        "audio_tracks": [
+            {"id": "T1", "clips": [{"id": "a1", "start_ms": 0, "duration_ms": 3000}]},
+        ],
+        "metadata": {"note": "kept"},
+    }
+
+
+class TestForkTimeline:
+    def test_containers_copied_clips_shared(self) -> None:
+        source = _timeline()
+        fork = fork_timeline(source)
+
+        assert fork == source
+        assert fork["layers"][0] is not source["layers"][0]
+        assert fork["layers"][0]["clips"] is not source["layers"][0]["clips"]
+        assert fork["layers"][0]["clips"][0] is source["layers"][0]["clips"][0]
+        assert fork["audio_tracks"][0]["clips"][0] is source["audio_tracks"][0]["clips"][0]
+
+    def test_container_edits_do_not_leak(self) -> None:
+        source = _timeline()
+        snapshot = copy.deepcopy(source)
+        fork = fork_timeline(source)
+
+        fork["duration_ms"] = 1
+        fork["layers"][0]["name"] = "Renamed"
+        fork["layers"][0]["clips"].pop()
+        fork["audio_tracks"].append({"id": "T2", "clips": []})
+
+        assert source == snapshot
+
+    def test_chunk_timeline_is_a_fork(self) -> None:
+        source = _timeline()
+        pipeline = RenderPipeline(job_id="j", project_id="p")
+
+        chunk = pipeline._create_chunk_timeline(source, 1000, 2500)
+
+        assert chunk["duration_ms"] == 1500
+        assert (chunk["export_start_ms"], chunk["export_end_ms"]) == (1000, 2500)
+        assert source["duration_ms"] == 3000 and "export_start_ms" not in source
+        assert chunk["layers"][0]["clips"][1] is source["layers"][0]["clips"][1]
+
+
+class TestTimelineDocument:
+    def test_own_clip_on_first_write(self) -> None:
+        source = _timeline()
+        snapshot = copy.deepcopy(source)
+        doc = TimelineDocument(source)
+
+        clip, layer, full_id = doc.find_clip("video", "c2")
+        assert clip is not None and layer is not None and full_id == "c2"
+        clip["transform"]["x"] = 99
+
+        assert source == snapshot
+        assert doc.working["layers"][0]["clips"][1]["transform"]["x"] == 99
+        # Untouched clips stay shared; a second lookup returns the same copy
+        assert doc.working["layers"][0]["clips"][0] is source["layers"][0]["clips"][0]
+        assert doc.find_clip("video", "c2")[0] is clip
+
+    def test_prefix_lookup_and_missing(self) -> None:
+        doc = TimelineDocument(_timeline())
+        assert doc.find_clip("audio", "a")[2] == "a1"
+        assert doc.find_clip("audio", "zz") == (None, None, None)
+        assert doc.peek_clip("video", "c1") is doc.base["layers"][0]["clips"][0]
+
+
+def test_deep_clone_is_independent() -> None:
+    source = _timeline()
+    clone = deep_clone(source)
+
+    assert clone == source
+    clone["layers"][0]["clips"][0]["transform"]["x"] = 42
+    assert source["layers"][0]["clips"][0]["transform"]["x"] == 0
@@ -38,3 +38,17 @@ def test_normalize_embedded_export_timeline_preserves_partial_export_metadata()
 def test_normalize_export_timeline_rejects_invalid_range() -> None:
     with pytest.raises(ValueError, match="Invalid export range"):
         normalize_export_timeline({"duration_ms": 500}, 500, start_ms=300, end_ms=300)
+
+
+def test_normalize_export_timeline_leaves_source_untouched() -> None:
+    source = {
+        "duration_ms": 1000,
+        "layers": [{"id": "L1", "clips": [{"id": "c1", "start_ms": 0, "duration_ms": 1000}]}],
+    }
+
+    timeline, _ = normalize_export_timeline(source, 1000, start_ms=100, end_ms=900)
+
+    assert timeline["duration_ms"] == 800
+    assert source["duration_ms"] == 1000
+    assert "export_start_ms" not in source
+    assert timeline["layers"][0] is not source["layers"][0]
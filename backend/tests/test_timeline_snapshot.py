@@ -0,0 +1,138 @@
+"""Tests for the timeline snapshot image and its byte-bounded cache."""
+
+import base64
+import io
+from types import SimpleNamespace
+from typing import Any
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from src.services import timeline_snapshot
+from src.services.derived_view_cache import SNAPSHOT_MAX_BYTES, DerivedViewCache, view_key
+from src.services.timeline_snapshot import (
+    AUDIO_CLIP_COLOR,
+    LAYER_COLORS,
+    RULER_HEIGHT,
+    TRACK_AREA_LEFT,
+    _clip_spans,
+    _span_mask,
+    generate_timeline_snapshot,
+)
+
+
+def _decode(snapshot: str | None) -> Image.Image:
+    assert snapshot is not None
+    return Image.open(io.BytesIO(base64.b64decode(snapshot)))
+
+
+def _dense_layer(count: int, duration_ms: int) -> dict[str, Any]:
+    # Clips every other 1/count of the timeline: most are narrower than a pixel
+    step = duration_ms // count
+    clips = [
+        {"id": f"c{i}", "start_ms": i * step, "duration_ms": step // 2} for i in range(0, count, 2)
+    ]
+    return {"id": "L1", "type": "text", "name": "Text", "clips": clips}
+
+
+def test_clip_spans_match_single_clip_geometry() -> None:
+    clips = [
+        {"start_ms": 0, "duration_ms": 500},
+        {"start_ms": 5000, "duration_ms": 1},  # sub-pixel: widened to 2px
+        {"start_ms": 7000, "duration_ms": 0},  # skipped
+        {"start_ms": 20_000, "duration_ms": 1000},  # beyond the end: dropped
+    ]
+
+    visible, x0, x1 = _clip_spans(clips, 10_000, 1200)
+
+    assert visible == clips[:2]
+    assert x0.tolist() == [TRACK_AREA_LEFT, TRACK_AREA_LEFT + 545]
+    assert x1.tolist() == [TRACK_AREA_LEFT + 54, TRACK_AREA_LEFT + 547]
+
+
+def test_span_mask_coalesces_overlapping_spans() -> None:
+    mask = _span_mask(np.array([2, 3, 8]), np.array([4, 5, 8]), 10)
+
+    assert np.flatnonzero(mask).tolist() == [2, 3, 4, 5, 8]
+
+
+def test_dense_rows_are_rasterized_as_spans(monkeypatch: pytest.MonkeyPatch) -> None:
+    layer = _dense_layer(2000, 60_000)
+    snapshot = generate_timeline_snapshot([layer], [], 60_000, image_format="png")
+
+    pixels = np.array(_decode(snapshot).convert("RGB"))
+    _, x0, x1 = _clip_spans(layer["clips"], 60_000, 1200)
+    covered = _span_mask(x0, x1, 1200)
+    row_mid = pixels[RULER_HEIGHT + 25]
+
+    # The palette PNG keeps flat colors exact
+    assert (row_mid[covered] == LAYER_COLORS["text"]).all()
+    assert not (row_mid[~covered] == LAYER_COLORS["text"]).all(axis=1).any()
+
+    # The same row drawn clip by clip covers the same columns
+    monkeypatch.setattr(timeline_snapshot, "DENSE_ROW_MIN_CLIPS", 10**9)
+    per_clip = np.array(
+        _decode(generate_timeline_snapshot([layer], [], 60_000, image_format="png")).convert("RGB")
+    )
+    per_clip_covered = (per_clip[RULER_HEIGHT + 25] == LAYER_COLORS["text"]).all(axis=1)
+    assert (per_clip_covered == covered).all()
+
+
+@pytest.mark.parametrize(
+    ("image_format", "pil_format"), [("jpeg", "JPEG"), ("png", "PNG"), ("webp", "WEBP")]
+)
+def test_formats_and_width(image_format: Any, pil_format: str) -> None:
+    track = {"id": "A1", "type": "bgm", "clips": [{"start_ms": 0, "duration_ms": 4000}]}
+
+    img = _decode(
+        generate_timeline_snapshot([], [track], 4000, width=800, image_format=image_format)
+    )
+
+    assert img.format == pil_format
+    assert img.width == 800
+    if image_format == "png":
+        assert img.convert("RGB").getpixel((400, RULER_HEIGHT + 25)) == AUDIO_CLIP_COLOR
+
+
+def _snapshot_key(version: int, assets: str = "1@-", width: int = 1200) -> Any:
+    project = SimpleNamespace(id="p1", updated_at=None)
+    sequence = SimpleNamespace(id="s1", version=version, updated_at=None)
+    return view_key(
+        project,  # type: ignore[arg-type]
+        sequence,  # type: ignore[arg-type]
+        "timeline_snapshot",
+        {"width": width, "format": "png"},
+        assets=assets,
+    )
+
+
+def test_snapshot_cache_is_bounded_by_bytes() -> None:
+    cache = DerivedViewCache(max_bytes=10)
+    cache.put(_snapshot_key(1, width=800), "a" * 6)
+    cache.put(_snapshot_key(1, width=1200), "b" * 6)
+
+    assert cache.get(_snapshot_key(1, width=800)) is None
+    assert cache.get(_snapshot_key(1, width=1200)) == "b" * 6
+    assert cache.size_bytes == 6
+    cache.put(_snapshot_key(1, width=1600), "c" * 11)  # larger than the cache
+    assert len(cache) == 1
+
+
+async def test_snapshot_cache_keys_on_version_and_asset_catalog() -> None:
+    cache = DerivedViewCache(max_bytes=SNAPSHOT_MAX_BYTES)
+    renders: list[int] = []
+
+    def render() -> str:
+        renders.append(1)
+        return f"img{len(renders)}"
+
+    assert await cache.get_or_compute(_snapshot_key(1), render) == "img1"
+    assert await cache.get_or_compute(_snapshot_key(1), render) == "img1"
+    # An asset rename changes the catalog token: the snapshot is rendered again
+    assert await cache.get_or_compute(_snapshot_key(1, assets="1@renamed"), render) == "img2"
+    # The newer version replaced the older one of the same variant
+    assert len(cache) == 1 and cache.size_bytes == len("img2")
+
+    assert cache.invalidate_project("p1") == 1
+    assert cache.size_bytes == 0
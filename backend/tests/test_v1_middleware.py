@@ -0,0 +1,130 @@
+"""Tests for the pure-ASGI V1 rate limit and ETag middleware."""
+
+from __future__ import annotations
+
+import pytest
+from fastapi import FastAPI, Response
+from fastapi.testclient import TestClient
+
+from src.middleware.etag import ETagMiddleware
+from src.middleware.rate_limit import LocalRateLimitBackend, RateLimitMiddleware
+from src.utils.metrics import metrics
+
+
+def _app(**limits) -> RateLimitMiddleware:
+    app = FastAPI()
+
+    @app.get("/api/ai/v1/projects/p")
+    async def project(response: Response) -> dict[str, str]:
+        response.headers["ETag"] = '"v1"'
+        return {"id": "p"}
+
+    @app.get("/api/ai/v1/capabilities")
+    async def capabilities() -> dict[str, bool]:
+        return {"ok": True}
+
+    @app.get("/health")
+    async def health() -> dict[str, str]:
+        return {"status": "ok"}
+
+    # Same order as main.py: rate limiting wraps ETag handling
+    return RateLimitMiddleware(ETagMiddleware(app), **limits)
+
+
+class _SharedBackend:
+    """Stand-in for a cross-instance store; one local state behind an async API."""
+
+    def __init__(self) -> None:
+        self.state = LocalRateLimitBackend()
+        self.calls = 0
+
+    async def acquire(self, key, now, emission_interval, tolerance):  # type: ignore[no-untyped-def]
+        self.calls += 1
+        return self.state.step(key, now, emission_interval, tolerance)
+
+
+class _BrokenBackend:
+    async def acquire(self, *_):  # type: ignore[no-untyped-def]
+        raise ConnectionError("store unavailable")
+
+
+class TestLocalBackend:
+    def test_burst_then_steady_rate(self) -> None:
+        state = LocalRateLimitBackend()
+        # 3 per 3s: T=1s, burst of 3
+        results = [state.step("c", 100.0, 1.0, 2.0)[0] for _ in range(4)]
+        assert results == [True, True, True, False]
+        assert state.step("c", 100.5, 1.0, 2.0)[0] is False
+        assert state.step("c", 101.0, 1.0, 2.0)[0] is True
+
+    def test_memory_is_bounded(self) -> None:
+        state = LocalRateLimitBackend(max_clients=2)
+        for key in ("a", "b", "c"):
+            state.step(key, 0.0, 1.0, 0.0)
+        assert len(state) == 2
+
+
+class TestRateLimitMiddleware:
+    def test_headers_and_429_envelope(self) -> None:
+        limiter = _app(requests_per_window=2, window_seconds=60)
+        client = TestClient(limiter)
+        headers = {"X-API-Key": "douga_sk_abc"}
+
+        first = client.get("/api/ai/v1/capabilities", headers=headers)
+        assert first.status_code == 200
+        assert first.headers["X-RateLimit-Limit"] == "2"
+        assert first.headers["X-RateLimit-Remaining"] == "1"
+
+        assert client.get("/api/ai/v1/capabilities", headers=headers).status_code == 200
+        limited = client.get("/api/ai/v1/capabilities", headers=headers)
+        assert limited.status_code == 429
+        assert limited.headers["X-RateLimit-Remaining"] == "0"
+        assert 1 <= int(limited.headers["Retry-After"]) <= 31
+        assert limited.json()["error"]["code"] == "RATE_LIMITED"
+
+        # Other clients and non-V1 paths are unaffected
+        other = client.get("/api/ai/v1/capabilities", headers={"X-API-Key": "douga_sk_xyz"})
+        assert other.status_code == 200
+        health = client.get("/health", headers=headers)
+        assert health.status_code == 200
+        assert "X-RateLimit-Limit" not in health.headers
+
+    def test_shared_backend_and_fallback(self) -> None:
+        limiter = _app(requests_per_window=1, window_seconds=60)
+        client = TestClient(limiter)
+        shared = _SharedBackend()
+        limiter.set_backend(shared)
+
+        assert client.get("/api/ai/v1/capabilities").status_code == 200
+        assert client.get("/api/ai/v1/capabilities").status_code == 429
+        assert shared.calls == 2
+
+        limiter.set_backend(_BrokenBackend())
+        assert client.get("/api/ai/v1/capabilities").status_code == 200
+
+
+class TestETagMiddleware:
+    @pytest.fixture(autouse=True)
+    def _reset_metrics(self) -> None:
+        metrics.reset()
+
+    def test_matching_etag_returns_304_with_rate_headers(self) -> None:
+        client = TestClient(_app())
+
+        resp = client.get("/api/ai/v1/projects/p", headers={"If-None-Match": '"v1"'})
+        assert resp.status_code == 304
+        assert resp.content == b""
+        assert resp.headers["etag"] == '"v1"'
+        assert "x-ratelimit-remaining" in resp.headers
+        assert metrics.snapshot()["counters"]["etag.late_304"] == 1
+
+        resp = client.get("/api/ai/v1/projects/p", headers={"If-None-Match": '"v0"'})
+        assert resp.status_code == 200
+        assert resp.json() == {"id": "p"}
+
+    def test_cache_control_on_static_paths(self) -> None:
+        client = TestClient(_app())
+        assert client.get("/api/ai/v1/capabilities").headers["Cache-Control"] == (
+            "public, max-age=300"
+        )
+        assert "Cache-Control" not in client.get("/api/ai/v1/projects/p").headers